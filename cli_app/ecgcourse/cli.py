@@ -531,6 +531,15 @@ def _qtc(qt_ms: float, rr_ms: float):
     qf = qt_ms / ((rr_ms/1000.0)**(1.0/3.0))
     return round(qb,1), round(qf,1)
 
+def _print_stage_timings(prof) -> None:
+    tbl = Table(title="Tempo por etapa")
+    tbl.add_column("etapa"); tbl.add_column("ms", justify="right"); tbl.add_column("%", justify="right")
+    total_ms = prof.total * 1000.0
+    for stage, ms in prof.as_ms().items():
+        tbl.add_row(stage, f"{ms:.1f}", f"{100.0 * ms / max(total_ms, 1e-9):.0f}")
+    tbl.add_row("[bold]total[/]", f"{total_ms:.1f}", "100")
+    print(tbl)
+
 @ingest_app.command("image")
 def ingest_image(
     image_path: str = typer.Argument(..., help="Arquivo PNG/JPG/PDF(1ª pág.)"),
@@ -550,6 +559,7 @@ def ingest_image(
     axis_flag: bool = typer.Option(False, "--axis", help="Calcular eixo frontal I/aVF"),
     schema_v5: bool = typer.Option(True, "--schema-v5/--schema-v4-off", help="Emitir laudo no schema v0.5"),
     report: bool = typer.Option(False, "--report", help="Salvar laudo conforme schema"),
+    profile: bool = typer.Option(False, "--profile", help="Imprimir tempo por etapa (decode, deskew, grid, ...)"),
 ):
     p = pathlib.Path(image_path)
     if not p.exists():
@@ -557,22 +567,9 @@ def ingest_image(
 
     # Sidecar META
     meta_path = pathlib.Path(meta) if meta else p.with_suffix(p.suffix + ".meta.json")
-    # Pré-processamento opcional: deskew + normalize (aplicados sequencialmente sobre arquivo temporário em memória)
-    from PIL import Image
-    import io as _io
-    _img = Image.open(str(p)).convert("RGB")
-    if deskew:
-        from cv.deskew import estimate_rotation_angle, rotate_image
-        _info = estimate_rotation_angle(_img, search_deg=6.0, step=0.5)
-        _img = rotate_image(_img, _info['angle_deg'])
-    if normalize:
-        from cv.normalize import normalize_scale
-        _img, _scale, _pxmm = normalize_scale(_img, target_px_per_mm=10.0)
-    # Substitui path por buffer em memória para etapas seguintes que leem a imagem
-    _buf = _io.BytesIO()
-    _img.save(_buf, format="PNG")
-    _buf.seek(0)
-    
+    from cv.profiling import StageTimings
+    prof = StageTimings()
+
     meta_data = {}
     if meta_path.exists():
         try:
@@ -586,81 +583,29 @@ def ingest_image(
     ms_per_div = meta_data.get("ms_per_div")
     layout = meta_data.get("leads_layout", "3x4")
     measures = meta_data.get("measures", {})
-    # Grade/segmentação automática quando solicitado ou sem calibração
+    # Grade/segmentação automática quando solicitado: mesmo pipeline do ingest em lote
+    # (deskew → normalize → grade → segmentação → R-peaks → intervalos → eixo)
     seg = None
     grid = None
     layout_det = None
-    lead_labels = None
     rpeaks_out = None
     intervals_refined_out = None
     axis_out = None
     intervals_out = None
-
-
     if auto_grid:
+        from cv.batch import analyze_image
+        options = {"deskew": deskew, "normalize": normalize, "layout": "3x4",
+                   "rpeaks_lead": rpeaks_lead, "robust": rpeaks_robust, "intervals": intervals,
+                   "intervals_refined": intervals_refined_flag, "axis": axis_flag,
+                   "auto_leads": auto_leads}
         try:
-            from PIL import Image
-            import numpy as _np
-            from cv.grid_detect import estimate_grid_period_px
-            from cv.segmentation import segment_12leads_basic, find_content_bbox
-            _buf.seek(0)
-            arr = _np.asarray(Image.open(_buf).convert("RGB"))
-            grid = estimate_grid_period_px(arr)
-            _buf.seek(0)
-            gray = _np.asarray(Image.open(_buf).convert("L"))
-            bbox = find_content_bbox(gray)
-            seg_leads = segment_12leads_basic(gray, bbox=bbox)
-            seg = {"content_bbox": bbox, "leads": seg_leads}
-            if auto_leads:
-                from cv.lead_ocr import choose_layout
-                layout_det = choose_layout(gray, {"3x4": [d["bbox"] for d in seg_leads]})
-                lead_labels = layout_det.get("labels")
-            _lab2box = {d["lead"]: d["bbox"] for d in seg_leads}
-            if rpeaks_lead or axis_flag:
-                from cv.rpeaks_from_image import extract_trace_centerline, smooth_signal, detect_rpeaks_from_trace, estimate_px_per_sec
-                _pxmm = (grid.get("px_small_x") if grid else None) or (grid.get("px_small_y") if grid else None)
-                _pxsec = estimate_px_per_sec(_pxmm, 25.0) or 250.0
-
-                def _detect_peaks_for_box(_box):
-                    _x0, _y0, _x1, _y1 = _box
-                    _crop = gray[_y0:_y1, _x0:_x1]
-                    _trace = smooth_signal(extract_trace_centerline(_crop, band=0.8), win=11)
-                    if rpeaks_robust:
-                        from cv.rpeaks_robust import pan_tompkins_like
-                        _rob = pan_tompkins_like(_trace, _pxsec)
-                        return _trace, {"peaks_idx": _rob["peaks_idx"], "method": "pan_tompkins_like"}
-                    _det = detect_rpeaks_from_trace(_trace, px_per_sec=_pxsec, zthr=2.0)
-                    _det["method"] = "zscore_localmax"
-                    return _trace, _det
-
-                if rpeaks_lead in _lab2box:
-                    _trace, rpeaks_out = _detect_peaks_for_box(_lab2box[rpeaks_lead])
-                    if intervals_refined_flag:
-                        from cv.intervals_refined import intervals_refined_from_trace
-                        intervals_refined_out = intervals_refined_from_trace(_trace, rpeaks_out.get('peaks_idx') or [], _pxsec)
-                    if intervals:
-                        from cv.intervals import intervals_from_trace
-                        intervals_out = intervals_from_trace(_trace, rpeaks_out.get("peaks_idx") or [], _pxsec)
-                    rpeaks_out["lead_used"] = rpeaks_lead
-
-                if axis_flag and all(lab in _lab2box for lab in ("I", "aVF")):
-                    from cv.axis import frontal_axis_from_image
-                    axis_rpeaks = {}
-                    axis_fs = {}
-                    for lab in ("I", "aVF"):
-                        _, _axis_det = _detect_peaks_for_box(_lab2box[lab])
-                        axis_rpeaks[lab] = _axis_det.get("peaks_idx", [])
-                        axis_fs[lab] = _pxsec
-                    _buf.seek(0)
-                    axis_out = frontal_axis_from_image(
-                        _np.asarray(Image.open(_buf).convert('L')),
-                        {lab: _lab2box.get(lab) for lab in ['I', 'aVF']},
-                        axis_rpeaks,
-                        axis_fs,
-                    )
+            res = analyze_image(p, options, source=str(p), timings=prof)
+            grid, seg = res["grid"], res["segmentation"]
+            layout_det = res.get("layout_detection")
+            rpeaks_out, axis_out = res["rpeaks"], res["axis"]
+            intervals_out, intervals_refined_out = res["intervals"], res["intervals_refined"]
         except Exception as e:
             typer.echo(f"Auto-grid falhou: {e}", err=True)
-    
 
     # Derivados
     rr_ms = measures.get("rr_ms")
@@ -749,6 +694,8 @@ def ingest_image(
     if qt_ms: print(f"QT: {qt_ms} ms | QTc (B/F): {qb}/{qf} ms")
     if axis_label: print(f"Eixo: {axis_label} ({angle:.1f}° aprox)")
     if flags: print("Flags: " + "; ".join(flags))
+    if profile:
+        _print_stage_timings(prof)
 
     # Salvar relatórios
     if report:
@@ -772,6 +719,49 @@ def ingest_image(
                     f.write(f"- {s}\n")
         print(Panel.fit("[bold green]Laudos salvos em reports/"))
 
+
+@ingest_app.command("batch")
+def ingest_batch_cmd(
+    source: str = typer.Argument(..., help="Diretório de imagens ou manifesto JSONL (ex.: assets/manifest/ecg_images.v1.jsonl)"),
+    out_dir: str = typer.Option(None, "--out", help="Diretório dos laudos (padrão: reports/batch)"),
+    workers: int = typer.Option(0, "--workers", help="Processos (0 = nº de CPUs; 1 = sem pool)"),
+    chunksize: int = typer.Option(4, "--chunksize", help="Imagens por tarefa enviada ao pool"),
+    resume: bool = typer.Option(True, "--resume/--no-resume", help="Pular imagens com laudo ok já gravado"),
+    images_dir: str = typer.Option(None, "--images-dir", help="Base dos arquivos do manifesto (padrão: assets/raw/images)"),
+    deskew: bool = typer.Option(True, "--deskew/--no-deskew", help="Estimar rotação e deskew"),
+    normalize: bool = typer.Option(True, "--normalize/--no-normalize", help="Normalizar escala para px/mm ~10"),
+    layout: str = typer.Option("3x4", "--layout", help="Layout de segmentação"),
+    rpeaks_lead: str = typer.Option("II", "--rpeaks-lead", help="Derivação para R-peaks/intervalos"),
+    rpeaks_robust: bool = typer.Option(True, "--rpeaks-robust/--rpeaks-simple", help="Pan‑Tompkins-like ou z-score"),
+    intervals_refined_flag: bool = typer.Option(False, "--intervals-refined", help="Incluir intervalos refinados"),
+    axis_flag: bool = typer.Option(True, "--axis/--no-axis", help="Calcular eixo frontal I/aVF"),
+):
+    """Ingestão em lote (pool de processos) com laudo JSON por imagem e summary.jsonl."""
+    from cv.batch import ingest_batch
+    src = pathlib.Path(source)
+    if not src.exists():
+        typer.echo(f"Entrada não encontrada: {src}", err=True); raise typer.Exit(code=2)
+    out = pathlib.Path(out_dir) if out_dir else (REPO_ROOT / "reports" / "batch")
+    options = {"deskew": deskew, "normalize": normalize, "layout": layout, "rpeaks_lead": rpeaks_lead,
+               "robust": rpeaks_robust, "intervals": True, "intervals_refined": intervals_refined_flag,
+               "axis": axis_flag}
+
+    def _progress(row):
+        color = {"ok": "green", "skipped": "cyan"}.get(row["status"], "red")
+        extra = f" — {row['error']}" if row.get("error") else ""
+        print(f"[{color}]{row['status']:>7}[/] {row['key']} ({row['elapsed_s']:.2f}s){extra}")
+
+    res = ingest_batch(src, out, options=options, workers=workers or None, chunksize=chunksize,
+                       resume=resume, images_dir=images_dir, on_result=_progress)
+    tbl = Table(title="Ingestão em lote")
+    for col in ("total", "ok", "skipped", "error", "missing", "workers", "elapsed_s"):
+        tbl.add_column(col)
+    tbl.add_row(*(str(res[c]) for c in ("total", "ok", "skipped", "error", "missing", "workers", "elapsed_s")))
+    print(tbl)
+    print(f"Resumo: {res['summary']}")
+    if res["error"]:
+        raise typer.Exit(code=1)
+
 app.add_typer(ingest_app, name="ingest")
 
 
@@ -831,7 +821,7 @@ def cv_calibrate(image_path: str = typer.Argument(..., help="PNG/JPG"),
     from cv.grid_detect import estimate_grid_period_px
     arr = _open_image_to_array(pathlib.Path(image_path))
     info = estimate_grid_period_px(arr)
-    # Heurística: px_small ≈ período; px_big ≈ 5*px_small; px/mm ≈ px_small (se small=1mm)
+    # px_small = fundamental sub-pixel; px_big medido pela razão de harmônico (ou 5*px_small); px/mm ≈ px_small (small=1mm)
     px_small = float(info.get("px_small_x") or info.get("px_small_y") or 0.0)
     px_big = float(info.get("px_big_x") or info.get("px_big_y") or 0.0)
     out = {
@@ -840,6 +830,7 @@ def cv_calibrate(image_path: str = typer.Argument(..., help="PNG/JPG"),
         "px_per_mm_x": px_small or None,
         "px_per_mm_y": px_small or None,
         "grid_confidence": info.get("confidence", 0.0),
+        "big_small_ratio": info.get("big_ratio_x") or info.get("big_ratio_y"),
     }
     if dump_json:
         print(_json.dumps(out, ensure_ascii=False, indent=2))
@@ -872,13 +863,14 @@ app.add_typer(cv_app, name="cv")
 @cv_app.command("deskew")
 def cv_deskew(image_path: str = typer.Argument(..., help="PNG/JPG"),
               save: str = typer.Option(None, "--save", help="Salvar imagem deskew"),
-              search_deg: float = typer.Option(6.0, "--range", help="Ângulo máximo (+/-)")):
-    """Estima rotação e aplica deskew (busca bruta)."""
+              search_deg: float = typer.Option(6.0, "--range", help="Ângulo máximo (+/-)"),
+              method: str = typer.Option("pyramid", "--method", help="pyramid (grossa→fina) | brute")):
+    """Estima rotação e aplica deskew (busca grossa→fina em pirâmide ou bruta)."""
     from PIL import Image
     from cv.deskew import estimate_rotation_angle, rotate_image
     p = pathlib.Path(image_path)
     img = Image.open(str(p)).convert("RGB")
-    info = estimate_rotation_angle(img, search_deg=search_deg, step=0.5)
+    info = estimate_rotation_angle(img, search_deg=search_deg, step=0.5, method=method)
     print(f"Ângulo estimado: {info['angle_deg']:.2f}° (score {info['score']:.3f} vs {info['score0']:.3f})")
     if save:
         out = rotate_image(img, info['angle_deg'])
@@ -1316,6 +1308,33 @@ def checklist_lvh(image_path: str = typer.Argument(..., help="PNG/JPG"),
     return rep
 
 
+@checklist_app.command("full")
+def checklist_full(image_path: str = typer.Argument(..., help="PNG/JPG"),
+                   sex: str = typer.Option("male", "--sex", help="male/female"),
+                   layout: str = typer.Option("3x4", "--layout"),
+                   lead: str = typer.Option("II", "--lead", help="Derivação para ritmo/âncora"),
+                   json_out: bool = typer.Option(False, "--json")):
+    """Checklist completo (ritmo, eixo hexaxial, transição R/S, HVE) com um único contexto de imagem."""
+    import json as _json
+    from cv.context import ECGImageContext
+    from cv.rhythm import analyze_rhythm
+    from cv.axis_hexaxial import hexaxial_axis_from_image
+    from cv.precordial_transition import analyze_transition
+    from cv.lvh_checklist import lvh_checklist
+    ctx = ECGImageContext.from_path(image_path, layout=layout)
+    rep = {
+        "rhythm": analyze_rhythm(ctx, lead=lead, layout=layout),
+        "axis_hex": hexaxial_axis_from_image(ctx, layout=layout, anchor_lead=lead),
+        "transition": analyze_transition(ctx, layout=layout, anchor_lead=lead),
+        "lvh": lvh_checklist(ctx, sex=sex, layout=layout),
+    }
+    if json_out: print(_json.dumps(rep, ensure_ascii=False, indent=2))
+    else:
+        print(f"Ritmo: {rep['rhythm']['label']} | Eixo (hex): {rep['axis_hex']['angle_deg']:.1f}° — {rep['axis_hex']['label']}")
+        print(f"Transição em: {rep['transition'].get('transition_at')} | LVH: S-L={rep['lvh']['LVH_sokolow']} Cornell={rep['lvh']['LVH_cornell']}")
+    return rep
+
+
 # ── Fase 18 — Datasets clínicos (PTB-XL, PhysioNet) ───────────────────────
 
 datasets_app = typer.Typer(help="Datasets clínicos (PTB-XL, PhysioNet).")
@@ -1326,8 +1345,9 @@ app.add_typer(datasets_app, name="datasets")
 def datasets_download(
     name: str = typer.Option("ptb-xl", "--name", help="Nome do dataset (ex: ptb-xl, mit-bih)."),
     dest: str = typer.Option(None, "--dest", help="Diretório destino."),
+    workers: int = typer.Option(8, "--workers", help="Downloads simultâneos."),
 ):
-    """Baixar um dataset do PhysioNet."""
+    """Baixar um dataset do PhysioNet (paralelo, retomável, verificado por SHA256)."""
     from datasets.physionet import download_dataset, DATASETS
 
     if name not in DATASETS:
@@ -1338,7 +1358,7 @@ def datasets_download(
     dest_dir = dest or f"datasets/{name}"
     print(f"[bold cyan]Baixando dataset '{name}' para {dest_dir}...[/]")
     try:
-        result_path = download_dataset(name, dest_dir=dest_dir)
+        result_path = download_dataset(name, dest_dir=dest_dir, workers=workers)
         print(f"[bold green]Download concluído![/] Salvo em: {result_path}")
     except Exception as e:
         print(f"[bold red]Erro no download:[/] {e}")
@@ -1417,6 +1437,9 @@ def datasets_render(
     record_id: str = typer.Option(..., "--record-id", help="ID do registro (ex: 00001)."),
     lead: str = typer.Option("II", "--lead", help="Derivação a renderizar."),
     out: str = typer.Option("render.png", "--out", help="Caminho do arquivo de saída."),
+    layout: str = typer.Option(None, "--layout", help="Todas as derivações: 3x4, 6x2 ou 12x1."),
+    px_per_mm: float = typer.Option(5.0, "--px-per-mm", help="Resolução (px/mm; papel 25 mm/s, 10 mm/mV)."),
+    resolution: int = typer.Option(None, "--resolution", help="Frequência do registro PTB-XL (100 ou 500 Hz)."),
 ):
     """Renderizar um registro como imagem PNG."""
     if name != "ptb-xl":
@@ -1427,15 +1450,79 @@ def datasets_render(
 
     base_dir = f"datasets/{name}"
     try:
-        record = load_record(base_dir, record_id)
-    except FileNotFoundError as e:
+        record = load_record(base_dir, record_id, resolution=resolution)
+    except (FileNotFoundError, ValueError) as e:
         print(f"[bold red]Registro não encontrado.[/] {e}")
         raise typer.Exit(code=1)
 
     try:
-        img = record_to_image(record, lead=lead)
+        img = record_to_image(record, lead=lead, layout=layout, px_per_mm=px_per_mm)
         img.save(out)
         print(f"[bold green]Imagem salva em:[/] {out}")
     except ValueError as e:
         print(f"[bold red]Erro:[/] {e}")
         raise typer.Exit(code=1)
+
+
+@datasets_app.command("pack")
+def datasets_pack(
+    name: str = typer.Option("ptb-xl", "--name", help="Nome do dataset."),
+    resolution: int = typer.Option(100, "--resolution", help="PTB-XL: 100 ou 500 Hz."),
+    base: str = typer.Option(None, "--base", help="Diretório do dataset (padrão: datasets/<nome>)."),
+    out: str = typer.Option(None, "--out", help="Diretório do store (padrão: <base>/store[<res>])."),
+):
+    """Empacotar os registros WFDB em um store int16 memory-mapped (signals.npy + índice)."""
+    from datasets.physionet import DATASETS
+    from datasets.signal_store import pack_dataset
+
+    if name not in DATASETS:
+        available = ", ".join(sorted(DATASETS.keys()))
+        print(f"[bold red]Dataset '{name}' não reconhecido.[/] Disponíveis: {available}")
+        raise typer.Exit(code=1)
+
+    base_dir = base or f"datasets/{name}"
+    out_dir = out or str(pathlib.Path(base_dir) / (f"store{resolution}" if name == "ptb-xl" else "store"))
+    t0 = time.perf_counter()
+
+    def progress(done, total):
+        if done % 1000 == 0 or done == total:
+            print(f"  {done}/{total} registros")
+
+    try:
+        manifest = pack_dataset(base_dir, out_dir, dataset=name, resolution=resolution, on_record=progress)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"[bold red]Erro ao empacotar:[/] {e}")
+        raise typer.Exit(code=1)
+    size_mb = (pathlib.Path(out_dir) / "signals.npy").stat().st_size / 1e6
+    print(f"[bold green]Store pronto:[/] {out_dir} — {manifest['n_records']} registros, "
+          f"{manifest['n_leads']} derivações, {size_mb:.1f} MB em {time.perf_counter() - t0:.1f}s")
+
+
+@app.command("simulate-dataset")
+def simulate_dataset_cmd(
+    out_dir: str = typer.Argument(..., help="Diretório de saída (shards .npy + rótulos + dataset.json)"),
+    n: int = typer.Option(1000, "--n", help="Número de registros"),
+    seed: int = typer.Option(0, "--seed", help="Seed do dataset (registros reprodutíveis)"),
+    fs: int = typer.Option(500, "--fs", help="Frequência de amostragem (Hz)"),
+    duration: float = typer.Option(10.0, "--duration", help="Duração de cada registro (s)"),
+    shard_size: int = typer.Option(1000, "--shard-size", help="Registros por shard .npy"),
+    dtype: str = typer.Option("float32", "--dtype", help="float32 ou float16"),
+    pathology: list[str] = typer.Option(None, "--pathology", help="Restringir a patologias (repetível)"),
+    workers: int = typer.Option(0, "--workers", help="Processos (0 = nº de CPUs; 1 = sem pool)"),
+    label_format: str = typer.Option("auto", "--labels", help="auto|parquet|csv"),
+):
+    """Gerar ECGs sintéticos rotulados em lote (shards [registros, amostras, 12] + tabela de rótulos)."""
+    from simulation.dataset import simulate_dataset
+    try:
+        res = simulate_dataset(out_dir, n, seed=seed, fs=fs, duration_s=duration, shard_size=shard_size,
+                               dtype=dtype, pathologies=pathology or None, workers=workers or None,
+                               label_format=label_format,
+                               on_shard=lambda s: print(f"[green]{s['shard']}[/] {s['records']} registros"))
+    except ValueError as e:
+        typer.echo(str(e), err=True); raise typer.Exit(code=2)
+    tbl = Table(title="Dataset sintético")
+    for col in ("n_records", "shards", "dtype", "labels", "workers", "elapsed_s"):
+        tbl.add_column(col)
+    tbl.add_row(str(res["n_records"]), str(len(res["shards"])), res["dtype"], res["labels"],
+                str(res["workers"]), str(res["elapsed_s"]))
+    print(tbl)
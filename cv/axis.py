@@ -1,16 +1,10 @@
 
 import numpy as np
 from typing import Dict, List, Optional, Tuple
+from .trace import extract_trace_centerline
 
 def _centerline(gray_crop: np.ndarray, band: float = 0.8) -> np.ndarray:
-    h, w = gray_crop.shape
-    cy0 = int((1-band)*0.5*h); cy1 = int(h - cy0)
-    y = []
-    for x in range(w):
-        col = gray_crop[cy0:cy1, x]
-        y_local = int(np.argmin(col))
-        y.append(cy0 + y_local)
-    y = np.array(y, dtype=float)
+    y = extract_trace_centerline(gray_crop, band=band)
     return -(y - np.median(y))
 
 def _window(sig: np.ndarray, center: int, fs: float, pre_ms=80.0, post_ms=120.0) -> Tuple[int,int]:
@@ -27,7 +21,13 @@ def net_qrs_amplitude(sig: np.ndarray, r_idx: int, fs: float) -> float:
 def frontal_axis_from_image(gray: np.ndarray,
                             boxes: Dict[str, Tuple[int,int,int,int]],
                             rpeaks: Dict[str, List[int]],
-                            fs_map: Dict[str, float]) -> Dict:
+                            fs_map: Dict[str, float],
+                            traces: Optional[Dict[str, np.ndarray]] = None) -> Dict:
+    """
+    Eixo frontal por amplitude líquida do QRS em I e aVF.
+    traces: centerlines brutos já extraídos por derivação (ex.: ECGImageContext.trace(lead, smooth=0)),
+    evitando reextrair do recorte.
+    """
     amps = {}
     for lead in ["I","aVF"]:
         box = boxes.get(lead)
@@ -35,9 +35,12 @@ def frontal_axis_from_image(gray: np.ndarray,
         if box is None:
             amps[lead] = None
             continue
-        x0,y0,x1,y1 = box
-        crop = gray[y0:y1, x0:x1]
-        sig = _centerline(crop)
+        if traces is not None and lead in traces:
+            y = np.asarray(traces[lead], dtype=float)
+            sig = -(y - np.median(y))
+        else:
+            x0,y0,x1,y1 = box
+            sig = _centerline(gray[y0:y1, x0:x1])
         fs = fs_map.get(lead, 250.0)
         vals = [net_qrs_amplitude(sig, r, fs) for r in rlist if 0 <= r < len(sig)]
         vals = [v for v in vals if abs(v) > 1e-6]
@@ -0,0 +1,277 @@
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pathlib
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+from PIL import Image
+
+from .context import ECGImageContext
+from .profiling import StageTimings
+
+IMAGE_EXTS = (".png", ".jpg", ".jpeg")
+BATCH_VERSION = "batch-0.1"
+
+DEFAULT_OPTIONS = {
+    "deskew": True,
+    "normalize": True,
+    "layout": "3x4",
+    "rpeaks_lead": "II",
+    "robust": True,
+    "intervals": True,
+    "intervals_refined": False,
+    "axis": True,
+    "auto_leads": False,
+}
+
+
+def _json_default(o):
+    if isinstance(o, np.integer):
+        return int(o)
+    if isinstance(o, np.floating):
+        return float(o)
+    if isinstance(o, (np.ndarray, tuple)):
+        return list(o)
+    if isinstance(o, np.bool_):
+        return bool(o)
+    raise TypeError(f"Objeto não serializável: {type(o).__name__}")
+
+
+def analyze_image(image: Union[str, Image.Image, np.ndarray], options: Optional[Dict] = None,
+                  source: Optional[str] = None, timings: Optional[StageTimings] = None) -> Dict:
+    """
+    Pipeline de imagem usado pelo ingest: deskew → normalize → grade → segmentação →
+    R-peaks → intervalos → eixo, tudo sobre um único ECGImageContext.
+    Retorna as seções do laudo (grid, segmentation, rpeaks, intervals, intervals_refined, axis,
+    preprocess; layout_detection com auto_leads) e timings_ms (tempo por etapa).
+    """
+    opt = dict(DEFAULT_OPTIONS, **(options or {}))
+    prof = timings if timings is not None else StageTimings()
+    with prof.stage("decode"):
+        img = Image.open(str(image)) if isinstance(image, (str, pathlib.Path)) else image
+        if not isinstance(img, Image.Image):
+            img = Image.fromarray(np.asarray(img))
+        img = img.convert("RGB")
+    pre = {"angle_deg": None, "scale": None}
+    if opt["deskew"]:
+        from .deskew import estimate_rotation_angle, rotate_image
+        with prof.stage("deskew"):
+            info = estimate_rotation_angle(img, search_deg=6.0, step=0.5)
+            img = rotate_image(img, info["angle_deg"])
+        pre["angle_deg"] = info["angle_deg"]
+    if opt["normalize"]:
+        from .normalize import normalize_scale
+        with prof.stage("normalize"):
+            img, scale, _ = normalize_scale(img, target_px_per_mm=10.0)
+        pre["scale"] = scale
+    layout = opt["layout"]
+    ctx = ECGImageContext(img, layout=layout, source=source, timings=prof)
+    out = {"preprocess": pre, "grid": ctx.grid,
+           "segmentation": {"content_bbox": ctx.bbox, "leads": ctx.leads(layout)},
+           "rpeaks": None, "intervals": None, "intervals_refined": None, "axis": None}
+    if opt["auto_leads"]:
+        from .lead_ocr import choose_layout
+        out["layout_detection"] = choose_layout(
+            ctx.gray, {layout: [d["bbox"] for d in out["segmentation"]["leads"]]})
+    lab2box = ctx.lead_boxes(layout)
+    method = "pan_tompkins_like" if opt["robust"] else "zscore_localmax"
+    lead = opt["rpeaks_lead"]
+    if lead and lead in lab2box:
+        trace = ctx.trace(lead)
+        rp = dict(ctx.rpeaks(lead, method=method))
+        rp["lead_used"] = lead
+        out["rpeaks"] = rp
+        peaks = rp.get("peaks_idx") or []
+        if opt["intervals"]:
+            from .intervals import intervals_from_trace
+            with prof.stage("intervals"):
+                out["intervals"] = intervals_from_trace(trace, peaks, ctx.fs)
+        if opt["intervals_refined"]:
+            from .intervals_refined import intervals_refined_from_trace
+            with prof.stage("intervals"):
+                out["intervals_refined"] = intervals_refined_from_trace(trace, peaks, ctx.fs)
+    if opt["axis"] and all(lab in lab2box for lab in ("I", "aVF")):
+        from .axis import frontal_axis_from_image
+        axis_peaks = {lab: ctx.rpeaks(lab, method=method).get("peaks_idx", [])
+                      for lab in ("I", "aVF")}
+        axis_traces = {lab: ctx.trace(lab, smooth=0) for lab in ("I", "aVF")}
+        with prof.stage("axis"):
+            out["axis"] = frontal_axis_from_image(
+                ctx.gray,
+                {lab: lab2box[lab] for lab in ("I", "aVF")},
+                axis_peaks,
+                {lab: ctx.fs for lab in ("I", "aVF")},
+                traces=axis_traces,
+            )
+    out["timings_ms"] = prof.as_ms()
+    return out
+
+
+# --------------------------
+# Entradas: diretório ou manifesto JSONL
+# --------------------------
+
+def iter_batch_inputs(
+    source: Union[str, pathlib.Path],
+    images_dir: Optional[Union[str, pathlib.Path]] = None,
+) -> List[Tuple[str, pathlib.Path]]:
+    """
+    Lista (chave, caminho) das imagens a processar.
+    Diretório: busca recursiva por PNG/JPG; chave = caminho relativo.
+    Manifesto (.jsonl): entradas type=image; arquivo = images_dir/file_name
+    (padrão: assets/raw/images ao lado de assets/manifest); chave = id.
+    """
+    src = pathlib.Path(source)
+    if src.is_dir():
+        files = sorted(p for p in src.rglob("*") if p.is_file() and p.suffix.lower() in IMAGE_EXTS)
+        return [(p.relative_to(src).as_posix(), p) for p in files]
+    if not src.exists():
+        raise FileNotFoundError(f"Entrada não encontrada: {src}")
+    if images_dir:
+        base = pathlib.Path(images_dir)
+    else:
+        base = src.resolve().parent.parent / "raw" / "images"
+    items = []
+    for line in src.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        rec = json.loads(line)
+        if rec.get("type", "image") != "image" or not rec.get("file_name"):
+            continue
+        if pathlib.Path(rec["file_name"]).suffix.lower() not in IMAGE_EXTS:
+            continue
+        items.append((rec.get("id") or rec["file_name"], base / rec["file_name"]))
+    return items
+
+
+def report_path_for(key: str, out_dir: Union[str, pathlib.Path]) -> pathlib.Path:
+    """
+    Nome estável e único do laudo por imagem: chave achatada (com extensão, "/" → "__")
+    + hash curto da chave, para que a.png/a.jpg ou sub/b.png/sub__b.png não colidam.
+    """
+    safe = "".join(c if (c.isalnum() or c in "-_.") else "_" for c in key.replace("/", "__"))
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:8]
+    return pathlib.Path(out_dir) / f"{safe}-{digest}.json"
+
+
+def _source_stamp(path: pathlib.Path) -> Dict:
+    st = path.stat()
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _effective_options(options: Optional[Dict]) -> Dict:
+    return dict(DEFAULT_OPTIONS, **(options or {}))
+
+
+def _is_done(report: pathlib.Path, path: pathlib.Path, options: Optional[Dict] = None) -> bool:
+    """
+    Resume: laudo existente com status ok, mesma origem (tamanho/mtime), mesmas opções
+    efetivas e mesma BATCH_VERSION.
+    """
+    if not report.exists() or not path.exists():
+        return False
+    try:
+        prev = json.loads(report.read_text(encoding="utf-8"))
+    except Exception:
+        return False
+    meta = prev.get("meta", {})
+    return (prev.get("status") == "ok" and meta.get("source_stamp") == _source_stamp(path)
+            and meta.get("ingest_version") == BATCH_VERSION
+            and meta.get("options") == _effective_options(options))
+
+
+def _summary_row(key, path, report, status, elapsed, res=None, error=None) -> Dict:
+    rp = (res or {}).get("rpeaks") or {}
+    grid = (res or {}).get("grid") or {}
+    med = ((res or {}).get("intervals") or {}).get("median") or {}
+    axis = (res or {}).get("axis") or {}
+    return {
+        "key": key, "source_image": str(path), "report": str(report), "status": status,
+        "elapsed_s": round(float(elapsed), 3), "error": error,
+        "px_per_mm": grid.get("px_small_x"),
+        "n_rpeaks": len(rp.get("peaks_idx") or []) if rp else None,
+        "hr_bpm": (60.0 / med["RR_s"]) if med.get("RR_s") else None, "qtc_b_ms": med.get("QTc_B"),
+        "axis_deg": axis.get("angle_deg"),
+    }
+
+
+def process_image_file(task: Tuple[str, str, str, Dict]) -> Dict:
+    """Worker: processa uma imagem, grava o laudo JSON (escrita atômica) e devolve o resumo."""
+    key, path_s, report_s, options = task
+    path, report = pathlib.Path(path_s), pathlib.Path(report_s)
+    t0 = time.perf_counter()
+    if not path.exists():
+        return _summary_row(key, path, report, "missing", 0.0, error="arquivo não encontrado")
+    try:
+        res = analyze_image(path, options, source=str(path))
+        status, error = "ok", None
+    except Exception as e:
+        res, status, error = None, "error", f"{type(e).__name__}: {e}"
+    elapsed = time.perf_counter() - t0
+    doc = {
+        "meta": {"source_image": str(path), "key": key, "source_stamp": _source_stamp(path),
+                 "ingest_version": BATCH_VERSION, "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                 "options": _effective_options(options)},
+        "status": status, "error": error, "elapsed_s": round(elapsed, 3),
+        **(res or {}),
+    }
+    report.parent.mkdir(parents=True, exist_ok=True)
+    tmp = report.with_suffix(".json.tmp")
+    payload = json.dumps(doc, ensure_ascii=False, indent=2, default=_json_default)
+    tmp.write_text(payload, encoding="utf-8")
+    os.replace(tmp, report)
+    return _summary_row(key, path, report, status, elapsed, res, error)
+
+
+def ingest_batch(source: Union[str, pathlib.Path], out_dir: Union[str, pathlib.Path],
+                 options: Optional[Dict] = None, workers: Optional[int] = None, chunksize: int = 4,
+                 resume: bool = True, images_dir: Optional[Union[str, pathlib.Path]] = None,
+                 on_result: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """
+    Ingestão em lote: distribui process_image_file num ProcessPoolExecutor (workers=1 roda no
+    processo atual), grava um laudo por imagem em out_dir e o resumo em out_dir/summary.jsonl
+    (uma linha por imagem, escrita à medida que os resultados chegam).
+    Com resume=True, imagens cujo laudo ok já existe são puladas (status "skipped").
+    """
+    out = pathlib.Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    items = iter_batch_inputs(source, images_dir)
+    tasks, skipped = [], []
+    for key, path in items:
+        report = report_path_for(key, out)
+        if resume and _is_done(report, path, options):
+            skipped.append(_summary_row(key, path, report, "skipped", 0.0))
+        else:
+            tasks.append((key, str(path), str(report), dict(options or {})))
+    workers = max(1, int(workers or os.cpu_count() or 1))
+    counts = {"ok": 0, "error": 0, "missing": 0, "skipped": len(skipped)}
+    t0 = time.perf_counter()
+    summary_path = out / "summary.jsonl"
+    with open(summary_path, "w", encoding="utf-8") as fh:
+        def emit(row):
+            fh.write(json.dumps(row, ensure_ascii=False, default=_json_default) + "\n")
+            fh.flush()
+            if on_result:
+                on_result(row)
+
+        for row in skipped:
+            emit(row)
+        if workers == 1 or len(tasks) <= 1:
+            results: Iterable[Dict] = map(process_image_file, tasks)
+            for row in results:
+                counts[row["status"]] += 1
+                emit(row)
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as ex:
+                for row in ex.map(process_image_file, tasks, chunksize=max(1, int(chunksize))):
+                    counts[row["status"]] += 1
+                    emit(row)
+    return {"total": len(items), "processed": len(tasks), **counts, "workers": workers,
+            "elapsed_s": round(time.perf_counter() - t0, 3), "summary": str(summary_path)}
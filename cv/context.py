@@ -0,0 +1,178 @@
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from PIL import Image
+
+from .grid_detect import estimate_grid_period_px
+from .profiling import StageTimings
+from .rpeaks_from_image import detect_rpeaks_from_trace, estimate_px_per_sec
+from .rpeaks_robust import pan_tompkins_like
+from .segmentation import find_content_bbox
+from .segmentation_ext import segment_layout
+from .trace import extract_traces, smooth_signal
+
+
+class ECGImageContext:
+    """
+    Contexto de análise por imagem: decodifica uma vez e memoiza (lazy) cinza, grade,
+    bbox de conteúdo, caixas por layout, traçados por derivação e R-peaks.
+    Os analisadores (ritmo, eixo hexaxial, transição R/S, HVE) aceitam o contexto
+    no lugar do caminho da imagem, de modo que o checklist completo calcula cada etapa uma só vez.
+    O tempo de cada etapa calculada é acumulado em ``timings`` (StageTimings, compartilhável).
+    """
+
+    def __init__(self, image: Union[Image.Image, np.ndarray], layout: str = "3x4",
+                 speed_mm_per_sec: float = 25.0, source: Optional[str] = None,
+                 timings: Optional[StageTimings] = None):
+        if isinstance(image, Image.Image):
+            self._img = image.convert("RGB")
+            self.rgb = np.asarray(self._img)
+        else:
+            arr = np.asarray(image)
+            if arr.ndim == 2:
+                arr = np.stack([arr] * 3, axis=-1)
+            self._img = None
+            self.rgb = np.ascontiguousarray(arr[..., :3], dtype=np.uint8)
+        self.layout = layout
+        self.speed_mm_per_sec = float(speed_mm_per_sec)
+        self.source = source
+        self.timings = timings if timings is not None else StageTimings()
+        self._gray = None
+        self._grid = None
+        self._bbox = None
+        self._leads: Dict[str, List[Dict]] = {}
+        self._traces: Dict[Tuple[str, str, int], np.ndarray] = {}
+        self._raw_traces: Dict[str, Dict[str, np.ndarray]] = {}
+        self._rpeaks: Dict[Tuple[str, str, str], Dict] = {}
+
+    @classmethod
+    def from_path(cls, image_path: str, layout: str = "3x4", speed_mm_per_sec: float = 25.0,
+                  timings: Optional[StageTimings] = None) -> "ECGImageContext":
+        timings = timings if timings is not None else StageTimings()
+        with timings.stage("decode"):
+            img = Image.open(image_path).convert("RGB")
+        return cls(img, layout=layout, speed_mm_per_sec=speed_mm_per_sec,
+                   source=str(image_path), timings=timings)
+
+    @property
+    def image(self) -> Image.Image:
+        if self._img is None:
+            self._img = Image.fromarray(self.rgb)
+        return self._img
+
+    @property
+    def gray(self) -> np.ndarray:
+        if self._gray is None:
+            with self.timings.stage("decode"):
+                self._gray = np.asarray(self.image.convert("L"))
+        return self._gray
+
+    @property
+    def grid(self) -> Dict:
+        if self._grid is None:
+            with self.timings.stage("grid"):
+                self._grid = estimate_grid_period_px(self.rgb)
+        return self._grid
+
+    @property
+    def px_per_mm(self) -> float:
+        """px/mm horizontal (grade pequena ~1 mm); 10.0 se a grade não for detectada."""
+        g = self.grid
+        return float(g.get("px_small_x") or g.get("px_small_y") or 10.0)
+
+    @property
+    def py_per_mm(self) -> float:
+        """px/mm vertical (para amplitudes em mm)."""
+        g = self.grid
+        return float(g.get("px_small_y") or g.get("px_small_x") or 10.0)
+
+    @property
+    def fs(self) -> float:
+        """Amostragem temporal do traçado em px/s (colunas por segundo)."""
+        pxmm = self.px_per_mm
+        return estimate_px_per_sec(pxmm, self.speed_mm_per_sec) or (pxmm * 25.0)
+
+    @property
+    def bbox(self) -> Tuple[int, int, int, int]:
+        if self._bbox is None:
+            gray = self.gray
+            with self.timings.stage("segment"):
+                self._bbox = find_content_bbox(gray)
+        return self._bbox
+
+    def leads(self, layout: Optional[str] = None) -> List[Dict]:
+        """Lista {lead, bbox} para o layout (memoizada por layout)."""
+        layout = layout or self.layout
+        if layout not in self._leads:
+            gray, bbox = self.gray, self.bbox
+            with self.timings.stage("segment"):
+                self._leads[layout] = segment_layout(gray, layout, bbox=bbox)
+        return self._leads[layout]
+
+    def lead_boxes(self, layout: Optional[str] = None) -> Dict[str, Tuple[int, int, int, int]]:
+        return {d["lead"]: d["bbox"] for d in self.leads(layout)}
+
+    def pick_lead(self, preferred: str, fallbacks: Tuple[str, ...] = (),
+                  layout: Optional[str] = None) -> str:
+        """Derivação preferida se existir no layout; senão o primeiro fallback disponível."""
+        lab2box = self.lead_boxes(layout)
+        if preferred in lab2box:
+            return preferred
+        for cand in fallbacks:
+            if cand in lab2box:
+                return cand
+        return next(iter(lab2box.keys()))
+
+    def trace(self, lead: str, layout: Optional[str] = None, smooth: int = 11) -> np.ndarray:
+        """Traçado 1D y(x) da derivação (pixels, origem topo); smooth=0 = centerline bruto."""
+        layout = layout or self.layout
+        key = (layout, lead, int(smooth or 0))
+        if key not in self._traces:
+            if key[2]:
+                raw = self.trace(lead, layout, smooth=0)
+                with self.timings.stage("trace"):
+                    self._traces[key] = smooth_signal(raw, smooth)
+            else:
+                self._traces[key] = self.raw_traces(layout)[lead]
+        return self._traces[key]
+
+    def raw_traces(self, layout: Optional[str] = None) -> Dict[str, np.ndarray]:
+        """Centerlines brutos de todas as derivações do layout, num único passe vetorizado."""
+        layout = layout or self.layout
+        if layout not in self._raw_traces:
+            gray, boxes = self.gray, self.lead_boxes(layout)
+            with self.timings.stage("trace"):
+                self._raw_traces[layout] = extract_traces(gray, boxes)
+        return self._raw_traces[layout]
+
+    def rpeaks(self, lead: str, layout: Optional[str] = None,
+               method: str = "pan_tompkins_like") -> Dict:
+        """R-peaks no traçado suavizado da derivação ('pan_tompkins_like' ou 'zscore_localmax')."""
+        layout = layout or self.layout
+        key = (layout, lead, method)
+        if key not in self._rpeaks:
+            if method not in ("pan_tompkins_like", "zscore_localmax"):
+                raise ValueError(f"Método de R-peaks não suportado: {method}")
+            sig, fs = self.trace(lead, layout), self.fs
+            with self.timings.stage("peaks"):
+                if method == "pan_tompkins_like":
+                    det = pan_tompkins_like(sig, fs)
+                    det = {"peaks_idx": det["peaks_idx"], "method": method}
+                else:
+                    det = detect_rpeaks_from_trace(sig, px_per_sec=fs, zthr=2.0)
+                    det["method"] = method
+            self._rpeaks[key] = det
+        return self._rpeaks[key]
+
+
+def as_context(image: Union[str, "ECGImageContext", Image.Image, np.ndarray],
+               layout: str = "3x4") -> ECGImageContext:
+    """Aceita caminho, PIL, ndarray ou um contexto já construído (reutilizado como está)."""
+    if isinstance(image, ECGImageContext):
+        return image
+    if isinstance(image, (Image.Image, np.ndarray)):
+        return ECGImageContext(image, layout=layout)
+    return ECGImageContext.from_path(str(image), layout=layout)
@@ -20,12 +20,25 @@ def _proj_score(gray):
     # maior variância indica linhas mais alinhadas ao eixo
     return float(np.var(sx) + np.var(sy))
 
-def estimate_rotation_angle(img: Image.Image, search_deg=6.0, step=0.5):
-    """
-    Busca bruta de ângulo em [-search_deg, +search_deg] (deg) maximizando a variância
-    das projeções dos gradientes (proxy para alinhamento com a grade).
-    Retorna: {'angle_deg': best, 'score': best_score, 'score0': score_sem_rotacao}
-    """
+def _sweep(gray_img: Image.Image, angles, score0: float):
+    """Avalia o score para cada ângulo (rotação do cinza 'L'); 0° usa score0. Retorna (best_angle, best_score)."""
+    best_angle, best_score = 0.0, score0
+    for ang in angles:
+        if abs(ang) < 1e-6:
+            continue
+        gr = gray_img.rotate(ang, resample=Image.BILINEAR, expand=True, fillcolor=255)
+        score = _proj_score(np.asarray(gr, dtype=np.float32))
+        if score > best_score:
+            best_score, best_angle = score, float(ang)
+    return best_angle, best_score
+
+def _rotation_score(gray_img: Image.Image, ang: float, score0: float) -> float:
+    if abs(ang) < 1e-6:
+        return score0
+    gr = gray_img.rotate(ang, resample=Image.BILINEAR, expand=True, fillcolor=255)
+    return _proj_score(np.asarray(gr, dtype=np.float32))
+
+def _estimate_rotation_brute(img: Image.Image, search_deg=6.0, step=0.5):
     gray0 = _to_gray(img)
     score0 = _proj_score(gray0)
     best_angle = 0.0
@@ -42,5 +55,52 @@ def estimate_rotation_angle(img: Image.Image, search_deg=6.0, step=0.5):
             best_score, best_angle = score, ang
     return {"angle_deg": float(best_angle), "score": float(best_score), "score0": float(score0)}
 
+def estimate_rotation_angle(img: Image.Image, search_deg=6.0, step=0.5,
+                            method: str = "pyramid", downsample: int = 4, min_side: int = 256):
+    """
+    Estima o ângulo em [-search_deg, +search_deg] (deg) maximizando a variância
+    das projeções dos gradientes (proxy para alinhamento com a grade).
+    method='pyramid' (padrão): varredura grossa (passo 'step') no cinza reduzido por
+    'downsample' (sem descer abaixo de 'min_side' px), depois refinamento em resolução
+    cheia apenas nos vizinhos ±step do melhor ângulo e interpolação parabólica do pico
+    (ajuste limitado a ±step/2). method='brute' mantém a busca exaustiva em RGB.
+    Retorna: {'angle_deg': best, 'score': best_score, 'score0': score_sem_rotacao}
+    """
+    if method == "brute":
+        return _estimate_rotation_brute(img, search_deg, step)
+    if method != "pyramid":
+        raise ValueError(f"Método de deskew não suportado: {method}")
+    gray_img = img.convert("L") if isinstance(img, Image.Image) else Image.fromarray(np.asarray(_to_gray(img), dtype=np.uint8))
+    score0 = _proj_score(np.asarray(gray_img, dtype=np.float32))
+    n = int(2*search_deg/step)+1
+    angles = [-search_deg + k*step for k in range(n)]
+    # 1) varredura grossa na pirâmide reduzida
+    w, h = gray_img.size
+    f = int(max(1, min(downsample, min(w, h) // max(1, min_side))))
+    small = gray_img.reduce(f) if f > 1 else gray_img
+    small0 = _proj_score(np.asarray(small, dtype=np.float32))
+    coarse, _ = _sweep(small, angles, small0)
+    # 2) refinamento em resolução cheia: melhor ângulo da grade entre coarse-step..coarse+step
+    # candidatos indexados pelo deslocamento inteiro (-1, 0, +1) em passos: sem chaves float
+    cand = {k: coarse + k*step for k in (-1, 0, 1)
+            if -search_deg - 1e-9 <= coarse + k*step <= search_deg + 1e-9}
+    scores = {k: _rotation_score(gray_img, a, score0) for k, a in cand.items()}
+    best_k = max(cand, key=lambda k: (scores[k], -abs(cand[k])))
+    best_angle, best_score = cand[best_k], scores[best_k]
+    if best_score <= score0:
+        return {"angle_deg": 0.0, "score": float(score0), "score0": float(score0)}
+    # 3) interpolação parabólica do pico com os vizinhos disponíveis
+    if best_k - 1 in scores and best_k + 1 in scores:
+        s_lo, s_c, s_hi = scores[best_k - 1], best_score, scores[best_k + 1]
+        den = s_lo - 2.0*s_c + s_hi
+        if den < 0:
+            delta = float(np.clip(0.5*step*(s_lo - s_hi)/den, -0.5*step, 0.5*step))
+            if abs(delta) > 1e-3:
+                ang = best_angle + delta
+                s = _rotation_score(gray_img, ang, score0)
+                if s > best_score:
+                    best_angle, best_score = ang, s
+    return {"angle_deg": float(best_angle), "score": float(best_score), "score0": float(score0)}
+
 def rotate_image(img: Image.Image, angle_deg: float) -> Image.Image:
     return img.rotate(float(angle_deg), resample=Image.BILINEAR, expand=True, fillcolor=(255,255,255))
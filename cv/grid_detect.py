@@ -7,17 +7,42 @@ def _to_gray(arr_or_img):
         img = arr_or_img.convert("L")
         return np.asarray(img).astype(np.float32)
     if arr_or_img.ndim==3:
-        # assume RGB
-        r,g,b = arr_or_img[...,0], arr_or_img[...,1], arr_or_img[...,2]
-        return (0.2989*r + 0.5870*g + 0.1140*b).astype(np.float32)
+        # assume RGB (produto com pesos em float32: evita temporários float64 em imagens grandes)
+        w = np.array([0.2989, 0.5870, 0.1140], dtype=np.float32)
+        return arr_or_img[..., :3].astype(np.float32) @ w
     return arr_or_img.astype(np.float32)
 
 def _autocorr_1d(x):
+    """Autocorrelação (lags >= 0) via FFT (Wiener–Khinchin), O(N log N); normalizada por ac[0]."""
+    x = np.asarray(x, dtype=np.float64)
     x = (x - x.mean()) / (x.std() + 1e-6)
-    ac = np.correlate(x, x, mode="full")[len(x)-1:]
+    n = len(x)
+    nfft = 1 << max(1, int(2*n - 1).bit_length())
+    X = np.fft.rfft(x, nfft)
+    ac = np.fft.irfft(X * np.conj(X), nfft)[:n]
     ac /= (ac[0] + 1e-6)
     return ac
 
+def _parabolic_peak(ac, k):
+    """Refina o pico inteiro k por interpolação parabólica (3 pontos); retorna lag fracionário."""
+    if k <= 0 or k >= len(ac)-1:
+        return float(k)
+    y0, y1, y2 = ac[k-1], ac[k], ac[k+1]
+    den = y0 - 2.0*y1 + y2
+    if den >= 0:
+        return float(k)
+    return float(k + np.clip(0.5*(y0 - y2)/den, -0.5, 0.5))
+
+def _local_peak(ac, center, radius):
+    """Máximo local de ac em [center-radius, center+radius]; None se estiver na borda da janela."""
+    lo = max(1, int(round(center - radius))); hi = min(len(ac)-2, int(round(center + radius)))
+    if hi <= lo:
+        return None
+    k = lo + int(np.argmax(ac[lo:hi+1]))
+    if ac[k] < ac[k-1] or ac[k] < ac[k+1]:
+        return None
+    return k
+
 def _dominant_period(ac, min_p=4, max_p=200):
     # encontra melhor pico em [min_p, max_p]
     seg = ac[min_p:max_p]
@@ -28,39 +53,122 @@ def _dominant_period(ac, min_p=4, max_p=200):
     conf = float(seg[k])
     return p, conf
 
-def estimate_grid_period_px(img_or_array):
+def _fundamental_period(ac, dominant, min_p=4, rel_thr=0.35):
+    """
+    Menor lag c >= min_p que é máximo local forte (ac[c] >= rel_thr*ac[dominant]) e do qual o pico
+    dominante é harmônico inteiro (dominant/c ~ inteiro). Separa grade pequena de grande sem
+    assumir a razão 5.
+    """
+    thr = rel_thr * ac[dominant]
+    dom_f = _parabolic_peak(ac, dominant)
+    for c in range(min_p, dominant + 1):
+        if ac[c] < thr or ac[c] < ac[c-1] or ac[c] < ac[c+1]:
+            continue
+        n = max(1, int(round(dom_f / c)))
+        # c é inteiro (erro <= 0.5 px): tolera n*0.5 px de desvio no harmônico
+        if abs(dom_f - n*_parabolic_peak(ac, c)) > 0.5*n + 0.5:
+            continue
+        if n >= 2 and _local_peak(ac, 2*c, max(1.0, 0.15*c)) is None:
+            continue
+        return c
+    return dominant
+
+def _refine_period(ac, p0, max_lag, k_max=10):
+    """Período sub-pixel: ajuste por mínimos quadrados (pela origem) dos picos em k*p0, k=1..k_max."""
+    ks, lags = [], []
+    est = float(p0)
+    for k in range(1, k_max+1):
+        if k*est > max_lag:
+            break
+        kk = _local_peak(ac, k*est, max(1.0, 0.15*est))
+        if kk is None:
+            continue
+        ks.append(k); lags.append(_parabolic_peak(ac, kk))
+        ks_a = np.asarray(ks, float)
+        est = float(np.dot(ks_a, lags) / np.dot(ks_a, ks_a))
+    return est
+
+def _big_grid_ratio(proj, small, ratios=range(2, 11), min_contrast=0.15):
     """
-    Estima período da grade (em pixels) nas direções X e Y.
-    Heurística: projeção de derivada (diferença) -> autocorrelação -> pico dominante.
-    Retorna: dict { 'px_small_x','px_small_y','px_big_x','px_big_y','confidence' }
+    Checagem explícita do harmônico grade grande/pequena: mede a intensidade de cada linha
+    da grade pequena (projeção nas posições fase + k*small) e procura o m em 'ratios' em que
+    uma classe k mod m se destaca (linhas grossas a cada m linhas finas). Retorna m ou None.
     """
-    arr = _to_gray(img_or_array)
+    n = len(proj)
+    if small < 2 or n < 4*small:
+        return None
+    k = np.arange(int((n - 1) // small))
+    phases = np.arange(int(np.ceil(small)))
+    idx = np.clip(np.rint(phases[:, None] + k[None, :]*small).astype(int), 0, n-1)
+    phase = phases[int(np.argmax(proj[idx].mean(axis=1)))]
+    # gradiente integrado numa janela ±r (insensível à fase sub-pixel da linha)
+    r = int(max(1, min(2, small // 2 - 1)))
+    centers = np.clip(np.rint(phase + k*small).astype(int), r, n-1-r)
+    strength = sum(proj[centers + d] for d in range(-r, r+1))
+    scores = {}
+    for m in ratios:
+        if len(strength) < 2*m:
+            continue
+        groups = np.array([strength[offset::m].mean() for offset in range(m)])
+        top = int(np.argmax(groups))
+        others = np.delete(groups, top)
+        scores[m] = float((groups[top] - np.median(others)) / (np.mean(groups) + 1e-9))
+    if not scores:
+        return None
+    best = max(scores.values())
+    if best < min_contrast:
+        return None
+    # menor razão que explica o padrão (10 também "vê" o ciclo de 5, com grupos mais ruidosos)
+    return min(m for m, sc in scores.items() if sc >= 0.6*best)
+
+def _axis_periods(proj, min_p=4, max_p=200):
+    """Período pequeno (px, fracionário), grande e razão grande/pequena numa projeção."""
+    ac = _autocorr_1d(proj)
+    dom, conf = _dominant_period(ac, min_p, max_p)
+    if not dom:
+        return None, None, None, conf
+    small0 = _fundamental_period(ac, dom, min_p)
+    small = _refine_period(ac, small0, len(ac) // 2)
+    ratio = _big_grid_ratio(proj, small)
+    big = small * ratio if ratio else None
+    return small, big, ratio, conf
+
+def estimate_grid_period_px(img_or_array, max_lines: int = 512):
+    """
+    Estima período da grade (em pixels, sub-pixel) nas direções X e Y.
+    Heurística: projeção de derivada (diferença) -> autocorrelação via FFT -> pico dominante;
+    a grade pequena é o fundamental do qual o pico dominante é harmônico (checagem explícita),
+    refinado por interpolação parabólica nos múltiplos. A razão grande/pequena é medida pela
+    periodicidade da intensidade das linhas finas ('big_ratio_*'); sem padrão detectável,
+    assume-se 5 (big_ratio_* = None). Acima de max_lines linhas/colunas, as projeções são
+    médias sobre um subconjunto regular (custo ~constante em imagens grandes).
+    Retorna: dict { 'px_small_x','px_small_y','px_big_x','px_big_y','big_ratio_x','big_ratio_y','confidence' }
+    """
+    arr = np.asarray(img_or_array.convert("L")) if isinstance(img_or_array, Image.Image) else np.asarray(img_or_array)
     # borda: ignora 2% em cada lado para reduzir bordas
-    h, w = arr.shape
+    h, w = arr.shape[:2]
     x0, x1 = int(0.02*w), int(0.98*w)
     y0, y1 = int(0.02*h), int(0.98*h)
-    roi = arr[y0:y1, x0:x1]
-
-    # gradientes simples
-    gx = np.abs(np.diff(roi, axis=1))
-    gy = np.abs(np.diff(roi, axis=0))
+    # imagens grandes: a média da projeção usa um subconjunto regular de linhas/colunas
+    # (até max_lines), sem perder resolução ao longo do eixo medido
+    rs = max(1, (y1 - y0) // max_lines)
+    cs = max(1, (x1 - x0) // max_lines)
 
-    # projeções
-    proj_x = gx.mean(axis=0)
-    proj_y = gy.mean(axis=1)
+    # gradientes simples + projeções
+    proj_x = np.abs(np.diff(_to_gray(arr[y0:y1:rs, x0:x1]), axis=1)).mean(axis=0)
+    proj_y = np.abs(np.diff(_to_gray(arr[y0:y1, x0:x1:cs]), axis=0)).mean(axis=1)
 
-    acx = _autocorr_1d(proj_x)
-    acy = _autocorr_1d(proj_y)
-    px_x, cfx = _dominant_period(acx, 4, 200)
-    px_y, cfy = _dominant_period(acy, 4, 200)
+    px_x, big_x, rx, cfx = _axis_periods(proj_x, 4, 200)
+    px_y, big_y, ry, cfy = _axis_periods(proj_y, 4, 200)
 
-    # small grid ~ px_x, px_y ; big grid = 5*small (aprox), arredonda
     res = {}
     if px_x:
         res["px_small_x"] = float(px_x)
-        res["px_big_x"] = float(px_x*5.0)
+        res["px_big_x"] = float(big_x if big_x else px_x*5.0)
+        res["big_ratio_x"] = int(rx) if rx else None
     if px_y:
         res["px_small_y"] = float(px_y)
-        res["px_big_y"] = float(px_y*5.0)
+        res["px_big_y"] = float(big_y if big_y else px_y*5.0)
+        res["big_ratio_y"] = int(ry) if ry else None
     res["confidence"] = float(0.5*(cfx + cfy))
     return res
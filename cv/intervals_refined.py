@@ -18,78 +18,126 @@ def _energy(x, win):
 def _norm01(x):
     return (x - x.min())/((x.max() - x.min())+1e-9)
 
-def _stable(gabs, start, direction, fs, dur_ms=15, thr=0.12):
-    dur = int(max(1, dur_ms*fs/1000.0))
-    if direction < 0:
-        rng = range(start, -1, -1)
-    else:
-        rng = range(start, len(gabs))
-    for i in rng:
-        i0 = max(0, i - (dur if direction<0 else 0))
-        i1 = min(len(gabs), i + (dur if direction>0 else 0))
-        if np.all(gabs[i0:i1] < thr):
-            return i
-    return start
+# --------------------------
+# Features por traçado (calculadas uma vez por derivação) + buscas O(1) por contagem acumulada
+# --------------------------
 
-def find_onset_offset_refined(y_px: np.ndarray, r_idx: int, fs: float) -> Tuple[int,int]:
-    y = y_px - np.median(y_px)
-    y = _smooth(y, 7)
-    g = _grad(y); gabs = _norm01(np.abs(g))
-    E = _energy(y, win=int(0.04*fs))
+def _prefix_count(mask: np.ndarray) -> np.ndarray:
+    """c[k] = nº de True em mask[:k] (len+1); nenhum True em mask[a:b] ⇔ c[b]-c[a] == 0."""
+    c = np.zeros(len(mask) + 1, dtype=np.int64)
+    np.cumsum(mask, out=c[1:])
+    return c
+
+class _TraceFeatures:
+    """Sinal suavizado, |gradiente| normalizado, energia e contagens acumuladas dos testes de estabilidade."""
+
+    def __init__(self, y_px: np.ndarray, fs: float):
+        y = _smooth(y_px - np.median(y_px), 7)
+        self.n = len(y)
+        self.gabs = _norm01(np.abs(_grad(y)))
+        self.E = _energy(y, win=int(0.04*fs))
+        # "não abaixo/acima do limiar" (mesma semântica de np.all(x < thr) inclusive com NaN)
+        self.c_qrs = _prefix_count(~(self.gabs < 0.14))
+        self.c_p = _prefix_count(~(self.gabs > 0.06))
+        self.c_t = _prefix_count(~(self.gabs < 0.10))
+
+def _stable_back(c, w0, start, dur):
+    """_stable(direction<0) sobre a janela que começa em w0: maior i<=start com janela [i-dur, i) estável."""
+    i = np.arange(start, -1, -1)
+    ok = (c[w0 + i] - c[w0 + np.maximum(0, i - dur)]) == 0
+    return int(i[np.argmax(ok)])  # i=0 (janela vazia) sempre satisfaz
+
+def _stable_fwd(c, w0, wlen, start, dur):
+    """_stable(direction>0) sobre a janela [w0, w0+wlen): menor i>=start com [i, i+dur) estável."""
+    i = np.arange(start, wlen)
+    ok = (c[w0 + np.minimum(wlen, i + dur)] - c[w0 + i]) == 0
+    return int(i[np.argmax(ok)]) if ok.any() else start
+
+def _qrs_bounds(f: _TraceFeatures, r_idx: int, fs: float) -> Tuple[int,int]:
     pre = int(0.16*fs)
     pos = int(0.18*fs)
-    i0 = max(0, r_idx-pre); i1 = min(len(y)-1, r_idx+pos)
-    gw = gabs[i0:i1+1]; Ew = E[i0:i1+1]
+    i0 = max(0, r_idx-pre); i1 = min(f.n-1, r_idx+pos)
+    gw = f.gabs[i0:i1+1]; Ew = f.E[i0:i1+1]
     thr_g = 0.25*np.quantile(gw, 0.98) + 0.05*np.max(gw)
     thr_E = 0.25*np.quantile(Ew, 0.98) + 0.05*np.max(Ew)
     thr_g = float(np.clip(thr_g, 0.08, 0.6))
     thr_E = float(np.clip(thr_E, 0.08, 0.6))
+    hit = (gw > thr_g) | (Ew > thr_E)
+    k = r_idx - i0
+    dur = int(max(1, 15*fs/1000.0))
     onset = i0
-    for i in range(r_idx-i0, -1, -1):
-        if gw[i] > thr_g or Ew[i] > thr_E:
-            onset = i0 + _stable(gw, i, -1, fs, 15, 0.14)
-            break
+    back = np.flatnonzero(hit[:k+1])
+    if back.size:
+        onset = i0 + _stable_back(f.c_qrs, i0, int(back[-1]), dur)
     offset = i1
-    for i in range(r_idx-i0, len(gw)):
-        if gw[i] > thr_g or Ew[i] > thr_E:
-            offset = i0 + _stable(gw, i, +1, fs, 15, 0.14)
-            break
+    fwd = np.flatnonzero(hit[k:])
+    if fwd.size:
+        offset = i0 + _stable_fwd(f.c_qrs, i0, len(gw), k + int(fwd[0]), dur)
     qrs_ms = (offset - onset)*1000.0/fs
-    if qrs_ms < 60:  offset = min(len(y)-1, onset + int(0.08*fs))
+    if qrs_ms < 60:  offset = min(f.n-1, onset + int(0.08*fs))
     if qrs_ms > 200: offset = onset + int(0.20*fs)
     return int(onset), int(offset)
 
-def p_onset_refined(y_px: np.ndarray, qrs_on: int, fs: float) -> Optional[int]:
-    y = _smooth(y_px - np.median(y_px), 7)
-    gabs = _norm01(np.abs(_grad(y)))
-    i0 = max(0, qrs_on - int(0.32*fs))
-    thr = 0.06
+def _first_stable(ok: np.ndarray, i: np.ndarray, shift: int = 0) -> List[Optional[int]]:
+    """Por linha (batimento): primeiro i com ok=True (menos shift), ou None se nenhum."""
+    j = np.argmax(ok, axis=1)
+    hit = ok[np.arange(len(ok)), j]
+    first = i[np.arange(len(i)), j] - shift
+    return [int(v) if h else None for v, h in zip(first, hit)]
+
+def _p_onsets(f: _TraceFeatures, qrs_on: np.ndarray, fs: float) -> List[Optional[int]]:
+    """Início da P de todos os batimentos de uma vez: grade [batimentos, janela] de lookups."""
+    qrs_on = np.asarray(qrs_on, dtype=np.int64)
     dur = int(0.02*fs)
-    for i in range(qrs_on, i0, -1):
-        if np.all(gabs[max(0,i-dur):i] > thr):
-            return int(i - dur)
-    return None
+    i0 = np.maximum(0, qrs_on - int(0.32*fs))
+    i = qrs_on[:, None] - np.arange(max(1, int(0.32*fs)))[None, :]
+    valid = i > i0[:, None]
+    ic = np.clip(i, 0, f.n)
+    ok = valid & ((f.c_p[ic] - f.c_p[np.maximum(0, ic - dur)]) == 0)
+    return _first_stable(ok, i, dur)
 
-def t_end_refined(y_px: np.ndarray, qrs_off: int, fs: float) -> Optional[int]:
-    y = _smooth(y_px - np.median(y_px), 7)
-    gabs = _norm01(np.abs(_grad(y)))
+def _t_ends(f: _TraceFeatures, qrs_off: np.ndarray, fs: float) -> List[Optional[int]]:
+    """Fim da T de todos os batimentos de uma vez (mesma grade de _p_onsets, para frente)."""
+    qrs_off = np.asarray(qrs_off, dtype=np.int64)
     endw = int(0.03*fs)
-    i0 = qrs_off
-    i1 = min(len(y)-1, qrs_off + int(0.62*fs))
-    for i in range(i0+endw, i1):
-        if np.all(gabs[i-endw:i] < 0.10):
-            return int(i)
-    return None
+    i1 = np.minimum(f.n-1, qrs_off + int(0.62*fs))
+    i = qrs_off[:, None] + endw + np.arange(max(1, int(0.62*fs) - endw))[None, :]
+    valid = i < i1[:, None]
+    ic = np.clip(i, endw, f.n)
+    ok = valid & ((f.c_t[ic] - f.c_t[ic - endw]) == 0)
+    return _first_stable(ok, i)
+
+def _p_onset(f: _TraceFeatures, qrs_on: int, fs: float) -> Optional[int]:
+    return _p_onsets(f, np.array([qrs_on]), fs)[0]
+
+def _t_end(f: _TraceFeatures, qrs_off: int, fs: float) -> Optional[int]:
+    return _t_ends(f, np.array([qrs_off]), fs)[0]
+
+def find_onset_offset_refined(y_px: np.ndarray, r_idx: int, fs: float) -> Tuple[int,int]:
+    return _qrs_bounds(_TraceFeatures(y_px, fs), r_idx, fs)
+
+def p_onset_refined(y_px: np.ndarray, qrs_on: int, fs: float) -> Optional[int]:
+    return _p_onset(_TraceFeatures(y_px, fs), qrs_on, fs)
+
+def t_end_refined(y_px: np.ndarray, qrs_off: int, fs: float) -> Optional[int]:
+    return _t_end(_TraceFeatures(y_px, fs), qrs_off, fs)
 
 def intervals_refined_from_trace(y_px: np.ndarray, r_peaks: List[int], px_per_sec: float) -> Dict:
+    """Delineia todos os batimentos de um traçado.
+
+    P e fim da T são buscados de uma vez sobre o vetor de R-peaks (grade de lookups nas
+    contagens acumuladas). Os limites do QRS ficam num laço por batimento: os limiares são
+    quantis da própria janela, que é recortada nas bordas do traçado — vetorizar exigiria
+    quantis sobre janelas de tamanho variável, e cada iteração já é O(janela) em numpy.
+    """
     fs = float(px_per_sec)
     y = _smooth(y_px - np.median(y_px), 7)
-    onsets=[]; offsets=[]; tend=[]; pons=[]
-    for r in r_peaks:
-        on, off = find_onset_offset_refined(y, r, fs)
-        onsets.append(on); offsets.append(off)
-        tend.append(t_end_refined(y, off, fs))
-        pons.append(p_onset_refined(y, on, fs))
+    feat = _TraceFeatures(y, fs)  # uma vez por derivação; os testes por batimento são lookups
+    bounds = [_qrs_bounds(feat, r, fs) for r in r_peaks]
+    onsets = [on for on, _ in bounds]
+    offsets = [off for _, off in bounds]
+    tend = _t_ends(feat, np.array(offsets, dtype=np.int64), fs) if bounds else []
+    pons = _p_onsets(feat, np.array(onsets, dtype=np.int64), fs) if bounds else []
     rr = [ (b-a)/fs for a,b in zip(r_peaks, r_peaks[1:]) ]
     rr_med = float(np.median(rr)) if rr else None
     PR=[]; QRS=[]; QT=[]
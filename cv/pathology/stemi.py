@@ -151,11 +151,32 @@ def measure_st_deviation(
     list[float]
         ST deviation in mm for each beat.  Positive = elevation, negative = depression.
     """
+    from signal_processing.beats import extract_beats
+
     trace = np.asarray(trace, dtype=float)
     st_offset_samples = int(st_offset_ms * fs / 1000.0)
-    deviations: List[float] = []
-
-    for rp in r_peaks:
+    r_peaks = np.asarray(r_peaks, dtype=int).reshape(-1)
+    deviations = np.empty(len(r_peaks))
+
+    # Beats whose TP baseline, QRS search and ST point all fit in the trace are
+    # measured together on one aligned beat matrix; the rest (record edges) use
+    # the per-beat helpers with their fallbacks.
+    qrs_window = int(0.08 * fs)
+    tp_start, tp_end = int(0.32 * fs), int(0.28 * fs)
+    done = np.zeros(len(r_peaks), dtype=bool)
+    if qrs_window >= 2 and tp_start > tp_end:
+        # +0.5 sample: post_s * fs must not round down below the ST point
+        beats = extract_beats(trace, r_peaks, fs, pre_s=0.32, post_s=(qrs_window + st_offset_samples + 1.5) / fs)
+        if len(beats):
+            r = beats.offset
+            baseline = beats.beats[:, r - tp_start:r - tp_end].mean(axis=1)
+            j_idx = r + _j_point_offsets(beats.beats[:, r:r + qrs_window + 1])
+            st_mv = beats.beats[np.arange(len(beats)), j_idx + st_offset_samples] - baseline
+            deviations[beats.index] = st_mv / 0.1
+            done[beats.index] = True
+
+    for i in np.flatnonzero(~done):
+        rp = int(r_peaks[i])
         baseline = _baseline_level(trace, rp, fs)
         j_idx = _j_point_index(trace, rp, fs)
         measure_idx = j_idx + st_offset_samples
@@ -165,10 +186,28 @@ def measure_st_deviation(
 
         st_voltage_mv = trace[measure_idx] - baseline
         # Convert mV → mm  (standard calibration: 1 mm = 0.1 mV)
-        st_mm = st_voltage_mv / 0.1
-        deviations.append(round(st_mm, 3))
+        deviations[i] = st_voltage_mv / 0.1
+
+    return [round(float(d), 3) for d in deviations]
 
-    return deviations
+
+def _j_point_offsets(qrs: np.ndarray) -> np.ndarray:
+    """Vectorised :func:`_j_point_index` over beats: *qrs* is [beats, R..R+80 ms].
+
+    Returns the J-point offset from R for each row, using the same S-trough and
+    15 % gradient rule as the scalar version.
+    """
+    n, width = qrs.shape
+    s_off = np.argmin(qrs, axis=1)
+    grad = np.abs(np.diff(qrs, axis=1))
+    valid = np.arange(width - 1)[np.newaxis, :] >= s_off[:, np.newaxis]
+    gmax = np.where(valid, grad, -np.inf).max(axis=1)
+    thr = np.where(gmax > 0, 0.15 * gmax, 0.0)
+    below = valid & (grad < thr[:, np.newaxis])
+    first = np.argmax(below, axis=1)
+    j = np.where(below.any(axis=1), first, width - 2)
+    # No gradient left after the S trough: J is the trough itself
+    return np.where(s_off >= width - 1, s_off, j)
 
 
 def classify_st_deviation(
@@ -0,0 +1,44 @@
+
+from __future__ import annotations
+import time
+from contextlib import contextmanager
+from typing import Dict, List
+
+
+class StageTimings:
+    """
+    Cronômetro por etapa do pipeline (decode, deskew, normalize, grid, segment, trace, peaks, ...).
+    Tempos são exclusivos: uma etapa aninhada (ex.: segment disparado dentro de trace) pausa a
+    etapa externa, de modo que a soma das etapas não conta o mesmo intervalo duas vezes.
+    Chamadas repetidas da mesma etapa acumulam.
+    """
+
+    def __init__(self):
+        self.totals: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self._stack: List[List] = []  # [nome, início do trecho corrente]
+
+    @contextmanager
+    def stage(self, name: str):
+        now = time.perf_counter()
+        if self._stack:
+            outer = self._stack[-1]
+            self.totals[outer[0]] = self.totals.get(outer[0], 0.0) + (now - outer[1])
+        self._stack.append([name, now])
+        try:
+            yield self
+        finally:
+            now = time.perf_counter()
+            _, t0 = self._stack.pop()
+            self.totals[name] = self.totals.get(name, 0.0) + (now - t0)
+            self.counts[name] = self.counts.get(name, 0) + 1
+            if self._stack:
+                self._stack[-1][1] = now
+
+    @property
+    def total(self) -> float:
+        return float(sum(self.totals.values()))
+
+    def as_ms(self) -> Dict[str, float]:
+        """Tempo acumulado por etapa (ms), na ordem em que as etapas apareceram."""
+        return {k: round(v * 1000.0, 2) for k, v in self.totals.items()}
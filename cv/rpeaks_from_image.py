@@ -2,24 +2,69 @@
 import numpy as np
 from typing import Dict, List, Tuple, Optional
 
-def extract_trace_centerline(gray_crop: np.ndarray, band: float = 0.8) -> np.ndarray:
+def _band_rows(h: int, band: float) -> Tuple[int, int]:
+    cy0 = int((1-band)*0.5*h)
+    return cy0, int(h - cy0)
+
+def _subpixel_centroid(col_block: np.ndarray, idx: np.ndarray, radius: int = 2) -> np.ndarray:
+    """
+    Refina o índice do mínimo por coluna com centróide ponderado pela "escuridão"
+    (max - intensidade) numa janela ±radius ao redor do argmin. Vetorizado em todas as colunas.
+    """
+    h, w = col_block.shape
+    offs = np.arange(-radius, radius+1)
+    rows = np.clip(idx[None, :] + offs[:, None], 0, h-1)
+    vals = np.take_along_axis(col_block, rows, axis=0).astype(np.float32)
+    wts = vals.max(axis=0, keepdims=True) - vals
+    wsum = wts.sum(axis=0)
+    cen = (wts * rows).sum(axis=0) / np.where(wsum > 0, wsum, 1.0)
+    return np.where(wsum > 0, cen, idx).astype(float)
+
+def extract_trace_centerline(gray_crop: np.ndarray, band: float = 0.8, subpixel: bool = False) -> np.ndarray:
     """
     Constrói uma série 1D y(x) a partir do recorte da derivação:
     para cada coluna x, pega a posição do pixel mais escuro (mínimo) dentro de uma banda vertical central.
     'band' define a fração da altura considerada ao redor do meio (default 80%).
+    'subpixel' refina cada coluna por centróide de intensidade (posição fracionária).
     Retorna vetor float com coordenadas y (em pixels, origem topo).
     """
     if gray_crop.ndim != 2:
         raise ValueError("Esperado gray 2D")
     h, w = gray_crop.shape
-    cy0 = int((1-band)*0.5*h)
-    cy1 = int(h - cy0)
-    center = []
-    for x in range(w):
-        col = gray_crop[cy0:cy1, x]
-        y_local = int(np.argmin(col))
-        center.append(cy0 + y_local)
-    return np.array(center, dtype=float)
+    cy0, cy1 = _band_rows(h, band)
+    block = gray_crop[cy0:cy1]
+    idx = np.argmin(block, axis=0)
+    y = _subpixel_centroid(block, idx) if subpixel else idx.astype(float)
+    return cy0 + y
+
+def extract_traces(gray: np.ndarray, boxes: Dict[str, Tuple[int,int,int,int]], band: float = 0.8,
+                   subpixel: bool = False) -> Dict[str, np.ndarray]:
+    """
+    Extrai os traçados de todas as derivações de uma vez: caixas que compartilham a mesma
+    faixa vertical (uma linha do layout) viram um único argmin(axis=0) sobre a faixa inteira,
+    fatiado depois por coluna. Equivalente a extract_trace_centerline(crop) por caixa.
+    Retorna {lead: y(x)} com y relativo ao topo de cada caixa.
+    """
+    if gray.ndim != 2:
+        raise ValueError("Esperado gray 2D")
+    rows: Dict[Tuple[int,int], List[str]] = {}
+    for lead, (x0, y0, x1, y1) in boxes.items():
+        rows.setdefault((int(y0), int(y1)), []).append(lead)
+    out = {}
+    for (y0, y1), leads in rows.items():
+        cy0, cy1 = _band_rows(y1 - y0, band)
+        xs0 = min(int(boxes[l][0]) for l in leads); xs1 = max(int(boxes[l][2]) for l in leads)
+        block = gray[y0+cy0:y0+cy1, xs0:xs1]
+        if block.shape[0] == 0:
+            for l in leads:
+                out[l] = np.full(max(0, int(boxes[l][2]) - int(boxes[l][0])), float(cy0))
+            continue
+        idx = np.argmin(block, axis=0)
+        y = _subpixel_centroid(block, idx) if subpixel else idx.astype(float)
+        for l in leads:
+            x0, x1 = int(boxes[l][0]) - xs0, int(boxes[l][2]) - xs0
+            out[l] = cy0 + y[x0:x1]
+    return out
 
 def smooth_signal(y: np.ndarray, win: int = 9) -> np.ndarray:
     win = max(3, int(win) | 1)  # ímpar
@@ -26,71 +26,218 @@ def _integrator(y: np.ndarray, win: int) -> np.ndarray:
     # Integração por janela deslizante (média) — etapa final do Pan‑Tompkins
     return _moving_avg(y, win)
 
+def _pt_params(fs: float, lo_ms: float, hi_ms: float, deriv_ms: float, integ_ms: float,
+               refractory_ms: float) -> Dict[str, int]:
+    lo_win = max(1, int(lo_ms * fs / 1000.0))
+    return {
+        "lo_win": lo_win,
+        "hi_win": max(lo_win+1, int(hi_ms * fs / 1000.0)),
+        "d_win": max(1, int(deriv_ms * fs / 1000.0)),
+        "i_win": max(1, int(integ_ms * fs / 1000.0)),
+        "rp": int(refractory_ms * fs / 1000.0),
+    }
+
+def _pt_filters(y: np.ndarray, prm: Dict[str, int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Banda limitada → derivada (MA) → quadrado → integração (sem normalização)."""
+    yb = _diff_ma_bandpass(y, prm["lo_win"], prm["hi_win"])
+    dy = np.diff(yb, prepend=yb[:1])
+    dy = _moving_avg(dy, prm["d_win"])
+    sq = dy * dy
+    yi = _integrator(sq, prm["i_win"])
+    return yb, dy, sq, yi
+
+def _pt_support(prm: Dict[str, int]) -> Tuple[int, int]:
+    """Amostras de contexto (esquerda, direita) de que yi[i] depende (MAs 'same' + diferença)."""
+    left = prm["hi_win"]//2 + 1 + prm["d_win"]//2 + prm["i_win"]//2
+    right = (prm["hi_win"]-1)//2 + (prm["d_win"]-1)//2 + (prm["i_win"]-1)//2
+    return left, right
+
+def _local_max(yi: np.ndarray) -> np.ndarray:
+    """Máscara de candidatos (pico local, empates inclusive) para yi[1:-1]."""
+    return (yi[1:-1] >= yi[:-2]) & (yi[1:-1] >= yi[2:])
+
+class _PTThreshold:
+    """
+    Limiar adaptativo estilo Pan‑Tompkins (mesma regra por amostra do laço original): fora do período
+    refratário, o primeiro candidato acima de THR1 vira R (atualiza SPKI); amostras acima de THR1 que
+    não são candidatas ficam congeladas; as demais atualizam NPKI (média exponencial).
+    Vetorizado por eventos: entre dois cruzamentos de THR1 a evolução de NPKI é um IIR de 1ª ordem
+    (lfilter), e o laço Python só roda uma vez por cruzamento — não por amostra. O estado persiste entre
+    chamadas de run(), o que permite processar o sinal em blocos.
+    """
+
+    def __init__(self, learn: np.ndarray, rp: int, block: int = 256):
+        self.npki = float(np.median(learn))
+        self.spki = float(np.percentile(learn, 95))
+        self.thr = self.npki + 0.25*(self.spki - self.npki)
+        self.rp = int(rp)
+        self.block = max(int(block), 16)
+        self.last_peak = -10**9
+
+    def _noise(self, seg: np.ndarray) -> np.ndarray:
+        """NPKI após cada amostra de seg (todas atualizando o nível de ruído)."""
+        from scipy.signal import lfilter
+        out, _ = lfilter([0.125], [1.0, -0.875], seg, zi=[0.875*self.npki])
+        return out
+
+    def _set_noise(self, npki: float):
+        self.npki = float(npki)
+        self.thr = self.npki + 0.25*(self.spki - self.npki)
+
+    def run(self, yi: np.ndarray, cand: np.ndarray, base: int) -> List[int]:
+        """Processa yi[k] (índice absoluto base+k) com cand[k] = pico local; retorna os R aceitos."""
+        peaks: List[int] = []
+        i, n = 0, len(yi)
+        while i < n:
+            if base + i - self.last_peak < self.rp:
+                # período refratário: toda amostra atualiza NPKI
+                e = min(n, self.last_peak + self.rp - base)
+                self._set_noise(self._noise(yi[i:e])[-1])
+                i = e
+                continue
+            e = min(n, i + self.block)
+            seg = yi[i:e]
+            after = self._noise(seg)
+            before = np.concatenate([[self.npki], after[:-1]])
+            over = seg > before + 0.25*(self.spki - before)
+            if not over.any():
+                self._set_noise(after[-1])
+                i = e
+                continue
+            k = int(np.argmax(over))
+            self._set_noise(before[k])
+            i = self._frozen(yi, cand, i + k, base, peaks)
+        return peaks
+
+    def _frozen(self, yi: np.ndarray, cand: np.ndarray, j: int, base: int, peaks: List[int]) -> int:
+        """A partir de um cruzamento em j, com limiar constante: devolve o índice onde retomar."""
+        n, w = len(yi), self.block
+        while j < n:
+            e = min(n, j + w)
+            above = yi[j:e] > self.thr
+            stop = np.flatnonzero(~above)
+            lim = int(stop[0]) if stop.size else e - j
+            hit = np.flatnonzero(cand[j:j+lim] & above[:lim])
+            if hit.size:
+                r = j + int(hit[0])
+                peaks.append(base + r)
+                self.last_peak = base + r
+                self.spki = 0.875*self.spki + 0.125*yi[r]
+                self.thr = self.npki + 0.25*(self.spki - self.npki)
+                return r + 1
+            if stop.size:
+                return j + lim
+            j, w = e, 2*w
+        return n
+
 def pan_tompkins_like(y_px: np.ndarray, px_per_sec: float,
                       lo_ms: float = 12.0, hi_ms: float = 180.0,
                       deriv_ms: float = 8.0, integ_ms: float = 150.0,
                       refractory_ms: float = 200.0,
-                      learn_sec: float = 2.0) -> Dict:
+                      learn_sec: float = 2.0,
+                      return_signals: bool = False) -> Dict:
     """
     Pipeline Pan‑Tompkins-like sobre traçado 1D (posição em pixels ao longo do tempo em "colunas").
-    Retorna picos R robustos e intermediários (sinais) para debug.
+    Retorna picos R robustos; os intermediários (yb, dy, sq, yi) só com return_signals=True (debug).
     """
     # 1) Sinal: inverter para que picos positivos representem complexos QRS
     y = -(y_px - np.median(y_px))
     fs = float(px_per_sec)
-    # 2) Banda limitada (diferença de MAs)
-    lo_win = max(1, int(lo_ms * fs / 1000.0))
-    hi_win = max(lo_win+1, int(hi_ms * fs / 1000.0))
-    yb = _diff_ma_bandpass(y, lo_win, hi_win)
-    # 3) Derivada e quadrado
-    d_win = max(1, int(deriv_ms * fs / 1000.0))
-    dy = np.diff(yb, prepend=yb[:1])
-    dy = _moving_avg(dy, d_win)
-    sq = dy * dy
-    # 4) Integração janela
-    i_win = max(1, int(integ_ms * fs / 1000.0))
-    yi = _integrator(sq, i_win)
+    prm = _pt_params(fs, lo_ms, hi_ms, deriv_ms, integ_ms, refractory_ms)
+    # 2–4) Banda limitada, derivada, quadrado, integração
+    yb, dy, sq, yi = _pt_filters(y, prm)
     yi = _normalize(yi)
 
-    # 5) Threshold adaptativo estilo Pan‑Tompkins
-    thr_spki = 0.0  # nível sinal
-    thr_npki = 0.0  # nível ruído
-    peaks = []
-    rp = int(refractory_ms * fs / 1000.0)
-    last_peak = -10**9
-
-    # fase de aprendizado
-    n_learn = int(learn_sec * fs)
-    base = yi[:max(10, n_learn)]
-    thr_npki = float(np.median(base))
-    thr_spki = float(np.percentile(base, 95))
-    THR1 = thr_npki + 0.25*(thr_spki - thr_npki)
-
-    if len(yi) < 3:
-        return {
-            "peaks_idx": peaks,
-            "fs_px": fs,
-            "signals": {"yb": yb, "dy": dy, "sq": sq, "yi": yi},
-            "params": {"lo_win": lo_win, "hi_win": hi_win, "d_win": d_win, "i_win": i_win, "rp": rp}
-        }
-
-    for i in range(1, len(yi)-1):
-        if yi[i] > THR1 and (i - last_peak) >= rp:
-            # candidato a R: pico local
-            if yi[i] >= yi[i-1] and yi[i] >= yi[i+1]:
-                peaks.append(i)
-                last_peak = i
-                # atualiza níveis
-                thr_spki = 0.875*thr_spki + 0.125*yi[i]
-                THR1 = thr_npki + 0.25*(thr_spki - thr_npki)
-        else:
-            # atualiza ruído lentamente
-            thr_npki = 0.875*thr_npki + 0.125*yi[i]
-            THR1 = thr_npki + 0.25*(thr_spki - thr_npki)
+    # 5) Threshold adaptativo estilo Pan‑Tompkins (aprendizado nos primeiros learn_sec)
+    peaks: List[int] = []
+    if len(yi) >= 3:
+        state = _PTThreshold(yi[:max(10, int(learn_sec * fs))], prm["rp"])
+        peaks = state.run(yi[1:-1], _local_max(yi), base=1)
 
-    return {
-        "peaks_idx": peaks,
-        "fs_px": fs,
-        "signals": {"yb": yb, "dy": dy, "sq": sq, "yi": yi},
-        "params": {"lo_win": lo_win, "hi_win": hi_win, "d_win": d_win, "i_win": i_win, "rp": rp}
-    }
+    out = {"peaks_idx": peaks, "fs_px": fs, "params": prm}
+    if return_signals:
+        out["signals"] = {"yb": yb, "dy": dy, "sq": sq, "yi": yi}
+    return out
+
+
+class PanTompkinsStream:
+    """
+    Versão incremental de pan_tompkins_like para registros longos: alimente blocos de amostras com
+    feed() (retorna os R-peaks confirmados até ali, em índices absolutos) e chame flush() no fim.
+    Guarda só o contexto dos filtros e o estado do limiar, então memória e custo por bloco não crescem
+    com a duração; o resultado não depende do tamanho dos blocos.
+    Diferenças em relação ao lote: a linha de base é a mediana da janela de aprendizado (não do registro
+    inteiro) e yi não é normalizado — o limiar adaptativo é invariante a escala e deslocamento, então
+    os picos coincidem salvo arredondamento e as primeiras amostras da borda.
+    """
+
+    def __init__(self, px_per_sec: float, lo_ms: float = 12.0, hi_ms: float = 180.0,
+                 deriv_ms: float = 8.0, integ_ms: float = 150.0, refractory_ms: float = 200.0,
+                 learn_sec: float = 2.0):
+        self.fs = float(px_per_sec)
+        self.params = _pt_params(self.fs, lo_ms, hi_ms, deriv_ms, integ_ms, refractory_ms)
+        self._left, self._right = _pt_support(self.params)
+        self._n_learn = max(10, int(learn_sec * self.fs))
+        self._raw = np.zeros(0)     # amostras brutas a partir de _raw_start
+        self._raw_start = 0
+        self._ref: Optional[float] = None
+        self._yi = np.zeros(0)      # yi final para índices [_yi_start, _done)
+        self._yi_start = 0
+        self._done = 0
+        self._next = 1              # próximo índice a passar pelo limiar
+        self._state: Optional[_PTThreshold] = None
+        self.n_samples = 0
+        self.peaks: List[int] = []
+
+    def feed(self, chunk) -> List[int]:
+        chunk = np.asarray(chunk, dtype=float).ravel()
+        if chunk.size:
+            self._raw = np.concatenate([self._raw, chunk])
+            self.n_samples += chunk.size
+        if self._ref is None:
+            if self.n_samples < max(self._n_learn, self._left + self._right + 1):
+                return []
+            self._ref = float(np.median(self._raw))
+        return self._advance(self.n_samples - self._right)
+
+    def flush(self) -> List[int]:
+        """Fecha o registro: a borda final usa o mesmo preenchimento com zeros do lote."""
+        if not self.n_samples:
+            return []
+        if self._ref is None:
+            self._ref = float(np.median(self._raw))
+        return self._advance(self.n_samples, final=True)
+
+    def _advance(self, upto: int, final: bool = False) -> List[int]:
+        if upto > self._done:
+            yi = _pt_filters(-(self._raw - self._ref), self.params)[3]
+            self._yi = np.concatenate([self._yi, yi[self._done - self._raw_start: upto - self._raw_start]])
+            self._done = upto
+            keep = max(0, self._done - self._left) - self._raw_start
+            if keep > 0:
+                self._raw = self._raw[keep:]
+                self._raw_start += keep
+        if self._state is None:
+            if self._done < self._n_learn and not final:
+                return []
+            self._state = _PTThreshold(self._yi[:self._n_learn], self.params["rp"])
+        # índices k com vizinhos disponíveis: _next <= k < _done-1 (como o laço 1..n-2 do lote)
+        lo, hi = self._next - self._yi_start, self._done - 1 - self._yi_start
+        if hi <= lo:
+            return []
+        cand = _local_max(self._yi[lo-1: hi+1])
+        new = self._state.run(self._yi[lo:hi], cand, base=self._next)
+        self._next = self._done - 1
+        drop = self._next - 1 - self._yi_start
+        self._yi = self._yi[drop:]
+        self._yi_start += drop
+        self.peaks += new
+        return new
+
+
+def iter_rpeaks_stream(chunks, px_per_sec: float, **kwargs):
+    """Gera R-peaks (índices absolutos) à medida que os blocos de amostras são consumidos."""
+    det = PanTompkinsStream(px_per_sec, **kwargs)
+    for chunk in chunks:
+        yield from det.feed(chunk)
+    yield from det.flush()
@@ -1,11 +1,12 @@
 """Convenience re-exports for trace extraction utilities.
 
-Several modules (rhythm, lvh_checklist, precordial_transition, axis_hexaxial)
-import ``extract_trace_centerline`` and ``smooth_signal`` from ``cv.trace``.
+The image analyzers (through ``cv.context``) and ``cv.axis``
+import ``extract_trace_centerline`` and ``smooth_signal`` from ``cv.trace``;
+``extract_traces`` extracts every lead box of an image in one vectorized pass.
 The canonical implementations live in ``cv.rpeaks_from_image``; this module
 simply re-exports them so that both import paths work.
 """
 
-from .rpeaks_from_image import extract_trace_centerline, smooth_signal
+from .rpeaks_from_image import extract_trace_centerline, extract_traces, smooth_signal
 
-__all__ = ["extract_trace_centerline", "smooth_signal"]
+__all__ = ["extract_trace_centerline", "extract_traces", "smooth_signal"]
@@ -1,13 +1,20 @@
 """Generic PhysioNet dataset utilities for ECGiga.
 
-Provides a catalogue of supported ECG datasets and a unified download
-interface built on top of ``wfdb.dl_database()``.
+Provides a catalogue of supported ECG datasets, a parallel resumable
+downloader for PhysioNet file trees (checked against ``SHA256SUMS.txt``) and a
+cached index of the WFDB records on disk.
 """
 
 from __future__ import annotations
 
+import hashlib
+import json
+import os
 import pathlib
-from typing import Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
 
 
 # ---------------------------------------------------------------------------
@@ -111,9 +118,175 @@ def list_available_datasets() -> list[dict]:
     return result
 
 
+# ---------------------------------------------------------------------------
+# Parallel, resumable downloader
+# ---------------------------------------------------------------------------
+
+PHYSIONET_FILES_URL = "https://physionet.org/files"
+_CHUNK = 1 << 20
+
+
+def _sha256(path: pathlib.Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(_CHUNK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def parse_checksums(text: str) -> dict[str, str]:
+    """``SHA256SUMS.txt`` content -> ``{relative path: sha256}``."""
+    sums = {}
+    for line in text.splitlines():
+        digest, _, name = line.strip().partition(" ")
+        name = name.strip().lstrip("*")
+        if len(digest) == 64 and name:
+            sums[name.removeprefix("./")] = digest.lower()
+    return sums
+
+
+class _Fetcher:
+    """One keep-alive ``requests.Session`` per worker thread."""
+
+    def __init__(self, base_url: str, timeout: float):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self._local = threading.local()
+
+    @property
+    def session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            import requests
+
+            session = self._local.session = requests.Session()
+        return session
+
+    def get(self, name: str, **kwargs):
+        return self.session.get(f"{self.base_url}/{name}", timeout=self.timeout, **kwargs)
+
+    def file_list(self) -> tuple[list[str], dict[str, str]]:
+        """Files to fetch and their checksums (``RECORDS`` fallback without checksums)."""
+        resp = self.get("SHA256SUMS.txt")
+        if resp.status_code == 200:
+            sums = parse_checksums(resp.text)
+            return sorted(sums), sums
+        resp = self.get("RECORDS")
+        resp.raise_for_status()
+        records = [r.strip() for r in resp.text.splitlines() if r.strip()]
+        return ["RECORDS"] + [f"{r}.{ext}" for r in records for ext in ("hea", "dat")], {}
+
+    def download(self, name: str, dest: pathlib.Path, sha256: Optional[str]) -> tuple[str, int]:
+        """Fetch *name* into *dest*: ("skipped" | "downloaded" | "resumed", bytes received)."""
+        if dest.exists():
+            if sha256 is not None and _sha256(dest) == sha256:
+                return "skipped", 0
+            if sha256 is None:
+                head = self.session.head(f"{self.base_url}/{name}", timeout=self.timeout)
+                if head.ok and int(head.headers.get("Content-Length", -1)) == dest.stat().st_size:
+                    return "skipped", 0
+        part = dest.with_name(dest.name + ".part")
+        offset = part.stat().st_size if part.exists() else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        received = 0
+        with self.get(name, headers=headers, stream=True) as resp:
+            if resp.status_code == 416:  # .part already holds the whole file
+                pass
+            else:
+                resp.raise_for_status()
+                resumed = resp.status_code == 206
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                with open(part, "ab" if resumed else "wb") as fh:
+                    for block in resp.iter_content(_CHUNK):
+                        fh.write(block)
+                        received += len(block)
+                offset = offset if resumed else 0
+        if sha256 is not None and _sha256(part) != sha256:
+            part.unlink()
+            raise ValueError(f"SHA256 divergente para {name}")
+        os.replace(part, dest)
+        return ("resumed" if offset else "downloaded"), received
+
+
+def download_physionet(
+    db: str,
+    dest_dir: str | pathlib.Path,
+    *,
+    workers: int = 8,
+    base_url: str = PHYSIONET_FILES_URL,
+    files: Optional[list[str]] = None,
+    timeout: float = 60.0,
+    on_file: Optional[Callable[[str, str], None]] = None,
+) -> dict:
+    """Download the files of PhysioNet database *db* (e.g. ``"ptb-xl/1.0.3"``).
+
+    Files are fetched concurrently by *workers* threads, each reusing one
+    keep-alive connection. Files already present with the SHA256 listed in
+    ``SHA256SUMS.txt`` are skipped, interrupted transfers continue from their
+    ``.part`` file with an HTTP byte range, and every new file is verified
+    before it replaces the destination.
+
+    Parameters
+    ----------
+    db : str
+        Database path under *base_url* (``"<slug>/<version>"``).
+    dest_dir : str or Path
+        Destination; the PhysioNet directory layout is preserved.
+    workers : int
+        Concurrent downloads.
+    base_url : str
+        Files root (a local HTTP server in tests / offline mirrors).
+    files : list of str, optional
+        Subset of relative paths to fetch (default: all listed files).
+    timeout : float
+        Per-request timeout (s).
+    on_file : callable, optional
+        Called with ``(relative path, status)`` as each file finishes.
+
+    Returns
+    -------
+    dict
+        ``{"downloaded", "resumed", "skipped", "bytes", "failed", "elapsed_s"}``
+        where ``failed`` maps relative paths to error messages.
+    """
+    fetcher = _Fetcher(f"{base_url.rstrip('/')}/{db.strip('/')}", timeout)
+    listed, sums = fetcher.file_list()
+    names = files if files is not None else listed
+    dest = pathlib.Path(dest_dir)
+    dest.mkdir(parents=True, exist_ok=True)
+    summary = {"downloaded": 0, "resumed": 0, "skipped": 0, "bytes": 0, "failed": {}}
+    lock = threading.Lock()
+    t0 = time.perf_counter()
+
+    def fetch(name: str) -> None:
+        try:
+            if name.startswith("/") or ".." in pathlib.PurePosixPath(name).parts:
+                raise ValueError(f"Caminho inválido: {name}")
+            status, received = fetcher.download(name, dest / name, sums.get(name))
+        except Exception as exc:  # one bad file must not abort the rest
+            status, received = "failed", 0
+            with lock:
+                summary["failed"][name] = str(exc)
+        else:
+            with lock:
+                summary[status] += 1
+                summary["bytes"] += received
+        if on_file:
+            on_file(name, status)
+
+    with ThreadPoolExecutor(max_workers=max(1, int(workers))) as ex:
+        list(ex.map(fetch, names))
+    _RECORD_INDEXES.pop(dest.resolve(), None)
+    _INDEX_STAMPS.pop(dest.resolve(), None)
+    (dest / RECORD_INDEX_FILE).unlink(missing_ok=True)
+    return {**summary, "elapsed_s": round(time.perf_counter() - t0, 3)}
+
+
 def download_dataset(
     name: str,
     dest_dir: Optional[str] = None,
+    workers: int = 8,
+    base_url: str = PHYSIONET_FILES_URL,
 ) -> pathlib.Path:
     """Download a PhysioNet dataset by its short key.
 
@@ -124,6 +297,10 @@ def download_dataset(
         (e.g. ``"ptb-xl"``, ``"mit-bih"``).
     dest_dir : str, optional
         Destination directory. Defaults to ``datasets/<name>``.
+    workers : int
+        Concurrent downloads (see :func:`download_physionet`).
+    base_url : str
+        PhysioNet files root.
 
     Returns
     -------
@@ -134,9 +311,9 @@ def download_dataset(
     ------
     ValueError
         If the dataset name is not recognised.
+    RuntimeError
+        If some files could not be downloaded or verified (re-run to resume).
     """
-    import wfdb
-
     if name not in DATASETS:
         available = ", ".join(sorted(DATASETS.keys()))
         raise ValueError(
@@ -151,6 +328,133 @@ def download_dataset(
     dest = pathlib.Path(dest_dir)
     dest.mkdir(parents=True, exist_ok=True)
 
-    wfdb.dl_database(info["physionet_name"], dl_dir=str(dest))
+    result = download_physionet(info["physionet_name"], dest, workers=workers, base_url=base_url)
+    if result["failed"]:
+        raise RuntimeError(
+            f"{len(result['failed'])} arquivo(s) falharam: {sorted(result['failed'])[:5]}"
+        )
 
     return dest
+
+
+# ---------------------------------------------------------------------------
+# Record file index
+# ---------------------------------------------------------------------------
+
+RECORD_INDEX_FILE = "records.index.json"
+RECORD_INDEX_VERSION = "records-index-1"
+
+# Process-wide cache: dataset root -> {record name: record path (no suffix)}
+_RECORD_INDEXES: dict[pathlib.Path, dict[str, pathlib.Path]] = {}
+# mtime of the records.index.json each in-memory index matches (None: not persisted)
+_INDEX_STAMPS: dict[pathlib.Path, Optional[int]] = {}
+
+
+def scan_records(base_dir: str | pathlib.Path) -> dict[str, pathlib.Path]:
+    """Walk *base_dir* once and map every WFDB record (``.hea``) to its path.
+
+    Record names are the POSIX paths relative to *base_dir* without the
+    ``.hea`` suffix (e.g. ``"records100/00000/00001_lr"``), ordered by depth
+    and then name so records at the dataset root win over version copies.
+    """
+    base = pathlib.Path(base_dir)
+    names = []
+    for root, dirs, files in os.walk(base):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        rel = pathlib.Path(root).relative_to(base)
+        names.extend((rel / f[:-4]).as_posix() for f in files if f.endswith(".hea"))
+    names.sort(key=lambda n: (n.count("/"), n))
+    return {n: base / n for n in names}
+
+
+def index_records(
+    base_dir: str | pathlib.Path,
+    refresh: bool = False,
+) -> dict[str, pathlib.Path]:
+    """Record index of a downloaded dataset, cached in memory and on disk.
+
+    The first call in a process reads ``records.index.json`` from *base_dir*
+    (or scans the tree and writes it); later calls are a dict lookup. Use
+    ``refresh=True`` after adding or removing records; :func:`find_record`
+    does so by itself when a lookup misses and the index looks stale.
+
+    Returns
+    -------
+    dict[str, pathlib.Path]
+        ``{record name: record path without suffix}`` (see :func:`scan_records`).
+    """
+    base = pathlib.Path(base_dir).resolve()
+    if not refresh and base in _RECORD_INDEXES:
+        return _RECORD_INDEXES[base]
+    cache_file = base / RECORD_INDEX_FILE
+    index = None
+    if not refresh:
+        try:
+            data = json.loads(cache_file.read_text(encoding="utf-8"))
+            if data.get("version") == RECORD_INDEX_VERSION:
+                index = {n: base / n for n in data["records"]}
+        except (OSError, ValueError, KeyError):
+            index = None
+    if index is None:
+        index = scan_records(base)
+        try:
+            tmp = cache_file.with_name(cache_file.name + ".tmp")
+            tmp.write_text(json.dumps({"version": RECORD_INDEX_VERSION, "records": list(index)}),
+                           encoding="utf-8")
+            os.replace(tmp, cache_file)
+        except OSError:
+            pass  # read-only dataset directory: keep the in-process index only
+    _RECORD_INDEXES[base] = index
+    _INDEX_STAMPS[base] = _index_stamp(base)
+    return index
+
+
+def _index_stamp(base: pathlib.Path) -> Optional[int]:
+    try:
+        return (base / RECORD_INDEX_FILE).stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def _index_is_stale(base: pathlib.Path) -> bool:
+    """True when the in-memory index of *base* may miss records added since it was built.
+
+    That is when ``records.index.json`` was removed (a download finished) or
+    rewritten by another process, or could never be written.
+    """
+    base = pathlib.Path(base).resolve()
+    if base not in _RECORD_INDEXES:
+        return True
+    stamp = _INDEX_STAMPS.get(base)
+    return stamp is None or _index_stamp(base) != stamp
+
+
+def _header(path: pathlib.Path) -> pathlib.Path:
+    return path.with_name(path.name + ".hea")
+
+
+def find_record(
+    base_dir: str | pathlib.Path,
+    record_name: str,
+    refresh: bool = False,
+) -> pathlib.Path:
+    """Path (without suffix) of *record_name*, rescanning once if the index is stale.
+
+    A miss triggers one rescan when the record now exists at
+    ``base_dir/record_name``, when the on-disk index changed since it was
+    loaded (see :func:`_index_is_stale`) or when *refresh* is set, so a
+    long-lived process sees records downloaded later by another one.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the record does not exist under *base_dir*.
+    """
+    base = pathlib.Path(base_dir).resolve()
+    path = None if refresh else index_records(base).get(record_name)
+    if path is None or not _header(path).exists():
+        if refresh or _index_is_stale(base) or _header(base / record_name).exists():
+            path = index_records(base, refresh=True).get(record_name)
+    if path is None:
+        raise FileNotFoundError(f"Registro {record_name} não encontrado em {base}.")
+    return path
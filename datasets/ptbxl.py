@@ -7,12 +7,16 @@ utilities for the PTB-XL 12-lead ECG dataset from PhysioNet.
 from __future__ import annotations
 
 import ast
+import json
+import os
 import pathlib
 from typing import Optional
 
 import numpy as np
 import pandas as pd
 
+from .physionet import _index_is_stale, download_physionet, index_records
+
 # ---------------------------------------------------------------------------
 # SCP code -> Portuguese descriptions
 # ---------------------------------------------------------------------------
@@ -81,8 +85,12 @@ LEAD_NAMES = ["I", "II", "III", "aVR", "aVL", "aVF", "V1", "V2", "V3", "V4", "V5
 def download_ptbxl(
     dest_dir: str = "datasets/ptb-xl",
     version: str = "1.0.3",
+    workers: int = 8,
 ) -> pathlib.Path:
-    """Download PTB-XL dataset from PhysioNet using wfdb.
+    """Download PTB-XL dataset from PhysioNet.
+
+    Uses the parallel, resumable downloader (:func:`datasets.physionet.download_physionet`);
+    re-running after an interruption only fetches missing or corrupt files.
 
     Parameters
     ----------
@@ -90,19 +98,25 @@ def download_ptbxl(
         Local directory where the dataset will be stored.
     version : str
         Dataset version on PhysioNet (default ``1.0.3``).
+    workers : int
+        Concurrent downloads.
 
     Returns
     -------
     pathlib.Path
         Path to the downloaded dataset root.
-    """
-    import wfdb
 
+    Raises
+    ------
+    RuntimeError
+        If some files could not be downloaded or verified.
+    """
     dest = pathlib.Path(dest_dir)
-    dest.mkdir(parents=True, exist_ok=True)
-
-    db_name = f"ptb-xl/{version}"
-    wfdb.dl_database(db_name, dl_dir=str(dest))
+    result = download_physionet(f"ptb-xl/{version}", dest, workers=workers)
+    if result["failed"]:
+        raise RuntimeError(
+            f"{len(result['failed'])} arquivo(s) falharam: {sorted(result['failed'])[:5]}"
+        )
 
     return dest
 
@@ -111,27 +125,12 @@ def download_ptbxl(
 # Metadata
 # ---------------------------------------------------------------------------
 
-def load_ptbxl_metadata(base_dir: str = "datasets/ptb-xl") -> pd.DataFrame:
-    """Load and parse the PTB-XL metadata CSV.
+INDEX_VERSION = "ptbxl-index-1"
+_INDEX_STEM = "ptbxl_database.index"
 
-    Parameters
-    ----------
-    base_dir : str
-        Root directory of the downloaded PTB-XL dataset.
 
-    Returns
-    -------
-    pd.DataFrame
-        Metadata with ``scp_codes`` parsed from string to dict.
-
-    Raises
-    ------
-    FileNotFoundError
-        If the metadata CSV is not found at expected location.
-    """
-    base = pathlib.Path(base_dir)
-
-    # The CSV may be directly in base_dir or under a version subfolder
+def _find_metadata_csv(base: pathlib.Path) -> pathlib.Path:
+    """Locate ``ptbxl_database.csv`` directly in *base* or in a version subfolder."""
     candidates = [
         base / "ptbxl_database.csv",
         base / "ptb-xl" / "ptbxl_database.csv",
@@ -141,31 +140,314 @@ def load_ptbxl_metadata(base_dir: str = "datasets/ptb-xl") -> pd.DataFrame:
         if child.is_dir():
             candidates.append(child / "ptbxl_database.csv")
 
-    csv_path: Optional[pathlib.Path] = None
     for c in candidates:
         if c.exists():
-            csv_path = c
-            break
+            return c
+    raise FileNotFoundError(
+        f"ptbxl_database.csv não encontrado em {base}. "
+        "Execute download_ptbxl() primeiro."
+    )
 
-    if csv_path is None:
-        raise FileNotFoundError(
-            f"ptbxl_database.csv não encontrado em {base}. "
-            "Execute download_ptbxl() primeiro."
-        )
 
+class PTBXLIndex:
+    """Parsed PTB-XL metadata plus lookup tables, built once per CSV version.
+
+    Attributes
+    ----------
+    metadata : pd.DataFrame
+        ``ptbxl_database.csv`` indexed by ``ecg_id`` with ``scp_codes`` as dicts.
+        Shared by every caller — do not modify it in place.
+    codes : pd.DataFrame
+        Exploded ``(ecg_id, code, likelihood)`` table.
+    labels_by_id : dict[int, list[str]]
+        SCP codes of each record.
+    rows_by_code : dict[str, np.ndarray]
+        Inverted index: positional rows of ``metadata`` holding each code.
+    """
+
+    def __init__(self, metadata: pd.DataFrame, codes: pd.DataFrame,
+                 csv_path: pathlib.Path, stamp: tuple[int, int]):
+        self.metadata = metadata
+        self.codes = codes
+        self.csv_path = csv_path
+        self.stamp = stamp
+        ids = metadata.index.to_numpy()
+        self.labels_by_id = {int(i): list(c) for i, c in zip(ids, metadata["scp_codes"])}
+        rows = metadata.index.get_indexer(codes["ecg_id"].to_numpy())
+        order = np.argsort(codes["code"].to_numpy(dtype=str), kind="stable")
+        sorted_codes = codes["code"].to_numpy(dtype=str)[order]
+        bounds = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1], True])
+        self.rows_by_code = {
+            str(sorted_codes[lo]): np.sort(rows[order[lo:hi]])
+            for lo, hi in zip(bounds[:-1], bounds[1:])
+        } if len(codes) else {}
+
+    def labels(self, ecg_id: int) -> list[str]:
+        return list(self.labels_by_id.get(int(ecg_id), []))
+
+    def ids_with(self, code: str) -> np.ndarray:
+        """``ecg_id`` of the records holding *code* (metadata order)."""
+        return self.metadata.index.to_numpy()[self.rows_by_code.get(code, np.empty(0, dtype=int))]
+
+    def filter(self, code: str) -> pd.DataFrame:
+        return self.metadata.iloc[self.rows_by_code.get(code, np.empty(0, dtype=int))]
+
+
+# Process-wide cache: metadata CSV path -> PTBXLIndex
+_INDEXES: dict[pathlib.Path, PTBXLIndex] = {}
+
+
+def _csv_stamp(path: pathlib.Path) -> tuple[int, int]:
+    st = path.stat()
+    return st.st_mtime_ns, st.st_size
+
+
+def _cache_format() -> str:
+    import importlib.util
+    return "parquet" if importlib.util.find_spec("pyarrow") else "json"
+
+
+def _codes_frame(df: pd.DataFrame) -> pd.DataFrame:
+    pairs = [(int(i), str(k), float(v))
+             for i, c in zip(df.index, df["scp_codes"]) for k, v in c.items()]
+    return pd.DataFrame(pairs, columns=["ecg_id", "code", "likelihood"])
+
+
+def _parse_metadata_csv(csv_path: pathlib.Path) -> tuple[pd.DataFrame, pd.DataFrame]:
     df = pd.read_csv(csv_path, index_col="ecg_id")
     # Parse the scp_codes column from string representation of dict
     df["scp_codes"] = df["scp_codes"].apply(
-        lambda x: ast.literal_eval(x) if isinstance(x, str) else x
+        lambda x: ast.literal_eval(x) if isinstance(x, str) else (x if isinstance(x, dict) else {})
     )
-    return df
+    return df, _codes_frame(df)
+
+
+def _read_disk_cache(csv_path: pathlib.Path, stamp: tuple[int, int]):
+    """Cached (metadata, codes) or None when missing, stale or unreadable (→ rebuild).
+
+    Parquet keeps both frames; without pyarrow only the parsed ``scp_codes``
+    (the slow ``literal_eval`` part) are kept as JSON and the CSV is re-read
+    by the C parser. No pickle: the dataset directory may be shared.
+    """
+    meta_path = csv_path.with_name(f"{_INDEX_STEM}.json")
+    try:
+        info = json.loads(meta_path.read_text(encoding="utf-8"))
+        if info.get("version") != INDEX_VERSION or tuple(info.get("csv_stamp", ())) != stamp:
+            return None
+        if info["format"] == "parquet":
+            df = pd.read_parquet(csv_path.with_name(f"{_INDEX_STEM}.metadata.parquet"))
+            codes = pd.read_parquet(csv_path.with_name(f"{_INDEX_STEM}.codes.parquet"))
+            df["scp_codes"] = [json.loads(x) for x in df["scp_codes"]]
+            return df, codes
+        if info["format"] == "json":
+            scp = json.loads(csv_path.with_name(f"{_INDEX_STEM}.codes.json")
+                             .read_text(encoding="utf-8"))
+            df = pd.read_csv(csv_path, index_col="ecg_id")
+            if [int(i) for i in df.index] != scp["ecg_id"]:
+                return None
+            df["scp_codes"] = scp["scp_codes"]
+            return df, _codes_frame(df)
+    except Exception:  # stale or corrupt cache → rebuild from the CSV
+        return None
+    return None
+
+
+def _write_disk_cache(csv_path: pathlib.Path, stamp: tuple[int, int],
+                      df: pd.DataFrame, codes: pd.DataFrame) -> None:
+    fmt = _cache_format()
+    try:
+        if fmt == "parquet":
+            flat = df.copy()
+            flat["scp_codes"] = [json.dumps(c) for c in df["scp_codes"]]
+            outputs = [("metadata.parquet", flat.to_parquet), ("codes.parquet", codes.to_parquet)]
+        else:
+            payload = json.dumps({"ecg_id": [int(i) for i in df.index],
+                                  "scp_codes": list(df["scp_codes"])})
+            outputs = [("codes.json", lambda tmp: tmp.write_text(payload, encoding="utf-8"))]
+        for name, write in outputs:
+            tmp = csv_path.with_name(f"{_INDEX_STEM}.{name}.tmp")
+            write(tmp)
+            os.replace(tmp, csv_path.with_name(f"{_INDEX_STEM}.{name}"))
+        info = {"version": INDEX_VERSION, "csv_stamp": list(stamp), "format": fmt}
+        csv_path.with_name(f"{_INDEX_STEM}.json").write_text(json.dumps(info), encoding="utf-8")
+    except OSError:
+        pass  # read-only dataset directory: keep the in-process index only
+
+
+def get_metadata_index(
+    base_dir: str = "datasets/ptb-xl",
+    use_disk_cache: bool = True,
+) -> PTBXLIndex:
+    """Process-wide PTB-XL metadata index, invalidated by the CSV mtime/size.
+
+    The first call parses ``ptbxl_database.csv`` (or reads the Parquet/JSON cache
+    persisted next to it); later calls cost one ``stat``.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the metadata CSV is not found at expected location.
+    """
+    csv_path = _find_metadata_csv(pathlib.Path(base_dir)).resolve()
+    stamp = _csv_stamp(csv_path)
+    index = _INDEXES.get(csv_path)
+    if index is not None and index.stamp == stamp:
+        return index
+    cached = _read_disk_cache(csv_path, stamp) if use_disk_cache else None
+    if cached is None:
+        cached = _parse_metadata_csv(csv_path)
+        if use_disk_cache:
+            _write_disk_cache(csv_path, stamp, *cached)
+    index = _INDEXES[csv_path] = PTBXLIndex(*cached, csv_path=csv_path, stamp=stamp)
+    return index
+
+
+def clear_metadata_cache() -> None:
+    """Drop the in-process metadata indexes (disk caches stay valid)."""
+    _INDEXES.clear()
+
+
+def load_ptbxl_metadata(base_dir: str = "datasets/ptb-xl") -> pd.DataFrame:
+    """Load and parse the PTB-XL metadata CSV.
+
+    Served from the process-wide index (see :func:`get_metadata_index`); the
+    returned frame is shared, so copy it before modifying in place.
+
+    Parameters
+    ----------
+    base_dir : str
+        Root directory of the downloaded PTB-XL dataset.
+
+    Returns
+    -------
+    pd.DataFrame
+        Metadata with ``scp_codes`` parsed from string to dict.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the metadata CSV is not found at expected location.
+    """
+    return get_metadata_index(base_dir).metadata
 
 
 # ---------------------------------------------------------------------------
 # Single record loading
 # ---------------------------------------------------------------------------
 
-def load_record(base_dir: str, record_id: str | int) -> dict:
+RESOLUTIONS = (100, 500)
+
+# Process-wide cache: dataset root -> (file index it was built from, {ecg_id: {fs: path}})
+_RECORD_PATHS: dict[pathlib.Path, tuple[dict, dict[int, dict[int, pathlib.Path]]]] = {}
+
+
+def _record_key(name: str) -> Optional[tuple[int, int]]:
+    """``(ecg_id, fs)`` of a record name such as ``records500/00000/00001_hr``."""
+    *dirs, stem = name.split("/")
+    rid, _, tag = stem.partition("_")
+    if not rid.isdigit():
+        return None
+    fs = next((r for r in RESOLUTIONS if f"records{r}" in dirs), None)
+    fs = fs or {"lr": 100, "hr": 500}.get(tag)
+    return (int(rid), fs) if fs else None
+
+
+def _canonical_name(ecg_id: int, fs: int) -> str:
+    """Record name in the official PTB-XL layout (``records100/00000/00001_lr``)."""
+    tag = "lr" if fs == 100 else "hr"
+    return f"records{fs}/{ecg_id // 1000 * 1000:05d}/{ecg_id:05d}_{tag}"
+
+
+def build_record_index(
+    base_dir: str,
+    refresh: bool = False,
+) -> dict[int, dict[int, pathlib.Path]]:
+    """Map every PTB-XL record to its WFDB path per sampling rate.
+
+    Built from the dataset file index (:func:`datasets.physionet.index_records`,
+    one directory walk cached in ``records.index.json``), so no path probing
+    happens per record.
+
+    Returns
+    -------
+    dict[int, dict[int, pathlib.Path]]
+        ``{ecg_id: {100: path, 500: path}}`` with paths without suffix.
+    """
+    files = index_records(base_dir, refresh=refresh)
+    key = pathlib.Path(base_dir).resolve()
+    cached = _RECORD_PATHS.get(key)
+    if cached is not None and cached[0] is files:
+        return cached[1]
+    paths: dict[int, dict[int, pathlib.Path]] = {}
+    for name, path in files.items():
+        rec = _record_key(name)
+        if rec is not None:
+            paths.setdefault(rec[0], {}).setdefault(rec[1], path)
+    _RECORD_PATHS[key] = (files, paths)
+    return paths
+
+
+def resolve_record_path(
+    base_dir: str,
+    record_id: str | int,
+    resolution: Optional[int] = None,
+    refresh: bool = False,
+) -> pathlib.Path:
+    """WFDB path (without suffix) of a PTB-XL record.
+
+    A miss rescans the dataset once when the record now exists at its
+    canonical path, when ``records.index.json`` changed since the index was
+    loaded, or when *refresh* is set, so long-lived processes pick up records
+    downloaded later.
+
+    Parameters
+    ----------
+    base_dir : str
+        Root directory of the downloaded PTB-XL dataset.
+    record_id : str or int
+        The record identifier (e.g. ``1`` or ``"00001"``).
+    resolution : int, optional
+        100 or 500 (Hz). Default: 100 Hz when available, else 500 Hz.
+    refresh : bool
+        Rescan the dataset tree before resolving.
+
+    Raises
+    ------
+    ValueError
+        If *resolution* is not 100 or 500.
+    FileNotFoundError
+        If the record is not found at the requested resolution.
+    """
+    if resolution is not None and resolution not in RESOLUTIONS:
+        raise ValueError(f"Resolução deve ser 100 ou 500 Hz, recebido {resolution!r}")
+    ecg_id = int(record_id)
+    order = (resolution,) if resolution else RESOLUTIONS
+    base = pathlib.Path(base_dir).resolve()
+
+    def pick(index: dict[int, dict[int, pathlib.Path]]) -> Optional[pathlib.Path]:
+        by_fs = index.get(ecg_id, {})
+        path = next((by_fs[r] for r in order if r in by_fs), None)
+        return path if path is not None and path.with_name(path.name + ".hea").exists() else None
+
+    path = None if refresh else pick(build_record_index(base_dir))
+    if path is None and (refresh or _index_is_stale(base) or any(
+            (base / f"{_canonical_name(ecg_id, r)}.hea").exists() for r in order)):
+        path = pick(build_record_index(base_dir, refresh=True))
+    if path is not None:
+        return path
+    suffix = f" a {resolution} Hz" if resolution else ""
+    raise FileNotFoundError(
+        f"Registro {ecg_id:05d}{suffix} não encontrado em {base_dir}. "
+        "Verifique se o dataset foi baixado corretamente."
+    )
+
+
+def load_record(
+    base_dir: str,
+    record_id: str | int,
+    resolution: Optional[int] = None,
+    refresh: bool = False,
+) -> dict:
     """Load a single WFDB record from the PTB-XL dataset.
 
     Parameters
@@ -174,6 +456,11 @@ def load_record(base_dir: str, record_id: str | int) -> dict:
         Root directory of the downloaded PTB-XL dataset.
     record_id : str or int
         The record identifier (e.g. ``1`` or ``"00001"``).
+    resolution : int, optional
+        100 Hz (fast browsing) or 500 Hz (measurements). Default: 100 Hz when
+        available, else 500 Hz.
+    refresh : bool
+        Rescan the dataset tree before resolving (see :func:`resolve_record_path`).
 
     Returns
     -------
@@ -182,69 +469,31 @@ def load_record(base_dir: str, record_id: str | int) -> dict:
     """
     import wfdb
 
-    base = pathlib.Path(base_dir)
-
-    # PTB-XL stores records under records100/ or records500/
-    # Format record_id as 5-digit string
-    if isinstance(record_id, int):
-        rid = f"{record_id:05d}"
-    else:
-        rid = str(record_id).zfill(5)
-
-    # Determine the subfolder: records are grouped in folders of 1000
-    folder_num = (int(rid) - 1) // 1000 + 1
-    folder = f"{folder_num:02d}000"
-
-    # Try records100 first (lower resolution, faster), then records500
-    for res_dir in ["records100", "records500"]:
-        candidates = [
-            base / res_dir / folder / f"{rid}_hr",
-            base / res_dir / folder / f"{rid}_lr",
-            base / res_dir / folder / rid,
-        ]
-        # Also search version sub-directories
-        for child in sorted(base.iterdir()) if base.exists() else []:
-            if child.is_dir():
-                for suffix in [f"{rid}_hr", f"{rid}_lr", rid]:
-                    candidates.append(child / res_dir / folder / suffix)
-
-        for rec_path in candidates:
-            hea_file = rec_path.with_suffix(".hea")
-            if hea_file.exists():
-                record = wfdb.rdrecord(str(rec_path))
-                # Try to load labels from metadata
-                labels = _get_labels_for_record(base, int(rid))
-                header_dict = {
-                    "record_name": record.record_name,
-                    "n_sig": record.n_sig,
-                    "fs": record.fs,
-                    "sig_len": record.sig_len,
-                    "sig_name": record.sig_name,
-                    "units": record.units,
-                }
-                return {
-                    "signal": record.p_signal,
-                    "header": header_dict,
-                    "labels": labels,
-                }
-
-    raise FileNotFoundError(
-        f"Registro {rid} não encontrado em {base}. "
-        "Verifique se o dataset foi baixado corretamente."
-    )
+    rec_path = resolve_record_path(base_dir, record_id, resolution, refresh=refresh)
+    record = wfdb.rdrecord(str(rec_path))
+    # Try to load labels from metadata
+    labels = _get_labels_for_record(pathlib.Path(base_dir), int(record_id))
+    header_dict = {
+        "record_name": record.record_name,
+        "n_sig": record.n_sig,
+        "fs": record.fs,
+        "sig_len": record.sig_len,
+        "sig_name": record.sig_name,
+        "units": record.units,
+    }
+    return {
+        "signal": record.p_signal,
+        "header": header_dict,
+        "labels": labels,
+    }
 
 
 def _get_labels_for_record(base_dir: pathlib.Path, ecg_id: int) -> list[str]:
     """Attempt to extract SCP labels for a given record ID."""
     try:
-        df = load_ptbxl_metadata(str(base_dir))
-        if ecg_id in df.index:
-            codes = df.loc[ecg_id, "scp_codes"]
-            if isinstance(codes, dict):
-                return list(codes.keys())
+        return get_metadata_index(str(base_dir)).labels(ecg_id)
     except (FileNotFoundError, Exception):
-        pass
-    return []
+        return []
 
 
 # ---------------------------------------------------------------------------
@@ -268,7 +517,11 @@ def filter_by_diagnosis(
     -------
     pd.DataFrame
         Filtered subset of records containing the given diagnosis code.
+        Frames served by :func:`load_ptbxl_metadata` use the inverted index.
     """
+    for index in _INDEXES.values():
+        if index.metadata is metadata_df:
+            return index.filter(diagnosis_code)
     mask = metadata_df["scp_codes"].apply(
         lambda codes: diagnosis_code in codes if isinstance(codes, dict) else False
     )
@@ -325,31 +578,45 @@ def record_to_image(
     record: dict,
     lead: str = "II",
     figsize: tuple[int, int] = (12, 3),
+    layout: Optional[str] = None,
+    px_per_mm: float = 5.0,
+    backend: str = "raster",
 ):
-    """Render a single lead from a WFDB record as a PIL Image.
+    """Render a WFDB record (one lead, or all leads in a layout) as a PIL Image.
 
     Parameters
     ----------
     record : dict
         Record dict as returned by :func:`load_record`.
     lead : str
-        Lead name to render (default ``"II"``).
+        Lead name to render (default ``"II"``); ignored when *layout* is set.
     figsize : tuple
-        Matplotlib figure size.
+        Matplotlib figure size (``backend="matplotlib"`` only).
+    layout : str, optional
+        ``"3x4"``, ``"6x2"`` or ``"12x1"`` to render every lead on one sheet.
+    px_per_mm : float
+        Resolution of the raster backend (25 mm/s, 10 mm/mV paper).
+    backend : str
+        ``"raster"`` (NumPy rasterizer, :mod:`datasets.raster`) or
+        ``"matplotlib"`` (axes with labels, for figures).
 
     Returns
     -------
     PIL.Image.Image
         Rendered ECG strip as an image.
     """
-    import io
-
-    import matplotlib
-    matplotlib.use("Agg")
-    import matplotlib.pyplot as plt
     from PIL import Image
 
-    sig_names = record["header"].get("sig_name", LEAD_NAMES)
+    sig_names = list(record["header"].get("sig_name", LEAD_NAMES))
+    fs = record["header"].get("fs", 500)
+    if backend == "raster":
+        from .raster import render_leads
+
+        if layout is not None:
+            return Image.fromarray(render_leads(record["signal"], fs, sig_names, layout=layout,
+                                                px_per_mm=px_per_mm))
+    elif backend != "matplotlib":
+        raise ValueError(f"Backend '{backend}' inválido. Use 'raster' ou 'matplotlib'.")
     if lead not in sig_names:
         raise ValueError(
             f"Derivação '{lead}' não encontrada. Disponíveis: {sig_names}"
@@ -357,7 +624,15 @@ def record_to_image(
 
     lead_idx = sig_names.index(lead)
     signal = record["signal"][:, lead_idx]
-    fs = record["header"].get("fs", 500)
+    if backend == "raster":
+        return Image.fromarray(render_leads(signal, fs, [lead], layout="1x1", px_per_mm=px_per_mm))
+
+    import io
+
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
     t = np.arange(len(signal)) / fs
 
     fig, ax = plt.subplots(1, 1, figsize=figsize)
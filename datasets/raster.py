@@ -0,0 +1,255 @@
+"""NumPy rasterizer for ECG strips and 12-lead sheets.
+
+Draws the standard paper grid (1 mm minor / 5 mm major lines) and the lead
+polylines straight into a ``uint8`` RGB array, without a matplotlib figure per
+image. Geometry follows the paper convention: ``speed_mm_s`` (25 mm/s) on the
+time axis, ``gain_mm_mv`` (10 mm/mV) on the amplitude axis, ``px_per_mm`` sets
+the resolution. The grid and lead labels of a layout are drawn once and reused
+across a batch.
+
+With ``return_truth=True`` the renderers also return the exact calibration
+(px/mm, baseline and bounding box of every lead), which makes the images usable
+as ground truth for the CV pipeline (``cv.grid_detect``, ``cv.segmentation``).
+"""
+
+from __future__ import annotations
+
+from typing import Optional, Sequence
+
+import numpy as np
+
+LEAD_NAMES = ["I", "II", "III", "aVR", "aVL", "aVF", "V1", "V2", "V3", "V4", "V5", "V6"]
+
+# layout -> (rows, columns); leads fill columns first (clinical order)
+LAYOUTS = {"1x1": (1, 1), "3x4": (3, 4), "6x2": (6, 2), "12x1": (12, 1)}
+
+PAPER_COLOR = (255, 255, 255)
+MINOR_COLOR = (250, 200, 200)
+MAJOR_COLOR = (235, 130, 130)
+TRACE_COLOR = (0, 0, 0)
+
+
+def paper_grid(
+    height: int,
+    width: int,
+    px_per_mm: float,
+    origin: tuple[float, float] = (0.0, 0.0),
+) -> np.ndarray:
+    """ECG paper ``[height, width, 3]``: minor line every mm, major line every 5 mm."""
+    canvas = np.empty((height, width, 3), dtype=np.uint8)
+    canvas[:] = PAPER_COLOR
+    for every, color in ((1, MINOR_COLOR), (5, MAJOR_COLOR)):
+        step = every * px_per_mm
+        xs = np.round(origin[0] + np.arange(0, (width - origin[0]) / step + 1) * step).astype(int)
+        ys = np.round(origin[1] + np.arange(0, (height - origin[1]) / step + 1) * step).astype(int)
+        canvas[:, xs[(xs >= 0) & (xs < width)]] = color
+        canvas[ys[(ys >= 0) & (ys < height)], :] = color
+    return canvas
+
+
+def _polyline_samples(xs: np.ndarray, ys: np.ndarray, step: float) -> tuple[np.ndarray, np.ndarray]:
+    """Points every <= *step* px along all segments of a polyline (vectorized)."""
+    dx, dy = np.diff(xs), np.diff(ys)
+    n = np.maximum(np.ceil(np.maximum(np.abs(dx), np.abs(dy)) / step).astype(np.int64), 1)
+    seg = np.repeat(np.arange(len(dx)), n)
+    t = (np.arange(int(n.sum())) - np.repeat(np.cumsum(n) - n, n)) / np.repeat(n, n)
+    return np.r_[xs[seg] + dx[seg] * t, xs[-1]], np.r_[ys[seg] + dy[seg] * t, ys[-1]]
+
+
+def draw_polylines(
+    canvas: np.ndarray,
+    lines: Sequence[tuple[np.ndarray, np.ndarray]],
+    color: tuple[int, int, int] = TRACE_COLOR,
+    antialias: bool = True,
+    width: int = 1,
+) -> np.ndarray:
+    """Draw polylines ``(x_px, y_px)`` into *canvas* (in place) and return it.
+
+    Segments are sampled at sub-pixel steps and accumulated into a coverage
+    buffer with ``np.bincount``; ``antialias`` splats each sample bilinearly,
+    otherwise onto the nearest pixel. ``width`` thickens with a square brush.
+    """
+    h, w = canvas.shape[:2]
+    step = 0.5 if antialias else 1.0
+    samples = [_polyline_samples(np.asarray(x, float), np.asarray(y, float), step)
+               for x, y in lines if len(x) > 1]
+    if not samples:
+        return canvas
+    px, py = np.concatenate([p[0] for p in samples]), np.concatenate([p[1] for p in samples])
+    if width > 1:
+        off = np.arange(width) - (width - 1) / 2.0
+        ox, oy = (g.ravel() for g in np.meshgrid(off, off))
+        px, py = (px[:, None] + ox).ravel(), (py[:, None] + oy).ravel()
+    if antialias:
+        x0, y0 = np.floor(px), np.floor(py)
+        fx, fy = px - x0, py - y0
+        cols = np.concatenate([x0, x0 + 1, x0, x0 + 1]).astype(np.int64)
+        rows = np.concatenate([y0, y0, y0 + 1, y0 + 1]).astype(np.int64)
+        weights = step * np.concatenate([(1 - fx) * (1 - fy), fx * (1 - fy),
+                                         (1 - fx) * fy, fx * fy])
+    else:
+        cols, rows = np.round(px).astype(np.int64), np.round(py).astype(np.int64)
+        weights = np.ones(len(cols))
+    keep = (cols >= 0) & (cols < w) & (rows >= 0) & (rows < h)
+    flat = rows[keep] * w + cols[keep]
+    cover = np.bincount(flat, weights=weights[keep], minlength=h * w)
+    idx = np.flatnonzero(cover)
+    alpha = np.minimum(cover[idx], 1.0)[:, None] if antialias else 1.0
+    pixels = canvas.reshape(-1, canvas.shape[-1])
+    blended = pixels[idx] * (1.0 - alpha) + np.asarray(color, float) * alpha
+    pixels[idx] = np.round(blended).astype(np.uint8)
+    return canvas
+
+
+def _sheet(
+    n_samples: int,
+    fs: float,
+    lead_names: Sequence[str],
+    layout: str,
+    px_per_mm: float,
+    speed_mm_s: float,
+    gain_mm_mv: float,
+    row_mm: Optional[float],
+    margin_mm: float,
+    labels: bool,
+) -> tuple[np.ndarray, dict]:
+    """Background (grid + labels) and per-lead geometry of a layout."""
+    if layout not in LAYOUTS:
+        raise ValueError(f"Layout '{layout}' inválido. Disponíveis: {list(LAYOUTS)}")
+    rows, cols = LAYOUTS[layout]
+    if len(lead_names) > rows * cols:
+        raise ValueError(
+            f"Layout {layout} comporta {rows * cols} derivações, recebidas {len(lead_names)}"
+        )
+    row_mm = row_mm or (30.0 if rows > 1 else 40.0)
+    col_s = n_samples / fs / cols
+    col_mm = col_s * speed_mm_s
+    width = int(np.ceil((2 * margin_mm + cols * col_mm) * px_per_mm)) + 1
+    height = int(np.ceil((2 * margin_mm + rows * row_mm) * px_per_mm)) + 1
+    origin = margin_mm * px_per_mm
+    canvas = paper_grid(height, width, px_per_mm, origin=(origin % (5 * px_per_mm),) * 2)
+    leads = {}
+    for k, name in enumerate(lead_names):
+        r, c = k % rows, k // rows
+        x0, y0 = origin + c * col_mm * px_per_mm, origin + r * row_mm * px_per_mm
+        leads[name] = {
+            "index": k, "row": r, "col": c, "t0_s": c * col_s, "t1_s": (c + 1) * col_s,
+            "bbox": (int(round(x0)), int(round(y0)), int(round(x0 + col_mm * px_per_mm)),
+                     int(round(y0 + row_mm * px_per_mm))),
+            "x0": x0, "baseline_y": y0 + row_mm * px_per_mm / 2.0,
+        }
+    if labels:
+        from PIL import Image, ImageDraw
+
+        img = Image.fromarray(canvas)
+        draw = ImageDraw.Draw(img)
+        for name, geo in leads.items():
+            anchor = (geo["bbox"][0] + px_per_mm, geo["bbox"][1] + px_per_mm)
+            draw.text(anchor, name, fill=TRACE_COLOR)
+        canvas = np.asarray(img).copy()
+    truth = {"layout": layout, "px_per_mm": float(px_per_mm), "speed_mm_s": float(speed_mm_s),
+             "gain_mm_mv": float(gain_mm_mv), "fs": float(fs), "size": (width, height),
+             "leads": leads}
+    return canvas, truth
+
+
+def _trace_lines(
+    signals: np.ndarray, fs: float, truth: dict,
+) -> list[tuple[np.ndarray, np.ndarray]]:
+    px_per_mm, n = truth["px_per_mm"], signals.shape[0]
+    x_per_sample = truth["speed_mm_s"] * px_per_mm / fs
+    y_per_mv = truth["gain_mm_mv"] * px_per_mm
+    lines = []
+    for geo in truth["leads"].values():
+        s0, s1 = int(round(geo["t0_s"] * fs)), min(int(round(geo["t1_s"] * fs)), n)
+        seg = np.nan_to_num(signals[s0:s1, geo["index"]].astype(float))
+        xs = geo["x0"] + np.arange(s1 - s0) * x_per_sample
+        lines.append((xs, geo["baseline_y"] - seg * y_per_mv))
+    return lines
+
+
+def _as_matrix(signals, lead_names) -> tuple[np.ndarray, list[str]]:
+    if isinstance(signals, dict):
+        names = list(lead_names or signals)
+        return np.stack([np.asarray(signals[n], float) for n in names], axis=-1), names
+    arr = np.asarray(signals, dtype=float)
+    arr = arr[:, None] if arr.ndim == 1 else arr
+    if lead_names is not None:
+        names = list(lead_names)
+    elif arr.shape[-1] <= 12:
+        names = LEAD_NAMES[:arr.shape[-1]]
+    else:
+        names = [str(i) for i in range(arr.shape[-1])]
+    return arr, names
+
+
+def render_leads(
+    signals,
+    fs: float,
+    lead_names: Optional[Sequence[str]] = None,
+    layout: str = "3x4",
+    px_per_mm: float = 5.0,
+    speed_mm_s: float = 25.0,
+    gain_mm_mv: float = 10.0,
+    row_mm: Optional[float] = None,
+    margin_mm: float = 5.0,
+    antialias: bool = True,
+    line_width: int = 1,
+    labels: bool = True,
+    return_truth: bool = False,
+):
+    """Render an ECG onto ECG paper as a ``uint8`` RGB array ``[H, W, 3]``.
+
+    Parameters
+    ----------
+    signals : array-like or dict
+        ``[samples, leads]`` (or 1-D for one lead) in mV, or ``{lead: samples}``.
+    fs : float
+        Sampling rate (Hz).
+    lead_names : sequence of str, optional
+        Names/order of the leads (default: standard 12-lead order).
+    layout : str
+        ``"3x4"``, ``"6x2"``, ``"12x1"`` or ``"1x1"`` (rows x columns). Leads fill
+        columns first and each column shows the next ``duration / columns`` seconds.
+    px_per_mm, speed_mm_s, gain_mm_mv : float
+        Resolution and paper calibration (25 mm/s, 10 mm/mV).
+    row_mm : float, optional
+        Height of each lead row (default 30 mm, 40 mm for a single row).
+    antialias : bool
+        Bilinear coverage instead of nearest-pixel lines.
+    return_truth : bool
+        Also return the calibration/geometry dict (``px_per_mm``, ``leads``
+        with ``bbox``, ``baseline_y``, ``x0``, ``t0_s``, ``t1_s``).
+    """
+    arr, names = _as_matrix(signals, lead_names)
+    canvas, truth = _sheet(arr.shape[0], fs, names, layout, px_per_mm, speed_mm_s, gain_mm_mv,
+                           row_mm, margin_mm, labels)
+    draw_polylines(canvas, _trace_lines(arr, fs, truth), antialias=antialias, width=line_width)
+    return (canvas, truth) if return_truth else canvas
+
+
+def render_batch(
+    signals: np.ndarray,
+    fs: float,
+    lead_names: Optional[Sequence[str]] = None,
+    layout: str = "3x4",
+    return_truth: bool = False,
+    **kwargs,
+):
+    """Render ``[records, samples, leads]`` into ``[records, H, W, 3]``.
+
+    The grid/labels background is built once and copied per record; keyword
+    arguments are those of :func:`render_leads`.
+    """
+    signals = np.asarray(signals)
+    antialias, line_width = kwargs.pop("antialias", True), kwargs.pop("line_width", 1)
+    opts = {"px_per_mm": 5.0, "speed_mm_s": 25.0, "gain_mm_mv": 10.0, "row_mm": None,
+            "margin_mm": 5.0, "labels": True, **kwargs}
+    names = list(lead_names) if lead_names is not None else LEAD_NAMES[:signals.shape[-1]]
+    background, truth = _sheet(signals.shape[1], fs, names, layout, **opts)
+    out = np.empty((len(signals),) + background.shape, dtype=np.uint8)
+    for i, record in enumerate(signals):
+        out[i] = background
+        draw_polylines(out[i], _trace_lines(record, fs, truth), antialias=antialias,
+                       width=line_width)
+    return (out, truth) if return_truth else out
@@ -0,0 +1,240 @@
+"""Consolidated memory-mapped signal store for PhysioNet datasets.
+
+``pack_dataset`` reads every WFDB record of a downloaded dataset once, in its
+native digital units, and writes a single contiguous int16 ``signals.npy`` of
+shape ``[total samples, leads]``. Next to it go ``index.npz`` (per-record
+offsets, lengths, ADC gains and baselines) and ``store.json`` (record names,
+ids, lead names, labels).
+
+``SignalStore`` memory-maps the result: ``raw()`` returns zero-copy int16 views
+and ``signal()`` scales to physical units only the leads/samples requested, so
+random access costs a page read instead of a header parse plus a format-16
+decode per record.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import pathlib
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+
+from .physionet import index_records
+
+STORE_VERSION = "signal-store-1"
+
+
+def _dataset_records(
+    base_dir: str | pathlib.Path,
+    dataset: str,
+    resolution: int,
+) -> tuple[list[str], list[int], list[pathlib.Path]]:
+    """(record names, ids, paths) of a downloaded dataset, in id/name order."""
+    if dataset == "ptb-xl":
+        from .ptbxl import build_record_index
+
+        by_id = build_record_index(str(base_dir))
+        ids = sorted(i for i, paths in by_id.items() if resolution in paths)
+        paths = [by_id[i][resolution] for i in ids]
+        return [p.name for p in paths], ids, paths
+    files = index_records(base_dir)
+    names = sorted(files)
+    # MIT-BIH style numeric record names double as ids; otherwise the position
+    stems = [n.rsplit("/", 1)[-1] for n in names]
+    ids = [int(s) for s in stems] if all(s.isdigit() for s in stems) else list(range(len(names)))
+    return names, ids, [files[n] for n in names]
+
+
+def _ptbxl_labels(base_dir: str | pathlib.Path, ids: Sequence[int]) -> Optional[list[list[str]]]:
+    from .ptbxl import get_metadata_index
+
+    try:
+        index = get_metadata_index(str(base_dir))
+    except FileNotFoundError:
+        return None
+    return [index.labels(i) for i in ids]
+
+
+def pack_dataset(
+    base_dir: str | pathlib.Path,
+    out_dir: str | pathlib.Path,
+    dataset: str = "ptb-xl",
+    resolution: int = 100,
+    on_record: Optional[Callable[[int, int], None]] = None,
+) -> dict:
+    """Pack the WFDB records under *base_dir* into a memory-mapped store.
+
+    Parameters
+    ----------
+    base_dir : str or Path
+        Root directory of the downloaded dataset.
+    out_dir : str or Path
+        Destination; receives ``signals.npy``, ``index.npz`` and ``store.json``.
+    dataset : str
+        ``"ptb-xl"`` (records selected by ``resolution``, SCP labels from the
+        metadata index) or any other key of :data:`datasets.physionet.DATASETS`
+        (every ``.hea`` record under *base_dir*).
+    resolution : int
+        PTB-XL sampling rate to pack (100 or 500 Hz).
+    on_record : callable, optional
+        Called with ``(done, total)`` after each record.
+
+    Returns
+    -------
+    dict
+        The manifest written to ``store.json``.
+
+    Raises
+    ------
+    FileNotFoundError
+        If no record is found.
+    ValueError
+        If records differ in lead count or sampling rate, or do not fit int16.
+    """
+    import wfdb
+
+    names, ids, paths = _dataset_records(base_dir, dataset, resolution)
+    if not paths:
+        raise FileNotFoundError(f"Nenhum registro WFDB encontrado em {base_dir}.")
+    headers = [wfdb.rdheader(str(p)) for p in paths]
+    n_leads = {h.n_sig for h in headers}
+    fs = {float(h.fs) for h in headers}
+    if len(n_leads) != 1 or len(fs) != 1:
+        raise ValueError(
+            f"Registros com número de derivações {sorted(n_leads)} "
+            f"ou frequências {sorted(fs)} distintos."
+        )
+    n_leads, fs = n_leads.pop(), fs.pop()
+    lengths = np.array([h.sig_len for h in headers], dtype=np.int64)
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1])).astype(np.int64)
+
+    out = pathlib.Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    tmp = out / "signals.npy.tmp"
+    signals = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.int16,
+                                        shape=(int(lengths.sum()), n_leads))
+    gains = np.empty((len(paths), n_leads), dtype=np.float64)
+    baselines = np.empty((len(paths), n_leads), dtype=np.int32)
+    lead_names, units = [], []
+    for k, path in enumerate(paths):
+        rec = wfdb.rdrecord(str(path), physical=False, return_res=16)
+        if rec.d_signal.dtype != np.int16:
+            raise ValueError(f"Registro {names[k]} não cabe em int16 ({rec.d_signal.dtype}).")
+        signals[offsets[k]:offsets[k] + lengths[k]] = rec.d_signal
+        gains[k], baselines[k] = rec.adc_gain, rec.baseline
+        lead_names.append(list(rec.sig_name))
+        units.append(list(rec.units))
+        if on_record:
+            on_record(k + 1, len(paths))
+    signals.flush()
+    del signals
+    os.replace(tmp, out / "signals.npy")
+    np.savez(out / "index.npz", offsets=offsets, lengths=lengths, gains=gains, baselines=baselines,
+             ids=np.asarray(ids, dtype=np.int64))
+
+    same_leads = all(n == lead_names[0] for n in lead_names)
+    manifest = {
+        "version": STORE_VERSION, "dataset": dataset, "fs": fs, "n_records": len(paths),
+        "n_leads": n_leads, "total_samples": int(lengths.sum()), "layout": "samples, leads",
+        "sig_name": lead_names[0] if same_leads else lead_names,
+        "units": units[0] if all(u == units[0] for u in units) else units,
+        "records": names,
+        "labels": _ptbxl_labels(base_dir, ids) if dataset == "ptb-xl" else None,
+    }
+    (out / "store.json").write_text(json.dumps(manifest, ensure_ascii=False), encoding="utf-8")
+    return manifest
+
+
+class SignalStore:
+    """Read-only view over a store written by :func:`pack_dataset`.
+
+    Records are addressed by row (``0 .. len-1``); :meth:`row` maps an
+    ``ecg_id``/record number to its row and :meth:`rows_with` returns the rows
+    holding an SCP code.
+    """
+
+    def __init__(self, path: str | pathlib.Path):
+        self.path = pathlib.Path(path)
+        self.manifest = json.loads((self.path / "store.json").read_text(encoding="utf-8"))
+        if self.manifest.get("version") != STORE_VERSION:
+            raise ValueError(f"Versão de store incompatível: {self.manifest.get('version')!r}")
+        self.signals = np.load(self.path / "signals.npy", mmap_mode="r")
+        with np.load(self.path / "index.npz") as index:
+            self.offsets, self.lengths = index["offsets"], index["lengths"]
+            self.gains, self.baselines, self.ids = index["gains"], index["baselines"], index["ids"]
+        self.fs = self.manifest["fs"]
+        self.names: list[str] = self.manifest["records"]
+        self._rows = {int(i): k for k, i in enumerate(self.ids)}
+        self._rows_by_code: Optional[dict[str, np.ndarray]] = None
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def row(self, record_id: int | str) -> int:
+        try:
+            return self._rows[int(record_id)]
+        except (KeyError, ValueError):
+            raise KeyError(f"Registro {record_id} não está no store.") from None
+
+    def lead_names(self, row: int) -> list[str]:
+        names = self.manifest["sig_name"]
+        return names[row] if names and isinstance(names[0], list) else names
+
+    def _lead_index(self, row: int, leads) -> slice | list[int]:
+        if leads is None:
+            return slice(None)
+        names = self.lead_names(row)
+        return [names.index(lead) if isinstance(lead, str) else int(lead)
+                for lead in np.atleast_1d(leads).tolist()]
+
+    def raw(self, row: int, leads=None) -> np.ndarray:
+        """Digital samples ``[samples, leads]`` as int16.
+
+        A zero-copy view of the memmap for all leads or a contiguous run of leads.
+        """
+        start = int(self.offsets[row])
+        block = self.signals[start:start + int(self.lengths[row])]
+        cols = self._lead_index(row, leads)
+        if isinstance(cols, list) and cols == list(range(cols[0], cols[-1] + 1)):
+            cols = slice(cols[0], cols[-1] + 1)
+        return block[:, cols]
+
+    def signal(
+        self,
+        row: int,
+        leads=None,
+        start: int = 0,
+        stop: Optional[int] = None,
+        dtype=np.float32,
+    ) -> np.ndarray:
+        """Physical units ``(raw - baseline) / gain`` of the requested leads/samples only."""
+        cols = self._lead_index(row, leads)
+        raw = self.raw(row)[start:stop]
+        scaled = (raw[:, cols] - self.baselines[row, cols]) / self.gains[row, cols]
+        return scaled.astype(dtype, copy=False)
+
+    def record(self, row: int) -> dict:
+        """Same shape as :func:`datasets.ptbxl.load_record` (float64 signal)."""
+        labels = self.manifest.get("labels")
+        units = self.manifest["units"]
+        return {
+            "signal": self.signal(row, dtype=np.float64),
+            "header": {
+                "record_name": self.names[row], "n_sig": self.manifest["n_leads"], "fs": self.fs,
+                "sig_len": int(self.lengths[row]), "sig_name": self.lead_names(row),
+                "units": units[row] if units and isinstance(units[0], list) else units,
+            },
+            "labels": list(labels[row]) if labels else [],
+        }
+
+    def rows_with(self, code: str) -> np.ndarray:
+        """Rows whose labels contain *code* (inverted index built on first use)."""
+        if self._rows_by_code is None:
+            by_code: dict[str, list[int]] = {}
+            for k, codes in enumerate(self.manifest.get("labels") or []):
+                for c in codes:
+                    by_code.setdefault(c, []).append(k)
+            self._rows_by_code = {c: np.array(r, dtype=np.int64) for c, r in by_code.items()}
+        return self._rows_by_code.get(code, np.empty(0, dtype=np.int64))
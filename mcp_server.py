@@ -359,47 +359,32 @@ async def ecg_image_process(data: ECGImageProcessInput) -> ECGImageProcessOutput
             report["measures"]["normalize_scale"] = scale
             report["measures"]["px_per_mm_estimated"] = pxmm
 
-        arr = np.asarray(img)
-        gray = np.asarray(img.convert("L"))
+        # Contexto único: grade, segmentação, traçados e R-peaks memoizados
+        from cv.context import ECGImageContext
+        ctx = ECGImageContext(img, layout="3x4", source=image_url)
 
         # Detecção de grade
         grid_info = None
         if "grid" in ops_lower or "segment" in ops_lower or "rpeaks" in ops_lower or "intervals" in ops_lower or "axis" in ops_lower:
-            from cv.grid_detect import estimate_grid_period_px
-            grid_info = estimate_grid_period_px(arr)
+            grid_info = ctx.grid
             report["capabilities"].append("grid")
             report["measures"]["grid"] = grid_info
 
         # Segmentação 12 derivações
         seg_leads = None
         if "segment" in ops_lower or "rpeaks" in ops_lower or "intervals" in ops_lower or "axis" in ops_lower:
-            from cv.segmentation import find_content_bbox
-            from cv.segmentation_ext import segment_layout
-            bbox = find_content_bbox(gray)
-            seg_leads = segment_layout(gray, layout="3x4", bbox=bbox)
+            seg_leads = ctx.leads("3x4")
             report["capabilities"].append("segment")
-            report["measures"]["content_bbox"] = bbox
+            report["measures"]["content_bbox"] = ctx.bbox
             report["measures"]["leads_count"] = len(seg_leads)
 
         # Detecção de R-peaks
         rpeaks_result = None
         pxsec = 250.0
         if ("rpeaks" in ops_lower or "intervals" in ops_lower or "axis" in ops_lower) and seg_leads:
-            from cv.rpeaks_from_image import extract_trace_centerline, smooth_signal, estimate_px_per_sec
-            from cv.rpeaks_robust import pan_tompkins_like
-            lab2box = {d["lead"]: d["bbox"] for d in seg_leads}
-            lead = "II" if "II" in lab2box else next(iter(lab2box.keys()))
-            pxmm = (grid_info.get("px_small_x") or grid_info.get("px_small_y") or 10.0) if grid_info else 10.0
-            pxsec = estimate_px_per_sec(pxmm, 25.0) or 250.0
-
-            def _lead_trace_and_peaks(lead_name: str):
-                lx0, ly0, lx1, ly1 = lab2box[lead_name]
-                lead_crop = gray[ly0:ly1, lx0:lx1]
-                lead_trace = smooth_signal(extract_trace_centerline(lead_crop), win=11)
-                lead_peaks = pan_tompkins_like(lead_trace, pxsec).get("peaks_idx", [])
-                return lead_trace, lead_peaks
-
-            trace, peaks = _lead_trace_and_peaks(lead)
+            lead = ctx.pick_lead("II")
+            pxsec = ctx.fs
+            peaks = ctx.rpeaks(lead).get("peaks_idx", [])
             rpeaks_result = {"peaks_idx": peaks, "method": "pan_tompkins_like"}
             report["capabilities"].append("rpeaks")
             report["measures"]["rpeaks_lead"] = lead
@@ -411,31 +396,24 @@ async def ecg_image_process(data: ECGImageProcessInput) -> ECGImageProcessOutput
         # Medição de intervalos (PR/QRS/QT/QTc)
         if "intervals" in ops_lower and rpeaks_result and seg_leads:
             from cv.intervals_refined import intervals_refined_from_trace
-            lab2box = {d["lead"]: d["bbox"] for d in seg_leads}
             lead = report["measures"].get("rpeaks_lead", "II")
-            x0, y0, x1, y1 = lab2box[lead]
-            crop = gray[y0:y1, x0:x1]
-            trace = smooth_signal(extract_trace_centerline(crop), win=11)
-            iv = intervals_refined_from_trace(trace, rpeaks_result["peaks_idx"], pxsec)
+            iv = intervals_refined_from_trace(ctx.trace(lead), rpeaks_result["peaks_idx"], pxsec)
             report["capabilities"].append("intervals")
             report["measures"]["intervals"] = iv.get("median", {})
 
         # Cálculo do eixo frontal (I/aVF)
         if "axis" in ops_lower and rpeaks_result and seg_leads:
             from cv.axis import frontal_axis_from_image
-            lab2box = {d["lead"]: d["bbox"] for d in seg_leads}
+            lab2box = ctx.lead_boxes("3x4")
             if "I" in lab2box and "aVF" in lab2box:
-                axis_rpeaks = {}
-                axis_fs = {}
-                for axis_lead in ("I", "aVF"):
-                    _, axis_peaks = _lead_trace_and_peaks(axis_lead)
-                    axis_rpeaks[axis_lead] = axis_peaks
-                    axis_fs[axis_lead] = pxsec
+                axis_rpeaks = {axis_lead: ctx.rpeaks(axis_lead).get("peaks_idx", []) for axis_lead in ("I", "aVF")}
+                axis_fs = {axis_lead: pxsec for axis_lead in ("I", "aVF")}
                 axis = frontal_axis_from_image(
-                    gray,
+                    ctx.gray,
                     {"I": lab2box["I"], "aVF": lab2box["aVF"]},
                     axis_rpeaks,
                     axis_fs,
+                    traces={axis_lead: ctx.trace(axis_lead, smooth=0) for axis_lead in ("I", "aVF")},
                 )
                 report["capabilities"].append("axis")
                 report["measures"]["axis"] = {
@@ -0,0 +1,194 @@
+"""
+Async facade over :class:`persistence.database.Database` for ``async def`` code.
+
+Reads run on a bounded pool of reader threads, each holding its own
+connection (WAL lets them proceed while a write is in flight). Writes go
+through a queue to a single writer thread and connection, so they never
+contend for the SQLite write lock among themselves. With ``coalesce_ms > 0``
+quiz results and study sessions arriving within that window are grouped into
+one ``executemany`` transaction (one fsync per burst instead of one per row).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+from .database import Database
+
+# Database methods that modify data (routed to the writer thread)
+_WRITE_METHODS = frozenset({
+    "init_schema", "create_user", "update_user", "delete_user",
+    "create_session", "delete_session", "cleanup_expired_sessions",
+    "save_quiz_result", "save_quiz_results", "save_report", "delete_report",
+    "save_study_session", "save_study_sessions",
+})
+# Single-row inserts that may be coalesced -> their batch method
+_COALESCED = {
+    "save_quiz_result": "save_quiz_results",
+    "save_study_session": "save_study_sessions",
+}
+_STOP = object()
+
+
+class AsyncDatabase:
+    """Connection-pooled async access to the SQLite persistence layer.
+
+    Every public :class:`Database` method is available as a coroutine with the
+    same signature (``await adb.get_quiz_history(user_id)``).
+
+    Parameters
+    ----------
+    db_path : str
+        SQLite file.
+    readers : int
+        Reader threads (= reader connections).
+    busy_timeout_ms : int
+        SQLite busy timeout.
+    coalesce_ms : float
+        Write-coalescing window for quiz results / study sessions (0 = off).
+    batch_max : int
+        Maximum rows per coalesced transaction.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "data/ecgiga.db",
+        readers: int = 4,
+        busy_timeout_ms: int = 5000,
+        coalesce_ms: float = 0.0,
+        batch_max: int = 256,
+    ) -> None:
+        self.db = Database(db_path, busy_timeout_ms=busy_timeout_ms)
+        self.coalesce_ms = coalesce_ms
+        self.batch_max = max(1, int(batch_max))
+        self._readers = ThreadPoolExecutor(
+            max_workers=max(1, int(readers)), thread_name_prefix="ecgiga-db-read"
+        )
+        self._writes: queue.Queue = queue.Queue()
+        self._closed = False
+        self.stats = {"writes": 0, "transactions": 0}
+        self._writer = threading.Thread(
+            target=self._write_loop, name="ecgiga-db-write", daemon=True
+        )
+        self._writer.start()
+
+    # ------------------------------------------------------------------
+    # Dispatch
+    # ------------------------------------------------------------------
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        method = getattr(Database, name, None)
+        if name.startswith("_") or not callable(method):
+            raise AttributeError(name)
+
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            if name in _WRITE_METHODS:
+                return await self.write(name, *args, **kwargs)
+            return await self.read(getattr(self.db, name), *args, **kwargs)
+
+        call.__name__ = name
+        call.__doc__ = method.__doc__
+        return call
+
+    async def read(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run ``fn(*args, **kwargs)`` on a reader thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._readers, lambda: fn(*args, **kwargs))
+
+    async def write(self, name: str, *args: Any, **kwargs: Any) -> Any:
+        """Queue ``Database.<name>(*args, **kwargs)`` for the writer thread."""
+        if self._closed:
+            raise RuntimeError("AsyncDatabase is closed")
+        fut: Future = Future()
+        self._writes.put((name, args, kwargs, fut))
+        return await asyncio.wrap_future(fut)
+
+    # ------------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------------
+
+    def _run(self, name: str, args: tuple, kwargs: dict, fut: Future) -> None:
+        # A caller cancelled while queued (timeout, disconnect): skip the write
+        if not fut.set_running_or_notify_cancel():
+            return
+        self._execute(name, args, kwargs, fut)
+
+    def _execute(self, name: str, args: tuple, kwargs: dict, fut: Future) -> None:
+        try:
+            result = getattr(self.db, name)(*args, **kwargs)
+        except BaseException as exc:  # delivered to the awaiting coroutine
+            fut.set_exception(exc)
+        else:
+            fut.set_result(result)
+        self.stats["writes"] += 1
+        self.stats["transactions"] += 1
+
+    def _flush(self, batch: list[tuple]) -> None:
+        """One transaction per batch method; on failure retry row by row."""
+        batch = [item for item in batch if item[3].set_running_or_notify_cancel()]
+        for single, many in _COALESCED.items():
+            group = [item for item in batch if item[0] == single]
+            if not group:
+                continue
+            try:
+                ids = getattr(self.db, many)([(args[0], args[1]) for _, args, _, _ in group])
+            except Exception:
+                for item in group:  # isolate the offending row(s)
+                    self._execute(*item)
+                continue
+            for (_, _, _, fut), row_id in zip(group, ids):
+                fut.set_result(row_id)
+            self.stats["writes"] += len(group)
+            self.stats["transactions"] += 1
+
+    def _write_loop(self) -> None:
+        pending = None
+        while True:
+            item = pending if pending is not None else self._writes.get()
+            pending = None
+            if item is _STOP:
+                break
+            name, args, kwargs = item[:3]
+            if not (self.coalesce_ms > 0 and name in _COALESCED and len(args) == 2 and not kwargs):
+                self._run(*item)
+                continue
+            batch = [item]
+            deadline = time.monotonic() + self.coalesce_ms / 1000.0
+            while len(batch) < self.batch_max:
+                try:
+                    nxt = self._writes.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if nxt is not _STOP and nxt[0] in _COALESCED and len(nxt[1]) == 2 and not nxt[2]:
+                    batch.append(nxt)
+                else:  # keep ordering: flush before any other write
+                    pending = nxt
+                    break
+            self._flush(batch)
+        self.db.close()
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def close(self) -> None:
+        """Drain queued writes, stop the threads and close all connections."""
+        if self._closed:
+            return
+        self._closed = True
+        self._writes.put(_STOP)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._writer.join)
+        self._readers.shutdown(wait=True)
+        self.db.close_all()
+
+    async def __aenter__(self) -> "AsyncDatabase":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.close()
@@ -81,24 +81,63 @@ _MIGRATIONS: dict[int, str] = {
 }
 
 
+_INSERT_QUIZ_SQL = (
+    "INSERT INTO quiz_results (id, user_id, quiz_type, score, total, details, created_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+_INSERT_STUDY_SQL = (
+    "INSERT INTO study_sessions (id, user_id, topic, duration_s, score, details, created_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def _quiz_row(user_id: str, result: dict, now: str) -> tuple:
+    return (
+        str(uuid.uuid4()),
+        user_id,
+        result.get("quiz_type", "general"),
+        result.get("score", 0),
+        result.get("total", 0),
+        json.dumps(result.get("details", {}), ensure_ascii=False),
+        now,
+    )
+
+
+def _study_row(user_id: str, session_data: dict, now: str) -> tuple:
+    return (
+        str(uuid.uuid4()),
+        user_id,
+        session_data.get("topic", "general"),
+        session_data.get("duration_s", 0),
+        session_data.get("score"),
+        json.dumps(session_data.get("details", {}), ensure_ascii=False),
+        now,
+    )
+
+
 class Database:
     """Thread-safe SQLite wrapper for ECGiga data persistence.
 
     Each thread gets its own connection via thread-local storage.
     WAL mode is enabled for concurrent read performance.
     Busy timeout prevents immediate failures under contention.
+    Each connection keeps a prepared-statement cache (``cached_statements``),
+    so the constant SQL strings below are compiled once per connection.
     """
 
     def __init__(
         self,
         db_path: str = "data/ecgiga.db",
         busy_timeout_ms: int = 5000,
+        cached_statements: int = 256,
     ) -> None:
         self.db_path = db_path
         self.busy_timeout_ms = busy_timeout_ms
+        self.cached_statements = cached_statements
         Path(db_path).parent.mkdir(parents=True, exist_ok=True)
         self._local = threading.local()
         self._lock = threading.Lock()
+        self._conns: list[sqlite3.Connection] = []
 
     # ------------------------------------------------------------------
     # Connection management (thread-safe)
@@ -108,12 +147,19 @@ class Database:
         """Return a per-thread connection, creating one if necessary."""
         conn = getattr(self._local, "conn", None)
         if conn is None:
-            conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout_ms / 1000)
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=self.busy_timeout_ms / 1000,
+                cached_statements=self.cached_statements,
+                check_same_thread=False,
+            )
             conn.row_factory = sqlite3.Row
             conn.execute(f"PRAGMA busy_timeout = {self.busy_timeout_ms}")
             conn.execute("PRAGMA journal_mode = WAL")
             conn.execute("PRAGMA foreign_keys = ON")
             self._local.conn = conn
+            with self._lock:
+                self._conns.append(conn)
         return conn
 
     def close(self) -> None:
@@ -122,6 +168,16 @@ class Database:
         if conn is not None:
             conn.close()
             self._local.conn = None
+            with self._lock:
+                self._conns = [c for c in self._conns if c is not conn]
+
+    def close_all(self) -> None:
+        """Close every connection opened by any thread (e.g. a worker pool)."""
+        with self._lock:
+            conns, self._conns = self._conns, []
+        for conn in conns:
+            conn.close()
+        self._local = threading.local()
 
     # ------------------------------------------------------------------
     # Schema versioning & migrations
@@ -308,28 +364,31 @@ class Database:
         str
             The generated result ID.
         """
-        conn = self._get_conn()
-        result_id = str(uuid.uuid4())
+        return self.save_quiz_results([(user_id, result)])[0]
+
+    def save_quiz_results(self, items: list[tuple[str, dict]]) -> list[str]:
+        """Persist many ``(user_id, result)`` quiz results in one transaction.
+
+        Uses ``executemany`` with a single commit; all rows are rolled back if
+        any of them fails.
+
+        Returns
+        -------
+        list[str]
+            The generated result IDs, in input order.
+        """
         now = datetime.now(timezone.utc).isoformat()
+        return self._insert_many(_INSERT_QUIZ_SQL, [_quiz_row(u, r, now) for u, r in items])
+
+    def _insert_many(self, sql: str, rows: list[tuple]) -> list[str]:
+        conn = self._get_conn()
         try:
-            conn.execute(
-                "INSERT INTO quiz_results (id, user_id, quiz_type, score, total, details, created_at) "
-                "VALUES (?, ?, ?, ?, ?, ?, ?)",
-                (
-                    result_id,
-                    user_id,
-                    result.get("quiz_type", "general"),
-                    result.get("score", 0),
-                    result.get("total", 0),
-                    json.dumps(result.get("details", {}), ensure_ascii=False),
-                    now,
-                ),
-            )
+            conn.executemany(sql, rows)
             conn.commit()
         except sqlite3.Error:
             conn.rollback()
             raise
-        return result_id
+        return [row[0] for row in rows]
 
     def get_quiz_history(self, user_id: str, limit: int = 50) -> list[dict]:
         """Return the most recent quiz results for a user."""
@@ -443,24 +502,12 @@ class Database:
 
     def save_study_session(self, user_id: str, session_data: dict) -> str:
         """Record a study session for progress tracking."""
-        conn = self._get_conn()
-        session_id = str(uuid.uuid4())
+        return self.save_study_sessions([(user_id, session_data)])[0]
+
+    def save_study_sessions(self, items: list[tuple[str, dict]]) -> list[str]:
+        """Record many ``(user_id, session_data)`` study sessions in one transaction."""
         now = datetime.now(timezone.utc).isoformat()
-        conn.execute(
-            "INSERT INTO study_sessions (id, user_id, topic, duration_s, score, details, created_at) "
-            "VALUES (?, ?, ?, ?, ?, ?, ?)",
-            (
-                session_id,
-                user_id,
-                session_data.get("topic", "general"),
-                session_data.get("duration_s", 0),
-                session_data.get("score"),
-                json.dumps(session_data.get("details", {}), ensure_ascii=False),
-                now,
-            ),
-        )
-        conn.commit()
-        return session_id
+        return self._insert_many(_INSERT_STUDY_SQL, [_study_row(u, d, now) for u, d in items])
 
     def get_study_sessions(self, user_id: str, limit: int = 100) -> list[dict]:
         """Return study sessions for a user, newest first."""
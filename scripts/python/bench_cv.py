@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Benchmarks do pipeline de CV e de sinal (dados sintéticos, sem dependência de assets).
+Uso:
+    python scripts/python/bench_cv.py            # todos
+    python scripts/python/bench_cv.py deskew     # apenas um
+Cada benchmark compara a implementação de referência com a otimizada e imprime
+tempo médio, speedup e a divergência entre as saídas.
+"""
+import sys, time, pathlib
+
+BASE = pathlib.Path(__file__).resolve().parents[2]
+if str(BASE) not in sys.path:
+    sys.path.insert(0, str(BASE))
+
+import numpy as np
+from PIL import Image
+
+
+def _timeit(fn, repeat=3):
+    best = None
+    out = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best, out
+
+
+def _synthetic_rgb(width=2400, height=1800, grid_px=20):
+    from conftest import _make_12lead_image
+    gray = _make_12lead_image(width, height, grid_px)
+    return Image.fromarray(np.stack([gray] * 3, axis=-1))
+
+
+def bench_deskew():
+    """Busca de ângulo: força bruta (25 rotações RGB) vs pirâmide grossa→fina."""
+    from cv.deskew import estimate_rotation_angle
+    base = _synthetic_rgb()
+    rows = []
+    for true_deg in (-4.2, -1.3, 0.0, 2.0, 5.5):
+        img = base.rotate(true_deg, resample=Image.BILINEAR, expand=True, fillcolor=(255, 255, 255))
+        t_ref, ref = _timeit(lambda: estimate_rotation_angle(img, method="brute"), repeat=1)
+        t_new, new = _timeit(lambda: estimate_rotation_angle(img, method="pyramid"), repeat=1)
+        rows.append((true_deg, ref["angle_deg"], new["angle_deg"], t_ref, t_new))
+    print(f"[deskew] imagem {base.size[0]}x{base.size[1]}")
+    for true_deg, a, b, t_ref, t_new in rows:
+        print(f"  alvo={-true_deg:+.2f}°  brute={a:+.2f}° ({t_ref*1000:.0f} ms)  "
+              f"pyramid={b:+.2f}° ({t_new*1000:.0f} ms)  Δ={abs(a-b):.2f}°  x{t_ref/max(t_new,1e-9):.1f}")
+
+
+def bench_grid():
+    """Calibração da grade: autocorrelação direta O(N²) vs FFT e tempo total em imagem grande."""
+    from cv.grid_detect import _autocorr_1d, estimate_grid_period_px
+    x = np.random.default_rng(0).normal(size=4700)
+
+    def direct():
+        z = (x - x.mean()) / (x.std() + 1e-6)
+        ac = np.correlate(z, z, mode="full")[len(z)-1:]
+        return ac / (ac[0] + 1e-6)
+
+    t_ref, ref = _timeit(direct)
+    t_new, new = _timeit(lambda: _autocorr_1d(x))
+    print(f"[grid] autocorr N={len(x)}: direta {t_ref*1000:.1f} ms | FFT {t_new*1000:.2f} ms "
+          f"x{t_ref/max(t_new,1e-9):.0f} | max|Δ|={np.max(np.abs(ref-new)):.1e}")
+    rgb = np.asarray(_synthetic_rgb(4800, 3600, 20))
+    t_img, info = _timeit(lambda: estimate_grid_period_px(rgb))
+    print(f"[grid] 4800x3600 RGB: {t_img*1000:.0f} ms | small={info['px_small_x']:.3f}px "
+          f"big={info['px_big_x']:.3f}px (razão {info['big_ratio_x']})")
+
+
+def bench_intervals():
+    """intervals_refined: laço original (features por batimento) vs features por traçado + lookups."""
+    from cv.intervals_refined import intervals_refined_from_trace
+    from tests.test_intervals import _make_trace_with_peaks, _reference_intervals_refined
+    for secs, fs in ((10, 250.0), (10, 500.0), (60, 500.0)):
+        trace, peaks = _make_trace_with_peaks(n=int(secs*fs), fs=fs)
+        trace = trace + np.random.default_rng(0).normal(0, 1.5, trace.size)
+        t_ref, ref = _timeit(lambda: _reference_intervals_refined(trace, peaks, fs), repeat=1)
+        t_new, new = _timeit(lambda: intervals_refined_from_trace(trace, peaks, fs))
+        same = all(new["per_beat"][k] == ref[k] for k in ref)
+        print(f"[intervals] {secs}s @ {fs:.0f} Hz, {len(peaks)} batimentos: laço {t_ref*1000:.1f} ms | "
+              f"novo {t_new*1000:.2f} ms x{t_ref/max(t_new,1e-9):.0f} | idêntico={same}")
+
+
+def bench_rpeaks():
+    """Pan‑Tompkins-like: limiar por amostra (laço Python) vs por eventos; streaming em blocos de 1 s."""
+    from cv.rpeaks_robust import pan_tompkins_like, iter_rpeaks_stream
+    from tests.test_rpeaks import _ecg_like, _reference_pan_tompkins_peaks
+    pan_tompkins_like(_ecg_like(5, 250.0, 72, 1.0), 250.0)  # aquece imports do scipy
+    for secs, fs in ((10, 250.0), (600, 500.0)):
+        y = _ecg_like(secs, fs, 72, 2.0)
+        t_ref, ref = _timeit(lambda: _reference_pan_tompkins_peaks(y, fs), repeat=1)
+        t_new, new = _timeit(lambda: pan_tompkins_like(y, fs)["peaks_idx"])
+        chunks = lambda: (y[i:i+int(fs)] for i in range(0, len(y), int(fs)))
+        t_st, st = _timeit(lambda: list(iter_rpeaks_stream(chunks(), fs)), repeat=1)
+        print(f"[rpeaks] {secs}s @ {fs:.0f} Hz: laço {t_ref*1000:.0f} ms | eventos {t_new*1000:.0f} ms "
+              f"x{t_ref/max(t_new,1e-9):.1f} | stream {t_st*1000:.0f} ms | idêntico={ref == new == st} ({len(new)} R)")
+
+
+def bench_filters():
+    """Cadeia de filtros de preprocess_ecg em 12 derivações × 10 s @ 500 Hz: laço por derivação vs matriz."""
+    from scipy.signal import butter, filtfilt, iirnotch, sosfiltfilt
+    from signal_processing.preprocessing import preprocess_ecg
+    fs = 500.0
+    rng = np.random.default_rng(0)
+    t = np.arange(0, 10.0, 1.0 / fs)[:, None]
+    x = np.sin(2*np.pi*1.2*t) + 0.2*np.sin(2*np.pi*60*t) + 0.05*rng.normal(size=(t.size, 12))
+
+    def loop():
+        out = x.copy()
+        hp = butter(2, 0.5/(fs/2), btype="high", output="sos")
+        bp = butter(4, [0.05/(fs/2), 150.0/(fs/2)], btype="band", output="sos")
+        for i in range(12):
+            out[:, i] = sosfiltfilt(hp, out[:, i], padlen=15)
+        for h in (1, 2, 3):  # três passagens filtfilt por derivação (notch original)
+            b, a = iirnotch(60.0*h, 30.0, fs)
+            for i in range(12):
+                out[:, i] = filtfilt(b, a, out[:, i])
+        for i in range(12):
+            out[:, i] = sosfiltfilt(bp, out[:, i], padlen=27)
+        return out
+
+    preprocess_ecg(x, fs, compute_quality=False)  # aquece o cache de SOS
+    t_ref, ref = _timeit(loop, repeat=5)
+    for dtype in (np.float64, np.float32):
+        xx = x.astype(dtype)
+        t_new, new = _timeit(lambda: preprocess_ecg(xx, fs, compute_quality=False)["signal"], repeat=5)
+        err = np.max(np.abs(new - ref)) / np.max(np.abs(ref))
+        print(f"[filters] 12×10 s @ 500 Hz ({np.dtype(dtype).name}): laço {t_ref*1000:.1f} ms | matriz "
+              f"{t_new*1000:.1f} ms x{t_ref/max(t_new,1e-9):.1f} | max|Δ|/max={err:.1e} "
+              f"(transiente de borda do notch em cascata)")
+
+
+def bench_quality():
+    """SQI multiderivação (12 × 10 s @ 500 Hz): signal_quality_index por coluna vs matriz inteira."""
+    from signal_processing.noise import signal_quality_index
+    fs = 500.0
+    rng = np.random.default_rng(0)
+    t = np.arange(0, 10.0, 1.0 / fs)[:, None]
+    x = np.sin(2*np.pi*1.2*t) ** 15 + 0.05 * rng.normal(size=(t.size, 12))
+    x[2000:2500, 3] += rng.normal(0, 2.0, 500)
+    t_ref, ref = _timeit(lambda: [signal_quality_index(x[:, i].copy(), fs) for i in range(12)], repeat=5)
+    t_new, new = _timeit(lambda: signal_quality_index(x, fs), repeat=5)
+    print(f"[quality] 12×10 s @ 500 Hz: por derivação {t_ref*1000:.1f} ms | matriz {t_new*1000:.1f} ms "
+          f"x{t_ref/max(t_new,1e-9):.1f} | idêntico={ref == new}")
+
+
+def bench_generator():
+    """generate_ecg: trem de batimentos por _single_beat (laço) vs passagem única; ECG de 60 s × 12 @ 500 Hz."""
+    from simulation.ecg_generator import _beat_train, generate_ecg
+    from tests.test_simulation import _reference_beat_train
+    fs, n = 500, 60 * 500
+    rng = np.random.default_rng(0)
+    rr = 0.83 + rng.normal(0, 0.02, 80)
+    gains = 1.0 + rng.uniform(-0.1, 0.1, (80, 3))
+    t_ref, ref = _timeit(lambda: _reference_beat_train(rr, n, fs, 160, 90, 380, gains)[0])
+    t_new, new = _timeit(lambda: _beat_train(rr, n, fs, 160, 90, 380, gains)[0])
+    t_ecg, _ = _timeit(lambda: generate_ecg(duration_s=60, fs=fs, rng=0), repeat=5)
+    print(f"[generator] trem de batimentos 60 s: laço {t_ref*1000:.1f} ms | vetorizado {t_new*1000:.1f} ms "
+          f"x{t_ref/max(t_new,1e-9):.1f} | max|Δ|={np.max(np.abs(ref-new)):.1e} | generate_ecg 12×60 s {t_ecg*1000:.1f} ms")
+
+
+def bench_action_potential():
+    """Varredura de K⁺ (2–8 mmol/L, 25 condições × 1000 amostras): laço por amostra vs máscaras em lote."""
+    from simulation.ion_channels import ActionPotentialModel
+    from tests.test_simulation import _reference_waveform
+    k = np.linspace(2.0, 8.0, 25)
+    t_ref, ref = _timeit(lambda: np.stack([_reference_waveform(ActionPotentialModel(ki)) for ki in k]))
+    t_new, new = _timeit(lambda: ActionPotentialModel.compute_waveform_batch(k), repeat=5)
+    print(f"[action_potential] 25×1000: laço {t_ref*1000:.1f} ms | lote {t_new*1000:.2f} ms "
+          f"x{t_ref/max(t_new,1e-9):.0f} | max|Δ|={np.max(np.abs(ref-new)):.1e}")
+
+
+def bench_drugs():
+    """Dose–resposta (30 concentrações × 12 derivações × 10 s): uma chamada por dose vs lote."""
+    from simulation.drug_effects import simulate_drug_ecg
+    from simulation.ecg_generator import generate_ecg
+    ecg = generate_ecg(duration_s=10, fs=500, rng=0)
+    conc = np.linspace(0.0, 2.0, 30)
+    t_ref, ref = _timeit(lambda: np.concatenate([simulate_drug_ecg(ecg, "amiodarona", [c]) for c in conc]))
+    t_new, new = _timeit(lambda: simulate_drug_ecg(ecg, "amiodarona", conc))
+    print(f"[drugs] 30×12×5000: por dose {t_ref*1000:.1f} ms | lote {t_new*1000:.1f} ms "
+          f"x{t_ref/max(t_new,1e-9):.1f} | max|Δ|={np.max(np.abs(ref-new)):.1e}")
+
+
+def bench_render():
+    """Derivação II de 12 registros de 10 s: matplotlib (figura + PNG + PIL) vs rasterizador NumPy em lote."""
+    from datasets.ptbxl import record_to_image
+    from datasets.raster import render_batch
+    from simulation.ecg_generator import LEAD_NAMES, generate_ecg
+    ecg = generate_ecg(duration_s=10, fs=500, rng=0)
+    signal = np.stack([ecg["leads"][l] for l in LEAD_NAMES], axis=1)
+    record = {"signal": signal, "header": {"sig_name": LEAD_NAMES, "fs": 500}}
+    t_ref, _ = _timeit(lambda: [record_to_image(record, "II", backend="matplotlib") for _ in range(12)], repeat=1)
+    t_new, out = _timeit(lambda: render_batch(np.repeat(signal[None, :, 1:2], 12, axis=0), 500,
+                                              lead_names=["II"], layout="1x1"))
+    print(f"[render] 12 tiras: matplotlib {t_ref*1000:.1f} ms | raster lote {t_new*1000:.1f} ms "
+          f"x{t_ref/max(t_new,1e-9):.1f} | imagem {out.shape[2]}x{out.shape[1]}")
+
+
+BENCHES = {
+    "deskew": bench_deskew,
+    "grid": bench_grid,
+    "intervals": bench_intervals,
+    "rpeaks": bench_rpeaks,
+    "filters": bench_filters,
+    "quality": bench_quality,
+    "generator": bench_generator,
+    "action_potential": bench_action_potential,
+    "drugs": bench_drugs,
+    "render": bench_render,
+}
+
+
+def main(argv=None):
+    names = (argv if argv is not None else sys.argv[1:]) or list(BENCHES)
+    for name in names:
+        if name not in BENCHES:
+            raise SystemExit(f"Benchmark desconhecido: {name} (disponíveis: {', '.join(BENCHES)})")
+        BENCHES[name]()
+
+
+if __name__ == "__main__":
+    main()
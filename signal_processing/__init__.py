@@ -2,9 +2,10 @@
 
 Fornece correção de oscilação de linha de base, filtragem passa-banda,
 detecção de ruído, remoção de interferência da rede elétrica e
-avaliação da qualidade do sinal.
+avaliação da qualidade do sinal e matriz de batimentos alinhados.
 """
 
+from signal_processing.beats import BeatMatrix, extract_beats
 from signal_processing.filters import (
     bandpass_filter,
     highpass_filter,
@@ -17,9 +18,11 @@ from signal_processing.noise import (
     estimate_snr,
     signal_quality_index,
 )
-from signal_processing.preprocessing import preprocess_ecg
+from signal_processing.preprocessing import preprocess_ecg, preprocess_ecg_stream
 
 __all__ = [
+    "BeatMatrix",
+    "extract_beats",
     "bandpass_filter",
     "highpass_filter",
     "lowpass_filter",
@@ -29,4 +32,5 @@ __all__ = [
     "estimate_snr",
     "signal_quality_index",
     "preprocess_ecg",
+    "preprocess_ecg_stream",
 ]
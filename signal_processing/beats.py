@@ -0,0 +1,117 @@
+"""Matriz de batimentos alinhados ao pico R.
+
+Extrai, com um único indexador avançado, uma janela fixa em torno de cada pico R
+já conhecido (da CV, do PTB-XL ou de um detector) e expõe as medidas que dependem
+de batimentos alinhados: template médio, batimento mediano, correlação de cada
+batimento com o template e SNR por template. Quem já tem os picos não precisa
+de uma nova passagem de detecção.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Sequence
+
+import numpy as np
+from numpy.typing import NDArray
+
+
+class BeatMatrix:
+    """Batimentos alinhados: ``beats`` tem forma [batimentos, amostras] (sinal 1D)
+    ou [batimentos, amostras, derivações] (sinal 2D); o pico R fica na coluna ``offset``.
+
+    ``peaks`` guarda os picos efetivamente extraídos e ``index`` a posição de cada um
+    na lista original (batimentos cuja janela sai do sinal são descartados).
+    """
+
+    def __init__(
+        self,
+        beats: NDArray[np.floating[Any]],
+        peaks: NDArray[np.intp],
+        index: NDArray[np.intp],
+        offset: int,
+        fs: float,
+    ):
+        self.beats = beats
+        self.peaks = peaks
+        self.index = index
+        self.offset = int(offset)
+        self.fs = float(fs)
+
+    def __len__(self) -> int:
+        return int(self.beats.shape[0])
+
+    @property
+    def width(self) -> int:
+        return int(self.beats.shape[1])
+
+    def column(self, t_s: float) -> int:
+        """Coluna correspondente a ``t_s`` segundos em relação ao pico R."""
+        return self.offset + int(round(t_s * self.fs))
+
+    def template(self) -> NDArray[np.floating[Any]]:
+        """Batimento médio (template)."""
+        return self.beats.mean(axis=0)
+
+    def median_beat(self) -> NDArray[np.floating[Any]]:
+        """Batimento mediano (morfologia representativa, robusta a batimentos ectópicos)."""
+        return np.median(self.beats, axis=0)
+
+    def correlation(
+        self, template: NDArray[np.floating[Any]] | None = None
+    ) -> NDArray[np.float64]:
+        """Correlação de Pearson de cada batimento com o template.
+
+        Retorna [batimentos] (uma derivação) ou [batimentos, derivações].
+        """
+        ref = self.template() if template is None else np.asarray(template, dtype=float)
+        b = self.beats - self.beats.mean(axis=1, keepdims=True)
+        r = ref - ref.mean(axis=0, keepdims=True)
+        num = np.einsum("nw...,w...->n...", b, r)
+        den = np.sqrt((b ** 2).sum(axis=1) * (r ** 2).sum(axis=0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(den > 0, num / den, 0.0)
+
+    def snr_db(self) -> NDArray[np.float64] | float:
+        """SNR (dB): potência do template sobre a potência residual dos batimentos."""
+        template = self.template()
+        signal_power = np.mean(template ** 2, axis=0)
+        noise_power = np.mean((self.beats - template) ** 2, axis=(0, 1))
+        noise_power = np.where(noise_power <= 0, 1e-10, noise_power)
+        snr = 10 * np.log10(signal_power / noise_power)
+        return float(snr) if np.ndim(snr) == 0 else snr
+
+
+def extract_beats(
+    signal: NDArray[np.floating[Any]],
+    peaks: Sequence[int] | NDArray[np.integer[Any]],
+    fs: float,
+    pre_s: float = 0.15,
+    post_s: float = 0.25,
+) -> BeatMatrix:
+    """Monta a matriz de batimentos [pico - pre_s, pico + post_s) por indexação avançada.
+
+    Parâmetros
+    ----------
+    signal : ndarray
+        Sinal de ECG 1D ou 2D [amostras, derivações].
+    peaks : sequência de int
+        Índices dos picos R (amostras).
+    fs : float
+        Frequência de amostragem em Hz.
+    pre_s, post_s : float
+        Segundos antes e depois do pico R (padrão 150 ms / 250 ms).
+
+    Retorna
+    -------
+    BeatMatrix
+        Apenas batimentos com janela inteira dentro do sinal.
+    """
+    signal = np.asarray(signal)
+    if signal.ndim not in (1, 2):
+        raise ValueError(f"signal must be 1D or 2D, got {signal.ndim}D")
+    pre, post = int(pre_s * fs), int(post_s * fs)
+    pk = np.asarray(peaks, dtype=np.intp).reshape(-1)
+    keep = np.flatnonzero((pk - pre >= 0) & (pk + post < signal.shape[0]))
+    pk = pk[keep]
+    idx = pk[:, np.newaxis] + np.arange(-pre, post)[np.newaxis, :]
+    return BeatMatrix(signal[idx], pk, keep, pre, fs)
@@ -4,6 +4,9 @@ Implementa filtros Butterworth passa-banda, passa-alta, passa-baixa e notch
 com filtragem de fase zero (filtfilt) para processamento de ECG sem distorção.
 
 Todos os filtros utilizam seções de segunda ordem (SOS) para estabilidade numérica.
+Sinais multiderivação [amostras, derivações] são filtrados numa única chamada
+(axis=0), devolvendo float32 quando a entrada é float32; os coeficientes projetados
+ficam em cache por (tipo, fs, cortes, ordem).
 
 Referências:
 - Recomendações AHA/ACC para filtragem de ECG: 0,05-150 Hz para qualidade diagnóstica
@@ -13,6 +16,7 @@ Referências:
 from __future__ import annotations
 
 import math
+from functools import lru_cache
 from typing import Any
 
 import numpy as np
@@ -40,6 +44,46 @@ def _pad_length(signal_length: int, order: int) -> int:
     return min(pad, signal_length - 1)
 
 
+@lru_cache(maxsize=64)
+def _butter_sos(btype: str, fs: float, cutoffs: tuple[float, ...], order: int) -> NDArray[np.float64]:
+    """Coeficientes SOS Butterworth (cortes em Hz), em cache por (tipo, fs, cortes, ordem)."""
+    from scipy.signal import butter
+
+    nyq = fs / 2.0
+    wn = [c / nyq for c in cutoffs]
+    return butter(order, wn if len(wn) > 1 else wn[0], btype=btype, output="sos")
+
+
+@lru_cache(maxsize=32)
+def _notch_sos(fs: float, freq: float, quality: float, harmonics: int) -> NDArray[np.float64] | None:
+    """Notch da fundamental e harmônicas abaixo de Nyquist em um único SOS em cascata (uma seção cada)."""
+    from scipy.signal import iirnotch, tf2sos
+
+    nyq = fs / 2.0
+    sections = []
+    for h in range(1, harmonics + 1):
+        notch_freq = freq * h
+        if notch_freq >= nyq:
+            break
+        b, a = iirnotch(notch_freq, quality, fs)
+        sections.append(tf2sos(b, a))
+    if not sections:
+        return None
+    return np.vstack(sections)
+
+
+def _sosfiltfilt(sos: NDArray[np.float64], signal: NDArray[np.floating[Any]], padlen: int) -> NDArray[np.floating[Any]]:
+    """Filtragem de fase zero ao longo das amostras (axis=0) para 1D ou [amostras, derivações].
+
+    Entrada float32 devolve float32. Coeficientes e estado ficam em float64: arredondar o SOS
+    para float32 desloca os polos de cortes muito baixos (0,05 Hz) e distorce a linha de base.
+    """
+    from scipy.signal import sosfiltfilt
+
+    out = sosfiltfilt(sos, signal, axis=0, padlen=padlen)
+    return out.astype(np.float32) if signal.dtype == np.float32 else out
+
+
 def bandpass_filter(
     signal: NDArray[np.floating[Any]],
     fs: float,
@@ -67,8 +111,6 @@ def bandpass_filter(
     ndarray
         Sinal filtrado com a mesma forma da entrada.
     """
-    from scipy.signal import butter, sosfiltfilt
-
     _validate_signal(signal, fs)
     nyq = fs / 2.0
 
@@ -79,21 +121,9 @@ def bandpass_filter(
     if highcut >= nyq:
         highcut = nyq * 0.99  # Limita logo abaixo de Nyquist
 
-    low = lowcut / nyq
-    high = highcut / nyq
-
-    sos = butter(order, [low, high], btype="band", output="sos")
-
-    if signal.ndim == 1:
-        padlen = _pad_length(len(signal), order)
-        return sosfiltfilt(sos, signal, padlen=padlen)
-    else:
-        # Multiderivação: filtra cada derivação independentemente
-        result = np.empty_like(signal)
-        padlen = _pad_length(signal.shape[0], order)
-        for i in range(signal.shape[1]):
-            result[:, i] = sosfiltfilt(sos, signal[:, i], padlen=padlen)
-        return result
+    sos = _butter_sos("band", float(fs), (float(lowcut), float(highcut)), order)
+    # Multiderivação: todas as derivações numa única chamada (axis=0)
+    return _sosfiltfilt(sos, signal, _pad_length(signal.shape[0], order))
 
 
 def highpass_filter(
@@ -123,8 +153,6 @@ def highpass_filter(
     ndarray
         Sinal filtrado em passa-alta.
     """
-    from scipy.signal import butter, sosfiltfilt
-
     _validate_signal(signal, fs)
     nyq = fs / 2.0
 
@@ -133,17 +161,8 @@ def highpass_filter(
     if cutoff >= nyq:
         raise ValueError(f"Cutoff ({cutoff}) must be below Nyquist ({nyq})")
 
-    sos = butter(order, cutoff / nyq, btype="high", output="sos")
-
-    if signal.ndim == 1:
-        padlen = _pad_length(len(signal), order)
-        return sosfiltfilt(sos, signal, padlen=padlen)
-    else:
-        result = np.empty_like(signal)
-        padlen = _pad_length(signal.shape[0], order)
-        for i in range(signal.shape[1]):
-            result[:, i] = sosfiltfilt(sos, signal[:, i], padlen=padlen)
-        return result
+    sos = _butter_sos("high", float(fs), (float(cutoff),), order)
+    return _sosfiltfilt(sos, signal, _pad_length(signal.shape[0], order))
 
 
 def lowpass_filter(
@@ -173,8 +192,6 @@ def lowpass_filter(
     ndarray
         Sinal filtrado em passa-baixa.
     """
-    from scipy.signal import butter, sosfiltfilt
-
     _validate_signal(signal, fs)
     nyq = fs / 2.0
 
@@ -183,17 +200,8 @@ def lowpass_filter(
     if cutoff >= nyq:
         cutoff = nyq * 0.99
 
-    sos = butter(order, cutoff / nyq, btype="low", output="sos")
-
-    if signal.ndim == 1:
-        padlen = _pad_length(len(signal), order)
-        return sosfiltfilt(sos, signal, padlen=padlen)
-    else:
-        result = np.empty_like(signal)
-        padlen = _pad_length(signal.shape[0], order)
-        for i in range(signal.shape[1]):
-            result[:, i] = sosfiltfilt(sos, signal[:, i], padlen=padlen)
-        return result
+    sos = _butter_sos("low", float(fs), (float(cutoff),), order)
+    return _sosfiltfilt(sos, signal, _pad_length(signal.shape[0], order))
 
 
 def notch_filter(
@@ -205,7 +213,8 @@ def notch_filter(
 ) -> NDArray[np.floating[Any]]:
     """Aplica filtro notch para remoção de interferência da rede elétrica.
 
-    Remove a frequência fundamental e suas harmônicas.
+    Remove a frequência fundamental e suas harmônicas, cascateadas em um único
+    filtro SOS (uma passagem de fase zero em vez de uma por harmônica).
 
     Parâmetros
     ----------
@@ -225,28 +234,11 @@ def notch_filter(
     ndarray
         Sinal filtrado com interferência da rede elétrica removida.
     """
-    from scipy.signal import iirnotch, sosfiltfilt
-
     _validate_signal(signal, fs)
-    nyq = fs / 2.0
-    result = signal.copy()
-
-    for h in range(1, harmonics + 1):
-        notch_freq = freq * h
-        if notch_freq >= nyq:
-            break
-
-        b, a = iirnotch(notch_freq, quality, fs)
-        # Converte para SOS para estabilidade
-        # iirnotch retorna b,a então usamos filtfilt diretamente
-        from scipy.signal import filtfilt
-        if result.ndim == 1:
-            result = filtfilt(b, a, result)
-        else:
-            for i in range(result.shape[1]):
-                result[:, i] = filtfilt(b, a, result[:, i])
-
-    return result
+    sos = _notch_sos(float(fs), float(freq), float(quality), int(harmonics))
+    if sos is None:
+        return signal.copy()
+    return _sosfiltfilt(sos, signal, _pad_length(signal.shape[0], len(sos)))
 
 
 def remove_baseline_wander(
@@ -307,25 +299,20 @@ def _median_baseline_removal(
     """
     from scipy.ndimage import median_filter
 
-    def _apply_1d(sig: NDArray) -> NDArray:
-        # Primeira passagem: janela curta para remover QRS
-        win1 = max(int(0.2 * fs), 3)
-        if win1 % 2 == 0:
-            win1 += 1
-        baseline1 = median_filter(sig, size=win1)
+    # Janelas só ao longo das amostras: (win, 1) em 2D filtra cada derivação numa única chamada
+    def _size(win: int) -> int | tuple[int, int]:
+        return win if signal.ndim == 1 else (win, 1)
 
-        # Segunda passagem: janela mais longa sobre resultado da primeira passagem
-        win2 = max(int(window_s * fs), 3)
-        if win2 % 2 == 0:
-            win2 += 1
-        baseline2 = median_filter(baseline1, size=win2)
+    # Primeira passagem: janela curta para remover QRS
+    win1 = max(int(0.2 * fs), 3)
+    if win1 % 2 == 0:
+        win1 += 1
+    baseline1 = median_filter(signal, size=_size(win1))
 
-        return sig - baseline2
+    # Segunda passagem: janela mais longa sobre resultado da primeira passagem
+    win2 = max(int(window_s * fs), 3)
+    if win2 % 2 == 0:
+        win2 += 1
+    baseline2 = median_filter(baseline1, size=_size(win2))
 
-    if signal.ndim == 1:
-        return _apply_1d(signal)
-    else:
-        result = np.empty_like(signal)
-        for i in range(signal.shape[1]):
-            result[:, i] = _apply_1d(signal[:, i])
-        return result
+    return signal - baseline2
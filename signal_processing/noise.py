@@ -12,7 +12,7 @@ Referências:
 
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, Sequence
 
 import numpy as np
 from numpy.typing import NDArray
@@ -22,6 +22,7 @@ def estimate_snr(
     signal: NDArray[np.floating[Any]],
     fs: float,
     method: str = "power_ratio",
+    peaks: Sequence[int] | NDArray[np.integer[Any]] | None = None,
 ) -> float:
     """Estima a relação sinal-ruído de um sinal de ECG.
 
@@ -35,6 +36,8 @@ def estimate_snr(
         Método de estimativa:
         - 'power_ratio': Razão entre potência na banda QRS e potência de ruído de alta frequência
         - 'template': SNR baseado em template usando batimento médio
+    peaks : sequência de int, opcional
+        Picos R já conhecidos (método 'template'); sem eles os picos são detectados.
 
     Retorna
     -------
@@ -49,7 +52,7 @@ def estimate_snr(
     if method == "power_ratio":
         return _snr_power_ratio(signal, fs)
     elif method == "template":
-        return _snr_template(signal, fs)
+        return _snr_template(signal, fs, peaks)
     else:
         raise ValueError(f"Unknown method: {method}")
 
@@ -63,30 +66,49 @@ def _snr_power_ratio(signal: NDArray, fs: float) -> float:
     from scipy.signal import welch
 
     freqs, psd = welch(signal, fs=fs, nperseg=min(len(signal), int(fs * 4)))
+    return float(_snr_from_psd(freqs, psd))
 
+
+def _snr_from_psd(freqs: NDArray, psd: NDArray) -> NDArray:
+    """SNR (dB) a partir do PSD de Welch (ao longo do eixo 0; 2D dá uma SNR por derivação)."""
     # Banda de sinal: 5-40 Hz
     signal_mask = (freqs >= 5) & (freqs <= 40)
     _trapz = getattr(np, "trapezoid", getattr(np, "trapz", None))
-    signal_power = _trapz(psd[signal_mask], freqs[signal_mask])
+    signal_power = _trapz(psd[signal_mask], freqs[signal_mask], axis=0)
 
     # Banda de ruído: 60 Hz até Nyquist (ou 50-Nyquist dependendo da rede elétrica)
     noise_mask = freqs >= 60
-    noise_power = _trapz(psd[noise_mask], freqs[noise_mask]) if noise_mask.any() else 1e-10
+    noise_power = _trapz(psd[noise_mask], freqs[noise_mask], axis=0) if noise_mask.any() else 1e-10
 
-    if noise_power <= 0:
-        noise_power = 1e-10
+    noise_power = np.where(noise_power <= 0, 1e-10, noise_power)
 
-    snr_db = 10 * np.log10(signal_power / noise_power)
-    return float(snr_db)
+    with np.errstate(divide="ignore"):
+        return 10 * np.log10(signal_power / noise_power)
 
 
-def _snr_template(signal: NDArray, fs: float) -> float:
+def _snr_template(signal: NDArray, fs: float, peaks: NDArray | None = None) -> float:
     """Estimativa de SNR baseada em template.
 
-    Cria template de batimento médio a partir de picos R detectados, depois calcula
-    SNR como razão entre potência do template e potência residual.
+    Cria template de batimento médio a partir dos picos R (fornecidos ou detectados),
+    depois calcula SNR como razão entre potência do template e potência residual.
     """
-    # Detecção simples de picos R para extração de template
+    from signal_processing.beats import extract_beats
+
+    if peaks is None:
+        peaks = _detect_rpeaks_simple(signal, fs)
+        if len(peaks) < 5:
+            # Batimentos insuficientes para template, recorre à razão de potência
+            return _snr_power_ratio(signal, fs)
+
+    # Extrai batimentos (150ms antes, 250ms após pico R)
+    beats = extract_beats(signal, peaks, fs, pre_s=0.15, post_s=0.25)
+    if len(beats) < 3:
+        return _snr_power_ratio(signal, fs)
+    return beats.snr_db()
+
+
+def _detect_rpeaks_simple(signal: NDArray, fs: float) -> NDArray:
+    """Detecção simples de picos R (passa-banda 5-30 Hz + find_peaks), para quem não tem picos."""
     from scipy.signal import find_peaks
 
     # Aplica passa-banda no sinal primeiro para detecção de picos
@@ -97,35 +119,11 @@ def _snr_template(signal: NDArray, fs: float) -> float:
     height = np.std(filtered) * 1.5
     distance = int(0.4 * fs)  # mínimo de 400ms entre batimentos
     peaks, _ = find_peaks(filtered, height=height, distance=distance)
+    return peaks
 
-    if len(peaks) < 5:
-        # Batimentos insuficientes para template, recorre à razão de potência
-        return _snr_power_ratio(signal, fs)
-
-    # Extrai batimentos (150ms antes, 250ms após pico R)
-    pre = int(0.15 * fs)
-    post = int(0.25 * fs)
-    beats = []
-    for p in peaks:
-        if p - pre >= 0 and p + post < len(signal):
-            beats.append(signal[p - pre : p + post])
-
-    if len(beats) < 3:
-        return _snr_power_ratio(signal, fs)
-
-    beats_arr = np.array(beats)
-    template = np.mean(beats_arr, axis=0)
 
-    # Calcula ruído residual
-    residuals = beats_arr - template[np.newaxis, :]
-    signal_power = np.mean(template ** 2)
-    noise_power = np.mean(residuals ** 2)
-
-    if noise_power <= 0:
-        noise_power = 1e-10
-
-    snr_db = 10 * np.log10(signal_power / noise_power)
-    return float(snr_db)
+_NOISE_TYPES = ("high_variance", "flatline", "saturation", "spike")
+_SEVERITIES = ("low", "moderate", "high")
 
 
 def detect_noise_segments(
@@ -133,27 +131,33 @@ def detect_noise_segments(
     fs: float,
     window_s: float = 1.0,
     threshold_factor: float = 3.0,
-) -> list[dict[str, Any]]:
+    step_s: float | None = None,
+) -> list[dict[str, Any]] | list[list[dict[str, Any]]]:
     """Detecta segmentos ruidosos em um sinal de ECG.
 
     Utiliza análise de janela deslizante para identificar segmentos com
     variância anormalmente alta, detecção de linha plana e detecção de saturação.
+    As estatísticas de todas as janelas (e derivações) saem de somas acumuladas e
+    filtros de extremos sobre o sinal inteiro, em O(amostras); segmentos do mesmo
+    tipo que se tocam ou se sobrepõem são mesclados.
 
     Parâmetros
     ----------
     signal : ndarray
-        Sinal de ECG 1D.
+        Sinal de ECG 1D ou 2D [amostras, derivações].
     fs : float
         Frequência de amostragem em Hz.
     window_s : float
         Duração da janela de análise em segundos.
     threshold_factor : float
         Número de desvios padrão acima da variância mediana para classificar como ruidoso.
+    step_s : float, opcional
+        Passo entre janelas em segundos (padrão = window_s, sem sobreposição).
 
     Retorna
     -------
-    list[dict]
-        Lista de segmentos ruidosos, cada um com:
+    list[dict] (1D) ou list[list[dict]] (2D, uma lista por derivação)
+        Segmentos ruidosos, cada um com:
         - start_sample: int
         - end_sample: int
         - start_s: float (segundos)
@@ -161,167 +165,205 @@ def detect_noise_segments(
         - noise_type: str ('high_variance', 'flatline', 'saturation', 'spike')
         - severity: str ('low', 'moderate', 'high')
     """
-    if signal.ndim != 1:
-        raise ValueError("signal must be 1D")
-
-    window = int(window_s * fs)
-    if window < 10:
-        window = 10
-
-    n_windows = max(1, len(signal) // window)
-    segments: list[dict[str, Any]] = []
-
-    # Calcula estatísticas por janela
-    variances = []
-    ranges = []
-    for i in range(n_windows):
-        start = i * window
-        end = min(start + window, len(signal))
-        chunk = signal[start:end]
-        variances.append(np.var(chunk))
-        ranges.append(np.ptp(chunk))
-
-    variances = np.array(variances)
-    ranges = np.array(ranges)
-
-    if len(variances) == 0:
-        return segments
-
-    median_var = np.median(variances)
-    std_var = np.std(variances) if len(variances) > 1 else median_var
-
+    if signal.ndim not in (1, 2):
+        raise ValueError(f"signal must be 1D or 2D, got {signal.ndim}D")
+    x = signal[:, np.newaxis] if signal.ndim == 1 else signal
+    n, n_leads = x.shape
+    if n == 0:
+        return [] if signal.ndim == 1 else [[] for _ in range(n_leads)]
+
+    window = max(int(window_s * fs), 10)
+    step = window if step_s is None else max(1, int(step_s * fs))
+    window = min(window, n)
+
+    # Estatísticas por janela [janelas, derivações] em O(amostras), sem materializar as janelas:
+    # variância por somas acumuladas de x e x², máx./mín. por filtros de extremos
+    starts = np.arange(0, n - window + 1, step)
+    ends = starts + window
+    variances = _window_variance(x, starts, window)
+    vmax, vmin = _window_extrema(x, starts, window)
+    ranges = vmax - vmin
+
+    median_var = np.median(variances, axis=0)
+    std_var = np.std(variances, axis=0) if len(variances) > 1 else median_var.copy()
     # Evita divisão por zero
-    if median_var < 1e-10:
-        median_var = 1e-10
-    if std_var < 1e-10:
-        std_var = median_var * 0.1
-
-    for i in range(n_windows):
-        start = i * window
-        end = min(start + window, len(signal))
-        chunk = signal[start:end]
-
-        # 1. Alta variância (artefato muscular, ruído de eletrodo)
-        if variances[i] > median_var + threshold_factor * std_var:
-            severity = "high" if variances[i] > median_var + 5 * std_var else "moderate"
-            segments.append({
-                "start_sample": start,
-                "end_sample": end,
-                "start_s": start / fs,
-                "end_s": end / fs,
-                "noise_type": "high_variance",
-                "severity": severity,
-            })
-
-        # 2. Detecção de linha plana (desconexão de eletrodo)
-        elif ranges[i] < median_var * 0.01:
-            segments.append({
-                "start_sample": start,
-                "end_sample": end,
-                "start_s": start / fs,
-                "end_s": end / fs,
-                "noise_type": "flatline",
-                "severity": "high",
-            })
-
-        # 3. Detecção de saturação (clipagem do sinal)
-        elif _detect_saturation(chunk):
-            segments.append({
-                "start_sample": start,
-                "end_sample": end,
-                "start_s": start / fs,
-                "end_s": end / fs,
-                "noise_type": "saturation",
-                "severity": "high",
-            })
+    median_var = np.maximum(median_var, 1e-10)
+    std_var = np.where(std_var < 1e-10, median_var * 0.1, std_var)
+
+    # 1. Alta variância (artefato muscular, ruído de eletrodo)
+    high_var = variances > median_var + threshold_factor * std_var
+    # 2. Detecção de linha plana (desconexão de eletrodo)
+    flat = ~high_var & (ranges < median_var * 0.01)
+    # 3. Detecção de saturação (clipagem do sinal)
+    sat = ~high_var & ~flat & _detect_saturation(x, starts, window, step, vmax, vmin)
+
+    severity = np.where(variances > median_var + 5 * std_var, 2, 1)
+    parts = []
+    for code, mask, sev in ((0, high_var, severity), (1, flat, 2), (2, sat, 2)):
+        w, lead = np.nonzero(mask)
+        sev_arr = sev[w, lead] if isinstance(sev, np.ndarray) else np.full(len(w), sev)
+        parts.append((lead, starts[w], ends[w], np.full(len(w), code), sev_arr))
 
     # 4. Detecção de espículas (no sinal inteiro)
-    spike_segments = _detect_spikes(signal, fs, window)
-    segments.extend(spike_segments)
-
-    # Ordena por amostra inicial e mescla segmentos sobrepostos
-    segments.sort(key=lambda s: s["start_sample"])
-
-    return segments
-
-
-def _detect_saturation(chunk: NDArray) -> bool:
-    """Detecta saturação do sinal (clipagem) em um trecho."""
-    if len(chunk) < 5:
-        return False
-    # Verifica se muitas amostras consecutivas estão no mesmo valor extremo
-    max_val = chunk.max()
-    min_val = chunk.min()
-    at_max = (chunk == max_val).sum()
-    at_min = (chunk == min_val).sum()
+    parts.append(_detect_spikes(x, fs))
+
+    lead, start, end, kind, sev = (np.concatenate(c) for c in zip(*parts))
+    per_lead = _merge_segments(lead, start, end, kind, sev, n_leads, fs)
+    return per_lead[0] if signal.ndim == 1 else per_lead
+
+
+def _merge_segments(
+    lead: NDArray, start: NDArray, end: NDArray, kind: NDArray, sev: NDArray,
+    n_leads: int, fs: float,
+) -> list[list[dict[str, Any]]]:
+    """Mescla segmentos do mesmo tipo que se tocam/sobrepõem e ordena por amostra inicial."""
+    out: list[list[dict[str, Any]]] = [[] for _ in range(n_leads)]
+    if len(start) == 0:
+        return out
+    # Grupos (derivação, tipo) deslocados para faixas disjuntas: um único máximo acumulado
+    # dos finais separa os trechos contíguos de todas as derivações de uma vez
+    span = int(max(end.max(), 1)) + 1
+    key = lead.astype(np.int64) * len(_NOISE_TYPES) + kind
+    order = np.lexsort((start, key))
+    s_off = key[order] * span + start[order]
+    e_off = key[order] * span + end[order]
+    new = np.ones(len(order), dtype=bool)
+    new[1:] = s_off[1:] > np.maximum.accumulate(e_off)[:-1]
+    first = order[new]
+    g_start = start[first]
+    g_end = np.maximum.reduceat(end[order], np.flatnonzero(new))
+    g_sev = np.maximum.reduceat(sev[order], np.flatnonzero(new))
+    g_lead, g_kind = lead[first], kind[first]
+    for i in np.lexsort((g_kind, g_start)):
+        st, en = int(g_start[i]), int(g_end[i])
+        out[int(g_lead[i])].append({
+            "start_sample": st,
+            "end_sample": en,
+            "start_s": st / fs,
+            "end_s": en / fs,
+            "noise_type": _NOISE_TYPES[int(g_kind[i])],
+            "severity": _SEVERITIES[int(g_sev[i])],
+        })
+    return out
+
+
+def _window_variance(x: NDArray, starts: NDArray, window: int) -> NDArray:
+    """Variância populacional de x[s:s + window] para cada início s (somas acumuladas)."""
+    xc = x - x.mean(axis=0)  # centrar reduz o cancelamento em E[x²] - E[x]²
+    zero = np.zeros((1, x.shape[1]))
+    c1 = np.concatenate((zero, np.cumsum(xc, axis=0)))
+    c2 = np.concatenate((zero, np.cumsum(xc * xc, axis=0)))
+    mean = (c1[starts + window] - c1[starts]) / window
+    return np.maximum((c2[starts + window] - c2[starts]) / window - mean * mean, 0.0)
+
+
+def _window_extrema(x: NDArray, starts: NDArray, window: int) -> tuple[NDArray, NDArray]:
+    """Máximo e mínimo de x[s:s + window]: filtros de extremos amostrados nos inícios."""
+    from scipy.ndimage import maximum_filter1d, minimum_filter1d
+
+    # Com origin=0, a saída em i cobre [i - window//2, i - window//2 + window)
+    centers = starts + window // 2
+    return (maximum_filter1d(x, window, axis=0)[centers],
+            minimum_filter1d(x, window, axis=0)[centers])
+
+
+def _window_counts(
+    x: NDArray, starts: NDArray, window: int, step: int, ref: NDArray,
+) -> NDArray[np.int64]:
+    """Quantas amostras de x[s:s + window] são iguais a ref[janela] (por derivação).
+
+    Janelas a k = ceil(window/step) posições de distância não se sobrepõem; para cada uma
+    das k fases, a máscara ``x == ref`` da janela dona de cada amostra é acumulada uma vez.
+    """
+    counts = np.zeros(ref.shape, dtype=np.int64)
+    k = -(-window // step)
+    offsets = np.arange(window)
+    for phase in range(min(k, len(starts))):
+        sel = np.arange(phase, len(starts), k)
+        pos = (starts[sel][:, np.newaxis] + offsets).ravel()
+        mask = np.zeros(x.shape, dtype=bool)
+        mask[pos] = x[pos] == np.repeat(ref[sel], window, axis=0)
+        c = np.zeros((x.shape[0] + 1, x.shape[1]), dtype=np.int64)
+        np.cumsum(mask, axis=0, out=c[1:])
+        counts[sel] = c[starts[sel] + window] - c[starts[sel]]
+    return counts
+
+
+def _detect_saturation(
+    x: NDArray, starts: NDArray, window: int, step: int, vmax: NDArray, vmin: NDArray,
+) -> NDArray[np.bool_]:
+    """Detecta saturação (clipagem) por janela [janelas, derivações]."""
+    if window < 5:
+        return np.zeros(vmax.shape, dtype=bool)
+    # Verifica se muitas amostras estão no mesmo valor extremo
+    at_max = _window_counts(x, starts, window, step, vmax)
+    at_min = _window_counts(x, starts, window, step, vmin)
     # Mais de 10% das amostras no mesmo extremo = provável saturação
-    return (at_max > len(chunk) * 0.1) or (at_min > len(chunk) * 0.1)
+    return (at_max > window * 0.1) | (at_min > window * 0.1)
+
 
+def _detect_spikes(
+    signal: NDArray, fs: float,
+) -> tuple[NDArray, NDArray, NDArray, NDArray, NDArray]:
+    """Detecta espículas isoladas fisiologicamente implausíveis em [amostras, derivações].
 
-def _detect_spikes(signal: NDArray, fs: float, window: int) -> list[dict]:
-    """Detecta espículas isoladas fisiologicamente implausíveis."""
-    segments = []
+    Devolve arrays paralelos (derivação, início, fim, tipo, severidade).
+    """
+    n = signal.shape[0]
     # Calcula primeira derivada
-    diff = np.diff(signal)
-    abs_diff = np.abs(diff)
-    median_diff = np.median(abs_diff)
-    if median_diff < 1e-10:
-        median_diff = 1e-10
-
-    # Espículas: derivada > 10x a mediana
-    spike_threshold = median_diff * 10
-    spike_indices = np.where(abs_diff > spike_threshold)[0]
-
-    if len(spike_indices) == 0:
-        return segments
-
-    # Agrupa índices de espícula consecutivos
-    groups = []
-    current_group = [spike_indices[0]]
-    for idx in spike_indices[1:]:
-        if idx - current_group[-1] <= 3:  # dentro de 3 amostras
-            current_group.append(idx)
-        else:
-            groups.append(current_group)
-            current_group = [idx]
-    groups.append(current_group)
-
-    # Marca apenas espículas isoladas (duração muito curta)
-    for group in groups:
-        duration_ms = len(group) * 1000 / fs
-        if duration_ms < 10:  # < 10ms = provável artefato, não QRS
-            start = max(0, group[0] - int(0.01 * fs))
-            end = min(len(signal), group[-1] + int(0.01 * fs))
-            segments.append({
-                "start_sample": start,
-                "end_sample": end,
-                "start_s": start / fs,
-                "end_s": end / fs,
-                "noise_type": "spike",
-                "severity": "low",
-            })
-
-    return segments
+    abs_diff = np.abs(np.diff(signal, axis=0))
+    if n > 1:
+        median_diff = np.maximum(np.median(abs_diff, axis=0), 1e-10)
+    else:
+        median_diff = np.ones(signal.shape[1])
+
+    # Espículas: derivada > 10x a mediana; (derivação, índice) em ordem
+    lead, idx = np.nonzero((abs_diff > median_diff * 10).T)
+    if len(idx) == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty, empty, empty
+
+    # Agrupa índices de espícula consecutivos (dentro de 3 amostras, na mesma derivação)
+    brk = np.ones(len(idx), dtype=bool)
+    brk[1:] = (np.diff(idx) > 3) | (np.diff(lead) != 0)
+    first = np.flatnonzero(brk)
+    last = np.r_[first[1:], len(idx)] - 1
+    count = last - first + 1
+
+    # Marca apenas espículas isoladas (duração < 10ms = provável artefato, não QRS)
+    iso = count * 1000 / fs < 10
+    pad = int(0.01 * fs)
+    start = np.maximum(0, idx[first[iso]] - pad)
+    end = np.minimum(n, idx[last[iso]] + pad)
+    kind = np.full(len(start), 3)
+    return lead[first[iso]], start, end, kind, np.zeros(len(start), dtype=np.int64)
 
 
 def signal_quality_index(
     signal: NDArray[np.floating[Any]],
     fs: float,
-) -> dict[str, Any]:
+    peaks: Sequence[int] | NDArray[np.integer[Any]] | None = None,
+) -> dict[str, Any] | list[dict[str, Any]]:
     """Calcula o índice composto de qualidade de sinal (SQI) para um sinal de ECG.
 
     Combina múltiplas métricas de qualidade em uma pontuação composta (0-100).
+    Em 2D, espectro (Welch) e segmentos ruidosos são calculados uma vez para a
+    matriz inteira, ao longo das amostras, e o resultado sai por derivação.
 
     Parâmetros
     ----------
     signal : ndarray
-        Sinal de ECG 1D.
+        Sinal de ECG 1D ou 2D [amostras, derivações].
     fs : float
         Frequência de amostragem em Hz.
+    peaks : sequência de int, opcional
+        Picos R já conhecidos (CV, PTB-XL). Com 3+ batimentos completos, snr_db passa a
+        ser a SNR por template da matriz de batimentos e o resultado ganha template_corr
+        (correlação média dos batimentos com o template), sem nova detecção.
 
     Retorna
     -------
-    dict
+    dict (1D) ou list[dict] (2D, um por derivação)
         - sqi_score: float (0-100, quanto maior melhor)
         - snr_db: float
         - noise_segments: int (quantidade de segmentos ruidosos detectados)
@@ -330,13 +372,16 @@ def signal_quality_index(
         - has_powerline_interference: bool
         - quality_label: str ('excellent', 'good', 'acceptable', 'poor', 'unusable')
         - details: dict com sub-pontuações
+        - template_corr: float | None (apenas quando peaks é fornecido)
     """
-    if signal.ndim != 1:
-        raise ValueError("signal must be 1D")
+    if signal.ndim not in (1, 2):
+        raise ValueError(f"signal must be 1D or 2D, got {signal.ndim}D")
+    x = signal[:, np.newaxis] if signal.ndim == 1 else signal
+    n, n_leads = x.shape
 
     min_length = int(fs * 2)
-    if len(signal) < min_length:
-        return {
+    if n < min_length:
+        results = [{
             "sqi_score": 0.0,
             "snr_db": 0.0,
             "noise_segments": 0,
@@ -345,89 +390,100 @@ def signal_quality_index(
             "has_powerline_interference": False,
             "quality_label": "unusable",
             "details": {"reason": "signal too short"},
-        }
-
-    # 1. Pontuação de SNR (0-30 pontos)
-    snr = estimate_snr(signal, fs)
-    snr_score = min(30.0, max(0.0, (snr + 10) * 1.5))  # -10dB=0, 10dB=30
+        } for _ in range(n_leads)]
+        return results[0] if signal.ndim == 1 else results
 
-    # 2. Pontuação de segmentos ruidosos (0-30 pontos)
-    noise_segs = detect_noise_segments(signal, fs)
-    noise_samples = sum(s["end_sample"] - s["start_sample"] for s in noise_segs)
-    noise_fraction = noise_samples / len(signal) if len(signal) > 0 else 0
-    noise_score = max(0.0, 30.0 * (1.0 - noise_fraction * 2))
-
-    # 3. Pontuação de oscilação de linha de base (0-20 pontos)
-    has_bw = _check_baseline_wander(signal, fs)
-    bw_score = 0.0 if has_bw else 20.0
-
-    # 4. Pontuação de interferência da rede elétrica (0-20 pontos)
-    has_pli = _check_powerline_interference(signal, fs)
-    pli_score = 10.0 if has_pli else 20.0
-
-    # SQI composto
-    sqi = snr_score + noise_score + bw_score + pli_score
-
-    # Rótulo de qualidade
-    if sqi >= 85:
-        label = "excellent"
-    elif sqi >= 70:
-        label = "good"
-    elif sqi >= 50:
-        label = "acceptable"
-    elif sqi >= 30:
-        label = "poor"
-    else:
-        label = "unusable"
-
-    return {
-        "sqi_score": round(sqi, 1),
-        "snr_db": round(snr, 1),
-        "noise_segments": len(noise_segs),
-        "noise_fraction": round(noise_fraction, 3),
-        "has_baseline_wander": has_bw,
-        "has_powerline_interference": has_pli,
-        "quality_label": label,
-        "details": {
-            "snr_score": round(snr_score, 1),
-            "noise_score": round(noise_score, 1),
-            "bw_score": round(bw_score, 1),
-            "pli_score": round(pli_score, 1),
-        },
-    }
-
-
-def _check_baseline_wander(signal: NDArray, fs: float) -> bool:
-    """Verifica se o sinal possui oscilação de linha de base significativa (energia < 1 Hz)."""
     from scipy.signal import welch
 
-    nperseg = min(len(signal), int(fs * 4))
-    if nperseg < 64:
-        return False
+    # Um único espectro por derivação serve SNR, linha de base e rede elétrica
+    freqs, psd = welch(x, fs=fs, nperseg=min(n, int(fs * 4)), axis=0)
+
+    # 1. Pontuação de SNR (0-30 pontos)
+    snr = _snr_from_psd(freqs, psd)
+    template_corr = None
+    if peaks is not None:
+        from signal_processing.beats import extract_beats
+
+        beats = extract_beats(x, peaks, fs)
+        if len(beats) >= 3:
+            snr = beats.snr_db()
+            template_corr = beats.correlation().mean(axis=0)
+    snr_score = np.clip((snr + 10) * 1.5, 0.0, 30.0)  # -10dB=0, 10dB=30
 
-    freqs, psd = welch(signal, fs=fs, nperseg=nperseg)
+    # 2. Pontuação de segmentos ruidosos (0-30 pontos)
+    noise_segs = detect_noise_segments(x, fs)
+
+    # 3. Oscilação de linha de base (0-20 pontos) e 4. rede elétrica (0-20 pontos)
+    has_bw = _check_baseline_wander(freqs, psd)
+    has_pli = _check_powerline_interference(freqs, psd, fs)
+
+    results = []
+    for i in range(n_leads):
+        noise_samples = sum(s["end_sample"] - s["start_sample"] for s in noise_segs[i])
+        noise_fraction = noise_samples / n
+        noise_score = max(0.0, 30.0 * (1.0 - noise_fraction * 2))
+        bw_score = 0.0 if has_bw[i] else 20.0
+        pli_score = 10.0 if has_pli[i] else 20.0
+
+        # SQI composto
+        sqi = float(snr_score[i]) + noise_score + bw_score + pli_score
+
+        # Rótulo de qualidade
+        if sqi >= 85:
+            label = "excellent"
+        elif sqi >= 70:
+            label = "good"
+        elif sqi >= 50:
+            label = "acceptable"
+        elif sqi >= 30:
+            label = "poor"
+        else:
+            label = "unusable"
+
+        results.append({
+            "sqi_score": round(sqi, 1),
+            "snr_db": round(float(snr[i]), 1),
+            "noise_segments": len(noise_segs[i]),
+            "noise_fraction": round(noise_fraction, 3),
+            "has_baseline_wander": bool(has_bw[i]),
+            "has_powerline_interference": bool(has_pli[i]),
+            "quality_label": label,
+            "details": {
+                "snr_score": round(float(snr_score[i]), 1),
+                "noise_score": round(noise_score, 1),
+                "bw_score": round(bw_score, 1),
+                "pli_score": round(pli_score, 1),
+            },
+        })
+        if peaks is not None:
+            corr = None if template_corr is None else round(float(template_corr[i]), 3)
+            results[-1]["template_corr"] = corr
+    return results[0] if signal.ndim == 1 else results
+
+
+def _check_baseline_wander(freqs: NDArray, psd: NDArray) -> NDArray[np.bool_]:
+    """Oscilação de linha de base (energia < 1 Hz) por coluna do PSD [freqs, derivações]."""
+    if len(freqs) < 33:  # nperseg < 64
+        return np.zeros(psd.shape[1:], dtype=bool)
 
     # Energia abaixo de 1 Hz vs energia total
     bw_mask = freqs < 1.0
     total_mask = freqs < 50.0
 
     _trapz = getattr(np, "trapezoid", getattr(np, "trapz", None))
-    bw_power = _trapz(psd[bw_mask], freqs[bw_mask]) if bw_mask.any() else 0
-    total_power = _trapz(psd[total_mask], freqs[total_mask]) if total_mask.any() else 1e-10
+    bw_power = _trapz(psd[bw_mask], freqs[bw_mask], axis=0) if bw_mask.any() else 0
+    total_power = _trapz(psd[total_mask], freqs[total_mask], axis=0) if total_mask.any() else 1e-10
 
     # Se >30% da potência da banda diagnóstica está abaixo de 1 Hz, provável oscilação de linha de base
-    return (bw_power / max(total_power, 1e-10)) > 0.3
-
+    return (bw_power / np.maximum(total_power, 1e-10)) > 0.3
 
-def _check_powerline_interference(signal: NDArray, fs: float) -> bool:
-    """Verifica interferência da rede elétrica em 50 Hz ou 60 Hz."""
-    from scipy.signal import welch
 
-    nperseg = min(len(signal), int(fs * 4))
-    if nperseg < 64:
-        return False
+def _check_powerline_interference(freqs: NDArray, psd: NDArray, fs: float) -> NDArray[np.bool_]:
+    """Interferência da rede elétrica em 50 Hz ou 60 Hz por coluna do PSD [freqs, derivações]."""
+    found = np.zeros(psd.shape[1:], dtype=bool)
+    if len(freqs) < 33:  # nperseg < 64
+        return found
 
-    freqs, psd = welch(signal, fs=fs, nperseg=nperseg)
     freq_res = freqs[1] - freqs[0] if len(freqs) > 1 else 1.0
 
     for pli_freq in [50.0, 60.0]:
@@ -442,8 +498,8 @@ def _check_powerline_interference(signal: NDArray, fs: float) -> bool:
         # Compara com frequências vizinhas (±5 Hz)
         neighbors = psd[max(0, idx - int(5 / freq_res)):idx - int(2 / freq_res)]
         if len(neighbors) > 0:
-            neighbor_power = np.median(neighbors)
-            if neighbor_power > 0 and peak_power / neighbor_power > 5:
-                return True
+            neighbor_power = np.median(neighbors, axis=0)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                found |= (neighbor_power > 0) & (peak_power / neighbor_power > 5)
 
-    return False
+    return found
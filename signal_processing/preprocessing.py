@@ -12,12 +12,101 @@ Ordem recomendada do pipeline:
 
 from __future__ import annotations
 
+from collections.abc import Iterable, Iterator, Sequence
 from typing import Any
 
 import numpy as np
 from numpy.typing import NDArray
 
 
+def _mode_params(mode: str) -> dict[str, float]:
+    """Cortes do modo: passa-banda (bp_low, bp_high) e passa-alta da linha de base (bw_cutoff)."""
+    if mode == "diagnostic":
+        return {"bp_low": 0.05, "bp_high": 150.0, "bw_cutoff": 0.5}
+    if mode == "monitoring":
+        return {"bp_low": 0.5, "bp_high": 40.0, "bw_cutoff": 0.67}
+    raise ValueError(f"Unknown mode: {mode}. Use 'diagnostic' or 'monitoring'.")
+
+
+def _filter_chain(
+    signal: NDArray[np.floating[Any]],
+    fs: float,
+    params: dict[str, float],
+    powerline_freq: float,
+    remove_baseline: bool,
+    baseline_method: str,
+    remove_powerline: bool,
+    apply_bandpass: bool,
+) -> tuple[NDArray[np.floating[Any]], list[str]]:
+    """Etapas 1-3 do pipeline (linha de base → notch → passa-banda); devolve (sinal, etapas).
+
+    Cada filtro devolve um array novo, então a entrada nunca é alterada e não precisa de cópia.
+    """
+    from signal_processing.filters import (
+        bandpass_filter,
+        notch_filter,
+        remove_baseline_wander,
+    )
+
+    steps: list[str] = []
+    processed = signal
+
+    # Etapa 1: Remoção de oscilação de linha de base
+    if remove_baseline:
+        bw_cutoff = params["bw_cutoff"]
+        processed = remove_baseline_wander(
+            processed, fs,
+            method=baseline_method,
+            cutoff=bw_cutoff,
+        )
+        steps.append(f"baseline_wander_removal({baseline_method}, cutoff={bw_cutoff}Hz)")
+
+    # Etapa 2: Filtro notch da rede elétrica
+    if remove_powerline:
+        processed = notch_filter(
+            processed, fs,
+            freq=powerline_freq,
+            quality=30.0,
+            harmonics=3,
+        )
+        steps.append(f"notch_filter({powerline_freq}Hz, harmonics=3)")
+
+    # Etapa 3: Filtro passa-banda
+    if apply_bandpass:
+        bp_low, bp_high = params["bp_low"], params["bp_high"]
+        processed = bandpass_filter(
+            processed, fs,
+            lowcut=bp_low,
+            highcut=bp_high,
+        )
+        steps.append(f"bandpass_filter({bp_low}-{bp_high}Hz)")
+
+    if processed is signal:
+        processed = signal.copy()
+    return processed, steps
+
+
+def _assess_quality(
+    processed: NDArray[np.floating[Any]],
+    fs: float,
+    peaks: Sequence[int] | NDArray[np.integer[Any]] | None = None,
+) -> dict[str, Any]:
+    """Qualidade: 1D → {"quality"}; 2D → pior derivação em "quality" + "quality_per_lead"."""
+    from signal_processing.noise import signal_quality_index
+
+    if processed.ndim == 1:
+        return {"quality": signal_quality_index(processed, fs, peaks=peaks)}
+
+    # Multiderivação: todas as derivações numa única avaliação, reporta a pior
+    lead_qualities = signal_quality_index(processed, fs, peaks=peaks)
+    for i, q in enumerate(lead_qualities):
+        q["lead_index"] = i
+
+    # Qualidade geral é a pior derivação
+    worst = min(lead_qualities, key=lambda q: q["sqi_score"])
+    return {"quality": worst, "quality_per_lead": lead_qualities}
+
+
 def preprocess_ecg(
     signal: NDArray[np.floating[Any]],
     fs: float,
@@ -28,6 +117,7 @@ def preprocess_ecg(
     remove_powerline: bool = True,
     apply_bandpass: bool = True,
     compute_quality: bool = True,
+    peaks: Sequence[int] | NDArray[np.integer[Any]] | None = None,
 ) -> dict[str, Any]:
     """Pipeline completo de pré-processamento de ECG.
 
@@ -51,6 +141,8 @@ def preprocess_ecg(
         Se deve aplicar filtro passa-banda.
     compute_quality : bool
         Se deve calcular o índice de qualidade do sinal.
+    peaks : sequência de int, opcional
+        Picos R já conhecidos, repassados a ``signal_quality_index`` (SNR por template).
 
     Retorna
     -------
@@ -61,59 +153,17 @@ def preprocess_ecg(
         - steps_applied: list[str]
         - quality: dict (se compute_quality=True)
     """
-    from signal_processing.filters import (
-        bandpass_filter,
-        notch_filter,
-        remove_baseline_wander,
-    )
-    from signal_processing.noise import signal_quality_index
-
     if not isinstance(signal, np.ndarray):
         signal = np.asarray(signal, dtype=np.float64)
 
     if signal.dtype not in (np.float32, np.float64):
         signal = signal.astype(np.float64)
 
-    # Valida modo
-    if mode == "diagnostic":
-        bp_low, bp_high = 0.05, 150.0
-        bw_cutoff = 0.5
-    elif mode == "monitoring":
-        bp_low, bp_high = 0.5, 40.0
-        bw_cutoff = 0.67
-    else:
-        raise ValueError(f"Unknown mode: {mode}. Use 'diagnostic' or 'monitoring'.")
-
-    steps: list[str] = []
-    processed = signal.copy()
-
-    # Etapa 1: Remoção de oscilação de linha de base
-    if remove_baseline:
-        processed = remove_baseline_wander(
-            processed, fs,
-            method=baseline_method,
-            cutoff=bw_cutoff,
-        )
-        steps.append(f"baseline_wander_removal({baseline_method}, cutoff={bw_cutoff}Hz)")
-
-    # Etapa 2: Filtro notch da rede elétrica
-    if remove_powerline:
-        processed = notch_filter(
-            processed, fs,
-            freq=powerline_freq,
-            quality=30.0,
-            harmonics=3,
-        )
-        steps.append(f"notch_filter({powerline_freq}Hz, harmonics=3)")
-
-    # Etapa 3: Filtro passa-banda
-    if apply_bandpass:
-        processed = bandpass_filter(
-            processed, fs,
-            lowcut=bp_low,
-            highcut=bp_high,
-        )
-        steps.append(f"bandpass_filter({bp_low}-{bp_high}Hz)")
+    params = _mode_params(mode)
+    processed, steps = _filter_chain(
+        signal, fs, params, powerline_freq,
+        remove_baseline, baseline_method, remove_powerline, apply_bandpass,
+    )
 
     result: dict[str, Any] = {
         "signal": processed,
@@ -124,19 +174,166 @@ def preprocess_ecg(
 
     # Etapa 4: Avaliação de qualidade (no sinal pré-processado)
     if compute_quality:
-        if processed.ndim == 1:
-            result["quality"] = signal_quality_index(processed, fs)
-        else:
-            # Multiderivação: avalia cada derivação, reporta a pior
-            lead_qualities = []
-            for i in range(processed.shape[1]):
-                q = signal_quality_index(processed[:, i], fs)
-                q["lead_index"] = i
-                lead_qualities.append(q)
-
-            # Qualidade geral é a pior derivação
-            worst = min(lead_qualities, key=lambda q: q["sqi_score"])
-            result["quality"] = worst
-            result["quality_per_lead"] = lead_qualities
+        result.update(_assess_quality(processed, fs, peaks))
 
     return result
+
+
+# ---------------------------------------------------------------------------
+# Pré-processamento em fluxo (Holter de várias horas)
+# ---------------------------------------------------------------------------
+
+def _settle_samples(sos: NDArray[np.float64] | None, tol: float) -> int:
+    """Amostras até o transiente de um corte decair abaixo de tol (raio do polo mais lento)."""
+    from scipy.signal import sos2zpk
+
+    if sos is None:
+        return 0
+    _, poles, _ = sos2zpk(sos)
+    r = float(np.max(np.abs(poles))) if len(poles) else 0.0
+    if r <= 0.0:
+        return 0
+    return int(np.ceil(np.log(tol) / np.log(r)))
+
+
+def _stream_margin(
+    fs: float,
+    params: dict[str, float],
+    powerline_freq: float,
+    remove_baseline: bool,
+    baseline_method: str,
+    remove_powerline: bool,
+    apply_bandpass: bool,
+    tol: float = 1e-6,
+) -> int:
+    """Margem (amostras, por lado) que torna o bloco equivalente ao processamento em lote.
+
+    Soma, por etapa, o suporte do filtro: decaimento do IIR mais lento até tol (o filtfilt
+    propaga o transiente de cada corte para dentro do bloco) ou as meias-janelas do mediano.
+    """
+    from signal_processing.filters import _butter_sos, _notch_sos
+
+    margin = 0
+    if remove_baseline:
+        if baseline_method == "median":
+            win1 = max(int(0.2 * fs), 3) | 1
+            win2 = max(int(0.6 * fs), 3) | 1
+            margin += win1 // 2 + win2 // 2
+        else:
+            sos = _butter_sos("high", float(fs), (float(params["bw_cutoff"]),), 2)
+            margin += _settle_samples(sos, tol)
+    if remove_powerline:
+        margin += _settle_samples(_notch_sos(float(fs), float(powerline_freq), 30.0, 3), tol)
+    if apply_bandpass:
+        high = min(params["bp_high"], fs / 2.0 * 0.99)
+        sos = _butter_sos("band", float(fs), (float(params["bp_low"]), float(high)), 4)
+        margin += _settle_samples(sos, tol)
+    return margin
+
+
+def preprocess_ecg_stream(
+    chunks: Iterable[NDArray[np.floating[Any]]],
+    fs: float,
+    mode: str = "diagnostic",
+    powerline_freq: float = 60.0,
+    remove_baseline: bool = True,
+    baseline_method: str = "highpass",
+    remove_powerline: bool = True,
+    apply_bandpass: bool = True,
+    compute_quality: bool = True,
+    block_s: float = 300.0,
+    quality_window_s: float = 10.0,
+    margin_s: float | None = None,
+) -> Iterator[dict[str, Any]]:
+    """Pré-processamento em fluxo, com memória constante, para gravações longas (Holter).
+
+    Esquema de blocos com margens: cada bloco de saída [a, b) é filtrado pela mesma cadeia
+    do ``preprocess_ecg`` sobre [a - margem, b + margem] e só o miolo é emitido. Com a margem
+    automática (transiente de corte < 1e-6 por etapa) o resultado coincide com o lote em
+    todo o registro — nas bordas verdadeiras a janela é cortada exatamente como no lote.
+    O buffer interno nunca passa de ~bloco + 2·margem + um pedaço de entrada.
+
+    Parâmetros
+    ----------
+    chunks : iterável de ndarray
+        Pedaços consecutivos do sinal (1D ou 2D [amostras, derivações]), de qualquer tamanho.
+    fs : float
+        Frequência de amostragem em Hz.
+    mode, powerline_freq, remove_baseline, baseline_method, remove_powerline, apply_bandpass
+        Como em ``preprocess_ecg``.
+    compute_quality : bool
+        Se deve avaliar a qualidade por janela de ``quality_window_s``.
+    block_s : float
+        Duração do bloco emitido (arredondada para múltiplo da janela de qualidade).
+    quality_window_s : float
+        Janela da avaliação de qualidade em segundos (alinhada ao início do registro).
+    margin_s : float, opcional
+        Margem por lado em segundos; None calcula a partir dos filtros do modo.
+
+    Gera
+    ----
+    dict
+        - start, end: int (amostras [start, end) no registro)
+        - signal: ndarray (trecho pré-processado)
+        - quality: list[dict] (uma entrada por janela, com start/end;
+          vazia se compute_quality=False)
+        - steps_applied: list[str]
+    """
+    if fs <= 0:
+        raise ValueError(f"sampling frequency must be positive, got {fs}")
+    if block_s <= 0 or quality_window_s <= 0:
+        raise ValueError("block_s and quality_window_s must be positive")
+    params = _mode_params(mode)
+    flags = (remove_baseline, baseline_method, remove_powerline, apply_bandpass)
+    if margin_s is None:
+        margin = _stream_margin(fs, params, powerline_freq, *flags)
+    else:
+        margin = max(0, int(round(margin_s * fs)))
+    win = max(1, int(round(quality_window_s * fs)))
+    block = win * max(1, int(round(block_s / quality_window_s)))
+
+    buf: NDArray[np.floating[Any]] | None = None
+    buf_start = 0  # índice absoluto de buf[0]
+    total = 0      # amostras recebidas até agora
+    pos = 0        # início do próximo bloco a emitir
+
+    def _emit(a: int, b: int) -> dict[str, Any]:
+        w0, w1 = max(0, a - margin), min(total, b + margin)
+        window = buf[w0 - buf_start:w1 - buf_start]
+        processed, steps = _filter_chain(window, fs, params, powerline_freq, *flags)
+        out = processed[a - w0:b - w0]
+        quality: list[dict[str, Any]] = []
+        if compute_quality:
+            for q0 in range(0, b - a, win):
+                seg = out[q0:q0 + win]
+                q = _assess_quality(seg, fs)["quality"]
+                q.update(start=a + q0, end=a + q0 + len(seg))
+                quality.append(q)
+        return {"start": a, "end": b, "signal": out, "quality": quality, "steps_applied": steps}
+
+    for chunk in chunks:
+        chunk = np.asarray(chunk)
+        if chunk.dtype not in (np.float32, np.float64):
+            chunk = chunk.astype(np.float64)
+        if chunk.ndim not in (1, 2):
+            raise ValueError(f"chunk must be 1D or 2D, got {chunk.ndim}D")
+        if buf is not None and chunk.shape[1:] != buf.shape[1:]:
+            raise ValueError(
+                f"chunk shape {chunk.shape} incompatible with stream shape {buf.shape}"
+            )
+        if len(chunk) == 0:
+            continue
+        buf = chunk if buf is None else np.concatenate([buf, chunk])
+        total += len(chunk)
+        # Emite enquanto houver bloco completo com a margem direita disponível
+        while total - pos >= block + margin:
+            yield _emit(pos, pos + block)
+            pos += block
+            keep = max(0, pos - margin)
+            buf, buf_start = buf[keep - buf_start:].copy(), keep
+
+    # Fim do fluxo: a margem direita é cortada na borda verdadeira, como no lote
+    while buf is not None and pos < total:
+        b = min(pos + block, total)
+        yield _emit(pos, b)
+        pos = b
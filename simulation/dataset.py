@@ -0,0 +1,238 @@
+"""
+Bulk synthetic ECG datasets for benchmarking detectors and training models.
+
+Records are sampled (pathology from ``_PATHOLOGY_CONFIGS`` plus heart rate,
+intervals, axis and noise), generated in parallel across processes and written
+as memory-mappable ``.npy`` shards of shape ``[records, samples, 12]`` next to a
+label table (Parquet when a Parquet engine is installed, CSV otherwise) and a
+``dataset.json`` manifest.
+
+Every record draws from its own RNG stream (``SeedSequence(seed, spawn_key=(i,))``),
+so a dataset is reproducible from its seed regardless of shard size or workers.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+import os
+import pathlib
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Sequence
+
+import numpy as np
+
+from .ecg_generator import _PATHOLOGY_CONFIGS, LEAD_NAMES, generate_pathological_ecg
+
+DATASET_VERSION = "simdata-0.1"
+LABEL_COLUMNS = [
+    "record_id", "shard", "row", "pathology", "hr_bpm", "pr_ms", "qrs_ms", "qt_ms",
+    "axis_deg", "noise", "hrv_mode", "n_beats",
+]
+
+# Ranges for parameters a pathology does not define itself
+_PARAM_RANGES = {
+    "hr_bpm": (50.0, 110.0),
+    "pr_ms": (120.0, 200.0),
+    "qrs_ms": (70.0, 110.0),
+    "qtc_ms": (380.0, 450.0),
+    "axis_deg": (-30.0, 90.0),
+    "noise": (0.0, 0.05),
+}
+# Relative jitter applied to values fixed by the pathology configuration
+_CONFIG_JITTER = 0.05
+
+
+def sample_record_params(
+    rng: np.random.Generator,
+    pathologies: Sequence[str] | None = None,
+) -> dict[str, Any]:
+    """Sample one record's pathology and ``generate_ecg`` parameters.
+
+    Values that define the pathology (e.g. ``qt_ms`` of long_qt, ``hr_bpm`` of
+    sinus_tachycardia) come from its configuration with a ±5% jitter; the rest are
+    drawn uniformly from ``_PARAM_RANGES``, with QT derived from a sampled QTc (Bazett).
+    """
+    names = list(pathologies) if pathologies else list(_PATHOLOGY_CONFIGS)
+    pathology = names[int(rng.integers(len(names)))]
+    config = _PATHOLOGY_CONFIGS[pathology]
+    lo, hi = np.array(list(_PARAM_RANGES.values())).T
+    hr, pr, qrs, qtc, axis, noise = rng.uniform(lo, hi)
+    params = {"hr_bpm": hr, "pr_ms": pr, "qrs_ms": qrs, "qt_ms": qtc * np.sqrt(60.0 / hr),
+              "axis_deg": axis, "noise": noise, "hrv_mode": config.get("hrv_mode", "sinus")}
+    for key in ("hr_bpm", "pr_ms", "qrs_ms", "qt_ms", "axis_deg"):
+        if key in config:
+            params[key] = config[key] * (1.0 + rng.uniform(-_CONFIG_JITTER, _CONFIG_JITTER))
+            if key == "hr_bpm" and "qt_ms" not in config:
+                params["qt_ms"] = qtc * np.sqrt(60.0 / params[key])
+    rounded = {k: (v if k == "hrv_mode" else round(float(v), 3)) for k, v in params.items()}
+    return {"pathology": pathology, **rounded}
+
+
+def simulate_record(
+    index: int,
+    seed: int = 0,
+    fs: int = 500,
+    duration_s: float = 10,
+    pathologies: Sequence[str] | None = None,
+) -> tuple[np.ndarray, dict[str, Any]]:
+    """Generate record *index* of the dataset seeded by *seed*: ([samples, 12] signal, labels)."""
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(int(index),)))
+    labels = sample_record_params(rng, pathologies)
+    params = {k: v for k, v in labels.items() if k != "pathology"}
+    ecg = generate_pathological_ecg(labels["pathology"], rng=rng, fs=fs, duration_s=duration_s,
+                                    **params)
+    signal = np.stack([ecg["leads"][lead] for lead in LEAD_NAMES], axis=1)
+    return signal, {"record_id": int(index), **labels, "n_beats": len(ecg["beat_boundaries"])}
+
+
+def _simulate_shard(task: tuple[int, int, int, str, dict[str, Any]]) -> list[dict[str, Any]]:
+    """Worker: generate records [start, stop) straight into a ``.npy`` memmap (atomic rename)."""
+    shard, start, stop, path_s, opts = task
+    path = pathlib.Path(path_s)
+    n_samples = int(opts["duration_s"] * opts["fs"])
+    tmp = path.with_name(path.name + ".tmp")
+    out = np.lib.format.open_memmap(tmp, mode="w+", dtype=opts["dtype"],
+                                    shape=(stop - start, n_samples, len(LEAD_NAMES)))
+    rows = []
+    for row, index in enumerate(range(start, stop)):
+        signal, labels = simulate_record(index, opts["seed"], opts["fs"], opts["duration_s"],
+                                         opts["pathologies"])
+        out[row] = signal
+        rows.append({**labels, "shard": path.name, "row": row})
+    out.flush()
+    del out
+    os.replace(tmp, path)
+    return rows
+
+
+def _label_format(label_format: str) -> str:
+    if label_format == "auto":
+        has_engine = any(importlib.util.find_spec(m) for m in ("pyarrow", "fastparquet"))
+        return "parquet" if has_engine else "csv"
+    if label_format not in ("parquet", "csv"):
+        raise ValueError(f"label_format must be 'auto', 'parquet' or 'csv', got {label_format!r}")
+    return label_format
+
+
+def simulate_dataset(
+    out_dir: str | pathlib.Path,
+    n_records: int,
+    *,
+    seed: int = 0,
+    fs: int = 500,
+    duration_s: float = 10,
+    shard_size: int = 1000,
+    dtype: str = "float32",
+    pathologies: Sequence[str] | None = None,
+    workers: int | None = None,
+    label_format: str = "auto",
+    on_shard: Callable[[dict[str, Any]], None] | None = None,
+) -> dict[str, Any]:
+    """Generate *n_records* labeled synthetic 12-lead ECGs into *out_dir*.
+
+    Parameters
+    ----------
+    out_dir : str or Path
+        Destination; receives ``shard_NNNNN.npy``, ``labels.parquet``/``labels.csv``
+        and ``dataset.json``.
+    n_records : int
+        Number of records.
+    seed : int
+        Dataset seed; record *i* uses the independent stream ``SeedSequence(seed, spawn_key=(i,))``.
+    fs, duration_s : int, float
+        Sampling rate (Hz) and record duration (s).
+    shard_size : int
+        Records per shard (one task per shard in the process pool).
+    dtype : str
+        "float32" or "float16" for the signal shards.
+    pathologies : sequence of str, optional
+        Subset of ``_PATHOLOGY_CONFIGS`` to sample from (default: all).
+    workers : int, optional
+        Processes (default: CPU count; 1 runs in the current process).
+    label_format : str
+        "auto" (Parquet if pyarrow/fastparquet is installed, else CSV), "parquet" or "csv".
+    on_shard : callable, optional
+        Called with ``{"shard", "records"}`` as each shard finishes.
+
+    Returns
+    -------
+    dict
+        The manifest written to ``dataset.json`` plus ``elapsed_s``.
+    """
+    import pandas as pd
+
+    if n_records <= 0 or shard_size <= 0:
+        raise ValueError("n_records and shard_size must be > 0")
+    if np.dtype(dtype) not in (np.float16, np.float32):
+        raise ValueError(f"dtype must be float16 or float32, got {dtype}")
+    unknown = sorted(set(pathologies or ()) - set(_PATHOLOGY_CONFIGS))
+    if unknown:
+        raise ValueError(f"Unknown pathologies: {unknown}. Available: {list(_PATHOLOGY_CONFIGS)}")
+    fmt = _label_format(label_format)
+    out = pathlib.Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+
+    opts = {"seed": int(seed), "fs": int(fs), "duration_s": float(duration_s),
+            "dtype": np.dtype(dtype).name,
+            "pathologies": list(pathologies) if pathologies else None}
+    tasks = [(k, start, min(start + shard_size, n_records), str(out / f"shard_{k:05d}.npy"), opts)
+             for k, start in enumerate(range(0, n_records, shard_size))]
+    workers = max(1, int(workers or os.cpu_count() or 1))
+    t0 = time.perf_counter()
+    rows: list[dict[str, Any]] = []
+
+    def collect(shard_rows):
+        rows.extend(shard_rows)
+        if on_shard:
+            on_shard({"shard": shard_rows[0]["shard"], "records": len(shard_rows)})
+
+    if workers == 1 or len(tasks) <= 1:
+        for task in tasks:
+            collect(_simulate_shard(task))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as ex:
+            for shard_rows in ex.map(_simulate_shard, tasks):
+                collect(shard_rows)
+
+    labels = pd.DataFrame(rows, columns=LABEL_COLUMNS)
+    labels_path = out / f"labels.{fmt}"
+    if fmt == "parquet":
+        labels.to_parquet(labels_path, index=False)
+    else:
+        labels.to_csv(labels_path, index=False)
+
+    manifest = {
+        "version": DATASET_VERSION, "n_records": int(n_records), "seed": int(seed),
+        "fs": int(fs), "duration_s": float(duration_s), "n_samples": int(duration_s * fs),
+        "leads": list(LEAD_NAMES),
+        "dtype": opts["dtype"], "layout": "records, samples, leads",
+        "shards": [pathlib.Path(t[3]).name for t in tasks], "labels": labels_path.name,
+        "pathologies": opts["pathologies"] or list(_PATHOLOGY_CONFIGS),
+    }
+    (out / "dataset.json").write_text(json.dumps(manifest, ensure_ascii=False, indent=2),
+                                      encoding="utf-8")
+    return {**manifest, "workers": workers, "elapsed_s": round(time.perf_counter() - t0, 3)}
+
+
+def load_dataset(
+    out_dir: str | pathlib.Path,
+    mmap: bool = True,
+) -> tuple[dict[str, Any], list[np.ndarray], Any]:
+    """Open a dataset written by ``simulate_dataset``: (manifest, shards, labels DataFrame).
+
+    Shards are memory-mapped read-only by default; record ``labels.row`` of
+    ``labels.shard`` is ``shards[manifest["shards"].index(shard)][row]``.
+    """
+    import pandas as pd
+
+    base = pathlib.Path(out_dir)
+    manifest = json.loads((base / "dataset.json").read_text(encoding="utf-8"))
+    shards = [np.load(base / name, mmap_mode="r" if mmap else None) for name in manifest["shards"]]
+    labels_path = base / manifest["labels"]
+    if labels_path.suffix == ".parquet":
+        labels = pd.read_parquet(labels_path)
+    else:
+        labels = pd.read_csv(labels_path)
+    return manifest, shards, labels
@@ -8,6 +8,7 @@ pharmacodynamic principles:
 - Hill equation dose-response: effect = Emax * C / (EC50 + C)
 - Ion-channel-target-based waveform modification (INa, IKr, ICaL, β-adrenergic)
 - RR interval resampling (not amplitude scaling) for heart rate effects
+- Batched engine over multi-beat 12-lead ECGs and concentration vectors
 - CYP450-aware drug interaction checking with severity levels
 
 Each drug entry includes its known ECG effects and a Portuguese
@@ -650,6 +651,176 @@ def simulate_drug_effect(baseline_waveform: np.ndarray, drug_name: str,
     return waveform
 
 
+# ---------------------------------------------------------------------------
+# Batched engine: multi-beat 12-lead ECGs × concentration vectors
+# ---------------------------------------------------------------------------
+
+# Interval/amplitude effects of one drug at the therapeutic concentration (1.0).
+_EFFECT_KEYS = ("pr_ms", "qrs_ms", "qt_ms", "hr_bpm", "st_mv", "ical")
+
+
+def _therapeutic_effects(drug: dict) -> dict[str, float]:
+    """Database deltas at concentration 1.0 (channel-derived defaults as in
+    ``_apply_ion_channel_effects``)."""
+    targets = drug.get("ion_channel_targets", {})
+    ec50, hill_n = drug.get("ec50", 0.5), drug.get("hill_n", 1.0)
+    st = drug.get("st_delta_mv", 0.0)
+    if drug.get("st_elevation") and st <= 0:
+        st = 0.2
+    def block(channel):  # fractional block of a channel at unit concentration
+        return _hill_equation(1.0, targets.get(channel, 0.0), ec50, hill_n)
+
+    return {
+        "pr_ms": max(drug.get("pr_delta_ms", 0), 0),
+        "qrs_ms": drug.get("qrs_delta_ms", 40 * block("INa")),
+        "qt_ms": drug.get("qt_delta_ms", 80 * block("IKr")),
+        "hr_bpm": drug.get("hr_delta_bpm", 0),
+        "st_mv": st,
+        "ical": block("ICaL"),
+    }
+
+
+def drug_effect_deltas(drug_names: str | list[str],
+                       concentrations: np.ndarray | list[float]) -> dict[str, np.ndarray]:
+    """Summed ECG deltas of one or more drugs for each concentration.
+
+    Every effect is scaled by the drug's normalized Hill response
+    ``H(C) / H(1)`` (``H`` with its ``ec50`` and ``hill_n``), so the therapeutic
+    concentration 1.0 reproduces the database deltas.  Effects of several drugs
+    add up (the ICaL amplitude factors multiply).
+
+    Parameters
+    ----------
+    drug_names : str or list[str]
+        One drug or a combination (keys of ``DRUG_DATABASE``).
+    concentrations : array-like
+        [C] (same concentration for every drug) or [C, n_drugs].
+
+    Returns
+    -------
+    dict[str, np.ndarray]
+        "pr_ms", "qrs_ms", "qt_ms", "hr_bpm", "st_mv" deltas and the "amplitude"
+        factor, each of shape [C].
+    """
+    names = [drug_names] if isinstance(drug_names, str) else list(drug_names)
+    drugs = []
+    for name in names:
+        drug = DRUG_DATABASE.get(name.lower())
+        if drug is None:
+            raise ValueError(f"Drug '{name}' not found. Available: {list(DRUG_DATABASE.keys())}")
+        drugs.append(drug)
+    conc = np.atleast_1d(np.asarray(concentrations, dtype=float))
+    if conc.ndim == 1:
+        conc = np.repeat(conc[:, np.newaxis], len(drugs), axis=1)
+    elif conc.shape[1] != len(drugs):
+        raise ValueError(f"concentrations must be [C] or [C, {len(drugs)}], got {conc.shape}")
+    out = {key: np.zeros(conc.shape[0]) for key in _EFFECT_KEYS}
+    amplitude = np.ones(conc.shape[0])
+    for d, drug in enumerate(drugs):
+        ec50, hill_n = drug.get("ec50", 0.5), drug.get("hill_n", 1.0)
+        c = np.maximum(conc[:, d], 0.0)
+        cn = c ** hill_n
+        response = cn / (ec50 ** hill_n + cn) * (ec50 ** hill_n + 1.0)  # H(C) / H(1)
+        effects = _therapeutic_effects(drug)
+        for key in _EFFECT_KEYS:
+            out[key] += effects[key] * response
+        amplitude *= 1.0 - 0.15 * effects["ical"] * response
+    out.pop("ical")
+    out["amplitude"] = amplitude
+    return out
+
+
+def simulate_drug_ecg(ecg_data: dict, drug_names: str | list[str],
+                      concentrations: np.ndarray | list[float]) -> np.ndarray:
+    """Apply drug effects to every beat of a 12-lead ECG for many concentrations at once.
+
+    Each beat of ``ecg_data["beat_boundaries"]`` is split at its P end, QRS onset,
+    J point and T end (from ``ecg_data["params"]``); the PR segment, QRS and ST-T
+    stretch by the PR/QRS/QT deltas and the RR by the HR change.  The resulting
+    piecewise-linear time warp of all beats and concentrations is evaluated with
+    one ``searchsorted`` and all leads are resampled by linear interpolation; the
+    ST shift (J point → 60% of ST-T, 20 ms ramps) and the ICaL amplitude factor
+    follow.  Output keeps the input length (the last sample is held when the warped
+    record runs out).
+
+    Parameters
+    ----------
+    ecg_data : dict
+        Output of ``generate_ecg`` / ``generate_pathological_ecg``.
+    drug_names : str or list[str]
+        One drug or a combination (effects add, see ``drug_effect_deltas``).
+    concentrations : array-like
+        [C] or [C, n_drugs] normalized concentrations (1.0 = therapeutic).
+
+    Returns
+    -------
+    np.ndarray
+        [C, leads, samples] in the lead order of ``ecg_data["leads"]``.
+    """
+    deltas = drug_effect_deltas(drug_names, concentrations)
+    n_cond = len(deltas["amplitude"])
+    base = np.vstack([np.asarray(sig, dtype=float) for sig in ecg_data["leads"].values()])
+    n = base.shape[1]
+    params = ecg_data["params"]
+    fs = float(params["fs"])
+    pr_s, qrs_s, qt_s = (params[key] / 1000.0 for key in ("pr_ms", "qrs_ms", "qt_ms"))
+
+    onsets = np.asarray(ecg_data.get("beat_boundaries") or [0], dtype=float)
+    rr_src = np.diff(np.append(onsets, n)) / fs  # the last beat runs to the end of the record
+    # Source landmarks per beat: start, P end, QRS onset, J point, T end, beat end.
+    # Kept non-decreasing: wide QRS (LBBB, WPW) puts the QRS onset before 0.8·PR
+    marks = np.maximum.accumulate([0.0, 0.8 * pr_s, pr_s - 0.25 * qrs_s, pr_s + qrs_s, pr_s + qt_s])
+    knots = np.minimum(marks[np.newaxis, :], rr_src[:, np.newaxis])  # [B, 5]
+    seg_src = np.diff(np.concatenate([knots, rr_src[:, np.newaxis]], axis=1), axis=1)  # [B, 5]
+
+    # Output segment durations [C, B, 5]
+    def col(key):  # per-condition delta in seconds, [C, 1]
+        return deltas[key][:, np.newaxis] / 1000.0
+
+    seg = np.broadcast_to(seg_src, (n_cond,) + seg_src.shape).copy()
+    seg[:, :, 1] = np.maximum(seg[:, :, 1] + col("pr_ms"), 0.0)
+    seg[:, :, 2] = np.maximum(seg[:, :, 2] + col("qrs_ms"), 1.0 / fs)
+    seg[:, :, 3] = np.maximum(seg[:, :, 3] + col("qt_ms") - col("qrs_ms"), 1.0 / fs)
+    hr = float(params.get("hr_bpm", 70.0))
+    new_hr = np.clip(hr + deltas["hr_bpm"], 20.0, 220.0)
+    rr_out = rr_src[np.newaxis, :] * (hr / new_hr)[:, np.newaxis]
+    seg[:, :, 4] = np.maximum(rr_out - seg[:, :, :4].sum(axis=2), 0.0)
+
+    # Flattened knots: output times O [C, K] ↔ source times S [K], K = 5B + 1
+    out_t = np.concatenate([np.zeros((n_cond, 1)), np.cumsum(seg.reshape(n_cond, -1), axis=1)],
+                           axis=1)
+    seg_start = onsets[:, np.newaxis] / fs + np.cumsum(seg_src, axis=1) - seg_src
+    src_t = np.append(seg_start.ravel(), n / fs)
+    tau = np.arange(n) / fs
+    span = out_t[:, -1].max() + tau[-1] + 1.0
+    offs = np.arange(n_cond)[:, np.newaxis] * span
+    j = np.searchsorted((out_t + offs).ravel(), (tau + offs).ravel(), side="right")
+    j = j.reshape(n_cond, n)
+    j = np.clip(j - np.arange(n_cond)[:, np.newaxis] * out_t.shape[1] - 1, 0, out_t.shape[1] - 2)
+    o0 = np.take_along_axis(out_t, j, axis=1)
+    o1 = np.take_along_axis(out_t, j + 1, axis=1)
+    width = o1 - o0
+    frac = np.where(width > 0, (tau - o0) / np.where(width > 0, width, 1.0), 0.0)
+    src = np.minimum(src_t[j] + np.clip(frac, 0.0, 1.0) * (src_t[j + 1] - src_t[j]), (n - 1) / fs)
+    src = np.where(tau > out_t[:, -1:], (n - 1) / fs, src)
+
+    # Resample all leads at the warped positions: [C, L, N]
+    pos = src * fs
+    i0 = np.minimum(pos.astype(int), n - 2)
+    w = (pos - i0)[:, np.newaxis, :]
+    out = np.moveaxis(base[:, i0], 0, 1) * (1.0 - w) + np.moveaxis(base[:, i0 + 1], 0, 1) * w
+
+    # ST shift: J point → 60% of the ST-T segment, with 20 ms ramps
+    if np.any(deltas["st_mv"] != 0):
+        in_st = (j % 5 == 3) & (frac < 0.6)
+        ramp = 0.02
+        taper = np.minimum(1.0, np.minimum(tau - o0, 0.6 * width - (tau - o0)) / ramp)
+        shift = deltas["st_mv"][:, np.newaxis] * np.where(in_st, np.maximum(taper, 0.0), 0.0)
+        out += shift[:, np.newaxis, :]
+    out *= deltas["amplitude"][:, np.newaxis, np.newaxis]
+    return out
+
+
 def get_drug_info(drug_name: str) -> dict:
     """Get drug information including camera analogy explanation.
 
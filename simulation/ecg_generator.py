@@ -129,12 +129,9 @@ def _generate_precordial(beat_ii: np.ndarray, lead_name: str) -> np.ndarray:
     qrs_peak = np.argmax(abs_signal)
     qrs_region = slice(max(0, qrs_peak - n // 20), min(n, qrs_peak + n // 20))
 
-    # Scale QRS region according to R and S factors
-    for i in range(qrs_region.start, qrs_region.stop):
-        if beat_ii[i] > 0:
-            result[i] = beat_ii[i] * r_factor
-        else:
-            result[i] = beat_ii[i] * s_factor
+    # Scale QRS region according to R and S factors (positive part → R, rest → S)
+    region = beat_ii[qrs_region]
+    result[qrs_region] = region * np.where(region > 0, r_factor, s_factor)
 
     # V1-V2: invert T wave slightly
     if lead_name in ("V1", "V2"):
@@ -149,6 +146,7 @@ def _generate_precordial(beat_ii: np.ndarray, lead_name: str) -> np.ndarray:
 def _generate_rr_intervals(
     hr_bpm: float, n_beats: int, mode: str = "sinus",
     rsa_amplitude: float = 0.03, rsa_freq: float = 0.2,
+    rng: np.random.Generator | None = None,
 ) -> np.ndarray:
     """Generate physiologically realistic RR intervals with HRV.
 
@@ -166,6 +164,8 @@ def _generate_rr_intervals(
         Amplitude of RSA modulation (fraction of RR, default 3%).
     rsa_freq : float
         Respiratory rate in Hz (default 0.2 Hz = 12 breaths/min).
+    rng : numpy.random.Generator, optional
+        Random source (a fresh default generator when omitted).
 
     Returns
     -------
@@ -173,13 +173,14 @@ def _generate_rr_intervals(
         Array of RR intervals in seconds.
     """
     rr_mean = 60.0 / hr_bpm
+    rng = rng if rng is not None else np.random.default_rng()
 
     if mode == "regular":
         return np.full(n_beats, rr_mean)
 
     if mode == "af":
         # Irregularly irregular: exponential distribution clipped to reasonable range
-        rr_intervals = np.random.exponential(rr_mean * 0.85, n_beats)
+        rr_intervals = rng.exponential(rr_mean * 0.85, n_beats)
         rr_intervals = np.clip(rr_intervals, 0.35, 1.8)
         return rr_intervals
 
@@ -188,12 +189,73 @@ def _generate_rr_intervals(
     # Respiratory sinus arrhythmia (RSA)
     rsa = rr_mean * rsa_amplitude * np.sin(2 * np.pi * rsa_freq * beat_times)
     # Random beat-to-beat jitter (SDNN ~30-50ms for normal)
-    jitter = np.random.normal(0, rr_mean * 0.025, n_beats)  # 2.5% CV
+    jitter = rng.normal(0, rr_mean * 0.025, n_beats)  # 2.5% CV
     rr_intervals = rr_mean + rsa + jitter
     rr_intervals = np.clip(rr_intervals, rr_mean * 0.7, rr_mean * 1.3)
     return rr_intervals
 
 
+def _beat_train(
+    rr_intervals: np.ndarray,
+    n_total: int,
+    fs: int,
+    pr_ms: float,
+    qrs_ms: float,
+    qt_ms: float,
+    gains: np.ndarray,
+) -> tuple[np.ndarray, list[int]]:
+    """Render consecutive beats into one lead-II signal in a single vectorised pass.
+
+    Equivalent to placing ``_single_beat(rr, ...)`` back to back: every sample is
+    mapped to its beat (onset grid + searchsorted) and to that beat's local time,
+    and the P-Q-R-S-T-U Gaussians are summed once over the whole record.
+    *gains* is [beats, 3] with the P, R and T amplitude factors of each beat.
+
+    Returns the signal and the onset sample of every beat placed.
+    """
+    lengths = (rr_intervals * fs).astype(int)
+    onsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    n_beats = int(np.searchsorted(onsets, n_total, side="left"))
+    onsets, lengths, rr = onsets[:n_beats], lengths[:n_beats], rr_intervals[:n_beats]
+
+    signal = np.zeros(n_total)
+    end = min(n_total, int(onsets[-1] + lengths[-1])) if n_beats else 0
+    if end == 0:
+        return signal, onsets.tolist()
+    idx = np.arange(end)
+    k = np.searchsorted(onsets, idx, side="right") - 1
+    j = idx - onsets[k]
+    n_k = lengths[k]
+    t = j * (rr[k] / n_k)  # same grid as linspace(0, rr, n, endpoint=False)
+
+    pr_s, qrs_s, qt_s = pr_ms / 1000.0, qrs_ms / 1000.0, qt_ms / 1000.0
+    u_center = pr_s + qt_s + 0.04
+    waves = (  # (center, width, amplitude) — same landmarks as _single_beat
+        (pr_s * 0.5, pr_s * 0.15, 0.15),
+        (pr_s, qrs_s * 0.08, -0.1),
+        (pr_s + qrs_s * 0.4, qrs_s * 0.06, 1.0),
+        (pr_s + qrs_s * 0.8, qrs_s * 0.07, -0.25),
+        (pr_s + qt_s * 0.7, qt_s * 0.1, 0.3),
+    )
+    beat = np.zeros(end)
+    for center, width, amplitude in waves:
+        beat += _gaussian(t, center, width, amplitude)
+    # Small U wave, only in beats long enough to hold it
+    beat += np.where(u_center < rr[k], _gaussian(t, u_center, 0.02, 0.03), 0.0)
+
+    # Morphology variation (P is first 15%, R is 15-35%, T is from 45%)
+    gain = np.ones(end)
+    p_mask = j < (n_k * 0.15).astype(int)
+    r_mask = ~p_mask & (j < (n_k * 0.35).astype(int))
+    t_mask = j >= (n_k * 0.45).astype(int)
+    gain[p_mask] = gains[k[p_mask], 0]
+    gain[r_mask] = gains[k[r_mask], 1]
+    gain[t_mask] = gains[k[t_mask], 2]
+
+    signal[:end] = beat * gain
+    return signal, onsets.tolist()
+
+
 def generate_ecg(
     hr_bpm: float = 72,
     pr_ms: float = 160,
@@ -204,6 +266,7 @@ def generate_ecg(
     duration_s: float = 10,
     fs: int = 500,
     hrv_mode: str = "sinus",
+    rng: np.random.Generator | int | None = None,
 ) -> dict[str, Any]:
     """Generate a synthetic 12-lead ECG with realistic beat-to-beat variability.
 
@@ -227,81 +290,53 @@ def generate_ecg(
         Sampling frequency (Hz).
     hrv_mode : str
         HRV mode: "sinus" (default), "af", or "regular".
+    rng : numpy.random.Generator or int, optional
+        Random source or seed; the same seed reproduces the same ECG.
 
     Returns
     -------
     dict
         {"time": np.ndarray, "leads": dict[str, np.ndarray], "params": dict}
     """
+    rng = np.random.default_rng(rng)
     n_total = int(duration_s * fs)
     t = np.linspace(0, duration_s, n_total, endpoint=False)
 
     # Estimate number of beats needed
     rr_mean = 60.0 / hr_bpm
     n_beats_est = int(np.ceil(duration_s / rr_mean)) + 2
-    rr_intervals = _generate_rr_intervals(hr_bpm, n_beats_est, mode=hrv_mode)
-
-    # Build signal beat-by-beat with individual RR intervals and morphology variation
-    signal_ii = np.zeros(n_total)
-    sample_pos = 0
-    beat_boundaries: list[int] = []
-
-    for beat_idx in range(n_beats_est):
-        rr_s = float(rr_intervals[beat_idx])
-        beat_samples = int(rr_s * fs)
-        if beat_samples < 10:
-            beat_samples = 10
-        if sample_pos >= n_total:
-            break
-
-        # Generate this beat with slight morphology variation
-        p_amp_var = 1.0 + np.random.uniform(-0.10, 0.10)   # ±10% P amplitude
-        t_amp_var = 1.0 + np.random.uniform(-0.05, 0.05)   # ±5% T amplitude
-        r_amp_var = 1.0 + np.random.uniform(-0.03, 0.03)   # ±3% R amplitude
-
-        beat = _single_beat(rr_s, fs, pr_ms, qrs_ms, qt_ms)
-
-        # Apply morphology variation (P is first 15%, R is center, T is last 30%)
-        n_beat = len(beat)
-        p_end = int(n_beat * 0.15)
-        qrs_start = int(n_beat * 0.15)
-        qrs_end = int(n_beat * 0.35)
-        t_start = int(n_beat * 0.45)
-
-        beat[:p_end] *= p_amp_var
-        beat[qrs_start:qrs_end] *= r_amp_var
-        beat[t_start:] *= t_amp_var
-
-        # Place beat in signal
-        end_pos = min(sample_pos + n_beat, n_total)
-        actual_len = end_pos - sample_pos
-        signal_ii[sample_pos:end_pos] = beat[:actual_len]
-        beat_boundaries.append(sample_pos)
-        sample_pos += n_beat
-
-    # Generate all 12 leads
-    leads: dict[str, np.ndarray] = {}
-
-    for lead_name in LEAD_NAMES:
+    rr_intervals = _generate_rr_intervals(hr_bpm, n_beats_est, mode=hrv_mode, rng=rng)
+
+    # Per-beat morphology variation: ±10% P, ±3% R, ±5% T amplitude
+    gains = 1.0 + rng.uniform(-1.0, 1.0, (n_beats_est, 3)) * np.array([0.10, 0.03, 0.05])
+    signal_ii, beat_boundaries = _beat_train(rr_intervals, n_total, fs, pr_ms, qrs_ms, qt_ms, gains)
+
+    # Generate all 12 leads as rows of one [lead, sample] matrix
+    n_leads = len(LEAD_NAMES)
+    matrix = np.empty((n_leads, n_total))
+    for i, lead_name in enumerate(LEAD_NAMES):
         if lead_name in LEAD_AXES:
-            lead_signal = _project_frontal(signal_ii, axis_deg, lead_name)
+            matrix[i] = _project_frontal(signal_ii, axis_deg, lead_name)
         else:
-            lead_signal = _generate_precordial(signal_ii, lead_name)
+            matrix[i] = _generate_precordial(signal_ii, lead_name)
+
+    # Baseline wander (respiratory + low-frequency drift) and powerline, one random phase
+    # per lead: a*sin(wt + phi) = a*cos(phi)*sin(wt) + a*sin(phi)*cos(wt), so all leads come
+    # from one [lead, 6] x [6, sample] product over the sin/cos of each frequency
+    phase = rng.uniform(0, 2 * np.pi, n_leads)
+    amps = [(0.04, 0.15, phase), (0.02, 0.05, phase * 0.7)]  # respiratory, slow drift
 
-        # Add baseline wander (respiratory + low-frequency drift)
-        phase = np.random.uniform(0, 2 * np.pi)
-        wander = 0.04 * np.sin(2 * np.pi * 0.15 * t + phase)
-        wander += 0.02 * np.sin(2 * np.pi * 0.05 * t + phase * 0.7)  # slow drift
+    # Add EMG-like noise (higher frequency component)
+    if noise > 0:
+        matrix += rng.normal(0, noise, (n_leads, n_total))
+        # Add occasional 50/60Hz powerline artifact (very subtle)
+        amps.append((0.005, 60.0, rng.uniform(0, 2 * np.pi, n_leads)))
 
-        # Add EMG-like noise (higher frequency component)
-        lead_noise = np.zeros(n_total)
-        if noise > 0:
-            lead_noise = np.random.normal(0, noise, n_total)
-            # Add occasional 50/60Hz powerline artifact (very subtle)
-            powerline = 0.005 * np.sin(2 * np.pi * 60 * t + np.random.uniform(0, 2 * np.pi))
-            lead_noise += powerline
+    coef = np.column_stack([c for a, _, ph in amps for c in (a * np.cos(ph), a * np.sin(ph))])
+    basis = np.vstack([f(2 * np.pi * freq * t) for _, freq, _ in amps for f in (np.sin, np.cos)])
+    matrix += coef @ basis
 
-        leads[lead_name] = lead_signal + wander + lead_noise
+    leads: dict[str, np.ndarray] = {name: matrix[i] for i, name in enumerate(LEAD_NAMES)}
 
     return {
         "time": t,
@@ -450,14 +485,323 @@ _PATHOLOGY_CONFIGS: dict[str, dict[str, Any]] = {
 }
 
 
-def generate_pathological_ecg(pathology: str = "stemi_anterior") -> dict[str, Any]:
+# ---------------------------------------------------------------------------
+# Pathology overlays (declarative, rendered per beat on the real beat grid)
+# ---------------------------------------------------------------------------
+#
+# Each pathology declares a list of overlay operations.  Timing is given as a
+# phase of the beat (fraction of that beat's own RR, so it follows HRV) and
+# every operation is rendered for all its leads and all beats at once on the
+# [lead, sample] matrix, in declaration order (scales apply to what was added
+# before them).  Operations:
+#
+#   add       window (p0, p1) × shape ("flat", "trapezoid", "sine", "linear",
+#             "exp_decay") × amplitude
+#   gaussian  pulse centred at phase (+ offset_s), sigma_s / half_s in seconds
+#   scale     multiply the window by factor
+#   smooth    moving average of size_s seconds inside the window
+#   oscillate continuous sine at freq_hz with a random phase per lead
+#   gain      whole-lead gain, optionally of the rectified signal
+#
+# amplitude may be a scalar or a {lead: value} mapping ("*" = default);
+# "every": (cycle, position) restricts an operation to one beat per cycle and
+# "period_s" renders on an independent fixed grid (e.g. dissociated P waves).
+
+_ALL = tuple(LEAD_NAMES)
+_ALL_BUT_AVR_V1 = ("I", "II", "III", "aVL", "aVF", "V2", "V3", "V4", "V5", "V6")
+
+
+def _add(leads, window, amplitude, shape="flat", **params) -> dict[str, Any]:
+    return {"op": "add", "leads": leads, "window": window, "amplitude": amplitude,
+            "shape": shape, **params}
+
+
+def _gauss(leads, phase, amplitude, sigma_s, half_s, **params) -> dict[str, Any]:
+    return {"op": "gaussian", "leads": leads, "phase": phase, "amplitude": amplitude,
+            "sigma_s": sigma_s, "half_s": half_s, **params}
+
+
+def _scale(leads, window, factor, **params) -> dict[str, Any]:
+    return {"op": "scale", "leads": leads, "window": window, "factor": factor, **params}
+
+
+def _st(leads, amplitude, window=(0.35, 0.55), ramp_s=0.02) -> dict[str, Any]:
+    """ST shift with linear ramps at both ends (elevation > 0, depression < 0)."""
+    return _add(leads, window, amplitude, "trapezoid", ramp_s=ramp_s)
+
+
+_PATHOLOGY_OVERLAYS: dict[str, list[dict[str, Any]]] = {
+    "stemi_anterior": [_st(("V1", "V2", "V3", "V4"), 0.3), _st(("II", "III", "aVF"), -0.1)],
+    "stemi_inferior": [_st(("II", "III", "aVF"), 0.25), _st(("I", "aVL"), -0.1)],
+    "stemi_lateral": [_st(("I", "aVL", "V5", "V6"), 0.25), _st(("III", "aVF"), -0.1)],
+    # Wide QRS already set. V1 predominantly negative, V6 positive broad R
+    "lbbb": [
+        {"op": "gain", "leads": ("V1",), "factor": -0.8, "rectify": True},
+        {"op": "gain", "leads": ("V6",), "factor": 1.2, "rectify": True},
+    ],
+    # RSR' in V1, deep S in I and V6
+    "rbbb": [
+        _gauss(("V1",), 0.28, 0.4, 0.016, 0.04),
+        _gauss(("I", "V6"), 0.25, -0.3, 0.012, 0.03),
+    ],
+    # Fibrillatory baseline, P waves suppressed
+    "af": [
+        {"op": "oscillate", "leads": _ALL, "amplitude": 0.05, "freq_hz": 6.0},
+        {"op": "oscillate", "leads": _ALL, "amplitude": 0.03, "freq_hz": 8.5},
+        _scale(_ALL, (0.0, 0.15), 0.1),
+    ],
+    # Delta wave (slurred upstroke)
+    "wpw": [_add(_ALL, (0.18, 0.24), 0.3, "linear", start=0.0)],
+    # Peaked T + QRS widened by smoothing
+    "hyperkalemia": [
+        _gauss(_ALL, 0.55, 0.5, 0.01, 0.04),
+        {"op": "smooth", "leads": _ALL, "window": (0.0, 0.35), "size_s": 0.014},
+    ],
+    # Sine-wave pattern: very peaked T, whole beat smoothed, P suppressed
+    "hyperkalemia_severe": [
+        _gauss(_ALL, 0.55, 0.8, 0.014, 0.06),
+        {"op": "smooth", "leads": _ALL, "window": (0.0, 1.0), "size_s": 0.03},
+        _scale(_ALL, (0.0, 0.15), 0.1),
+    ],
+    # Flattened T, ST depression, prominent U
+    "hypokalemia": [
+        _scale(_ALL, (0.45, 0.65), 0.25),
+        _st(_ALL, -0.12, window=(0.35, 0.50), ramp_s=0.016),
+        _gauss(_ALL, 0.72, 0.15, 0.016, 0.03),
+    ],
+    # Short QT via config; slight ST bump as T merges with QRS
+    "hypercalcemia": [_add(_ALL, (0.30, 0.42), 0.08)],
+    # Coved ST in V1-V2 with negative T
+    "brugada_type1": [
+        _add(("V1", "V2"), (0.28, 0.55), 0.25, "exp_decay", rate=3.0),
+        _scale(("V1", "V2"), (0.50, 0.70), -0.8),
+    ],
+    # Diffuse concave ST elevation + PR depression; aVR mirror
+    "pericarditis": [
+        _add(_ALL_BUT_AVR_V1, (0.30, 0.55), 0.12, "sine"),
+        _add(_ALL_BUT_AVR_V1, (0.12, 0.20), -0.05),
+        _add(("aVR",), (0.30, 0.55), -0.15),
+    ],
+    # S1Q3T3 + T inversion in III, V1-V3
+    "pe_pattern": [
+        _gauss(("I",), 0.25, -0.35, 0.012, 0.03),
+        _gauss(("III",), 0.19, -0.25, 0.008, 0.02),
+        _scale(("III", "V1", "V2", "V3"), (0.50, 0.70), -0.7),
+    ],
+    # Tall R V5-V6, deep S V1-V2, lateral downsloping ST + asymmetric T inversion
+    "lvh_strain": [
+        {"op": "gain", "leads": ("V5", "V6"), "factor": 1.8},
+        _add(("V1", "V2"), (0.22, 0.30), -0.4),
+        _add(("I", "aVL", "V5", "V6"), (0.32, 0.50), -0.15, "linear", start=1.0 / 3.0),
+        _scale(("I", "aVL", "V5", "V6"), (0.50, 0.70), -0.6),
+    ],
+    # P pulmonale: tall narrow P in II, III, aVF (and V1)
+    "rae": [
+        _gauss(("II", "III", "aVF"), 0.08, 0.20, 0.008, 0.04),
+        _gauss(("V1",), 0.08, 0.15, 0.008, 0.04),
+    ],
+    # P mitrale: bifid P in I, II, aVL; deep negative terminal P in V1
+    "lae": [
+        _gauss(("I", "II", "aVL"), 0.04, 0.10, 0.01, 0.03, offset_s=0.03),
+        _gauss(("I", "II", "aVL"), 0.04, 0.08, 0.01, 0.03, offset_s=0.076),
+        _gauss(("V1",), 0.09, -0.12, 0.01, 0.05, offset_s=0.016),
+    ],
+    # Dominant R in V1, strain V1-V3, deep S in V5-V6
+    "rvh": [
+        _gauss(("V1",), 0.22, 0.7, 0.01, 0.04),
+        _scale(("V1", "V2", "V3"), (0.48, 0.68), -0.7),
+        _gauss(("V5", "V6"), 0.26, -0.35, 0.012, 0.03),
+    ],
+    # Wenckebach 4:3 — every 4th QRS-T dropped
+    "bav_mobitz1": [_scale(_ALL, (0.20, 0.75), 0.05, every=(4, 3))],
+    # Mobitz II 3:2 — every 3rd QRS-T dropped, P preserved
+    "bav_mobitz2": [_scale(_ALL, (0.22, 0.75), 0.04, every=(3, 2))],
+    # Complete AV block: independent P waves at ~80 bpm over the ~40 bpm escape rhythm
+    "bav_complete": [
+        _gauss(_ALL, 0.5, {"*": 0.06, "I": 0.12, "II": 0.12, "aVF": 0.12, "aVR": -0.10}, 0.01, 0.03,
+               period_s=60.0 / 80),
+    ],
+    # Biphasic T (positive → negative) in V2-V3
+    "wellens_a": [
+        _scale(("V2", "V3"), (0.46, 0.54), -0.4),
+        _add(("V2", "V3"), (0.46, 0.54), 0.08, "sine"),
+        _scale(("V2", "V3"), (0.54, 0.68), 0.0),
+        _add(("V2", "V3"), (0.54, 0.68), -0.12, "sine"),
+    ],
+    # Deep symmetric T inversion V1-V4 (deepest in V2-V3)
+    "wellens_b": [
+        _scale(("V1", "V2", "V3", "V4"), (0.46, 0.70), 0.05),
+        _add(("V1", "V2", "V3", "V4"), (0.46, 0.70),
+             {"V1": -0.25, "V2": -0.45, "V3": -0.40, "V4": -0.20}, "sine"),
+    ],
+    # Upsloping ST depression at J + tall symmetric T in V1-V4
+    "de_winter": [
+        _add(("V1", "V2", "V3", "V4"), (0.28, 0.48), -0.2, "linear", start=0.5),
+        _gauss(("V1", "V2", "V3", "V4"), 0.60, 0.5, 0.02, 0.06),
+    ],
+    # Mirror of posterior STEMI: ST depression + tall T in V1-V4, dominant R in V1-V2
+    "stemi_posterior": [
+        _st(("V1", "V2", "V3", "V4"), -0.20, window=(0.32, 0.52)),
+        _gauss(("V1", "V2", "V3", "V4"), 0.58, 0.35, 0.016, 0.05),
+        _gauss(("V1", "V2"), 0.22, 0.5, 0.01, 0.03),
+    ],
+    # ST elevation in aVR (and V1) + diffuse ST depression
+    "stemi_avr": [
+        _st(("aVR", "V1"), {"aVR": 0.20, "V1": 0.10}, window=(0.32, 0.52), ramp_s=0.016),
+        _st(_ALL_BUT_AVR_V1, -0.15, window=(0.32, 0.52), ramp_s=0.016),
+    ],
+    # J-point notch + subtle concave ST elevation, inferior/lateral
+    "early_repolarization": [
+        _gauss(("II", "III", "aVF", "V4", "V5", "V6"), 0.27, 0.08, 0.006, 0.016),
+        _add(("II", "III", "aVF", "V4", "V5", "V6"), (0.30, 0.50), 0.08, "sine"),
+    ],
+}
+
+
+def _window_profile(
+    shape: str, i: np.ndarray, seg: np.ndarray, fs: float, params: dict[str, Any],
+) -> np.ndarray:
+    """Unit profile of a window shape at in-window index *i* of a *seg*-sample window."""
+    u = i / np.maximum(seg - 1, 1)  # 0 → 1 across the window (linspace grid)
+    if shape == "flat":
+        return np.ones_like(u)
+    if shape == "sine":
+        return np.sin(np.pi * u)
+    if shape == "linear":
+        start = params.get("start", 0.0)
+        return start + (1.0 - start) * u
+    if shape == "exp_decay":
+        return np.exp(-params.get("rate", 3.0) * u)
+    if shape == "trapezoid":
+        ramp = np.minimum(max(int(round(params.get("ramp_s", 0.02) * fs)), 1), seg)
+        den = np.maximum(ramp - 1, 1)
+        out = np.where(i < ramp, i / den, 1.0)
+        return np.where(i >= seg - ramp, (seg - 1 - i) / den, out)
+    raise ValueError(f"Unknown overlay shape: {shape}")
+
+
+def _beat_grid(beat_boundaries: list[int], n: int) -> tuple[np.ndarray, np.ndarray]:
+    """Onsets and lengths of the beats (the last beat repeats the previous RR)."""
+    onsets = np.asarray(beat_boundaries, dtype=int)
+    if len(onsets) == 0:
+        return np.zeros(1, dtype=int), np.array([n])
+    lengths = np.diff(onsets)
+    last = lengths[-1] if len(lengths) else n - onsets[0]
+    return onsets, np.append(lengths, last)
+
+
+def apply_overlays(
+    ecg_data: dict[str, Any],
+    overlays: list[dict[str, Any]],
+    rng: np.random.Generator | int | None = None,
+) -> dict[str, Any]:
+    """Render declarative pathology overlays onto the leads of *ecg_data* (in place).
+
+    Windows and pulse centres are phases of each beat's own RR interval, taken from
+    ``ecg_data["beat_boundaries"]``, so overlays stay locked to the beats under HRV
+    and AF.  Each operation is one broadcast over its leads and all beats.
+    """
+    if not overlays:
+        return ecg_data
+    rng = np.random.default_rng(rng)
+    names = list(ecg_data["leads"])
+    row = {name: i for i, name in enumerate(names)}
+    matrix = np.vstack([np.asarray(ecg_data["leads"][name], dtype=float) for name in names])
+    n = matrix.shape[1]
+    fs = float(ecg_data["params"]["fs"])
+    t = np.asarray(ecg_data["time"], dtype=float)
+    idx = np.arange(n)
+    beat_grid = _beat_grid(ecg_data.get("beat_boundaries") or [0], n)
+
+    def grid(ov):
+        if "period_s" in ov:
+            period = max(int(ov["period_s"] * fs), 1)
+            onsets = np.arange(0, n, period)
+            return onsets, np.full(len(onsets), period)
+        return beat_grid
+
+    def selected(n_beats, ov):
+        if "every" not in ov:
+            return np.ones(n_beats, dtype=bool)
+        cycle, position = ov["every"]
+        return np.arange(n_beats) % cycle == position
+
+    def window_mask(ov):
+        onsets, lengths = grid(ov)
+        k = np.maximum(np.searchsorted(onsets, idx, side="right") - 1, 0)
+        j = idx - onsets[k]
+        start = (lengths[k] * ov["window"][0]).astype(int)
+        seg = (lengths[k] * ov["window"][1]).astype(int) - start
+        i = j - start
+        mask = (j >= 0) & (j < lengths[k]) & (i >= 0) & (i < seg) & selected(len(onsets), ov)[k]
+        return mask, i, seg
+
+    for ov in overlays:
+        rows = [row[name] for name in ov["leads"] if name in row]
+        if not rows:
+            continue
+        op = ov["op"]
+        amp = ov.get("amplitude", 0.0)
+        if isinstance(amp, dict):
+            amp = np.array([amp.get(names[r], amp.get("*", 0.0)) for r in rows])
+        amp = np.reshape(amp, (-1, 1)) if np.ndim(amp) else amp
+
+        if op == "add":
+            mask, i, seg = window_mask(ov)
+            profile = np.where(mask, _window_profile(ov["shape"], i, seg, fs, ov), 0.0)
+            matrix[rows] += amp * profile
+        elif op == "gaussian":
+            onsets, lengths = grid(ov)
+            onsets, lengths = onsets[selected(len(onsets), ov)], lengths[selected(len(onsets), ov)]
+            half = int(round(ov["half_s"] * fs))
+            d = np.arange(-half, half)
+            offset = int(round(ov.get("offset_s", 0.0) * fs))
+            centres = onsets + (lengths * ov["phase"]).astype(int) + offset
+            pos = (centres[:, np.newaxis] + d).ravel()
+            kernel = np.tile(np.exp(-(d ** 2) / (2 * (ov["sigma_s"] * fs) ** 2)), len(centres))
+            inside = (pos >= 0) & (pos < n)
+            profile = np.bincount(pos[inside], weights=kernel[inside], minlength=n)
+            matrix[rows] += amp * profile
+        elif op == "scale":
+            mask, _, _ = window_mask(ov)
+            matrix[rows] *= np.where(mask, ov["factor"], 1.0)
+        elif op == "smooth":
+            from scipy.ndimage import uniform_filter1d
+
+            mask, _, _ = window_mask(ov)
+            size = max(int(round(ov["size_s"] * fs)), 1) | 1
+            smoothed = uniform_filter1d(matrix[rows], size=size, axis=1, mode="nearest")
+            matrix[rows] = np.where(mask, smoothed, matrix[rows])
+        elif op == "oscillate":
+            phase = rng.uniform(0, 2 * np.pi, (len(rows), 1))
+            matrix[rows] += amp * np.sin(2 * np.pi * ov["freq_hz"] * t + phase)
+        elif op == "gain":
+            block = np.abs(matrix[rows]) if ov.get("rectify") else matrix[rows]
+            matrix[rows] = ov["factor"] * block
+        else:
+            raise ValueError(f"Unknown overlay op: {op}")
+
+    ecg_data["leads"] = {name: matrix[row[name]] for name in names}
+    return ecg_data
+
+
+def generate_pathological_ecg(
+    pathology: str = "stemi_anterior",
+    rng: np.random.Generator | int | None = None,
+    **params: Any,
+) -> dict[str, Any]:
     """Generate an ECG with a specific pathological pattern.
 
     Parameters
     ----------
     pathology : str
-        One of: "normal", "stemi_anterior", "stemi_inferior", "lbbb",
-        "rbbb", "af", "wpw", "hyperkalemia", "long_qt".
+        One of the keys of ``_PATHOLOGY_CONFIGS`` ("normal", "stemi_anterior",
+        "stemi_inferior", "lbbb", "rbbb", "af", "wpw", "hyperkalemia", "long_qt", ...).
+    rng : numpy.random.Generator or int, optional
+        Random source or seed, shared by the base ECG and the overlays.
+    **params
+        Overrides for ``generate_ecg`` (hr_bpm, noise, duration_s, fs, ...); by default
+        the pathology's own configuration, 0.02 mV noise, 10 s at 500 Hz.
 
     Returns
     -------
@@ -472,778 +816,24 @@ def generate_pathological_ecg(pathology: str = "stemi_anterior") -> dict[str, An
         )
 
     config = _PATHOLOGY_CONFIGS[pathology]
+    rng = np.random.default_rng(rng)
+
+    # Base parameters (may be overridden by config, then by the caller)
+    base = {
+        "hr_bpm": config.get("hr_bpm", 72),
+        "pr_ms": config.get("pr_ms", 160),
+        "qrs_ms": config.get("qrs_ms", 90),
+        "qt_ms": config.get("qt_ms", 380),
+        "axis_deg": config.get("axis_deg", 60),
+        "noise": 0.02,
+        "duration_s": 10,
+        "fs": 500,
+        "hrv_mode": config.get("hrv_mode", "sinus"),
+    }
+    ecg_data = generate_ecg(**{**base, **params}, rng=rng)
 
-    # Base parameters (may be overridden by config)
-    hr = config.get("hr_bpm", 72)
-    pr = config.get("pr_ms", 160)
-    qrs = config.get("qrs_ms", 90)
-    qt = config.get("qt_ms", 380)
-    axis = config.get("axis_deg", 60)
-    hrv_mode = config.get("hrv_mode", "sinus")
-
-    ecg_data = generate_ecg(
-        hr_bpm=hr,
-        pr_ms=pr,
-        qrs_ms=qrs,
-        qt_ms=qt,
-        axis_deg=axis,
-        noise=0.02,
-        duration_s=10,
-        fs=500,
-        hrv_mode=hrv_mode,
-    )
-
-    # Apply pathology-specific modifications
-    if pathology == "stemi_anterior":
-        # Elevate ST in V1-V4
-        for lead in ("V1", "V2", "V3", "V4"):
-            signal = ecg_data["leads"][lead]
-            n = len(signal)
-            rr_samples = int(500 * 60.0 / hr)
-            for beat_start in range(0, n, rr_samples):
-                st_start = beat_start + int(rr_samples * 0.35)
-                st_end = beat_start + int(rr_samples * 0.55)
-                if st_end > n:
-                    break
-                seg_len = st_end - st_start
-                elevation = 0.3 * np.ones(seg_len)
-                ramp = min(10, seg_len)
-                elevation[:ramp] = np.linspace(0, 0.3, ramp)
-                elevation[-ramp:] = np.linspace(0.3, 0, ramp)
-                signal[st_start:st_end] += elevation
-        # Reciprocal depression in II, III, aVF
-        for lead in ("II", "III", "aVF"):
-            signal = ecg_data["leads"][lead]
-            n = len(signal)
-            for beat_start in range(0, n, rr_samples):
-                st_start = beat_start + int(rr_samples * 0.35)
-                st_end = beat_start + int(rr_samples * 0.55)
-                if st_end > n:
-                    break
-                seg_len = st_end - st_start
-                depression = 0.1 * np.ones(seg_len)
-                ramp = min(10, seg_len)
-                depression[:ramp] = np.linspace(0, 0.1, ramp)
-                depression[-ramp:] = np.linspace(0.1, 0, ramp)
-                signal[st_start:st_end] -= depression
-
-    elif pathology == "stemi_inferior":
-        rr_samples = int(500 * 60.0 / hr)
-        for lead in ("II", "III", "aVF"):
-            signal = ecg_data["leads"][lead]
-            n = len(signal)
-            for beat_start in range(0, n, rr_samples):
-                st_start = beat_start + int(rr_samples * 0.35)
-                st_end = beat_start + int(rr_samples * 0.55)
-                if st_end > n:
-                    break
-                seg_len = st_end - st_start
-                elevation = 0.25 * np.ones(seg_len)
-                ramp = min(10, seg_len)
-                elevation[:ramp] = np.linspace(0, 0.25, ramp)
-                elevation[-ramp:] = np.linspace(0.25, 0, ramp)
-                signal[st_start:st_end] += elevation
-        # Reciprocal in I, aVL
-        for lead in ("I", "aVL"):
-            signal = ecg_data["leads"][lead]
-            n = len(signal)
-            for beat_start in range(0, n, rr_samples):
-                st_start = beat_start + int(rr_samples * 0.35)
-                st_end = beat_start + int(rr_samples * 0.55)
-                if st_end > n:
-                    break
-                seg_len = st_end - st_start
-                depression = 0.1 * np.ones(seg_len)
-                ramp = min(10, seg_len)
-                depression[:ramp] = np.linspace(0, 0.1, ramp)
-                depression[-ramp:] = np.linspace(0.1, 0, ramp)
-                signal[st_start:st_end] -= depression
-
-    elif pathology == "lbbb":
-        # Wide QRS already set. Make V1 predominantly negative, V6 positive broad R
-        signal_v1 = ecg_data["leads"]["V1"]
-        ecg_data["leads"]["V1"] = -np.abs(signal_v1) * 0.8
-        signal_v6 = ecg_data["leads"]["V6"]
-        ecg_data["leads"]["V6"] = np.abs(signal_v6) * 1.2
-
-    elif pathology == "rbbb":
-        # RSR' pattern in V1
-        signal_v1 = ecg_data["leads"]["V1"]
-        n = len(signal_v1)
-        rr_samples = int(500 * 60.0 / hr)
-        for beat_start in range(0, n, rr_samples):
-            # Add secondary R' wave
-            r_prime_center = beat_start + int(rr_samples * 0.28)
-            if r_prime_center + 20 > n:
-                break
-            t_local = np.arange(40) - 20
-            r_prime = 0.4 * np.exp(-(t_local**2) / (2 * 8**2))
-            start = max(0, r_prime_center - 20)
-            end = min(n, r_prime_center + 20)
-            actual_len = end - start
-            signal_v1[start:end] += r_prime[:actual_len]
-        # Deep S in I, V6
-        for lead in ("I", "V6"):
-            signal = ecg_data["leads"][lead]
-            n = len(signal)
-            for beat_start in range(0, n, rr_samples):
-                s_center = beat_start + int(rr_samples * 0.25)
-                if s_center + 15 > n:
-                    break
-                t_local = np.arange(30) - 15
-                s_deep = -0.3 * np.exp(-(t_local**2) / (2 * 6**2))
-                start = max(0, s_center - 15)
-                end = min(n, s_center + 15)
-                actual_len = end - start
-                signal[start:end] += s_deep[:actual_len]
-
-    elif pathology == "af":
-        # Remove P waves and make RR irregular
-        rr_base = int(500 * 60.0 / hr)
-        n_total = len(ecg_data["time"])
-        for lead_name in LEAD_NAMES:
-            signal = ecg_data["leads"][lead_name]
-            # Add fibrillatory baseline
-            fibrillation = 0.05 * np.sin(
-                2 * np.pi * 6 * ecg_data["time"] + np.random.uniform(0, 2 * np.pi)
-            )
-            fibrillation += 0.03 * np.sin(
-                2 * np.pi * 8.5 * ecg_data["time"] + np.random.uniform(0, 2 * np.pi)
-            )
-            signal += fibrillation
-            # Suppress P waves: zero out early portion of each beat
-            for beat_start in range(0, n_total, rr_base):
-                p_end = beat_start + int(rr_base * 0.15)
-                if p_end > n_total:
-                    break
-                signal[beat_start:p_end] *= 0.1  # suppress P wave
-            ecg_data["leads"][lead_name] = signal
-
-    elif pathology == "wpw":
-        # Add delta wave (slurred upstroke) to all leads
-        rr_samples = int(500 * 60.0 / hr)
-        for lead_name in LEAD_NAMES:
-            signal = ecg_data["leads"][lead_name]
-            n = len(signal)
-            for beat_start in range(0, n, rr_samples):
-                delta_start = beat_start + int(rr_samples * 0.18)
-                delta_end = delta_start + int(rr_samples * 0.06)
-                if delta_end > n:
-                    break
-                seg_len = delta_end - delta_start
-                delta = np.linspace(0, 0.3, seg_len)
-                signal[delta_start:delta_end] += delta
-
-    elif pathology == "hyperkalemia":
-        # Peaked T waves + widened QRS
-        rr_samples = int(500 * 60.0 / hr)
-        for lead_name in LEAD_NAMES:
-            signal = ecg_data["leads"][lead_name]
-            n = len(signal)
-            for beat_start in range(0, n, rr_samples):
-                # Peak the T wave
-                t_center = beat_start + int(rr_samples * 0.55)
-                if t_center + 20 > n:
-                    break
-                t_local = np.arange(40) - 20
-                peaked_t = 0.5 * np.exp(-(t_local**2) / (2 * 5**2))
-                start = max(0, t_center - 20)
-                end = min(n, t_center + 20)
-                actual_len = end - start
-                signal[start:end] += peaked_t[:actual_len]
-
-            # Widen QRS via smoothing
-            kernel = np.ones(7) / 7
-            qrs_end = int(rr_samples * 0.35)
-            for beat_start in range(0, n, rr_samples):
-                seg_start = beat_start
-                seg_end = min(n, beat_start + qrs_end)
-                seg = signal[seg_start:seg_end]
-                if len(seg) > len(kernel):
-                    padded = np.pad(seg, 3, mode="edge")
-                    signal[seg_start:seg_end] = np.convolve(padded, kernel, mode="valid")[
-                        : len(seg)
-                    ]
-
-    elif pathology == "hyperkalemia_severe":
-        # Sine wave pattern: very peaked T + very wide QRS fusing together
-        rr_samples = int(500 * 60.0 / hr)
-        for lead_name in LEAD_NAMES:
-            signal = ecg_data["leads"][lead_name]
-            n = len(signal)
-            for beat_start in range(0, n, rr_samples):
-                # Very peaked T wave
-                t_center = beat_start + int(rr_samples * 0.55)
-                if t_center + 30 > n:
-                    break
-                t_local = np.arange(60) - 30
-                peaked_t = 0.8 * np.exp(-(t_local**2) / (2 * 7**2))
-                start = max(0, t_center - 30)
-                end = min(n, t_center + 30)
-                actual_len = end - start
-                signal[start:end] += peaked_t[:actual_len]
-
-            # Heavy QRS smoothing (sine wave effect)
-            kernel = np.ones(15) / 15
-            for beat_start in range(0, n, rr_samples):
-                seg_end = min(n, beat_start + rr_samples)
-                seg = signal[beat_start:seg_end]
-                if len(seg) > len(kernel):
-                    padded = np.pad(seg, 7, mode="edge")
-                    signal[beat_start:seg_end] = np.convolve(
-                        padded, kernel, mode="valid"
-                    )[: len(seg)]
-
-            # Suppress P waves
-            for beat_start in range(0, n, rr_samples):
-                p_end = min(n, beat_start + int(rr_samples * 0.15))
-                signal[beat_start:p_end] *= 0.1
-
-    elif pathology == "hypokalemia":
-        # Flattened T waves + ST depression + prominent U waves
-        rr_samples = int(500 * 60.0 / hr)
-        for lead_name in LEAD_NAMES:
-            signal = ecg_data["leads"][lead_name]
-            n = len(signal)
-            for beat_start in range(0, n, rr_samples):
-                # Flatten T wave (reduce amplitude)
-                t_start = beat_start + int(rr_samples * 0.45)
-                t_end = beat_start + int(rr_samples * 0.65)
-                if t_end > n:
-                    break
-                signal[t_start:t_end] *= 0.25
-
-                # ST depression
-                st_start = beat_start + int(rr_samples * 0.35)
-                st_end = beat_start + int(rr_samples * 0.50)
-                if st_end > n:
-                    break
-                seg_len = st_end - st_start
-                depression = 0.12 * np.ones(seg_len)
-                ramp = min(8, seg_len)
-                depression[:ramp] = np.linspace(0, 0.12, ramp)
-                depression[-ramp:] = np.linspace(0.12, 0, ramp)
-                signal[st_start:st_end] -= depression
-
-                # Prominent U wave after T
-                u_center = beat_start + int(rr_samples * 0.72)
-                if u_center + 15 > n:
-                    break
-                t_local = np.arange(30) - 15
-                u_wave = 0.15 * np.exp(-(t_local**2) / (2 * 8**2))
-                start = max(0, u_center - 15)
-                end = min(n, u_center + 15)
-                actual_len = end - start
-                signal[start:end] += u_wave[:actual_len]
-
-    elif pathology == "hypercalcemia":
-        # Short QT already set via config; further shorten ST segment
-        rr_samples = int(500 * 60.0 / hr)
-        for lead_name in LEAD_NAMES:
-            signal = ecg_data["leads"][lead_name]
-            n = len(signal)
-            for beat_start in range(0, n, rr_samples):
-                # Compress ST segment (bring T closer to QRS)
-                st_start = beat_start + int(rr_samples * 0.30)
-                st_end = beat_start + int(rr_samples * 0.42)
-                if st_end > n:
-                    break
-                seg_len = st_end - st_start
-                # Elevate ST slightly to simulate T merging with QRS
-                bump = 0.08 * np.ones(seg_len)
-                signal[st_start:st_end] += bump
-
-    elif pathology == "hypocalcemia":
-        pass  # QT prolongation already set via config (qt_ms=520)
-
-    elif pathology == "long_qt":
-        pass  # QT already set to 520 ms via config
-
-    elif pathology == "stemi_lateral":
-        rr_samples = int(500 * 60.0 / hr)
-        for lead in ("I", "aVL", "V5", "V6"):
-            signal = ecg_data["leads"][lead]
-            n = len(signal)
-            for beat_start in range(0, n, rr_samples):
-                st_start = beat_start + int(rr_samples * 0.35)
-                st_end = beat_start + int(rr_samples * 0.55)
-                if st_end > n:
-                    break
-                seg_len = st_end - st_start
-                elevation = 0.25 * np.ones(seg_len)
-                ramp = min(10, seg_len)
-                elevation[:ramp] = np.linspace(0, 0.25, ramp)
-                elevation[-ramp:] = np.linspace(0.25, 0, ramp)
-                signal[st_start:st_end] += elevation
-        # Reciprocal in III, aVF
-        for lead in ("III", "aVF"):
-            signal = ecg_data["leads"][lead]
-            n = len(signal)
-            for beat_start in range(0, n, rr_samples):
-                st_start = beat_start + int(rr_samples * 0.35)
-                st_end = beat_start + int(rr_samples * 0.55)
-                if st_end > n:
-                    break
-                seg_len = st_end - st_start
-                depression = 0.1 * np.ones(seg_len)
-                ramp = min(10, seg_len)
-                depression[:ramp] = np.linspace(0, 0.1, ramp)
-                depression[-ramp:] = np.linspace(0.1, 0, ramp)
-                signal[st_start:st_end] -= depression
-
-    elif pathology == "brugada_type1":
-        # Coved ST elevation in V1-V2 with negative T wave
-        rr_samples = int(500 * 60.0 / hr)
-        for lead in ("V1", "V2"):
-            signal = ecg_data["leads"][lead]
-            n = len(signal)
-            for beat_start in range(0, n, rr_samples):
-                # Coved ST: sharp rise at J-point then downsloping
-                j_point = beat_start + int(rr_samples * 0.28)
-                st_end = beat_start + int(rr_samples * 0.55)
-                if st_end > n:
-                    break
-                seg_len = st_end - j_point
-                # Coved pattern: starts high, slopes down
-                coved = 0.25 * np.exp(-np.linspace(0, 3, seg_len))
-                signal[j_point:st_end] += coved
-                # Invert T wave
-                t_start = beat_start + int(rr_samples * 0.50)
-                t_end = beat_start + int(rr_samples * 0.70)
-                if t_end > n:
-                    break
-                signal[t_start:t_end] *= -0.8
-
-    elif pathology == "pericarditis":
-        # Diffuse concave-up ST elevation + PR depression + aVR ST depression
-        rr_samples = int(500 * 60.0 / hr)
-        diffuse_leads = ["I", "II", "III", "aVL", "aVF", "V2", "V3", "V4", "V5", "V6"]
-        for lead in diffuse_leads:
-            signal = ecg_data["leads"][lead]
-            n = len(signal)
-            for beat_start in range(0, n, rr_samples):
-                # Concave-up ST elevation (less than STEMI, more diffuse)
-                st_start = beat_start + int(rr_samples * 0.30)
-                st_end = beat_start + int(rr_samples * 0.55)
-                if st_end > n:
-                    break
-                seg_len = st_end - st_start
-                x = np.linspace(0, np.pi, seg_len)
-                concave_up = 0.12 * np.sin(x)  # concave up shape
-                signal[st_start:st_end] += concave_up
-                # PR depression
-                pr_start = beat_start + int(rr_samples * 0.12)
-                pr_end = beat_start + int(rr_samples * 0.20)
-                if pr_end > n:
-                    break
-                pr_seg = pr_end - pr_start
-                signal[pr_start:pr_end] -= 0.05 * np.ones(pr_seg)
-
-        # aVR: ST depression + PR elevation (mirror)
-        signal_avr = ecg_data["leads"]["aVR"]
-        n = len(signal_avr)
-        for beat_start in range(0, n, rr_samples):
-            st_start = beat_start + int(rr_samples * 0.30)
-            st_end = beat_start + int(rr_samples * 0.55)
-            if st_end > n:
-                break
-            seg_len = st_end - st_start
-            signal_avr[st_start:st_end] -= 0.15 * np.ones(seg_len)
-
-    elif pathology == "pe_pattern":
-        # S1Q3T3: deep S in I, Q in III, inverted T in III/V1-V3
-        rr_samples = int(500 * 60.0 / hr)
-        # Deep S in lead I
-        signal_i = ecg_data["leads"]["I"]
-        n = len(signal_i)
-        for beat_start in range(0, n, rr_samples):
-            s_center = beat_start + int(rr_samples * 0.25)
-            if s_center + 15 > n:
-                break
-            t_local = np.arange(30) - 15
-            s_deep = -0.35 * np.exp(-(t_local**2) / (2 * 6**2))
-            start = max(0, s_center - 15)
-            end = min(n, s_center + 15)
-            signal_i[start:end] += s_deep[:end - start]
-
-        # Q in III
-        signal_iii = ecg_data["leads"]["III"]
-        for beat_start in range(0, n, rr_samples):
-            q_center = beat_start + int(rr_samples * 0.19)
-            if q_center + 10 > n:
-                break
-            t_local = np.arange(20) - 10
-            q_wave = -0.25 * np.exp(-(t_local**2) / (2 * 4**2))
-            start = max(0, q_center - 10)
-            end = min(n, q_center + 10)
-            signal_iii[start:end] += q_wave[:end - start]
-
-        # Inverted T in III, V1-V3
-        for lead in ("III", "V1", "V2", "V3"):
-            signal = ecg_data["leads"][lead]
-            for beat_start in range(0, n, rr_samples):
-                t_start = beat_start + int(rr_samples * 0.50)
-                t_end = beat_start + int(rr_samples * 0.70)
-                if t_end > n:
-                    break
-                signal[t_start:t_end] *= -0.7
-
-    elif pathology == "lvh_strain":
-        # Tall R in V5-V6, deep S in V1-V2, ST depression + T inversion in laterals
-        rr_samples = int(500 * 60.0 / hr)
-        n = len(ecg_data["time"])
-        # Amplify R in V5-V6
-        for lead in ("V5", "V6"):
-            ecg_data["leads"][lead] *= 1.8
-        # Deep S in V1-V2
-        for lead in ("V1", "V2"):
-            signal = ecg_data["leads"][lead]
-            for beat_start in range(0, n, rr_samples):
-                # Deepen S wave region
-                s_start = beat_start + int(rr_samples * 0.22)
-                s_end = beat_start + int(rr_samples * 0.30)
-                if s_end > n:
-                    break
-                signal[s_start:s_end] -= 0.4
-
-        # Strain pattern in lateral leads: downsloping ST + asymmetric T inversion
-        for lead in ("I", "aVL", "V5", "V6"):
-            signal = ecg_data["leads"][lead]
-            for beat_start in range(0, n, rr_samples):
-                # Downsloping ST depression
-                st_start = beat_start + int(rr_samples * 0.32)
-                st_end = beat_start + int(rr_samples * 0.50)
-                if st_end > n:
-                    break
-                seg_len = st_end - st_start
-                downslopping = -np.linspace(0.05, 0.15, seg_len)
-                signal[st_start:st_end] += downslopping
-                # Asymmetric T inversion (slow descent, rapid return)
-                t_start = beat_start + int(rr_samples * 0.50)
-                t_end = beat_start + int(rr_samples * 0.70)
-                if t_end > n:
-                    break
-                signal[t_start:t_end] *= -0.6
-
-    elif pathology == "first_degree_avb":
-        pass  # PR already set to 240 ms via config
-
-    elif pathology == "rae":
-        # P pulmonale: peaked P ≥2.5 mm in II, III, aVF; narrow
-        rr_samples = int(500 * 60.0 / hr)
-        n = len(ecg_data["time"])
-        for lead in ("II", "III", "aVF"):
-            signal = ecg_data["leads"][lead]
-            for beat_start in range(0, n, rr_samples):
-                p_center = beat_start + int(rr_samples * 0.08)
-                if p_center + 20 > n:
-                    break
-                t_local = np.arange(40) - 20
-                # Tall, narrow, peaked P
-                peaked_p = 0.20 * np.exp(-(t_local**2) / (2 * 4**2))
-                start = max(0, p_center - 20)
-                end = min(n, p_center + 20)
-                signal[start:end] += peaked_p[:end - start]
-        # V1: biphasic P — positive first component
-        signal_v1 = ecg_data["leads"]["V1"]
-        for beat_start in range(0, n, rr_samples):
-            p_center = beat_start + int(rr_samples * 0.08)
-            if p_center + 20 > n:
-                break
-            t_local = np.arange(40) - 20
-            peaked_p = 0.15 * np.exp(-(t_local**2) / (2 * 4**2))
-            start = max(0, p_center - 20)
-            end = min(n, p_center + 20)
-            signal_v1[start:end] += peaked_p[:end - start]
-
-    elif pathology == "lae":
-        # P mitrale: notched/bifid P in II (duration ≥120 ms); deep negative terminal in V1
-        rr_samples = int(500 * 60.0 / hr)
-        n = len(ecg_data["time"])
-        for lead in ("I", "II", "aVL"):
-            signal = ecg_data["leads"][lead]
-            for beat_start in range(0, n, rr_samples):
-                p_start = beat_start + int(rr_samples * 0.04)
-                if p_start + 60 > n:
-                    break
-                t_local = np.arange(60)
-                # Two humps separated by slight dip → notched appearance
-                first_hump = 0.10 * np.exp(-((t_local - 15)**2) / (2 * 5**2))
-                second_hump = 0.08 * np.exp(-((t_local - 38)**2) / (2 * 5**2))
-                bifid_p = first_hump + second_hump
-                end = min(n, p_start + 60)
-                signal[p_start:end] += bifid_p[:end - p_start]
-        # V1: deep negative terminal component of P
-        signal_v1 = ecg_data["leads"]["V1"]
-        for beat_start in range(0, n, rr_samples):
-            p_center = beat_start + int(rr_samples * 0.09)
-            if p_center + 25 > n:
-                break
-            t_local = np.arange(50) - 25
-            neg_terminal = -0.12 * np.exp(-((t_local - 8)**2) / (2 * 5**2))
-            start = max(0, p_center - 25)
-            end = min(n, p_center + 25)
-            signal_v1[start:end] += neg_terminal[:end - start]
-
-    elif pathology == "rvh":
-        # R > S in V1, right axis (set via config), T inversion V1-V3 (strain)
-        rr_samples = int(500 * 60.0 / hr)
-        n = len(ecg_data["time"])
-        # Dominant R in V1
-        signal_v1 = ecg_data["leads"]["V1"]
-        for beat_start in range(0, n, rr_samples):
-            r_center = beat_start + int(rr_samples * 0.22)
-            if r_center + 20 > n:
-                break
-            t_local = np.arange(40) - 20
-            r_tall = 0.7 * np.exp(-(t_local**2) / (2 * 5**2))
-            start = max(0, r_center - 20)
-            end = min(n, r_center + 20)
-            signal_v1[start:end] += r_tall[:end - start]
-        # Strain: T inversion in V1-V3
-        for lead in ("V1", "V2", "V3"):
-            signal = ecg_data["leads"][lead]
-            for beat_start in range(0, n, rr_samples):
-                t_start = beat_start + int(rr_samples * 0.48)
-                t_end = beat_start + int(rr_samples * 0.68)
-                if t_end > n:
-                    break
-                signal[t_start:t_end] *= -0.7
-        # Deep S in V5-V6 (RVH hallmark)
-        for lead in ("V5", "V6"):
-            signal = ecg_data["leads"][lead]
-            for beat_start in range(0, n, rr_samples):
-                s_center = beat_start + int(rr_samples * 0.26)
-                if s_center + 15 > n:
-                    break
-                t_local = np.arange(30) - 15
-                s_deep = -0.35 * np.exp(-(t_local**2) / (2 * 6**2))
-                start = max(0, s_center - 15)
-                end = min(n, s_center + 15)
-                signal[start:end] += s_deep[:end - start]
-
-    elif pathology == "bav_mobitz1":
-        # Wenckebach: PR progressively lengthens over 3 beats then 1 dropped beat (4:3 pattern)
-        rr_samples = int(500 * 60.0 / hr)
-        n = len(ecg_data["time"])
-        wenckebach_pr_increments = [0, 30, 60]  # extra ms added per beat in cycle
-        cycle_len = 4  # 3 conducted + 1 dropped
-        beat_num = 0
-        for beat_start in range(0, n, rr_samples):
-            pos_in_cycle = beat_num % cycle_len
-            if pos_in_cycle == 3:
-                # Dropped beat: suppress QRS and T wave
-                qrs_start = beat_start + int(rr_samples * 0.20)
-                qrs_end = beat_start + int(rr_samples * 0.75)
-                if qrs_end > n:
-                    break
-                for lead_name in LEAD_NAMES:
-                    ecg_data["leads"][lead_name][qrs_start:qrs_end] *= 0.05
-            beat_num += 1
-
-    elif pathology == "bav_mobitz2":
-        # Fixed PR with sudden dropped beat every 3rd beat (3:2 pattern)
-        rr_samples = int(500 * 60.0 / hr)
-        n = len(ecg_data["time"])
-        cycle_len = 3  # 2 conducted + 1 dropped
-        beat_num = 0
-        for beat_start in range(0, n, rr_samples):
-            pos_in_cycle = beat_num % cycle_len
-            if pos_in_cycle == 2:
-                # Dropped beat: preserve P wave, suppress QRS+T
-                qrs_start = beat_start + int(rr_samples * 0.22)
-                qrs_end = beat_start + int(rr_samples * 0.75)
-                if qrs_end > n:
-                    break
-                for lead_name in LEAD_NAMES:
-                    ecg_data["leads"][lead_name][qrs_start:qrs_end] *= 0.04
-            beat_num += 1
-
-    elif pathology == "bav_complete":
-        # Complete AV block: P waves and QRS are independent (dissociated)
-        # The ecg is generated at escape rate ~40bpm; add extra P waves at atrial rate ~75bpm
-        rr_samples = int(500 * 60.0 / hr)  # ventricular escape: ~40bpm → large RR
-        n = len(ecg_data["time"])
-        atrial_rate_bpm = 80
-        p_rr = int(500 * 60.0 / atrial_rate_bpm)  # ~375 samples at 75bpm
-        # Superimpose independent P waves on the signal
-        for lead_name in LEAD_NAMES:
-            signal = ecg_data["leads"][lead_name]
-            p_amplitude = 0.12 if lead_name in ("II", "aVF", "I") else (-0.10 if lead_name == "aVR" else 0.06)
-            for p_start in range(0, n, p_rr):
-                p_center = p_start + int(p_rr * 0.5)
-                if p_center + 15 > n:
-                    break
-                t_local = np.arange(30) - 15
-                p_wave = p_amplitude * np.exp(-(t_local**2) / (2 * 5**2))
-                start = max(0, p_center - 15)
-                end = min(n, p_center + 15)
-                signal[start:end] += p_wave[:end - start]
-
-    elif pathology == "wellens_a":
-        # Wellens type A: biphasic T (positive→negative) in V2-V3
-        rr_samples = int(500 * 60.0 / hr)
-        n = len(ecg_data["time"])
-        for lead in ("V2", "V3"):
-            signal = ecg_data["leads"][lead]
-            for beat_start in range(0, n, rr_samples):
-                t_start = beat_start + int(rr_samples * 0.46)
-                t_mid = beat_start + int(rr_samples * 0.54)
-                t_end = beat_start + int(rr_samples * 0.68)
-                if t_end > n:
-                    break
-                # First half positive, second half negative
-                seg1 = t_mid - t_start
-                seg2 = t_end - t_mid
-                signal[t_start:t_mid] *= -0.4  # flatten existing T
-                signal[t_start:t_mid] += 0.08 * np.sin(np.linspace(0, np.pi, seg1))
-                signal[t_mid:t_end] = -0.12 * np.sin(np.linspace(0, np.pi, seg2))
-
-    elif pathology == "wellens_b":
-        # Wellens type B: deep symmetric T inversion in V2-V3 (± V1, V4)
-        rr_samples = int(500 * 60.0 / hr)
-        n = len(ecg_data["time"])
-        for lead in ("V1", "V2", "V3", "V4"):
-            signal = ecg_data["leads"][lead]
-            depth = {"V1": -0.25, "V2": -0.45, "V3": -0.40, "V4": -0.20}[lead]
-            for beat_start in range(0, n, rr_samples):
-                t_start = beat_start + int(rr_samples * 0.46)
-                t_end = beat_start + int(rr_samples * 0.70)
-                if t_end > n:
-                    break
-                seg_len = t_end - t_start
-                signal[t_start:t_end] *= 0.05  # suppress existing T
-                # Symmetric inverted T
-                x = np.linspace(0, np.pi, seg_len)
-                signal[t_start:t_end] += depth * np.sin(x)
-
-    elif pathology == "de_winter":
-        # De Winter: ST depression at J-point + tall upright T waves in V1-V4
-        rr_samples = int(500 * 60.0 / hr)
-        n = len(ecg_data["time"])
-        for lead in ("V1", "V2", "V3", "V4"):
-            signal = ecg_data["leads"][lead]
-            for beat_start in range(0, n, rr_samples):
-                # ST depression starting at J-point
-                st_start = beat_start + int(rr_samples * 0.28)
-                st_end = beat_start + int(rr_samples * 0.48)
-                if st_end > n:
-                    break
-                seg_len = st_end - st_start
-                depression = -np.linspace(0.1, 0.2, seg_len)
-                signal[st_start:st_end] += depression
-                # Tall, symmetric, upright T waves (taller than normal)
-                t_center = beat_start + int(rr_samples * 0.60)
-                if t_center + 30 > n:
-                    break
-                t_local = np.arange(60) - 30
-                tall_t = 0.5 * np.exp(-(t_local**2) / (2 * 10**2))
-                start = max(0, t_center - 30)
-                end = min(n, t_center + 30)
-                signal[start:end] += tall_t[:end - start]
-
-    elif pathology == "stemi_posterior":
-        # Posterior STEMI: mirror image → ST depression + tall R + upright T in V1-V4
-        rr_samples = int(500 * 60.0 / hr)
-        n = len(ecg_data["time"])
-        for lead in ("V1", "V2", "V3", "V4"):
-            signal = ecg_data["leads"][lead]
-            for beat_start in range(0, n, rr_samples):
-                # ST depression (mirror of posterior elevation)
-                st_start = beat_start + int(rr_samples * 0.32)
-                st_end = beat_start + int(rr_samples * 0.52)
-                if st_end > n:
-                    break
-                seg_len = st_end - st_start
-                depression = 0.20 * np.ones(seg_len)
-                ramp = min(10, seg_len)
-                depression[:ramp] = np.linspace(0, 0.20, ramp)
-                depression[-ramp:] = np.linspace(0.20, 0, ramp)
-                signal[st_start:st_end] -= depression
-                # Tall upright T (mirror of posterior T inversion)
-                t_center = beat_start + int(rr_samples * 0.58)
-                if t_center + 25 > n:
-                    break
-                t_local = np.arange(50) - 25
-                tall_t = 0.35 * np.exp(-(t_local**2) / (2 * 8**2))
-                start = max(0, t_center - 25)
-                end = min(n, t_center + 25)
-                signal[start:end] += tall_t[:end - start]
-        # Tall R (dominant) in V1-V2 → R/S ratio > 1
-        for lead in ("V1", "V2"):
-            signal = ecg_data["leads"][lead]
-            for beat_start in range(0, n, rr_samples):
-                r_center = beat_start + int(rr_samples * 0.22)
-                if r_center + 15 > n:
-                    break
-                t_local = np.arange(30) - 15
-                r_boost = 0.5 * np.exp(-(t_local**2) / (2 * 5**2))
-                start = max(0, r_center - 15)
-                end = min(n, r_center + 15)
-                signal[start:end] += r_boost[:end - start]
-
-    elif pathology == "stemi_avr":
-        # Left main / 3VD pattern: ST elevation in aVR + diffuse ST depression
-        rr_samples = int(500 * 60.0 / hr)
-        n = len(ecg_data["time"])
-        # ST elevation in aVR (and V1 as secondary)
-        for lead in ("aVR", "V1"):
-            signal = ecg_data["leads"][lead]
-            elev = 0.20 if lead == "aVR" else 0.10
-            for beat_start in range(0, n, rr_samples):
-                st_start = beat_start + int(rr_samples * 0.32)
-                st_end = beat_start + int(rr_samples * 0.52)
-                if st_end > n:
-                    break
-                seg_len = st_end - st_start
-                elevation = elev * np.ones(seg_len)
-                ramp = min(8, seg_len)
-                elevation[:ramp] = np.linspace(0, elev, ramp)
-                elevation[-ramp:] = np.linspace(elev, 0, ramp)
-                signal[st_start:st_end] += elevation
-        # Diffuse ST depression in all other leads
-        for lead in ("I", "II", "III", "aVL", "aVF", "V2", "V3", "V4", "V5", "V6"):
-            signal = ecg_data["leads"][lead]
-            for beat_start in range(0, n, rr_samples):
-                st_start = beat_start + int(rr_samples * 0.32)
-                st_end = beat_start + int(rr_samples * 0.52)
-                if st_end > n:
-                    break
-                seg_len = st_end - st_start
-                depression = 0.15 * np.ones(seg_len)
-                ramp = min(8, seg_len)
-                depression[:ramp] = np.linspace(0, 0.15, ramp)
-                depression[-ramp:] = np.linspace(0.15, 0, ramp)
-                signal[st_start:st_end] -= depression
-
-    elif pathology in ("sinus_bradycardia", "sinus_tachycardia"):
-        pass  # HR already set via config; normal morphology
-
-    elif pathology == "early_repolarization":
-        # Concave-up ST elevation with J-point notch in inferior/lateral leads
-        rr_samples = int(500 * 60.0 / hr)
-        for lead in ("II", "III", "aVF", "V4", "V5", "V6"):
-            signal = ecg_data["leads"][lead]
-            n = len(signal)
-            for beat_start in range(0, n, rr_samples):
-                # J-point notch
-                j_point = beat_start + int(rr_samples * 0.27)
-                if j_point + 8 > n:
-                    break
-                t_local = np.arange(16) - 8
-                notch = 0.08 * np.exp(-(t_local**2) / (2 * 3**2))
-                start = max(0, j_point - 8)
-                end = min(n, j_point + 8)
-                signal[start:end] += notch[:end - start]
-                # Subtle concave-up ST elevation
-                st_start = beat_start + int(rr_samples * 0.30)
-                st_end = beat_start + int(rr_samples * 0.50)
-                if st_end > n:
-                    break
-                seg_len = st_end - st_start
-                x = np.linspace(0, np.pi, seg_len)
-                elevation = 0.08 * np.sin(x)
-                signal[st_start:st_end] += elevation
+    # Apply pathology-specific overlays on the real beat grid
+    apply_overlays(ecg_data, _PATHOLOGY_OVERLAYS.get(pathology, []), rng=rng)
 
     ecg_data["pathology"] = pathology
     ecg_data["pathology_description_pt"] = config.get("description_pt", "ECG normal")
@@ -1283,8 +873,27 @@ def add_noise(signal: np.ndarray, snr_db: float = 20) -> np.ndarray:
 # ---------------------------------------------------------------------------
 
 
+def _minmax_decimate(
+    x: np.ndarray, y: np.ndarray, n_buckets: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Keep the min and max sample of each of *n_buckets* equal buckets (in time order).
+
+    With one bucket per pixel column the decimated line covers exactly the pixels
+    of the full-resolution one (QRS peaks and notches are never dropped).
+    """
+    n = len(y)
+    if n_buckets < 1 or n <= 2 * n_buckets:
+        return x, y
+    size = -(-n // n_buckets)
+    padded = np.pad(y, (0, size * n_buckets - n), mode="edge").reshape(n_buckets, size)
+    base = np.arange(n_buckets)[:, np.newaxis] * size
+    picks = np.minimum(base + np.stack([padded.argmin(axis=1), padded.argmax(axis=1)], axis=1), n - 1)
+    idx = np.unique(np.concatenate(([0], picks.ravel(), [n - 1])))
+    return x[idx], y[idx]
+
+
 def ecg_to_plotly_figure(ecg_data: dict, layout: str = "3x4",
-                         rhythm_strip: bool = True) -> "go.Figure":
+                         rhythm_strip: bool = True, render: str = "full") -> "go.Figure":
     """Convert ECG data to a Plotly figure with standard clinical format.
 
     Parameters
@@ -1295,6 +904,10 @@ def ecg_to_plotly_figure(ecg_data: dict, layout: str = "3x4",
         Layout format: "3x4" (standard), "6x2", or "12x1".
     rhythm_strip : bool
         If True and layout is "3x4", add a long rhythm strip (lead II) at bottom.
+    render : str
+        "full" — every sample as SVG ``Scatter`` (for export);
+        "webgl" — ``Scattergl`` traces decimated (min/max per pixel column) to the
+        pixel width of each subplot, float32 — a fraction of the payload for the browser.
 
     Returns
     -------
@@ -1303,6 +916,8 @@ def ecg_to_plotly_figure(ecg_data: dict, layout: str = "3x4",
     """
     if not HAS_PLOTLY:
         raise ImportError("Plotly is required for ecg_to_plotly_figure. pip install plotly")
+    if render not in ("full", "webgl"):
+        raise ValueError(f"Unknown render '{render}'. Use 'full' or 'webgl'.")
 
     time_arr = ecg_data["time"]
     leads_data = ecg_data["leads"]
@@ -1360,6 +975,22 @@ def ecg_to_plotly_figure(ecg_data: dict, layout: str = "3x4",
         specs=specs,
     )
 
+    width = 300 * cols
+    margin = dict(l=35, r=15, t=50, b=15)
+    if render == "webgl":
+        # Pixel width of one subplot / of the full-width rhythm strip
+        plot_px = width - margin["l"] - margin["r"]
+        cell_px = int(plot_px * (1 - 0.03 * (cols - 1)) / cols)
+
+        def trace(x, y, px, **kw):
+            x, y = _minmax_decimate(np.asarray(x), np.asarray(y), px)
+            return go.Scattergl(x=x.astype(np.float32), y=y.astype(np.float32), **kw)
+    else:
+        cell_px = plot_px = 0
+
+        def trace(x, y, px, **kw):
+            return go.Scatter(x=x, y=y, **kw)
+
     # Show 2.5 seconds per strip (standard clinical)
     t_max = min(2.5, time_arr[-1])
     mask = time_arr <= t_max
@@ -1368,9 +999,10 @@ def ecg_to_plotly_figure(ecg_data: dict, layout: str = "3x4",
         for c_idx, lead_name in enumerate(row_leads):
             signal = leads_data.get(lead_name, np.zeros_like(time_arr))
             fig.add_trace(
-                go.Scatter(
-                    x=time_arr[mask],
-                    y=signal[mask],
+                trace(
+                    time_arr[mask],
+                    signal[mask],
+                    cell_px,
                     mode="lines",
                     line=dict(color="#111111", width=1.2),
                     name=lead_name,
@@ -1387,9 +1019,10 @@ def ecg_to_plotly_figure(ecg_data: dict, layout: str = "3x4",
         # Show full 10s rhythm strip
         rhythm_mask = time_arr <= min(10.0, time_arr[-1])
         fig.add_trace(
-            go.Scatter(
-                x=time_arr[rhythm_mask],
-                y=signal_ii[rhythm_mask],
+            trace(
+                time_arr[rhythm_mask],
+                signal_ii[rhythm_mask],
+                plot_px,
                 mode="lines",
                 line=dict(color="#111111", width=1.2),
                 name="II (ritmo)",
@@ -1410,40 +1043,32 @@ def ecg_to_plotly_figure(ecg_data: dict, layout: str = "3x4",
     fig.update_layout(
         title=dict(text=title, font=dict(size=14, family="Arial")),
         height=180 * rows + 40,
-        width=300 * cols,
+        width=width,
         paper_bgcolor="#FFF5F5",
         plot_bgcolor="#FFF5F5",
         font=dict(size=9, family="Arial"),
-        margin=dict(l=35, r=15, t=50, b=15),
+        margin=margin,
     )
 
-    # ECG paper grid: major grid (5mm=0.2s/0.5mV) and styling
-    total_subplots = rows * cols
-    for i in range(1, total_subplots + 1):
-        r = (i - 1) // cols + 1
-        c = (i - 1) % cols + 1
-        # Skip None cells (colspan for rhythm strip)
-        if rhythm_strip and r == rows and c > 1:
-            continue
-        fig.update_xaxes(
-            showgrid=True,
-            gridcolor="rgba(220,100,100,0.35)",
-            dtick=0.2,
-            minor=dict(dtick=0.04, showgrid=True, gridcolor="rgba(220,100,100,0.12)"),
-            showticklabels=False,
-            zeroline=False,
-            row=r, col=c,
-        )
-        fig.update_yaxes(
-            showgrid=True,
-            gridcolor="rgba(220,100,100,0.35)",
-            dtick=0.5,
-            minor=dict(dtick=0.1, showgrid=True, gridcolor="rgba(220,100,100,0.12)"),
-            showticklabels=False,
-            zeroline=False,
-            range=[-1.5, 1.5],
-            row=r, col=c,
-        )
+    # ECG paper grid: major grid (5mm=0.2s/0.5mV) and styling — axis gridlines are
+    # layout-level (no traces); one update covers every subplot axis
+    fig.update_xaxes(
+        showgrid=True,
+        gridcolor="rgba(220,100,100,0.35)",
+        dtick=0.2,
+        minor=dict(dtick=0.04, showgrid=True, gridcolor="rgba(220,100,100,0.12)"),
+        showticklabels=False,
+        zeroline=False,
+    )
+    fig.update_yaxes(
+        showgrid=True,
+        gridcolor="rgba(220,100,100,0.35)",
+        dtick=0.5,
+        minor=dict(dtick=0.1, showgrid=True, gridcolor="rgba(220,100,100,0.12)"),
+        showticklabels=False,
+        zeroline=False,
+        range=[-1.5, 1.5],
+    )
 
     # Rhythm strip: show time labels
     if rhythm_strip:
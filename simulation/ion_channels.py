@@ -42,12 +42,15 @@ def _ghk_resting_potential(
     Vm = (RT/F) * ln((PK*Ko + PNa*Nao + PCl*Cli) / (PK*Ki + PNa*Nai + PCl*Clo))
 
     Default permeability ratios approximate ventricular myocyte at rest.
+    Concentrations may be arrays (one potential per condition).
     """
+    k_out, na_out = np.asarray(k_out, dtype=float), np.asarray(na_out, dtype=float)
     numerator = p_k * k_out + p_na * na_out + p_cl * cl_in
     denominator = p_k * k_in + p_na * na_in + p_cl * cl_out
-    if denominator <= 0 or numerator <= 0:
-        return -90.0
-    return _RT_F * np.log(numerator / denominator)
+    valid = (numerator > 0) & (denominator > 0)
+    ratio = np.where(valid, numerator / np.where(valid, denominator, 1.0), 1.0)
+    v = np.where(valid, _RT_F * np.log(ratio), -90.0)
+    return float(v) if v.ndim == 0 else v
 
 
 # ---------------------------------------------------------------------------
@@ -65,6 +68,23 @@ def _ina_availability(v_rest: float, v_half_inact: float = -70.0,
     return 1.0 / (1.0 + np.exp((v_rest - v_half_inact) / slope))
 
 
+def _ca_factor(ca_out: float, ca_normal: float = 2.2) -> float:
+    """Ca2+ modulation of ICaL relative to the normal extracellular level.
+
+    Hypercalcemia (> 1) shortens the plateau, hypocalcemia (< 1) prolongs it.
+    Works elementwise on arrays (one factor per condition).
+    """
+    return ca_out / ca_normal
+
+
+def _k_repol_factor(k_out: float, k_normal: float = 4.0) -> float:
+    """K+ modulation of the delayed rectifier conductances (IKr, IKs).
+
+    Scales with sqrt(Ko/Ko_normal); works elementwise on arrays.
+    """
+    return np.sqrt(k_out / k_normal)
+
+
 def _ito_current(dt_phase1: float, tau: float = 8.0,
                  g_to: float = 10.0) -> float:
     """Transient outward K+ current (Ito) – phase 1 notch.
@@ -219,7 +239,7 @@ class ActionPotentialModel:
         Hypercalcemia → increased ICaL inactivation rate → shortened plateau.
         Hypocalcemia → decreased ICaL → prolonged plateau.
         """
-        return self.ca_extra / self._CA_NORMAL
+        return _ca_factor(self.ca_extra, self._CA_NORMAL)
 
     def _compute_k_repol_factor(self) -> float:
         """K+ modulation of repolarizing currents (IKr, IKs).
@@ -227,7 +247,7 @@ class ActionPotentialModel:
         Hyperkalemia → increased IK conductance → faster repolarization.
         Hypokalemia → decreased IK conductance → slower repolarization.
         """
-        return np.sqrt(self.k_extra / self._K_NORMAL)
+        return _k_repol_factor(self.k_extra, self._K_NORMAL)
 
     # ------------------------------------------------------------------
     # Waveform generation
@@ -253,20 +273,58 @@ class ActionPotentialModel:
         np.ndarray
             1-D array of voltage values (mV-like units).
         """
+        return self.compute_waveform_batch(
+            self.k_extra, self.ca_extra, self.na_extra, duration_ms=duration_ms, fs=fs,
+        )[0]
+
+    @classmethod
+    def compute_waveform_batch(
+        cls,
+        k_extra: float | np.ndarray = 4.0,
+        ca_extra: float | np.ndarray = 2.2,
+        na_extra: float | np.ndarray = 140.0,
+        duration_ms: int = 1000,
+        fs: int = 1000,
+    ) -> np.ndarray:
+        """Action potentials for many ion conditions in one pass.
+
+        The concentrations broadcast against each other (e.g. a K+ sweep with
+        fixed Ca2+/Na+), one condition per row.  Each phase is evaluated on the
+        whole [condition, sample] grid and selected with boolean masks.
+
+        Parameters
+        ----------
+        k_extra, ca_extra, na_extra : float or array-like
+            Extracellular K+, Ca2+ and Na+ (mEq/L).
+        duration_ms : int
+            Duration of each waveform in milliseconds.
+        fs : int
+            Sampling frequency in Hz (samples per second).
+
+        Returns
+        -------
+        np.ndarray
+            Array of shape [n_conditions, n_samples].
+        """
+        k, ca, na = (np.asarray(x, dtype=float).reshape(-1, 1)
+                     for x in np.broadcast_arrays(k_extra, ca_extra, na_extra))
         n_samples = int(duration_ms * fs / 1000)
-        t = np.linspace(0, duration_ms, n_samples, endpoint=False)
+        t = np.linspace(0, duration_ms, n_samples, endpoint=False)[np.newaxis, :]
 
-        # --- Physiological parameters ---
-        v_rest = self._compute_resting_potential()
-        h_inf = self._compute_ina_availability()
-        ca_factor = self._compute_ca_factor()
-        k_repol = self._compute_k_repol_factor()
+        # --- Physiological parameters (one per condition, shape [C, 1]) ---
+        # Same module-level helpers as the _compute_* methods, evaluated on arrays
+        v_rest = _ghk_resting_potential(
+            k_out=k, na_out=na, cl_out=cls._CL_OUT,
+            k_in=cls._K_IN, na_in=cls._NA_IN, cl_in=cls._CL_IN,
+        )
+        h_inf = _ina_availability(v_rest)
+        ca_factor = _ca_factor(ca, cls._CA_NORMAL)
+        k_repol = _k_repol_factor(k, cls._K_NORMAL)
 
         # Na+ channel availability determines upstroke velocity and peak
         # Reduced availability → lower peak, slower upstroke → wider QRS
-        na_factor = self.na_extra / self._NA_NORMAL
-        v_peak = 20.0 * na_factor * h_inf  # INa-dependent overshoot
-        upstroke_speed = 5.0 / max(h_inf, 0.1)  # ms for phase 0
+        v_peak = 20.0 * (na / cls._NA_NORMAL) * h_inf  # INa-dependent overshoot
+        upstroke_speed = 5.0 / np.maximum(h_inf, 0.1)  # ms for phase 0
 
         # Phase 1: Ito notch depth (relatively constant)
         notch_depth = 10.0
@@ -274,86 +332,52 @@ class ActionPotentialModel:
         # Phase 2: ICaL plateau duration modulated by Ca2+
         # Hypercalcemia → faster ICaL inactivation → shorter plateau
         # Hypocalcemia → slower inactivation → longer plateau
-        ical_tau = 80.0 / max(ca_factor, 0.3)  # inactivation time constant
-        plateau_duration = 150.0 + 50.0 / max(ca_factor, 0.3)
+        ical_tau = 80.0 / np.maximum(ca_factor, 0.3)  # inactivation time constant
+        plateau_duration = 150.0 + 50.0 / np.maximum(ca_factor, 0.3)
 
         # Phase 3: IKr + IKs repolarization rate modulated by K+
         # Hyperkalemia → increased K+ conductance → faster repolarization
         # Hypokalemia → decreased conductance → slower repolarization
-        repol_duration = 150.0 / max(k_repol, 0.3)
+        repol_duration = 150.0 / np.maximum(k_repol, 0.3)
 
-        waveform = np.full(n_samples, v_rest)
-
-        # Depolarization onset at 50 ms
-        t_onset = 50.0
-
-        # Phase boundaries (ms relative to onset)
+        # Depolarization onset at 50 ms; phase boundaries relative to onset
+        dt = t - 50.0
         phase0_end = upstroke_speed
         phase1_end = phase0_end + 10.0
         phase2_end = phase1_end + plateau_duration
         phase3_end = phase2_end + repol_duration
 
-        for i, ti in enumerate(t):
-            dt = ti - t_onset
-            if dt < 0:
-                # Phase 4 (pre-depolarization): IK1 maintains resting potential
-                continue
-            elif dt < phase0_end:
-                # Phase 0: Fast INa rapid depolarization
-                # Voltage-gated Na+ channels open at threshold (~-70 mV)
-                frac = dt / phase0_end
-                # Sigmoidal upstroke shape
-                waveform[i] = v_rest + (v_peak - v_rest) * (
-                    3 * frac ** 2 - 2 * frac ** 3  # smooth step
-                )
-            elif dt < phase1_end:
-                # Phase 1: Ito transient outward K+ current
-                dt1 = dt - phase0_end
-                ito = _ito_current(dt1, tau=8.0, g_to=notch_depth)
-                waveform[i] = v_peak - ito * (dt1 / 10.0)
-            elif dt < phase2_end:
-                # Phase 2: ICaL vs IKr plateau balance
-                dt2 = dt - phase1_end
-                plateau_start_v = v_peak - notch_depth * 0.5
-
-                # ICaL provides inward (depolarizing) current
-                i_cal = _ical_plateau(dt2, tau_inact=ical_tau,
-                                      ca_factor=ca_factor)
-                # IKr provides outward (repolarizing) current
-                i_kr = _ikr_current(dt2, tau_act=50.0, k_factor=k_repol)
-
-                # Net current determines plateau drift
-                net_current = i_cal - i_kr
-                plateau_decay = 0.03 * dt2 * (1.0 - net_current / 2.0)
-                waveform[i] = plateau_start_v - plateau_decay
-            elif dt < phase3_end:
-                # Phase 3: IKr + IKs drive repolarization
-                dt3 = dt - phase2_end
-                # Voltage at start of phase 3
-                dt2_total = plateau_duration
-                i_cal_end = _ical_plateau(dt2_total, tau_inact=ical_tau,
-                                          ca_factor=ca_factor)
-                i_kr_end = _ikr_current(dt2_total, tau_act=50.0,
-                                        k_factor=k_repol)
-                net_end = i_cal_end - i_kr_end
-                plateau_start_v = v_peak - notch_depth * 0.5
-                start_v = plateau_start_v - 0.03 * dt2_total * (
-                    1.0 - net_end / 2.0)
-
-                frac = dt3 / repol_duration
-                frac = min(frac, 1.0)
-
-                # Combined IKr + IKs repolarization with power-law shape
-                # IKs slowly activating component gives characteristic shape
-                iks_component = _iks_current(dt3, tau_act=repol_duration * 0.6,
-                                             k_factor=k_repol)
-                repol_shape = frac ** (0.8 + 0.4 * iks_component)
-                waveform[i] = start_v + (v_rest - start_v) * repol_shape
-            else:
-                # Phase 4: IK1 maintains resting potential
-                waveform[i] = v_rest
-
-        return waveform
+        # Phase 0: Fast INa rapid depolarization (sigmoidal smooth step)
+        frac0 = dt / phase0_end
+        phase0 = v_rest + (v_peak - v_rest) * (3 * frac0 ** 2 - 2 * frac0 ** 3)
+
+        # Phase 1: Ito transient outward K+ current
+        dt1 = dt - phase0_end
+        phase1 = v_peak - _ito_current(dt1, tau=8.0, g_to=notch_depth) * (dt1 / 10.0)
+
+        # Phase 2: ICaL (inward) vs IKr (outward) plateau balance
+        plateau_start_v = v_peak - notch_depth * 0.5
+        dt2 = dt - phase1_end
+        net_current = (_ical_plateau(dt2, tau_inact=ical_tau, ca_factor=ca_factor)
+                       - _ikr_current(dt2, tau_act=50.0, k_factor=k_repol))
+        phase2 = plateau_start_v - 0.03 * dt2 * (1.0 - net_current / 2.0)
+
+        # Phase 3: IKr + IKs drive repolarization from the end-of-plateau voltage
+        net_end = (_ical_plateau(plateau_duration, tau_inact=ical_tau, ca_factor=ca_factor)
+                   - _ikr_current(plateau_duration, tau_act=50.0, k_factor=k_repol))
+        start_v = plateau_start_v - 0.03 * plateau_duration * (1.0 - net_end / 2.0)
+        dt3 = np.maximum(dt - phase2_end, 0.0)
+        frac3 = np.minimum(dt3 / repol_duration, 1.0)
+        # IKs slowly activating component gives the characteristic power-law shape
+        iks_component = _iks_current(dt3, tau_act=repol_duration * 0.6, k_factor=k_repol)
+        phase3 = start_v + (v_rest - start_v) * frac3 ** (0.8 + 0.4 * iks_component)
+
+        # Phase 4 (before onset and after repolarization): IK1 holds the resting potential
+        return np.select(
+            [dt < 0, dt < phase0_end, dt < phase1_end, dt < phase2_end, dt < phase3_end],
+            [v_rest, phase0, phase1, phase2, phase3],
+            default=v_rest,
+        )
 
     # ------------------------------------------------------------------
     # ECG-level effects summary
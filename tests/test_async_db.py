@@ -0,0 +1,145 @@
+"""Tests for the async SQLite facade (persistence.async_db)."""
+
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import threading
+
+import pytest
+
+from persistence.async_db import AsyncDatabase
+from persistence.database import Database
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "async.db")
+    sync = Database(path)
+    sync.init_schema()
+    sync.close()
+    return path
+
+
+def test_reads_and_writes_through_facade(db_path):
+    async def scenario():
+        async with AsyncDatabase(db_path, readers=2) as adb:
+            user = await adb.create_user("ana", "ana@example.com", "hash")
+            result = {"score": 8, "total": 10, "details": {"q1": True}}
+            rid = await adb.save_quiz_result(user["id"], result)
+            history = await adb.get_quiz_history(user["id"])
+            fetched = await adb.get_user("ana")
+            return rid, history, fetched
+
+    rid, history, fetched = _run(scenario())
+    assert history[0]["id"] == rid and history[0]["details"] == {"q1": True}
+    assert fetched["email"] == "ana@example.com"
+
+
+def test_reads_use_bounded_reader_pool(db_path):
+    threads = set()
+
+    async def scenario():
+        async with AsyncDatabase(db_path, readers=3) as adb:
+            def probe():
+                threads.add(threading.current_thread().name)
+                return adb.db.get_user("nobody")
+
+            results = await asyncio.gather(*(adb.read(probe) for _ in range(30)))
+            return results, len(adb.db._conns)
+
+    results, n_conns = _run(scenario())
+    assert results == [None] * 30
+    assert 1 <= len(threads) <= 3 and all(t.startswith("ecgiga-db-read") for t in threads)
+    assert n_conns <= 3
+
+
+def test_coalesced_inserts_share_one_transaction(db_path):
+    async def scenario():
+        async with AsyncDatabase(db_path, coalesce_ms=50) as adb:
+            user = await adb.create_user("bia", "bia@example.com", "hash")
+            before = dict(adb.stats)
+            ids = await asyncio.gather(
+                *(adb.save_quiz_result(user["id"], {"score": i, "total": 10}) for i in range(40)),
+                *(adb.save_study_session(user["id"], {"topic": "st", "duration_s": i})
+                  for i in range(10)),
+            )
+            history = await adb.get_quiz_history(user["id"], limit=100)
+            sessions = await adb.get_study_sessions(user["id"])
+            return ids, history, sessions, before, dict(adb.stats)
+
+    ids, history, sessions, before, after = _run(scenario())
+    assert len(set(ids)) == 50
+    assert len(history) == 40 and len(sessions) == 10
+    assert after["writes"] - before["writes"] == 50
+    assert after["transactions"] - before["transactions"] <= 4
+
+
+def test_coalesced_failure_is_isolated(db_path):
+    async def scenario():
+        async with AsyncDatabase(db_path, coalesce_ms=50) as adb:
+            user = await adb.create_user("caio", "caio@example.com", "hash")
+            results = await asyncio.gather(
+                adb.save_quiz_result(user["id"], {"score": 1, "total": 1}),
+                adb.save_quiz_result("missing-user", {"score": 1, "total": 1}),
+                adb.save_quiz_result(user["id"], {"score": 2, "total": 1}),
+                return_exceptions=True,
+            )
+            return results, await adb.get_quiz_history(user["id"])
+
+    results, history = _run(scenario())
+    assert isinstance(results[1], sqlite3.IntegrityError)
+    assert isinstance(results[0], str) and isinstance(results[2], str)
+    assert len(history) == 2
+
+
+def test_write_errors_propagate_and_close_rejects_writes(db_path):
+    async def scenario():
+        adb = AsyncDatabase(db_path)
+        await adb.create_user("duda", "duda@example.com", "hash")
+        with pytest.raises(sqlite3.IntegrityError):
+            await adb.create_user("duda", "other@example.com", "hash")
+        await adb.close()
+        with pytest.raises(RuntimeError):
+            await adb.save_report("x", {})
+        assert adb.db._conns == []
+
+    _run(scenario())
+
+
+def test_batch_insert_methods(db_path):
+    db = Database(db_path)
+    user = db.create_user("eva", "eva@example.com", "hash")
+    ids = db.save_quiz_results([(user["id"], {"score": i, "total": 5}) for i in range(5)])
+    assert len(ids) == 5 and len(db.get_quiz_history(user["id"])) == 5
+    with pytest.raises(sqlite3.IntegrityError):
+        db.save_study_sessions([(user["id"], {"topic": "a"}), ("missing-user", {"topic": "b"})])
+    assert db.get_study_sessions(user["id"]) == []  # whole batch rolled back
+    db.close()
+
+
+@pytest.mark.parametrize("coalesce_ms", [0, 5])
+def test_cancelled_write_does_not_kill_writer(db_path, coalesce_ms):
+    async def scenario():
+        async with AsyncDatabase(db_path, coalesce_ms=coalesce_ms) as adb:
+            user = await adb.create_user("fabi", "fabi@example.com", "hash")
+            # keep the writer busy so the next write is still queued when cancelled
+            release = threading.Event()
+            adb.db.init_schema = lambda: release.wait(5)
+            busy = asyncio.ensure_future(adb.init_schema())
+            cancelled = asyncio.ensure_future(adb.save_quiz_result(user["id"], {"score": 1}))
+            await asyncio.sleep(0.02)
+            cancelled.cancel()
+            await asyncio.sleep(0.01)
+            release.set()
+            await busy
+            rid = await asyncio.wait_for(adb.save_quiz_result(user["id"], {"score": 2}), timeout=5)
+            return cancelled, rid, await adb.get_quiz_history(user["id"])
+
+    cancelled, rid, history = _run(scenario())
+    assert cancelled.cancelled()
+    assert [h["id"] for h in history] == [rid]
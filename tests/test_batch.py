@@ -0,0 +1,93 @@
+"""Tests for cv.batch (batch image ingestion with resume)."""
+
+import json
+import shutil
+
+from cv.batch import analyze_image, ingest_batch, iter_batch_inputs, report_path_for
+
+
+def _folder(tmp_path, synthetic_12lead_path, n=2):
+    d = tmp_path / "imgs"
+    (d / "sub").mkdir(parents=True)
+    shutil.copy(synthetic_12lead_path, d / "a.png")
+    for i in range(1, n):
+        shutil.copy(synthetic_12lead_path, d / "sub" / f"b{i}.png")
+    (d / "notes.txt").write_text("ignorar")
+    return d
+
+
+def test_analyze_image_sections(synthetic_12lead_path):
+    res = analyze_image(synthetic_12lead_path, {"deskew": False, "normalize": False})
+    assert len(res["segmentation"]["leads"]) == 12
+    assert res["rpeaks"]["lead_used"] == "II"
+    assert res["intervals"] is not None and res["axis"] is not None
+    assert res["intervals_refined"] is None
+
+
+def test_iter_inputs_dir_and_manifest(tmp_path, synthetic_12lead_path):
+    d = _folder(tmp_path, synthetic_12lead_path)
+    assert [k for k, _ in iter_batch_inputs(d)] == ["a.png", "sub/b1.png"]
+    man = tmp_path / "m.jsonl"
+    man.write_text("\n".join(json.dumps(r) for r in [
+        {"id": "ok1", "type": "image", "file_name": "a.png"},
+        {"id": "svg", "type": "image", "file_name": "x.svg"},
+        {"id": "ds", "type": "dataset", "file_name": "y.png"},
+    ]) + "\n")
+    items = iter_batch_inputs(man, images_dir=d)
+    assert items == [("ok1", d / "a.png")]
+    assert report_path_for("sub/b1.png", tmp_path).name.startswith("sub__b1.png-")
+
+
+def test_report_paths_do_not_collide(tmp_path):
+    keys = ["a.png", "a.jpg", "sub/b1.png", "sub__b1.png", "a b.png", "a_b.png"]
+    names = {report_path_for(k, tmp_path).name for k in keys}
+    assert len(names) == len(keys)
+    assert report_path_for("a.png", tmp_path) == report_path_for("a.png", tmp_path)
+
+
+def test_ingest_batch_reports_and_resume(tmp_path, synthetic_12lead_path):
+    d = _folder(tmp_path, synthetic_12lead_path)
+    (d / "broken.png").write_bytes(b"not an image")
+    out = tmp_path / "out"
+    opts = {"deskew": False, "normalize": False}
+    res = ingest_batch(d, out, options=opts, workers=1)
+    assert (res["ok"], res["error"], res["skipped"]) == (2, 1, 0)
+    rows = [json.loads(l) for l in (out / "summary.jsonl").read_text().splitlines()]
+    assert {r["key"]: r["status"] for r in rows} == {"a.png": "ok", "broken.png": "error", "sub/b1.png": "ok"}
+    rep = json.loads(report_path_for("a.png", out).read_text())
+    assert rep["status"] == "ok" and len(rep["segmentation"]["leads"]) == 12
+    # Re-execução: só a imagem com erro é reprocessada
+    res2 = ingest_batch(d, out, options=opts, workers=1)
+    assert (res2["processed"], res2["skipped"], res2["error"]) == (1, 2, 1)
+    # Arquivo modificado invalida o laudo anterior
+    shutil.copy(synthetic_12lead_path, d / "a.png")
+    (d / "a.png").write_bytes((d / "a.png").read_bytes() + b"\0")
+    assert ingest_batch(d, out, options=opts, workers=1, resume=True)["skipped"] == 1
+
+
+def test_resume_invalidated_by_options_and_version(tmp_path, synthetic_12lead_path, monkeypatch):
+    import cv.batch as batch
+
+    d = _folder(tmp_path, synthetic_12lead_path)
+    out = tmp_path / "out"
+    opts = {"deskew": False, "normalize": False}
+    ingest_batch(d, out, options=opts, workers=1)
+    assert ingest_batch(d, out, options=opts, workers=1)["skipped"] == 2
+    # Opções efetivas diferentes (explícitas iguais ao padrão continuam válidas)
+    assert ingest_batch(d, out, options={**opts, "axis": True}, workers=1)["skipped"] == 2
+    res = ingest_batch(d, out, options={**opts, "axis": False}, workers=1)
+    assert (res["skipped"], res["processed"]) == (0, 2)
+    monkeypatch.setattr(batch, "BATCH_VERSION", "batch-test")
+    assert ingest_batch(d, out, options={**opts, "axis": False}, workers=1)["skipped"] == 0
+
+
+def test_ingest_batch_process_pool_matches_serial(tmp_path, synthetic_12lead_path):
+    d = _folder(tmp_path, synthetic_12lead_path, n=3)
+    opts = {"deskew": False, "normalize": False}
+    ingest_batch(d, tmp_path / "serial", options=opts, workers=1)
+    res = ingest_batch(d, tmp_path / "pool", options=opts, workers=2, chunksize=1)
+    assert res["ok"] == 3
+    for key in ("a.png", "sub/b1.png", "sub/b2.png"):
+        a = json.loads(report_path_for(key, tmp_path / "serial").read_text())
+        b = json.loads(report_path_for(key, tmp_path / "pool").read_text())
+        assert a["rpeaks"] == b["rpeaks"] and a["axis"] == b["axis"]
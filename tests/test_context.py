@@ -0,0 +1,87 @@
+"""Tests for cv.context (shared per-image analysis context)."""
+
+import numpy as np
+from cv import context as ctx_mod
+from cv.context import ECGImageContext, as_context
+from cv.rhythm import analyze_rhythm
+from cv.axis_hexaxial import hexaxial_axis_from_image
+from cv.precordial_transition import analyze_transition
+from cv.lvh_checklist import lvh_checklist
+
+
+def test_context_from_array_and_path(synthetic_12lead, synthetic_12lead_path):
+    a = ECGImageContext(synthetic_12lead)
+    b = ECGImageContext.from_path(synthetic_12lead_path)
+    assert a.rgb.shape == synthetic_12lead.shape + (3,)
+    assert np.array_equal(a.gray, b.gray)
+    assert a.bbox == b.bbox
+    assert len(a.leads()) == 12
+
+
+def test_as_context_reuses_instance(synthetic_12lead_path):
+    ctx = ECGImageContext.from_path(synthetic_12lead_path)
+    assert as_context(ctx) is ctx
+    assert isinstance(as_context(synthetic_12lead_path), ECGImageContext)
+
+
+def test_context_memoizes_stages(monkeypatch, synthetic_12lead_path):
+    calls = {"grid": 0, "seg": 0}
+    real_grid, real_seg = ctx_mod.estimate_grid_period_px, ctx_mod.segment_layout
+
+    def grid(arr):
+        calls["grid"] += 1
+        return real_grid(arr)
+
+    def seg(*a, **k):
+        calls["seg"] += 1
+        return real_seg(*a, **k)
+
+    monkeypatch.setattr(ctx_mod, "estimate_grid_period_px", grid)
+    monkeypatch.setattr(ctx_mod, "segment_layout", seg)
+    ctx = ECGImageContext.from_path(synthetic_12lead_path)
+    analyze_rhythm(ctx)
+    hexaxial_axis_from_image(ctx)
+    analyze_transition(ctx)
+    lvh_checklist(ctx)
+    assert calls == {"grid": 1, "seg": 1}
+    assert ctx.trace("II") is ctx.trace("II")
+    assert ctx.rpeaks("II") is ctx.rpeaks("II")
+
+
+def test_analyzers_same_result_with_path_or_context(synthetic_12lead_path):
+    ctx = ECGImageContext.from_path(synthetic_12lead_path)
+    assert analyze_rhythm(synthetic_12lead_path) == analyze_rhythm(ctx)
+    assert analyze_transition(synthetic_12lead_path) == analyze_transition(ctx)
+    assert lvh_checklist(synthetic_12lead_path) == lvh_checklist(ctx)
+    assert hexaxial_axis_from_image(synthetic_12lead_path)["angle_deg"] == \
+        hexaxial_axis_from_image(ctx)["angle_deg"]
+
+
+def test_context_rpeaks_methods(synthetic_12lead_path):
+    ctx = ECGImageContext.from_path(synthetic_12lead_path)
+    assert ctx.rpeaks("II")["method"] == "pan_tompkins_like"
+    assert ctx.rpeaks("II", method="zscore_localmax")["method"] == "zscore_localmax"
+
+
+def test_context_stage_timings(synthetic_12lead_path):
+    ctx = ECGImageContext.from_path(synthetic_12lead_path)
+    ctx.rpeaks("II")
+    assert list(ctx.timings.as_ms()) == ["decode", "segment", "trace", "grid", "peaks"]
+    assert ctx.timings.counts["segment"] == 2  # bbox + layout
+
+
+def test_stage_timings_nested_are_exclusive():
+    import time
+    from cv.profiling import StageTimings
+    prof = StageTimings()
+    t0 = time.perf_counter()
+    with prof.stage("outer"):
+        time.sleep(0.02)
+        with prof.stage("inner"):
+            time.sleep(0.03)
+    wall = time.perf_counter() - t0
+    # Só exclusividade (sem limite superior de relógio): outer não inclui o tempo de inner
+    assert prof.totals["inner"] >= 0.03
+    assert prof.totals["outer"] >= 0.015
+    assert prof.totals["outer"] + prof.totals["inner"] <= wall
+    assert abs(prof.total - (prof.totals["outer"] + prof.totals["inner"])) < 1e-12
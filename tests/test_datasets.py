@@ -165,3 +165,250 @@ class TestFilterByDiagnosis:
         assert "scp_codes" in result.columns
         assert "age" in result.columns
         assert "sex" in result.columns
+
+
+# ---------------------------------------------------------------------------
+# Metadata index (process-wide + disk cache)
+# ---------------------------------------------------------------------------
+
+class TestMetadataIndex:
+    """Tests for the cached PTB-XL metadata index."""
+
+    @pytest.fixture
+    def ptbxl_dir(self, tmp_path):
+        from datasets.ptbxl import clear_metadata_cache
+
+        clear_metadata_cache()
+        pd.DataFrame({
+            "ecg_id": [10, 11, 12, 13],
+            "age": [50, 60, 70, 80],
+            "scp_codes": [
+                "{'NORM': 100.0}",
+                "{'IMI': 80.0, 'MI': 100.0}",
+                "{'NORM': 50.0, 'SR': 0.0}",
+                "{'MI': 100.0}",
+            ],
+        }).to_csv(tmp_path / "ptbxl_database.csv", index=False)
+        yield tmp_path
+        clear_metadata_cache()
+
+    def test_index_lookups(self, ptbxl_dir):
+        from datasets.ptbxl import _get_labels_for_record, get_metadata_index
+
+        index = get_metadata_index(str(ptbxl_dir))
+        assert list(index.ids_with("MI")) == [11, 13]
+        assert index.ids_with("XXXXX").size == 0
+        assert index.labels(11) == ["IMI", "MI"]
+        assert _get_labels_for_record(ptbxl_dir, 12) == ["NORM", "SR"]
+        assert _get_labels_for_record(ptbxl_dir, 99) == []
+        assert len(index.codes) == 6
+
+    def test_filter_uses_index_and_matches_scan(self, ptbxl_dir):
+        from datasets.ptbxl import filter_by_diagnosis, load_ptbxl_metadata
+
+        df = load_ptbxl_metadata(str(ptbxl_dir))
+        for code in ("NORM", "MI", "SR", "XXXXX"):
+            fast = filter_by_diagnosis(df, code)
+            slow = filter_by_diagnosis(df.copy(), code)
+            pd.testing.assert_frame_equal(fast, slow)
+
+    def test_parsed_once_per_process(self, ptbxl_dir, monkeypatch):
+        import datasets.ptbxl as ptbxl
+
+        first = ptbxl.load_ptbxl_metadata(str(ptbxl_dir))
+        monkeypatch.setattr(ptbxl, "_parse_metadata_csv", lambda p: pytest.fail("CSV relido"))
+        assert ptbxl.load_ptbxl_metadata(str(ptbxl_dir)) is first
+
+    def test_disk_cache_reused_and_invalidated_by_mtime(self, ptbxl_dir, monkeypatch):
+        import os
+
+        import datasets.ptbxl as ptbxl
+
+        ptbxl.get_metadata_index(str(ptbxl_dir))
+        assert (ptbxl_dir / "ptbxl_database.index.json").exists()
+        ptbxl.clear_metadata_cache()
+        parse = ptbxl._parse_metadata_csv
+        calls = []
+        monkeypatch.setattr(ptbxl, "_parse_metadata_csv", lambda p: calls.append(p) or parse(p))
+        index = ptbxl.get_metadata_index(str(ptbxl_dir))
+        assert calls == [] and index.labels(13) == ["MI"]
+
+        csv = ptbxl_dir / "ptbxl_database.csv"
+        csv.write_text(csv.read_text().replace("{'MI': 100.0}", "{'AFIB': 100.0}"))
+        st = csv.stat()
+        os.utime(csv, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        index = ptbxl.get_metadata_index(str(ptbxl_dir))
+        assert len(calls) == 1 and index.labels(13) == ["AFIB"]
+        assert list(index.ids_with("MI")) == [11]
+
+    def test_corrupt_disk_cache_falls_back_to_csv(self, ptbxl_dir):
+        import datasets.ptbxl as ptbxl
+
+        first = ptbxl.get_metadata_index(str(ptbxl_dir))
+        cache_files = [p for p in ptbxl_dir.glob("ptbxl_database.index.*")
+                       if p.name != "ptbxl_database.index.json"]
+        assert cache_files and not list(ptbxl_dir.glob("*.pickle"))
+        for path in cache_files:
+            path.write_bytes(path.read_bytes()[:7])  # truncated write
+        ptbxl.clear_metadata_cache()
+        index = ptbxl.get_metadata_index(str(ptbxl_dir))
+        pd.testing.assert_frame_equal(index.metadata, first.metadata)
+        pd.testing.assert_frame_equal(index.codes, first.codes)
+
+
+# ---------------------------------------------------------------------------
+# Record path resolver
+# ---------------------------------------------------------------------------
+
+class TestRecordResolver:
+    """Tests for the file index behind load_record."""
+
+    @pytest.fixture
+    def ptbxl_tree(self, tmp_path):
+        import datasets.physionet as physionet
+
+        physionet._RECORD_INDEXES.clear()
+        physionet._INDEX_STAMPS.clear()
+        for rel in ("records100/00000/00001_lr", "records500/00000/00001_hr",
+                    "records500/00000/00002_hr", "ptb-xl/records100/00000/00002_lr",
+                    "ptb-xl/records100/00000/00001_lr"):
+            (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / f"{rel}.hea").write_text("")
+        yield tmp_path
+        physionet._RECORD_INDEXES.clear()
+        physionet._INDEX_STAMPS.clear()
+
+    def test_index_maps_ids_to_resolutions(self, ptbxl_tree):
+        from datasets.ptbxl import build_record_index
+
+        index = build_record_index(str(ptbxl_tree))
+        assert index[1] == {100: ptbxl_tree.resolve() / "records100/00000/00001_lr",
+                            500: ptbxl_tree.resolve() / "records500/00000/00001_hr"}
+        assert index[2][100].parts[-4] == "ptb-xl"
+        assert (ptbxl_tree / "records.index.json").exists()
+
+    def test_resolution_argument(self, ptbxl_tree):
+        from datasets.ptbxl import resolve_record_path
+
+        assert resolve_record_path(str(ptbxl_tree), 1).name == "00001_lr"
+        assert resolve_record_path(str(ptbxl_tree), "00001", resolution=500).name == "00001_hr"
+        with pytest.raises(ValueError):
+            resolve_record_path(str(ptbxl_tree), 1, resolution=250)
+        with pytest.raises(FileNotFoundError):
+            resolve_record_path(str(ptbxl_tree), 3)
+
+    def test_disk_index_reused_then_rescanned_when_stale(self, ptbxl_tree, monkeypatch):
+        import datasets.physionet as physionet
+        from datasets.ptbxl import resolve_record_path
+
+        resolve_record_path(str(ptbxl_tree), 1)
+        physionet._RECORD_INDEXES.clear()
+        physionet._INDEX_STAMPS.clear()
+        scan = physionet.scan_records
+        calls = []
+        monkeypatch.setattr(physionet, "scan_records", lambda b: calls.append(b) or scan(b))
+        assert resolve_record_path(str(ptbxl_tree), 2, resolution=500).name == "00002_hr"
+        assert calls == []
+
+        (ptbxl_tree / "records500/00000/00003_hr.hea").write_text("")
+        assert resolve_record_path(str(ptbxl_tree), 3).name == "00003_hr"
+        assert len(calls) == 1
+
+    def test_long_lived_process_sees_records_added_later(self, ptbxl_tree, monkeypatch):
+        import datasets.physionet as physionet
+        from datasets.ptbxl import resolve_record_path
+
+        assert resolve_record_path(str(ptbxl_tree), 1).name == "00001_lr"
+        # record copied in its canonical place after the first resolve
+        (ptbxl_tree / "records100/00000/00004_lr.hea").write_text("")
+        assert resolve_record_path(str(ptbxl_tree), 4).name == "00004_lr"
+        # another process finished a download (index file removed) with a non-canonical layout
+        (ptbxl_tree / "extra").mkdir()
+        (ptbxl_tree / "extra/00005_lr.hea").write_text("")
+        (ptbxl_tree / "records.index.json").unlink()
+        assert resolve_record_path(str(ptbxl_tree), 5).parts[-2] == "extra"
+        # a fresh index is not rescanned for records that simply do not exist
+        scan = physionet.scan_records
+        calls = []
+        monkeypatch.setattr(physionet, "scan_records", lambda b: calls.append(b) or scan(b))
+        with pytest.raises(FileNotFoundError):
+            resolve_record_path(str(ptbxl_tree), 6)
+        assert calls == []
+        (ptbxl_tree / "extra/00006_hr.hea").write_text("")
+        assert resolve_record_path(str(ptbxl_tree), 6, refresh=True).name == "00006_hr"
+
+    def test_find_record_rescans_on_new_record(self, ptbxl_tree):
+        from datasets.physionet import find_record
+
+        assert find_record(ptbxl_tree, "records100/00000/00001_lr").name == "00001_lr"
+        (ptbxl_tree / "records100/00000/00007_lr.hea").write_text("")
+        assert find_record(ptbxl_tree, "records100/00000/00007_lr").name == "00007_lr"
+        with pytest.raises(FileNotFoundError):
+            find_record(ptbxl_tree, "records100/00000/00008_lr")
+
+
+# ---------------------------------------------------------------------------
+# Memory-mapped signal store
+# ---------------------------------------------------------------------------
+
+class TestSignalStore:
+    """Tests for pack_dataset / SignalStore against real WFDB files."""
+
+    @pytest.fixture
+    def ptbxl_wfdb(self, tmp_path):
+        import numpy as np
+        import datasets.physionet as physionet
+        from datasets.ptbxl import clear_metadata_cache
+
+        wfdb = pytest.importorskip("wfdb")
+        physionet._RECORD_INDEXES.clear()
+        physionet._INDEX_STAMPS.clear()
+        clear_metadata_cache()
+        rng = np.random.default_rng(0)
+        for ecg_id, n in ((1, 1000), (2, 800), (3, 1000)):
+            folder = tmp_path / "records100" / "00000"
+            folder.mkdir(parents=True, exist_ok=True)
+            wfdb.wrsamp(f"{ecg_id:05d}_lr", fs=100, units=["mV"] * 3, sig_name=["I", "II", "V1"],
+                        p_signal=rng.normal(0, 0.5, (n, 3)), fmt=["16"] * 3, write_dir=str(folder))
+        pd.DataFrame({"ecg_id": [1, 2, 3], "scp_codes": ["{'NORM': 100.0}", "{'MI': 100.0}",
+                                                         "{'MI': 50.0, 'SR': 0.0}"]}
+                     ).to_csv(tmp_path / "ptbxl_database.csv", index=False)
+        yield tmp_path
+        physionet._RECORD_INDEXES.clear()
+        physionet._INDEX_STAMPS.clear()
+        clear_metadata_cache()
+
+    def test_roundtrip_matches_load_record(self, ptbxl_wfdb, tmp_path_factory):
+        import numpy as np
+        from datasets.ptbxl import load_record
+        from datasets.signal_store import SignalStore, pack_dataset
+
+        out = tmp_path_factory.mktemp("store")
+        manifest = pack_dataset(ptbxl_wfdb, out, resolution=100)
+        assert manifest["n_records"] == 3 and manifest["total_samples"] == 2800
+
+        store = SignalStore(out)
+        for ecg_id in (1, 2, 3):
+            rec = store.record(store.row(ecg_id))
+            ref = load_record(str(ptbxl_wfdb), ecg_id, resolution=100)
+            np.testing.assert_array_equal(rec["signal"], ref["signal"])
+            assert rec["labels"] == ref["labels"]
+            assert rec["header"]["sig_name"] == ref["header"]["sig_name"]
+        assert list(store.rows_with("MI")) == [1, 2]
+
+    def test_views_are_zero_copy_and_scaled_on_demand(self, ptbxl_wfdb, tmp_path_factory):
+        import numpy as np
+        from datasets.signal_store import SignalStore, pack_dataset
+
+        out = tmp_path_factory.mktemp("store")
+        pack_dataset(ptbxl_wfdb, out)
+        store = SignalStore(out)
+        raw = store.raw(1, leads=["II", "V1"])
+        assert raw.dtype == np.int16 and raw.shape == (800, 2)
+        assert np.shares_memory(raw, store.signals)
+        lead = store.signal(1, leads="II", start=100, stop=200)
+        full = store.signal(1, dtype=np.float64)
+        assert lead.dtype == np.float32 and lead.shape == (100, 1)
+        np.testing.assert_allclose(lead[:, 0], full[100:200, 1], rtol=1e-6)
+        with pytest.raises(KeyError):
+            store.row(99)
@@ -28,3 +28,39 @@ def test_rotate_zero_preserves_size(synthetic_pil_image):
     out = rotate_image(synthetic_pil_image, 0.0)
     # With expand=True and angle=0, size should be same
     assert out.size == synthetic_pil_image.size
+
+
+def test_pyramid_matches_brute_force(synthetic_12lead_pil):
+    img = synthetic_12lead_pil.rotate(2.3, resample=Image.BILINEAR, expand=True, fillcolor=(255, 255, 255))
+    brute = estimate_rotation_angle(img, method="brute")
+    pyr = estimate_rotation_angle(img, method="pyramid")
+    assert abs(brute["angle_deg"] - pyr["angle_deg"]) <= 0.25
+    assert pyr["score"] >= pyr["score0"]
+
+
+def test_pyramid_downsampled_large_image():
+    from conftest import _make_12lead_image
+
+    gray = _make_12lead_image(2000, 1500, 16)
+    img = Image.fromarray(np.stack([gray] * 3, axis=-1)).rotate(
+        -3.0, resample=Image.BILINEAR, expand=True, fillcolor=(255, 255, 255))
+    result = estimate_rotation_angle(img, downsample=4)
+    assert abs(result["angle_deg"] - 3.0) <= 0.5
+
+
+def test_unknown_method_raises(synthetic_pil_image):
+    import pytest
+
+    with pytest.raises(ValueError):
+        estimate_rotation_angle(synthetic_pil_image, method="radon")
+
+
+def test_parabolic_refinement_with_inexact_float_steps(synthetic_pil_image, monkeypatch):
+    import cv.deskew as deskew
+
+    # coarse ± step não é exato em float (0.3 - 0.1 + 0.1 != 0.3): vizinhos por índice inteiro
+    monkeypatch.setattr(deskew, "_proj_score", lambda arr: 0.0)
+    monkeypatch.setattr(deskew, "_sweep", lambda img, angles, s0: (0.3, 1.0))
+    monkeypatch.setattr(deskew, "_rotation_score", lambda img, a, s0: 10.0 - (a - 0.33) ** 2)
+    result = estimate_rotation_angle(synthetic_pil_image, search_deg=1.0, step=0.1)
+    assert abs(result["angle_deg"] - 0.33) < 1e-6
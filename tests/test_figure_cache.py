@@ -0,0 +1,112 @@
+"""Testes do cache LRU de figuras do Dash (memória + disco compartilhado)."""
+from __future__ import annotations
+
+import numpy as np
+import plotly.graph_objects as go
+import pytest
+
+from web_app.dash_app.figure_cache import FigureCache
+
+
+def _fig(y):
+    return go.Figure(go.Scatter(y=list(y)))
+
+
+def test_chave_normaliza_entradas():
+    cache = FigureCache()
+    a = cache.make_key("sim", {"hr": np.int64(75), "dur": 10.0000001, "p": ("a", "b")}, seed=np.int32(1))
+    b = cache.make_key("sim", {"p": ["a", "b"], "dur": 10.0, "hr": 75}, seed=1)
+    assert a == b
+    assert a != cache.make_key("sim", {"p": ["a", "b"], "dur": 10.0, "hr": 75}, seed=2)
+    assert a != cache.make_key("outro", {"p": ["a", "b"], "dur": 10.0, "hr": 75}, seed=1)
+
+
+def test_get_or_build_conta_acertos_e_constroi_uma_vez():
+    cache = FigureCache(max_entries=4)
+    calls = []
+    build = lambda: calls.append(1) or _fig([1, 2, 3])
+    first = cache.get_or_build("ap", {"phase": 2}, build)
+    second = cache.get_or_build("ap", {"phase": 2}, build)
+    assert first == second and first["data"][0]["y"] == [1, 2, 3]
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_lru_limita_entradas_em_memoria():
+    cache = FigureCache(max_entries=2)
+    for i in range(3):
+        cache.get_or_build("f", {"i": i}, lambda i=i: _fig([i]))
+    cache.get_or_build("f", {"i": 2}, lambda: _fig([99]))
+    assert cache.stats()["entries"] == 2 and cache.stats()["hits"] == 1
+    assert cache.get(cache.make_key("f", {"i": 0})) is None
+
+
+def test_disco_compartilhado_entre_instancias(tmp_path):
+    """Outro worker (outra instância, mesmo diretório) reaproveita a figura do disco."""
+    a, b = FigureCache(directory=tmp_path), FigureCache(directory=tmp_path)
+    a.get_or_build("cmp", None, lambda: _fig([4, 5]))
+    fig = b.get_or_build("cmp", None, lambda: pytest.fail("deveria vir do disco"))
+    assert fig["data"][0]["y"] == [4, 5]
+    assert b.stats()["disk_hits"] == 1 and b.stats()["misses"] == 0
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_disco_podado_por_mtime(tmp_path):
+    import os
+    cache = FigureCache(max_entries=2, directory=tmp_path)
+    keys = []
+    for i in range(3):
+        cache.get_or_build("f", {"i": i}, lambda i=i: _fig([i]))
+        keys.append(cache.make_key("f", {"i": i}))
+        os.utime(tmp_path / f"{keys[-1]}.json", ns=(i * 10**9, i * 10**9))
+        cache._prune_disk()
+    assert sorted(p.stem for p in tmp_path.glob("*.json")) == sorted(keys[1:])
+
+
+def test_erro_no_build_nao_grava(tmp_path):
+    cache = FigureCache(directory=tmp_path)
+
+    def boom():
+        raise RuntimeError("falhou")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_build("x", None, boom)
+    assert cache.stats()["entries"] == 0 and not list(tmp_path.glob("*.json"))
+
+
+def test_chave_inclui_versao_do_codigo(tmp_path):
+    """Deploy novo (módulos geradores alterados) não reaproveita figuras antigas do disco."""
+    import os
+    from web_app.dash_app.figure_cache import code_fingerprint
+
+    pkg = tmp_path / "src" / "gen"
+    pkg.mkdir(parents=True)
+    mod = pkg / "fig.py"
+    mod.write_text("Y = 1\n")
+    before = code_fingerprint.__wrapped__(tmp_path / "src", ("gen",))
+    os.utime(mod, ns=(0, 10**18))
+    assert code_fingerprint.__wrapped__(tmp_path / "src", ("gen",)) != before
+    assert FigureCache().code_version == code_fingerprint()
+
+    disk = tmp_path / "figs"
+    FigureCache(directory=disk, code_version="v1").get_or_build("f", None, lambda: _fig([1]))
+    novo = FigureCache(directory=disk, code_version="v2")
+    assert novo.get_or_build("f", None, lambda: _fig([2]))["data"][0]["y"] == [2]
+    assert novo.stats()["disk_hits"] == 0
+
+
+def test_alterar_modulo_construtor_muda_a_chave(tmp_path):
+    """Figuras de education.electrophysiology (potenciais de ação) entram na impressão digital."""
+    import os
+    from web_app.dash_app.figure_cache import GENERATOR_PACKAGES, code_fingerprint
+
+    for package in GENERATOR_PACKAGES:
+        (tmp_path / package).mkdir(parents=True)
+    builder = tmp_path / "education" / "electrophysiology.py"
+    builder.write_text("def create_action_potential_figure(kind): ...\n")
+    antes = FigureCache(code_version=code_fingerprint.__wrapped__(tmp_path, GENERATOR_PACKAGES))
+    builder.write_text("def create_action_potential_figure(kind, highlight=None): ...\n")
+    os.utime(builder, ns=(0, 10**18))
+    depois = FigureCache(code_version=code_fingerprint.__wrapped__(tmp_path, GENERATOR_PACKAGES))
+    assert antes.make_key("pacemaker_ap") != depois.make_key("pacemaker_ap")
+    assert "directory" not in FigureCache(directory=tmp_path / "figs").stats()
@@ -34,3 +34,42 @@ def test_grid_period_rgb(synthetic_pil_image):
     result = estimate_grid_period_px(arr)
     assert isinstance(result, dict)
     assert result.get("confidence", 0) >= 0
+
+
+def test_fft_autocorr_matches_direct():
+    from cv.grid_detect import _autocorr_1d
+
+    x = np.random.default_rng(0).normal(size=777)
+    z = (x - x.mean()) / (x.std() + 1e-6)
+    ref = np.correlate(z, z, mode="full")[len(z) - 1:]
+    ref /= ref[0] + 1e-6
+    assert np.allclose(_autocorr_1d(x), ref, atol=1e-9)
+
+
+def test_small_grid_is_fundamental_not_big_grid(synthetic_12lead):
+    result = estimate_grid_period_px(synthetic_12lead)
+    assert abs(result["px_small_x"] - 10.0) < 0.05
+    assert abs(result["px_small_y"] - 10.0) < 0.05
+    assert result["big_ratio_x"] == 5
+    assert abs(result["px_big_x"] - 50.0) < 0.25
+
+
+def test_grid_period_subpixel_after_resize(synthetic_12lead):
+    from PIL import Image
+
+    h, w = synthetic_12lead.shape
+    scale = 1.37
+    img = Image.fromarray(synthetic_12lead).resize((int(w * scale), int(h * scale)), Image.LANCZOS)
+    result = estimate_grid_period_px(np.asarray(img))
+    assert abs(result["px_small_x"] - 10.0 * scale) < 0.05
+    assert result["px_small_x"] != round(result["px_small_x"])
+
+
+def test_grid_without_big_lines_falls_back_to_5x():
+    img = np.full((600, 900), 240, dtype=np.uint8)
+    img[:, ::12] = 200
+    img[::12, :] = 200
+    result = estimate_grid_period_px(img)
+    assert abs(result["px_small_x"] - 12.0) < 0.05
+    assert result["big_ratio_x"] is None
+    assert abs(result["px_big_x"] - 5 * result["px_small_x"]) < 1e-6
@@ -51,3 +51,81 @@ def test_intervals_empty_peaks():
     trace = np.random.randn(500)
     result = intervals_from_trace(trace, [], px_per_sec=250.0)
     assert result["median"]["RR_s"] is None
+
+
+# Implementação original (laço por batimento, features recalculadas) — referência de regressão.
+def _reference_intervals_refined(y_px, r_peaks, fs):
+    from cv.intervals_refined import _smooth, _grad, _energy, _norm01
+
+    def stable(gabs, start, direction, dur_ms=15, thr=0.12):
+        dur = int(max(1, dur_ms*fs/1000.0))
+        rng = range(start, -1, -1) if direction < 0 else range(start, len(gabs))
+        for i in rng:
+            i0 = max(0, i - (dur if direction < 0 else 0))
+            i1 = min(len(gabs), i + (dur if direction > 0 else 0))
+            if np.all(gabs[i0:i1] < thr):
+                return i
+        return start
+
+    def onset_offset(y_px, r_idx):
+        y = _smooth(y_px - np.median(y_px), 7)
+        gabs = _norm01(np.abs(_grad(y))); E = _energy(y, win=int(0.04*fs))
+        i0 = max(0, r_idx-int(0.16*fs)); i1 = min(len(y)-1, r_idx+int(0.18*fs))
+        gw = gabs[i0:i1+1]; Ew = E[i0:i1+1]
+        thr_g = float(np.clip(0.25*np.quantile(gw, 0.98) + 0.05*np.max(gw), 0.08, 0.6))
+        thr_E = float(np.clip(0.25*np.quantile(Ew, 0.98) + 0.05*np.max(Ew), 0.08, 0.6))
+        onset = i0
+        for i in range(r_idx-i0, -1, -1):
+            if gw[i] > thr_g or Ew[i] > thr_E:
+                onset = i0 + stable(gw, i, -1, 15, 0.14); break
+        offset = i1
+        for i in range(r_idx-i0, len(gw)):
+            if gw[i] > thr_g or Ew[i] > thr_E:
+                offset = i0 + stable(gw, i, +1, 15, 0.14); break
+        qrs_ms = (offset - onset)*1000.0/fs
+        if qrs_ms < 60: offset = min(len(y)-1, onset + int(0.08*fs))
+        if qrs_ms > 200: offset = onset + int(0.20*fs)
+        return int(onset), int(offset)
+
+    def p_onset(y_px, qrs_on):
+        gabs = _norm01(np.abs(_grad(_smooth(y_px - np.median(y_px), 7))))
+        dur = int(0.02*fs)
+        for i in range(qrs_on, max(0, qrs_on - int(0.32*fs)), -1):
+            if np.all(gabs[max(0, i-dur):i] > 0.06):
+                return int(i - dur)
+        return None
+
+    def t_end(y_px, qrs_off):
+        gabs = _norm01(np.abs(_grad(_smooth(y_px - np.median(y_px), 7))))
+        endw = int(0.03*fs)
+        for i in range(qrs_off+endw, min(len(y_px)-1, qrs_off + int(0.62*fs))):
+            if np.all(gabs[i-endw:i] < 0.10):
+                return int(i)
+        return None
+
+    y = _smooth(y_px - np.median(y_px), 7)
+    out = {"onsets": [], "offsets": [], "t_end": [], "p_onset": []}
+    for r in r_peaks:
+        on, off = onset_offset(y, r)
+        out["onsets"].append(on); out["offsets"].append(off)
+        out["t_end"].append(t_end(y, off)); out["p_onset"].append(p_onset(y, on))
+    return out
+
+
+def test_intervals_refined_matches_reference():
+    rng = np.random.default_rng(7)
+    cases = []
+    for fs in (100.0, 250.0, 333.3, 500.0):
+        trace, peaks = _make_trace_with_peaks(n=int(10*fs), fs=fs)
+        cases.append((trace, peaks, fs))
+        noisy = trace + rng.normal(0, 2.0, trace.size) + 8*np.sin(np.arange(trace.size)/fs*2*np.pi*0.3)
+        cases.append((noisy, peaks, fs))
+        # picos perto das bordas e em posições arbitrárias
+        cases.append((noisy, [0, 3, int(fs*0.05)] + sorted(rng.integers(0, trace.size, 6).tolist()) + [trace.size-1], fs))
+    cases.append((rng.normal(0, 1, 3000), list(range(5, 3000, 237)), 250.0))
+    cases.append((np.zeros(800), [10, 400, 790], 250.0))
+    for trace, peaks, fs in cases:
+        got = intervals_refined_from_trace(trace, peaks, px_per_sec=fs)["per_beat"]
+        ref = _reference_intervals_refined(trace, peaks, fs)
+        for key in ("onsets", "offsets", "t_end", "p_onset"):
+            assert got[key] == ref[key], (fs, key)
@@ -201,6 +201,17 @@ class TestSTEMI:
         # At least some beats should show positive deviation
         assert any(d > 0 for d in devs)
 
+    def test_measure_st_deviation_matches_per_beat_helpers(self):
+        from cv.pathology.stemi import _baseline_level, _j_point_index
+        trace, r_peaks = _synthetic_ecg(st_elevation_mv=0.2)
+        trace = trace + np.random.default_rng(0).normal(0, 0.02, len(trace))
+        peaks = [5, 60] + list(r_peaks) + [len(trace) - 3]  # edge beats use the fallbacks
+        expected = []
+        for rp in peaks:
+            idx = min(_j_point_index(trace, rp, 500) + 40, len(trace) - 1)
+            expected.append(round((trace[idx] - _baseline_level(trace, rp, 500)) / 0.1, 3))
+        assert measure_st_deviation(trace, peaks, 500) == expected
+
     def test_explain_stemi_cameras_valid(self):
         for territory in TERRITORY_MAP:
             text = explain_stemi_cameras(territory)
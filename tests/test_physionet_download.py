@@ -0,0 +1,165 @@
+"""Tests for the parallel, resumable PhysioNet downloader (local HTTP stand-in)."""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+FILES = {
+    "RECORDS": b"records100/00000/00001_lr\nrecords100/00000/00002_lr\n",
+    "ptbxl_database.csv": b"ecg_id,scp_codes\n1,\"{'NORM': 100.0}\"\n",
+    "records100/00000/00001_lr.hea": b"00001_lr 12 100 1000\n",
+    "records100/00000/00001_lr.dat": bytes(range(256)) * 40,
+    "records100/00000/00002_lr.hea": b"00002_lr 12 100 1000\n",
+    "records100/00000/00002_lr.dat": bytes(reversed(range(256))) * 40,
+}
+DB = "ptb-xl/1.0.3"
+
+
+def _sums(files):
+    return "".join(f"{hashlib.sha256(v).hexdigest()} {k}\n" for k, v in files.items()).encode()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def log_message(self, *args):
+        pass
+
+    def _body(self):
+        server = self.server
+        name = self.path.removeprefix(f"/{DB}/")
+        if name == "SHA256SUMS.txt" and server.with_sums:
+            return _sums(server.files)
+        return server.files.get(name)
+
+    def do_HEAD(self):
+        body = self._body()
+        self.send_response(200 if body is not None else 404)
+        self.send_header("Content-Length", str(len(body or b"")))
+        self.end_headers()
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append((self.path, self.headers.get("Range")))
+            server.connections.add(self.client_address)
+        body = self._body()
+        if body is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        start = 0
+        rng = self.headers.get("Range")
+        if rng and server.ranges:
+            start = int(rng.removeprefix("bytes=").split("-")[0])
+            if start >= len(body):
+                self.send_response(416)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(body) - start))
+        self.end_headers()
+        self.wfile.write(body[start:])
+
+
+@pytest.fixture
+def physionet_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.files = dict(FILES)
+    server.with_sums = True
+    server.ranges = True
+    server.requests, server.connections, server.lock = [], set(), threading.Lock()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _url(server):
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+class TestDownloadPhysionet:
+
+    def test_downloads_all_files_verified(self, physionet_server, tmp_path):
+        from datasets.physionet import download_physionet
+
+        result = download_physionet(DB, tmp_path, base_url=_url(physionet_server), workers=4)
+        assert result["downloaded"] == len(FILES) and not result["failed"]
+        for name, body in FILES.items():
+            assert (tmp_path / name).read_bytes() == body
+        assert not list(tmp_path.rglob("*.part"))
+        # keep-alive: one connection per worker thread (+ the listing), not per file
+        assert len(physionet_server.connections) <= 5 < len(physionet_server.requests)
+
+    def test_rerun_skips_verified_files_and_replaces_corrupt(self, physionet_server, tmp_path):
+        from datasets.physionet import download_physionet
+
+        download_physionet(DB, tmp_path, base_url=_url(physionet_server))
+        (tmp_path / "records100/00000/00002_lr.dat").write_bytes(b"corrupt")
+        physionet_server.requests.clear()
+        result = download_physionet(DB, tmp_path, base_url=_url(physionet_server))
+        assert result["skipped"] == len(FILES) - 1 and result["downloaded"] == 1
+        fetched = [p for p, _ in physionet_server.requests if not p.endswith("SHA256SUMS.txt")]
+        assert fetched == [f"/{DB}/records100/00000/00002_lr.dat"]
+        assert (tmp_path / "records100/00000/00002_lr.dat").read_bytes() == FILES["records100/00000/00002_lr.dat"]
+
+    def test_resumes_partial_file_with_byte_range(self, physionet_server, tmp_path):
+        from datasets.physionet import download_physionet
+
+        name = "records100/00000/00001_lr.dat"
+        part = tmp_path / f"{name}.part"
+        part.parent.mkdir(parents=True)
+        part.write_bytes(FILES[name][:4000])
+        result = download_physionet(DB, tmp_path, base_url=_url(physionet_server), files=[name])
+        assert result["resumed"] == 1 and result["bytes"] == len(FILES[name]) - 4000
+        assert (f"/{DB}/{name}", "bytes=4000-") in physionet_server.requests
+        assert (tmp_path / name).read_bytes() == FILES[name]
+
+    def test_server_without_ranges_restarts_file(self, physionet_server, tmp_path):
+        from datasets.physionet import download_physionet
+
+        physionet_server.ranges = False
+        name = "records100/00000/00001_lr.dat"
+        (tmp_path / f"{name}.part").parent.mkdir(parents=True)
+        (tmp_path / f"{name}.part").write_bytes(b"stale bytes")
+        result = download_physionet(DB, tmp_path, base_url=_url(physionet_server), files=[name])
+        assert result["downloaded"] == 1
+        assert (tmp_path / name).read_bytes() == FILES[name]
+
+    def test_checksum_mismatch_is_reported(self, physionet_server, tmp_path):
+        from datasets.physionet import download_physionet
+
+        sums = _sums(FILES)
+        physionet_server.files["records100/00000/00001_lr.hea"] = b"tampered\n"
+        physionet_server.with_sums = False
+        physionet_server.files["SHA256SUMS.txt"] = sums
+        result = download_physionet(DB, tmp_path, base_url=_url(physionet_server))
+        assert list(result["failed"]) == ["records100/00000/00001_lr.hea"]
+        assert not (tmp_path / "records100/00000/00001_lr.hea").exists()
+        assert not list(tmp_path.rglob("*.part"))
+
+    def test_records_fallback_without_checksums(self, physionet_server, tmp_path):
+        from datasets.physionet import download_physionet
+
+        physionet_server.with_sums = False
+        result = download_physionet(DB, tmp_path, base_url=_url(physionet_server))
+        assert result["downloaded"] == 5 and not result["failed"]
+        rerun = download_physionet(DB, tmp_path, base_url=_url(physionet_server))
+        assert rerun["skipped"] == 5
+
+    def test_download_dataset_uses_catalogue(self, physionet_server, tmp_path):
+        from datasets.physionet import download_dataset
+
+        path = download_dataset("ptb-xl", dest_dir=str(tmp_path), base_url=_url(physionet_server))
+        assert (path / "ptbxl_database.csv").read_bytes() == FILES["ptbxl_database.csv"]
@@ -0,0 +1,90 @@
+"""Tests for the NumPy ECG rasterizer (datasets.raster)."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from datasets.raster import draw_polylines, paper_grid, render_batch, render_leads
+
+
+@pytest.fixture(scope="module")
+def twelve_lead():
+    from simulation.ecg_generator import LEAD_NAMES, generate_ecg
+
+    ecg = generate_ecg(duration_s=10, fs=500, rng=0)
+    return np.stack([ecg["leads"][lead] for lead in LEAD_NAMES], axis=1)
+
+
+def test_paper_grid_spacing():
+    grid = paper_grid(101, 201, px_per_mm=4)
+    gray = grid.mean(axis=2)
+    minor = np.flatnonzero(gray[2] < 255)  # row between horizontal lines
+    assert np.all(np.diff(minor) == 4)
+    major = np.flatnonzero(gray[2] < 200)
+    assert np.all(np.diff(major) == 20)
+
+
+def test_polyline_is_connected_without_antialias():
+    canvas = np.full((50, 50, 3), 255, np.uint8)
+    draw_polylines(canvas, [(np.array([2.0, 40.0]), np.array([5.0, 45.0]))], antialias=False)
+    ys, xs = np.nonzero(canvas[..., 0] == 0)
+    assert xs.min() == 2 and xs.max() == 40 and ys.min() == 5 and ys.max() == 45
+    assert len(np.unique(ys)) == 41  # one pixel per row on a steep line: no gaps
+
+
+def test_antialias_splits_coverage():
+    canvas = np.full((10, 30, 3), 255, np.uint8)
+    draw_polylines(canvas, [(np.array([5.0, 25.0]), np.array([4.5, 4.5]))], antialias=True)
+    col = canvas[:, 15, 0].astype(int)
+    assert 100 < col[4] < 160 and 100 < col[5] < 160
+    assert col[3] == 255 and col[6] == 255
+
+
+@pytest.mark.parametrize("layout", ["3x4", "6x2"])
+def test_truth_calibration_matches_trace(twelve_lead, layout):
+    img, truth = render_leads(twelve_lead, 500, layout=layout, px_per_mm=6, labels=False,
+                              antialias=False, return_truth=True)
+    assert img.shape[:2] == (truth["size"][1], truth["size"][0])
+    assert truth["leads"]["V1"]["col"] == {"3x4": 2, "6x2": 1}[layout]
+    assert truth["leads"]["V1"]["row"] == 0
+    geo = truth["leads"]["II"]
+    # the drawn pixel of lead II at one sample sits where the calibration says
+    k = int(round(geo["t0_s"] * 500)) + 137
+    x = int(round(geo["x0"] + 137 * 25 * 6 / 500))
+    y = int(round(geo["baseline_y"] - twelve_lead[k, 1] * 10 * 6))
+    assert img[y - 1:y + 2, x, 0].min() == 0
+
+
+def test_grid_detector_recovers_px_per_mm(twelve_lead):
+    from cv.normalize import estimate_px_per_mm
+
+    img = render_leads(twelve_lead, 500, px_per_mm=8)
+    assert estimate_px_per_mm(img) == pytest.approx(8.0, rel=0.02)
+
+
+def test_batch_matches_single(twelve_lead):
+    batch = render_batch(np.stack([twelve_lead, -twelve_lead]), 500, layout="6x2")
+    assert batch.shape[0] == 2
+    np.testing.assert_array_equal(batch[0], render_leads(twelve_lead, 500, layout="6x2"))
+    assert not np.array_equal(batch[0], batch[1])
+
+
+def test_invalid_layout(twelve_lead):
+    with pytest.raises(ValueError):
+        render_leads(twelve_lead, 500, layout="4x4")
+    with pytest.raises(ValueError):
+        render_leads(twelve_lead, 500, layout="1x1")
+
+
+def test_record_to_image_raster(twelve_lead):
+    from datasets.ptbxl import LEAD_NAMES, record_to_image
+
+    record = {"signal": twelve_lead, "header": {"sig_name": LEAD_NAMES, "fs": 500}}
+    strip = record_to_image(record, "II")
+    sheet = record_to_image(record, layout="3x4", px_per_mm=4)
+    assert strip.mode == "RGB" and strip.size[0] > strip.size[1]
+    assert sheet.size == (render_leads(twelve_lead, 500, px_per_mm=4).shape[1],
+                          render_leads(twelve_lead, 500, px_per_mm=4).shape[0])
+    with pytest.raises(ValueError):
+        record_to_image(record, "XX")
@@ -7,7 +7,7 @@ from cv.rpeaks_from_image import (
     detect_rpeaks_from_trace,
     estimate_px_per_sec,
 )
-from cv.rpeaks_robust import pan_tompkins_like
+from cv.rpeaks_robust import pan_tompkins_like, PanTompkinsStream, iter_rpeaks_stream
 
 
 def test_extract_trace_centerline(synthetic_gray):
@@ -56,9 +56,12 @@ def test_pan_tompkins_like():
     result = pan_tompkins_like(trace, px_per_sec=250.0)
     assert "peaks_idx" in result
     assert "fs_px" in result
-    assert "signals" in result
+    assert "signals" not in result
     assert "params" in result
     assert len(result["peaks_idx"]) >= 2
+    dbg = pan_tompkins_like(trace, px_per_sec=250.0, return_signals=True)
+    assert set(dbg["signals"]) == {"yb", "dy", "sq", "yi"}
+    assert dbg["peaks_idx"] == result["peaks_idx"]
 
 
 def test_pan_tompkins_like_ignores_boundary_artifact():
@@ -68,3 +71,68 @@ def test_pan_tompkins_like_ignores_boundary_artifact():
     trace[350] = 40.0
     result = pan_tompkins_like(trace, px_per_sec=250.0)
     assert 0 not in result["peaks_idx"]
+
+
+def _reference_pan_tompkins_peaks(y_px, fs):
+    """Laço por amostra original do limiar adaptativo (referência de regressão)."""
+    yi = pan_tompkins_like(y_px, fs, return_signals=True)["signals"]["yi"]
+    rp = int(200.0 * fs / 1000.0)
+    base = yi[:max(10, int(2.0 * fs))]
+    npki, spki = float(np.median(base)), float(np.percentile(base, 95))
+    thr = npki + 0.25*(spki - npki)
+    peaks, last = [], -10**9
+    for i in range(1, len(yi)-1):
+        if yi[i] > thr and (i - last) >= rp:
+            if yi[i] >= yi[i-1] and yi[i] >= yi[i+1]:
+                peaks.append(i); last = i
+                spki = 0.875*spki + 0.125*yi[i]
+                thr = npki + 0.25*(spki - npki)
+        else:
+            npki = 0.875*npki + 0.125*yi[i]
+            thr = npki + 0.25*(spki - npki)
+    return peaks
+
+
+def _ecg_like(secs, fs, hr, noise, seed=0):
+    rng = np.random.default_rng(seed)
+    n = int(secs * fs)
+    t = np.arange(n) / fs
+    y = 300 + 5*np.sin(2*np.pi*0.2*t) + rng.normal(0, noise, n)
+    tt = 0.4
+    while tt < secs - 0.2:
+        y -= 40*np.exp(-((t-tt)**2)/(2*0.008**2)) + 10*np.exp(-((t-tt-0.3)**2)/(2*0.04**2))
+        tt += 60.0/hr * (1 + 0.05*rng.normal())
+    return y
+
+
+def test_pan_tompkins_matches_per_sample_reference():
+    rng = np.random.default_rng(3)
+    cases = [(_ecg_like(20, fs, hr, noise, seed=i), fs)
+             for i, (fs, hr, noise) in enumerate([(250.0, 50, 0.5), (250.0, 130, 10.0), (500.0, 72, 3.0)])]
+    cases += [(rng.normal(0, 1, int(rng.integers(600, 3000))).cumsum(), 250.0) for _ in range(5)]
+    for y, fs in cases:
+        assert pan_tompkins_like(y, fs)["peaks_idx"] == _reference_pan_tompkins_peaks(y, fs)
+
+
+def test_pan_tompkins_stream_chunk_invariant_and_matches_batch():
+    y = _ecg_like(30, 250.0, 72, 2.0)
+    batch = pan_tompkins_like(y, 250.0)["peaks_idx"]
+    for size in (1, 53, 1000, len(y)):
+        det = PanTompkinsStream(250.0)
+        got = []
+        for i in range(0, len(y), size):
+            got += det.feed(y[i:i+size])
+        got += det.flush()
+        assert got == batch == det.peaks
+    chunks = (y[i:i+400] for i in range(0, len(y), 400))
+    assert list(iter_rpeaks_stream(chunks, 250.0)) == batch
+
+
+def test_pan_tompkins_stream_bounded_buffers():
+    det = PanTompkinsStream(250.0)
+    y = _ecg_like(120, 250.0, 72, 1.0)
+    for i in range(0, len(y), 500):
+        det.feed(y[i:i+500])
+        assert det._raw.size < 2000 and det._yi.size < 2000
+    det.flush()
+    assert len(det.peaks) > 130
@@ -22,7 +22,8 @@ from signal_processing.noise import (
     estimate_snr,
     signal_quality_index,
 )
-from signal_processing.preprocessing import preprocess_ecg
+from signal_processing.beats import extract_beats
+from signal_processing.preprocessing import preprocess_ecg, preprocess_ecg_stream
 
 
 # ---------------------------------------------------------------------------
@@ -318,10 +319,60 @@ class TestDeteccaoRuido:
         for seg in segmentos:
             assert campos_obrigatorios.issubset(seg.keys())
 
-    def test_sinal_1d_obrigatorio(self, sinal_multicanal, fs):
-        """Verifica que sinal 2D levanta ValueError."""
-        with pytest.raises(ValueError, match="1D"):
-            detect_noise_segments(sinal_multicanal, fs)
+    def test_sinal_2d_devolve_segmentos_por_derivacao(self, sinal_limpo_longo, fs):
+        """Matriz [amostras, derivações] dá uma lista por derivação, igual à chamada 1D."""
+        rng = np.random.default_rng(3)
+        ruidoso = sinal_limpo_longo + rng.normal(0, 0.01, size=len(sinal_limpo_longo))
+        ruidoso[int(3 * fs):int(4 * fs)] += rng.normal(0, 10.0, int(fs))
+        matriz = np.column_stack([sinal_limpo_longo + 0.01, ruidoso])
+        por_derivacao = detect_noise_segments(matriz, fs)
+        assert len(por_derivacao) == 2
+        for i in range(2):
+            assert por_derivacao[i] == detect_noise_segments(matriz[:, i].copy(), fs)
+        assert any(s["noise_type"] == "high_variance" for s in por_derivacao[1])
+
+    def test_sinal_3d_rejeitado(self, fs):
+        """Verifica que sinal 3D levanta ValueError."""
+        with pytest.raises(ValueError, match="1D or 2D"):
+            detect_noise_segments(np.zeros((100, 2, 2)), fs)
+
+    def test_janelas_sobrepostas_mescladas(self, sinal_limpo_longo, fs):
+        """Com passo menor que a janela, janelas ruidosas contíguas viram um único segmento."""
+        rng = np.random.default_rng(4)
+        sinal = sinal_limpo_longo + rng.normal(0, 0.01, size=len(sinal_limpo_longo))
+        sinal[int(3 * fs):int(4 * fs)] += rng.normal(0, 10.0, int(fs))
+        segmentos = detect_noise_segments(sinal, fs, step_s=0.25)
+        hv = [s for s in segmentos if s["noise_type"] == "high_variance"]
+        assert len(hv) == 1
+        assert hv[0]["start_sample"] <= int(3 * fs) and hv[0]["end_sample"] - hv[0]["start_sample"] > fs
+        inicios = [s["start_sample"] for s in segmentos]
+        assert inicios == sorted(inicios)
+
+    def test_saturacao_vetorizada(self, fs):
+        """Janela com platô no valor extremo é classificada como saturação."""
+        t = np.arange(0, 6.0, 1.0 / fs)
+        sinal = np.sin(2 * np.pi * 1.0 * t) + np.random.default_rng(5).normal(0, 0.01, t.size)
+        sinal[int(2 * fs):int(2.5 * fs)] = 1.2
+        tipos = {s["noise_type"] for s in detect_noise_segments(sinal, fs)}
+        assert "saturation" in tipos
+
+    @pytest.mark.parametrize("passo", [50, 30, 7])
+    def test_estatisticas_janela_iguais_ao_calculo_direto(self, passo):
+        """Somas acumuladas/filtros de extremos reproduzem var/máx./mín./contagens por janela."""
+        from signal_processing.noise import _window_counts, _window_extrema, _window_variance
+
+        rng = np.random.default_rng(6)
+        x = np.round(rng.normal(40.0, 2.0, size=(1000, 3)) * 2) / 2
+        janela = 50
+        inicios = np.arange(0, len(x) - janela + 1, passo)
+        blocos = np.stack([x[s:s + janela] for s in inicios])
+        vmax, vmin = _window_extrema(x, inicios, janela)
+        np.testing.assert_allclose(_window_variance(x, inicios, janela), blocos.var(axis=1),
+                                   atol=1e-9)
+        np.testing.assert_array_equal(vmax, blocos.max(axis=1))
+        np.testing.assert_array_equal(vmin, blocos.min(axis=1))
+        np.testing.assert_array_equal(_window_counts(x, inicios, janela, passo, vmax),
+                                      (blocos == vmax[:, np.newaxis]).sum(axis=1))
 
 
 # ---------------------------------------------------------------------------
@@ -403,6 +454,16 @@ class TestIndiceQualidadeSinal:
         resultado = signal_quality_index(sinal_limpo_longo, fs)
         assert 0 <= resultado["noise_fraction"] <= 1
 
+    def test_matriz_devolve_indice_por_derivacao(self, sinal_limpo_longo, fs):
+        """Em 2D o SQI sai por derivação e coincide com a avaliação 1D de cada coluna."""
+        t = np.arange(len(sinal_limpo_longo)) / fs
+        matriz = np.column_stack([sinal_limpo_longo, sinal_limpo_longo + 0.5 * np.sin(2 * np.pi * 60.0 * t)])
+        por_derivacao = signal_quality_index(matriz, fs)
+        assert len(por_derivacao) == 2
+        for i in range(2):
+            assert por_derivacao[i] == signal_quality_index(matriz[:, i].copy(), fs)
+        assert por_derivacao[1]["has_powerline_interference"]
+
 
 # ---------------------------------------------------------------------------
 # Testes: Pipeline de Pré-processamento
@@ -514,3 +575,178 @@ class TestValidacaoEntrada:
         sinal = np.zeros(500)
         with pytest.raises(ValueError, match="positive"):
             highpass_filter(sinal, fs, cutoff=-1.0)
+
+
+# ---------------------------------------------------------------------------
+# Filtragem multiderivação vetorizada
+# ---------------------------------------------------------------------------
+
+class TestFiltragemMultiderivacao:
+    """Matriz [amostras, derivações] filtrada numa única chamada, float32 e cache de SOS."""
+
+    @pytest.fixture
+    def matriz(self, fs):
+        rng = np.random.default_rng(0)
+        t = np.arange(0, 10.0, 1.0 / fs)[:, None]
+        return np.sin(2 * np.pi * 1.2 * t) + 0.3 * np.sin(2 * np.pi * 60.0 * t) + 0.1 * rng.normal(size=(t.size, 12))
+
+    @pytest.mark.parametrize("aplicar", [
+        lambda x, fs: bandpass_filter(x, fs, lowcut=0.5, highcut=40.0),
+        lambda x, fs: highpass_filter(x, fs, cutoff=0.5),
+        lambda x, fs: lowpass_filter(x, fs, cutoff=40.0),
+        lambda x, fs: notch_filter(x, fs, freq=60.0),
+        lambda x, fs: remove_baseline_wander(x, fs, method="median"),
+    ])
+    def test_matriz_igual_a_derivacao_por_derivacao(self, matriz, fs, aplicar):
+        """Filtrar a matriz inteira equivale a filtrar cada coluna como sinal 1D."""
+        junto = aplicar(matriz, fs)
+        por_coluna = np.column_stack([aplicar(matriz[:, i].copy(), fs) for i in range(matriz.shape[1])])
+        np.testing.assert_allclose(junto, por_coluna, rtol=1e-10, atol=1e-12)
+
+    def test_float32_preservado(self, matriz, fs):
+        """Entrada float32 é filtrada e devolvida em float32, próxima do resultado float64."""
+        x32 = matriz.astype(np.float32)
+        for f in (bandpass_filter, highpass_filter, lowpass_filter, notch_filter):
+            y32 = f(x32, fs)
+            assert y32.dtype == np.float32
+            np.testing.assert_allclose(y32, f(matriz, fs), atol=1e-3)
+
+    def test_notch_cascata_equivale_a_passagens_sequenciais(self, matriz, fs):
+        """Um SOS em cascata remove as mesmas harmônicas que três filtfilt sequenciais (longe das bordas)."""
+        from scipy.signal import filtfilt, iirnotch
+        ref = matriz[:, 0].copy()
+        for h in (1, 2, 3):
+            b, a = iirnotch(60.0 * h, 30.0, fs)
+            ref = filtfilt(b, a, ref)
+        got = notch_filter(matriz[:, 0], fs, freq=60.0, quality=30.0, harmonics=3)
+        np.testing.assert_allclose(got[500:-500], ref[500:-500], atol=1e-3)
+
+    def test_coeficientes_em_cache(self, matriz, fs):
+        """O projeto do filtro é reaproveitado entre chamadas com os mesmos parâmetros."""
+        from signal_processing.filters import _butter_sos, _notch_sos
+        bandpass_filter(matriz, fs, lowcut=0.7, highcut=33.0)
+        antes = _butter_sos.cache_info().hits
+        bandpass_filter(matriz, fs, lowcut=0.7, highcut=33.0)
+        assert _butter_sos.cache_info().hits == antes + 1
+        assert _notch_sos(fs, 60.0, 30.0, 3) is _notch_sos(fs, 60.0, 30.0, 3)
+
+
+class TestPreprocessamentoEmFluxo:
+    """preprocess_ecg_stream: blocos com margens equivalem ao lote, com memória limitada."""
+
+    @pytest.fixture
+    def holter(self):
+        fs = 250.0
+        rng = np.random.default_rng(1)
+        t = np.arange(0, 12 * 60.0, 1.0 / fs)[:, None]
+        x = (np.sin(2 * np.pi * 1.2 * t) + 0.4 * np.sin(2 * np.pi * 0.15 * t)
+             + 0.2 * np.sin(2 * np.pi * 60.0 * t) + 0.05 * rng.normal(size=(t.size, 2)))
+        return x, fs
+
+    @staticmethod
+    def _pedacos(x, tamanho):
+        return (x[i:i + tamanho] for i in range(0, len(x), tamanho))
+
+    @pytest.mark.parametrize("mode,tamanho", [("diagnostic", 997), ("monitoring", 250), ("monitoring", 40000)])
+    def test_igual_ao_lote(self, holter, mode, tamanho):
+        """A concatenação dos blocos reproduz preprocess_ecg em todo o registro, bordas inclusive."""
+        x, fs = holter
+        lote = preprocess_ecg(x, fs, mode=mode, compute_quality=False)["signal"]
+        blocos = list(preprocess_ecg_stream(self._pedacos(x, tamanho), fs, mode=mode,
+                                            block_s=120.0, compute_quality=False))
+        assert [b["start"] for b in blocos] == list(range(0, len(x), int(120 * fs)))
+        y = np.concatenate([b["signal"] for b in blocos])
+        assert y.shape == x.shape
+        np.testing.assert_allclose(y, lote, atol=1e-6 * np.max(np.abs(lote)))
+
+    def test_sinal_1d_e_qualidade_por_janela(self, holter):
+        """1D funciona e cada bloco traz uma avaliação por janela, alinhada ao registro."""
+        x, fs = holter
+        blocos = list(preprocess_ecg_stream(self._pedacos(x[:, 0], 5000), fs, mode="monitoring",
+                                            block_s=60.0, quality_window_s=20.0))
+        janelas = [q for b in blocos for q in b["quality"]]
+        assert len(janelas) == len(x) // int(20 * fs)
+        assert janelas[1]["start"] == int(20 * fs) and janelas[-1]["end"] == len(x)
+        assert all("sqi_score" in q for q in janelas)
+        assert blocos[0]["steps_applied"] == preprocess_ecg(x[:500, 0], fs, mode="monitoring")["steps_applied"]
+
+    def test_memoria_limitada(self, holter):
+        """Entrada sem fim: o primeiro bloco sai após consumir só bloco + margem, e o buffer não cresce."""
+        x, fs = holter
+        consumidos = [0]
+
+        def sem_fim():
+            while True:
+                consumidos[0] += 1
+                yield x[:1000]
+
+        fluxo = preprocess_ecg_stream(sem_fim(), fs, mode="monitoring", block_s=60.0,
+                                      margin_s=20.0, compute_quality=False)
+        primeiro = next(fluxo)
+        assert primeiro["end"] == int(60 * fs)
+        assert consumidos[0] == int(np.ceil((60 + 20) * fs / 1000))
+        for _ in range(20):
+            bloco = next(fluxo)
+        assert bloco["start"] == 20 * int(60 * fs)
+        assert consumidos[0] <= int(np.ceil((21 * 60 + 20) * fs / 1000))
+        fluxo.close()
+
+    def test_derivacoes_inconsistentes(self, holter):
+        """Pedaços com número de derivações diferente são rejeitados."""
+        x, fs = holter
+        with pytest.raises(ValueError, match="incompatible"):
+            list(preprocess_ecg_stream(iter([x[:1000], x[:1000, :1]]), fs))
+
+
+class TestMatrizBatimentos:
+    """extract_beats/BeatMatrix: batimentos alinhados compartilhados por SNR, template e SQI."""
+
+    @pytest.fixture
+    def ecg_com_picos(self, fs):
+        rng = np.random.default_rng(2)
+        t = np.arange(0, 10.0, 1.0 / fs)
+        picos = np.arange(int(0.4 * fs), len(t) - int(0.4 * fs), int(0.8 * fs))
+        sinal = np.zeros_like(t)
+        for p in picos:
+            sinal += np.exp(-0.5 * ((t - p / fs) / 0.012) ** 2) + 0.2 * np.exp(-0.5 * ((t - p / fs - 0.25) / 0.04) ** 2)
+        return sinal + rng.normal(0, 0.02, t.size), picos
+
+    def test_janelas_por_indexacao(self, ecg_com_picos, fs):
+        """Cada linha é a janela [pico - pre, pico + post); janelas fora do sinal são descartadas."""
+        sinal, picos = ecg_com_picos
+        lista = [3] + list(picos) + [len(sinal) - 2]
+        beats = extract_beats(sinal, lista, fs, pre_s=0.15, post_s=0.25)
+        assert beats.beats.shape == (len(picos), int(0.4 * fs))
+        assert list(beats.index) == list(range(1, len(picos) + 1))
+        np.testing.assert_array_equal(beats.beats[2], sinal[picos[2] - 75:picos[2] + 125])
+        assert beats.column(0.0) == beats.offset == 75
+
+    def test_template_mediana_correlacao(self, ecg_com_picos, fs):
+        """Template e mediana ficam com o pico na coluna do R; batimentos limpos correlacionam ~1."""
+        sinal, picos = ecg_com_picos
+        beats = extract_beats(sinal, picos, fs)
+        assert int(np.argmax(beats.template())) == beats.offset
+        assert int(np.argmax(beats.median_beat())) == beats.offset
+        assert np.all(beats.correlation() > 0.95)
+        multi = extract_beats(np.column_stack([sinal, -sinal]), picos, fs)
+        assert multi.beats.shape == (len(picos), beats.width, 2)
+        np.testing.assert_allclose(multi.correlation()[:, 0], beats.correlation())
+
+    def test_snr_template_com_picos_fornecidos(self, ecg_com_picos, fs):
+        """Com picos fornecidos, a SNR por template não repete a detecção e coincide com a detectada."""
+        sinal, picos = ecg_com_picos
+        detectada = estimate_snr(sinal, fs, method="template")
+        fornecida = estimate_snr(sinal, fs, method="template", peaks=picos)
+        assert fornecida == pytest.approx(extract_beats(sinal, picos, fs).snr_db())
+        assert abs(fornecida - detectada) < 3.0
+
+    def test_sqi_aceita_picos(self, ecg_com_picos, fs):
+        """signal_quality_index com picos: SNR por template e template_corr, por derivação em 2D."""
+        sinal, picos = ecg_com_picos
+        sem = signal_quality_index(sinal, fs)
+        com = signal_quality_index(sinal, fs, peaks=picos)
+        assert "template_corr" not in sem and com["template_corr"] > 0.95
+        assert com["snr_db"] == round(extract_beats(sinal, picos, fs).snr_db(), 1)
+        por_derivacao = signal_quality_index(np.column_stack([sinal, sinal]), fs, peaks=picos)
+        assert por_derivacao[0] == por_derivacao[1] == com
+        assert signal_quality_index(sinal, fs, peaks=picos[:2])["template_corr"] is None
@@ -24,6 +24,7 @@ from simulation.drug_effects import (
 )
 from simulation.ecg_generator import (
     LEAD_NAMES,
+    _PATHOLOGY_CONFIGS,
     generate_ecg,
     generate_pathological_ecg,
     add_noise,
@@ -110,6 +111,73 @@ def test_normal_ion_effects():
     assert "normalidade" in effects["description_pt"].lower()
 
 
+def _reference_waveform(model, duration_ms=1000, fs=1000):
+    """Per-sample phase loop of the original compute_waveform (reference for the masks)."""
+    from simulation.ion_channels import _ical_plateau, _ikr_current, _iks_current, _ito_current
+    t = np.linspace(0, duration_ms, int(duration_ms * fs / 1000), endpoint=False)
+    v_rest, h_inf = model._compute_resting_potential(), model._compute_ina_availability()
+    ca_factor, k_repol = model._compute_ca_factor(), model._compute_k_repol_factor()
+    v_peak = 20.0 * model.na_extra / model._NA_NORMAL * h_inf
+    ical_tau, plateau = 80.0 / max(ca_factor, 0.3), 150.0 + 50.0 / max(ca_factor, 0.3)
+    repol = 150.0 / max(k_repol, 0.3)
+    p0 = 5.0 / max(h_inf, 0.1)
+    p1, p2 = p0 + 10.0, p0 + 10.0 + plateau
+    plateau_v = v_peak - 5.0
+    net_end = _ical_plateau(plateau, tau_inact=ical_tau, ca_factor=ca_factor) - _ikr_current(plateau, k_factor=k_repol)
+    start_v = plateau_v - 0.03 * plateau * (1.0 - net_end / 2.0)
+    out = np.full(len(t), v_rest)
+    for i, dt in enumerate(t - 50.0):
+        if 0 <= dt < p0:
+            f = dt / p0
+            out[i] = v_rest + (v_peak - v_rest) * (3 * f ** 2 - 2 * f ** 3)
+        elif p0 <= dt < p1:
+            out[i] = v_peak - _ito_current(dt - p0, tau=8.0, g_to=10.0) * ((dt - p0) / 10.0)
+        elif p1 <= dt < p2:
+            d = dt - p1
+            net = _ical_plateau(d, tau_inact=ical_tau, ca_factor=ca_factor) - _ikr_current(d, k_factor=k_repol)
+            out[i] = plateau_v - 0.03 * d * (1.0 - net / 2.0)
+        elif p2 <= dt < p2 + repol:
+            d = dt - p2
+            iks = _iks_current(d, tau_act=repol * 0.6, k_factor=k_repol)
+            out[i] = start_v + (v_rest - start_v) * min(d / repol, 1.0) ** (0.8 + 0.4 * iks)
+    return out
+
+
+@pytest.mark.parametrize("k,ca,na", [(4.0, 2.2, 140.0), (7.5, 2.2, 140.0), (2.2, 1.5, 130.0), (5.7, 3.5, 145.0)])
+def test_waveform_matches_per_sample_loop(k, ca, na):
+    """Mask-based phases reproduce the per-sample loop."""
+    model = ActionPotentialModel(k, ca, na)
+    np.testing.assert_allclose(model.compute_waveform(), _reference_waveform(model), rtol=0, atol=1e-10)
+
+
+def test_waveform_batch_sweep():
+    """A K+ sweep renders as one [conditions, samples] matrix, row i = single-model waveform."""
+    k_levels = np.linspace(2.0, 8.0, 7)
+    batch = ActionPotentialModel.compute_waveform_batch(k_levels, ca_extra=2.2, duration_ms=600, fs=500)
+    assert batch.shape == (7, 300)
+    for row, k in zip(batch, k_levels):
+        np.testing.assert_array_equal(row, ActionPotentialModel(k_extra=k).compute_waveform(600, 500))
+    # Higher K+ depolarizes rest and accelerates repolarization (earlier return to rest)
+    assert np.all(np.diff(batch[:, 0]) > 0)
+    back_to_rest = np.argmax(np.isclose(batch[:, 100:], batch[:, :1]), axis=1)
+    assert np.all(np.diff(back_to_rest) <= 0)
+
+
+def test_ion_factor_helpers_shared_by_model_and_batch():
+    """The _compute_* methods are the scalar case of the array helpers used by the batch path."""
+    from simulation.ion_channels import (
+        _ca_factor, _ghk_resting_potential, _ina_availability, _k_repol_factor,
+    )
+    k, ca = np.array([2.5, 4.0, 7.0]), np.array([1.5, 2.2, 3.5])
+    v_rest = _ghk_resting_potential(k, 140.0)
+    for i in range(3):
+        model = ActionPotentialModel(k_extra=k[i], ca_extra=ca[i])
+        assert model._compute_resting_potential() == pytest.approx(v_rest[i])
+        assert model._compute_ina_availability() == pytest.approx(_ina_availability(v_rest)[i])
+        assert model._compute_ca_factor() == pytest.approx(_ca_factor(ca)[i])
+        assert model._compute_k_repol_factor() == pytest.approx(_k_repol_factor(k)[i])
+
+
 # ---------------------------------------------------------------------------
 # Drug database
 # ---------------------------------------------------------------------------
@@ -203,6 +271,67 @@ def test_check_cocaine_betablocker():
     assert any("CONTRAINDICAÇÃO" in w.upper() for w in warnings)
 
 
+# ---------------------------------------------------------------------------
+# Batched drug engine (multi-beat 12-lead × concentrations)
+# ---------------------------------------------------------------------------
+
+
+def _r_peaks(signal):
+    from scipy.signal import find_peaks
+    return find_peaks(signal, height=0.6)[0]
+
+
+def test_drug_effect_deltas_follow_hill_curve():
+    """Concentration 1.0 reproduces the database deltas; response saturates monotonically."""
+    from simulation.drug_effects import drug_effect_deltas
+    d = drug_effect_deltas("amiodarona", [0.0, 0.25, 1.0, 4.0])
+    drug = DRUG_DATABASE["amiodarona"]
+    assert d["qt_ms"][2] == pytest.approx(drug["qt_delta_ms"])
+    assert d["hr_bpm"][2] == pytest.approx(drug["hr_delta_bpm"])
+    assert d["qt_ms"][0] == 0 and d["amplitude"][0] == 1.0
+    assert np.all(np.diff(d["qt_ms"]) > 0) and d["qt_ms"][3] < 2 * drug["qt_delta_ms"]
+    combo = drug_effect_deltas(["digoxina", "amiodarona"], [[1.0, 1.0]])
+    assert combo["qt_ms"][0] == pytest.approx(-30 + 60)
+    with pytest.raises(ValueError):
+        drug_effect_deltas(["digoxina", "amiodarona"], [[1.0, 1.0, 1.0]])
+    with pytest.raises(ValueError, match="not found"):
+        drug_effect_deltas("placebo_x", [1.0])
+
+
+def test_simulate_drug_ecg_shape_and_identity():
+    """[C, leads, samples]; zero concentration returns the baseline ECG."""
+    from simulation.drug_effects import simulate_drug_ecg
+    ecg = generate_ecg(duration_s=6, fs=500, noise=0, rng=1)
+    out = simulate_drug_ecg(ecg, "sotalol", np.linspace(0, 2, 9))
+    assert out.shape == (9, 12, 3000) and np.all(np.isfinite(out))
+    np.testing.assert_allclose(out[0], np.vstack([ecg["leads"][lead] for lead in LEAD_NAMES]), atol=1e-9)
+
+
+@pytest.mark.parametrize("pathology", sorted(_PATHOLOGY_CONFIGS))
+def test_simulate_drug_ecg_identity_for_every_pathology(pathology):
+    """Zero concentration is the identity even when the QRS is wider than 0.8·PR (LBBB, WPW)."""
+    from simulation.drug_effects import simulate_drug_ecg
+    ecg = generate_pathological_ecg(pathology, rng=3, duration_s=4, noise=0)
+    out = simulate_drug_ecg(ecg, "sotalol", [0.0])
+    np.testing.assert_allclose(out[0], np.vstack(list(ecg["leads"].values())), atol=1e-9)
+
+
+def test_simulate_drug_ecg_applies_effects_per_beat():
+    """HR, PR and QT changes act on every beat of the record (not a single template)."""
+    from simulation.drug_effects import simulate_drug_ecg
+    ecg = generate_ecg(duration_s=10, fs=500, noise=0, hrv_mode="regular", rng=0)
+    base, amio = simulate_drug_ecg(ecg, "amiodarona", [0.0, 1.0])[:, 1]
+    r0, r1 = _r_peaks(base), _r_peaks(amio)
+    rr0, rr1 = np.median(np.diff(r0)), np.median(np.diff(r1))
+    assert rr1 / rr0 == pytest.approx(72 / (72 - 15), rel=0.02)
+    t_delay = lambda sig, peaks: np.median([np.argmax(sig[p + 40:p + 250]) + 40 for p in peaks[:-1]])
+    assert t_delay(amio, r1) > t_delay(base, r0) + 10  # QT prolonged (≥ 20 ms at 500 Hz)
+    assert len(r1) >= 7
+    dig = simulate_drug_ecg(ecg, "digoxina", [1.0])[0, 1]
+    r = _r_peaks(dig)
+    assert np.mean([dig[p + 30:p + 80].mean() for p in r[:-1]]) < -0.08  # ST depression
+
+
 # ---------------------------------------------------------------------------
 # ECG Generator — generate_ecg returns 12 leads
 # ---------------------------------------------------------------------------
@@ -243,6 +372,61 @@ def test_generate_ecg_different_hr():
     assert not np.allclose(ecg_slow["leads"]["II"], ecg_fast["leads"]["II"])
 
 
+def _reference_beat_train(rr_intervals, n_total, fs, pr_ms, qrs_ms, qt_ms, gains):
+    """Original beat-by-beat placement of _single_beat (reference for the vectorised train)."""
+    from simulation.ecg_generator import _single_beat
+    signal, pos, onsets = np.zeros(n_total), 0, []
+    for i, rr in enumerate(rr_intervals):
+        if pos >= n_total:
+            break
+        beat = _single_beat(float(rr), fs, pr_ms, qrs_ms, qt_ms)
+        n = len(beat)
+        beat[:int(n * 0.15)] *= gains[i, 0]
+        beat[int(n * 0.15):int(n * 0.35)] *= gains[i, 1]
+        beat[int(n * 0.45):] *= gains[i, 2]
+        end = min(pos + n, n_total)
+        signal[pos:end] = beat[:end - pos]
+        onsets.append(pos)
+        pos += n
+    return signal, onsets
+
+
+@pytest.mark.parametrize("fs,qt_ms", [(500, 380), (250, 520), (360, 300)])
+def test_beat_train_matches_per_beat_placement(fs, qt_ms):
+    """The single-pass beat train equals placing _single_beat beat by beat (U wave gating included)."""
+    from simulation.ecg_generator import _beat_train
+    rng = np.random.default_rng(fs)
+    rr = rng.uniform(0.35, 1.3, 30)
+    gains = 1.0 + rng.uniform(-0.1, 0.1, (30, 3))
+    got, onsets = _beat_train(rr, 8 * fs, fs, 160, 90, qt_ms, gains)
+    ref, ref_onsets = _reference_beat_train(rr, 8 * fs, fs, 160, 90, qt_ms, gains)
+    np.testing.assert_allclose(got, ref, rtol=0, atol=1e-12)
+    assert onsets == ref_onsets
+
+
+def test_generate_ecg_reproducible_with_generator():
+    """The same seed/Generator reproduces the ECG; different seeds differ."""
+    a = generate_ecg(duration_s=4, fs=250, rng=7)
+    b = generate_ecg(duration_s=4, fs=250, rng=np.random.default_rng(7))
+    c = generate_ecg(duration_s=4, fs=250, rng=8)
+    for lead in LEAD_NAMES:
+        np.testing.assert_array_equal(a["leads"][lead], b["leads"][lead])
+    assert a["beat_boundaries"] == b["beat_boundaries"]
+    assert not np.allclose(a["leads"]["II"], c["leads"]["II"])
+
+
+def test_precordial_scaling_by_mask():
+    """R/S scaling of the QRS region: positive samples × R factor, the rest × S factor."""
+    from simulation.ecg_generator import PRECORDIAL_R_FACTOR, PRECORDIAL_S_FACTOR, _generate_precordial
+    ii = generate_ecg(duration_s=2, fs=500, noise=0, hrv_mode="regular", rng=0)["leads"]["II"]
+    n, peak = len(ii), int(np.argmax(np.abs(ii)))
+    region = slice(max(0, peak - n // 20), min(n, peak + n // 20))
+    v4 = _generate_precordial(ii, "V4")
+    expected = np.where(ii[region] > 0, ii[region] * PRECORDIAL_R_FACTOR["V4"], ii[region] * PRECORDIAL_S_FACTOR["V4"])
+    np.testing.assert_array_equal(v4[region], expected)
+    np.testing.assert_array_equal(v4[:region.start], ii[:region.start])
+
+
 # ---------------------------------------------------------------------------
 # Pathological ECG — each supported pathology
 # ---------------------------------------------------------------------------
@@ -291,6 +475,103 @@ def test_wpw_short_pr():
     assert ecg["params"]["pr_ms"] <= 120
 
 
+def test_overlays_follow_real_beat_boundaries():
+    """ST overlays are locked to each beat's own RR (no drift under irregular rhythm)."""
+    from simulation.ecg_generator import _PATHOLOGY_OVERLAYS, apply_overlays
+    base = generate_ecg(duration_s=10, fs=500, noise=0, hrv_mode="af", rng=3)
+    before = {lead: sig.copy() for lead, sig in base["leads"].items()}
+    ecg = apply_overlays(base, _PATHOLOGY_OVERLAYS["stemi_anterior"])
+    delta = ecg["leads"]["V2"] - before["V2"]
+    onsets = base["beat_boundaries"]
+    for start, end in zip(onsets[:-1], onsets[1:]):
+        rr = end - start
+        st = slice(start + int(rr * 0.35), start + int(rr * 0.55))
+        assert delta[st].max() == pytest.approx(0.3)
+        assert np.all(delta[start:st.start] == 0) and np.all(delta[st.stop:end] == 0)
+    np.testing.assert_array_equal(ecg["leads"]["V5"], before["V5"])
+
+
+def test_overlay_every_drops_selected_beats():
+    """Mobitz II: only every 3rd beat has its QRS-T scaled down."""
+    from simulation.ecg_generator import _PATHOLOGY_OVERLAYS, apply_overlays
+    base = generate_ecg(duration_s=10, fs=500, noise=0, hrv_mode="regular", rng=0)
+    before = base["leads"]["II"].copy()
+    after = apply_overlays(base, _PATHOLOGY_OVERLAYS["bav_mobitz2"])["leads"]["II"]
+    onsets = base["beat_boundaries"]
+    for k, (start, end) in enumerate(zip(onsets[:-1], onsets[1:])):
+        changed = not np.array_equal(after[start:end], before[start:end])
+        assert changed == (k % 3 == 2)
+
+
+def test_pathological_ecg_reproducible_with_rng():
+    """The same seed reproduces AF (base rhythm and fibrillatory waves)."""
+    a = generate_pathological_ecg("af", rng=5)
+    b = generate_pathological_ecg("af", rng=5)
+    for lead in LEAD_NAMES:
+        np.testing.assert_array_equal(a["leads"][lead], b["leads"][lead])
+
+
+def test_all_configured_pathologies_render():
+    """Every configured pathology renders finite 12-lead signals through its overlays."""
+    from simulation.ecg_generator import _PATHOLOGY_CONFIGS, _PATHOLOGY_OVERLAYS
+    assert set(_PATHOLOGY_OVERLAYS) <= set(_PATHOLOGY_CONFIGS)
+    for pathology in _PATHOLOGY_CONFIGS:
+        ecg = generate_pathological_ecg(pathology, rng=0)
+        assert all(np.all(np.isfinite(ecg["leads"][lead])) for lead in LEAD_NAMES), pathology
+
+
+# ---------------------------------------------------------------------------
+# Bulk synthetic dataset
+# ---------------------------------------------------------------------------
+
+
+def test_simulate_dataset_shards_and_labels(tmp_path):
+    """Shards are [records, samples, 12] memmaps aligned with the label table."""
+    from simulation.dataset import LABEL_COLUMNS, load_dataset, simulate_dataset, simulate_record
+    res = simulate_dataset(tmp_path, 7, seed=3, fs=250, duration_s=4, shard_size=3,
+                           dtype="float16", workers=1, label_format="csv")
+    assert res["shards"] == ["shard_00000.npy", "shard_00001.npy", "shard_00002.npy"]
+    manifest, shards, labels = load_dataset(tmp_path)
+    assert isinstance(shards[0], np.memmap)
+    assert [s.shape for s in shards] == [(3, 1000, 12), (3, 1000, 12), (1, 1000, 12)]
+    assert shards[0].dtype == np.float16 and manifest["leads"] == LEAD_NAMES
+    assert list(labels.columns) == LABEL_COLUMNS and list(labels["record_id"]) == list(range(7))
+    signal, rec = simulate_record(4, seed=3, fs=250, duration_s=4)
+    row = labels.iloc[4]
+    assert (row["shard"], row["row"], row["pathology"]) == ("shard_00001.npy", 1, rec["pathology"])
+    np.testing.assert_array_equal(shards[1][1], signal.astype(np.float16))
+
+
+def test_simulate_dataset_independent_of_sharding(tmp_path):
+    """Per-record RNG streams: the same seed gives the same records for any shard size/workers."""
+    from simulation.dataset import load_dataset, simulate_dataset
+    simulate_dataset(tmp_path / "a", 6, seed=1, duration_s=2, shard_size=6, workers=1, label_format="csv")
+    simulate_dataset(tmp_path / "b", 6, seed=1, duration_s=2, shard_size=2, workers=2, label_format="csv")
+    _, sa, la = load_dataset(tmp_path / "a")
+    _, sb, lb = load_dataset(tmp_path / "b")
+    np.testing.assert_array_equal(sa[0], np.concatenate(sb))
+    assert list(la["pathology"]) == list(lb["pathology"])
+
+
+def test_sample_record_params_respects_pathology_config():
+    """Pathology-defining values stay near their configuration; subsets are honoured."""
+    from simulation.dataset import sample_record_params
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        p = sample_record_params(rng, ["long_qt", "af"])
+        assert p["pathology"] in ("long_qt", "af")
+        if p["pathology"] == "long_qt":
+            assert 0.95 * 520 <= p["qt_ms"] <= 1.05 * 520
+        else:
+            assert p["hrv_mode"] == "af"
+
+
+def test_simulate_dataset_rejects_unknown_pathology(tmp_path):
+    from simulation.dataset import simulate_dataset
+    with pytest.raises(ValueError, match="Unknown pathologies"):
+        simulate_dataset(tmp_path, 2, pathologies=["nope"])
+
+
 # ---------------------------------------------------------------------------
 # add_noise
 # ---------------------------------------------------------------------------
@@ -332,6 +613,40 @@ def test_ecg_to_plotly_figure_12x1():
     assert len(fig.data) == 12
 
 
+def test_minmax_decimate_keeps_extremes_per_bucket():
+    """Min/max decimation keeps every bucket's extremes, endpoints and time order."""
+    from simulation.ecg_generator import _minmax_decimate
+    rng = np.random.default_rng(0)
+    x = np.arange(5003) / 500.0
+    y = rng.normal(size=x.size)
+    xd, yd = _minmax_decimate(x, y, 200)
+    assert len(yd) <= 2 * 200 + 2 and np.all(np.diff(xd) > 0)
+    assert xd[0] == x[0] and xd[-1] == x[-1]
+    assert yd.max() == y.max() and yd.min() == y.min()
+    size = -(-x.size // 200)
+    for b in range(0, 200, 37):
+        seg = y[b * size:(b + 1) * size]
+        assert seg.max() in yd and seg.min() in yd
+    short_x, short_y = _minmax_decimate(x[:100], y[:100], 200)
+    assert np.array_equal(short_x, x[:100]) and np.array_equal(short_y, y[:100])
+
+
+def test_ecg_to_plotly_figure_webgl_is_decimated():
+    """render="webgl": Scattergl traces, at most 2 points per pixel column, same peaks."""
+    ecg = generate_ecg(duration_s=10, fs=500, rng=0)
+    full = ecg_to_plotly_figure(ecg, layout="3x4", render="full")
+    fast = ecg_to_plotly_figure(ecg, layout="3x4", render="webgl")
+    assert len(fast.data) == len(full.data) == 13
+    assert all(t.type == "scattergl" for t in fast.data)
+    assert all(t.type == "scatter" for t in full.data)
+    for a, b in zip(full.data, fast.data):
+        assert len(b.y) < len(a.y) and len(b.y) <= 2 * fast.layout.width
+        assert np.max(b.y) == pytest.approx(np.max(a.y), abs=1e-6)
+    assert len(fast.to_json()) < len(full.to_json()) / 3
+    with pytest.raises(ValueError):
+        ecg_to_plotly_figure(ecg, render="canvas")
+
+
 def test_ecg_to_plotly_invalid_layout():
     """Invalid layout should raise ValueError."""
     ecg = generate_ecg(duration_s=1, fs=250)
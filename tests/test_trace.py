@@ -16,3 +16,37 @@ def test_extract_trace_via_trace_module(synthetic_gray):
     trace = extract_trace_centerline(synthetic_gray)
     assert isinstance(trace, np.ndarray)
     assert trace.ndim == 1
+
+
+def _loop_centerline(crop, band=0.8):
+    h, w = crop.shape
+    cy0 = int((1 - band) * 0.5 * h)
+    cy1 = int(h - cy0)
+    return np.array([cy0 + int(np.argmin(crop[cy0:cy1, x])) for x in range(w)], dtype=float)
+
+
+def test_vectorized_centerline_matches_column_loop(synthetic_12lead):
+    crop = synthetic_12lead[0:300, 0:300]
+    assert np.array_equal(extract_trace_centerline(crop), _loop_centerline(crop))
+
+
+def test_extract_traces_batch_matches_per_crop(synthetic_12lead):
+    from cv.trace import extract_traces
+    from cv.segmentation_ext import segment_layout
+
+    boxes = {d["lead"]: d["bbox"] for d in segment_layout(synthetic_12lead, "3x4")}
+    traces = extract_traces(synthetic_12lead, boxes)
+    assert set(traces) == set(boxes)
+    for lead, (x0, y0, x1, y1) in boxes.items():
+        assert np.array_equal(traces[lead], _loop_centerline(synthetic_12lead[y0:y1, x0:x1]))
+
+
+def test_extract_traces_subpixel_close_to_integer(synthetic_12lead):
+    from cv.trace import extract_traces
+
+    boxes = {"II": (300, 0, 600, 300)}
+    base = extract_traces(synthetic_12lead, boxes)["II"]
+    sub = extract_traces(synthetic_12lead, boxes, subpixel=True)["II"]
+    assert sub.shape == base.shape
+    assert np.max(np.abs(sub - base)) <= 2.0
+    assert not np.array_equal(sub, np.round(sub))
@@ -6,10 +6,17 @@ import numpy as np, base64, json, random
 from PIL import Image
 from io import BytesIO
 
+from web_app.dash_app.figure_cache import default_figure_cache
+
 app = dash.Dash(__name__, suppress_callback_exceptions=True)
 app.title = "ECGiga — Plataforma Educacional de ECG"
 server = app.server  # expose Flask server for gunicorn
 
+# Figuras determinísticas (entradas normalizadas + seed) são servidas do cache compartilhado.
+# Cliques em "gerar" alternam entre FIGURE_VARIANTS seeds: variedade sem recalcular em sala de aula.
+FIGURE_CACHE = default_figure_cache()
+FIGURE_VARIANTS = 8
+
 def synth_wave(phase=0.0, n=2000):
     t = np.linspace(0, 1, n)
     base = 0.02*np.sin(2*np.pi*2*t + phase)
@@ -1570,7 +1577,8 @@ def update_contractile_ap(phase_val):
     try:
         from education.electrophysiology import create_action_potential_figure
         highlight = int(phase_val) if phase_val != "all" else None
-        fig = create_action_potential_figure("contractile", highlight)
+        fig = FIGURE_CACHE.get_or_build("contractile_ap", {"highlight": highlight},
+                                        lambda: create_action_potential_figure("contractile", highlight))
         return fig, phase_details.get(phase_val, "")
     except Exception as exc:
         fig = go.Figure()
@@ -1588,7 +1596,7 @@ def update_pacemaker_ap(tab):
         raise dash.exceptions.PreventUpdate
     try:
         from education.electrophysiology import create_action_potential_figure
-        return create_action_potential_figure("pacemaker")
+        return FIGURE_CACHE.get_or_build("pacemaker_ap", None, lambda: create_action_potential_figure("pacemaker"))
     except Exception as exc:
         fig = go.Figure()
         fig.update_layout(title=f"Erro: {exc}")
@@ -1605,7 +1613,7 @@ def update_comparison_ap(tab):
         raise dash.exceptions.PreventUpdate
     try:
         from education.electrophysiology import create_phase_comparison_figure
-        return create_phase_comparison_figure()
+        return FIGURE_CACHE.get_or_build("comparison_ap", None, create_phase_comparison_figure)
     except Exception as exc:
         fig = go.Figure()
         fig.update_layout(title=f"Erro: {exc}")
@@ -1754,12 +1762,14 @@ def generate_electrolyte_ecg(n_clicks, pathology):
             "A onda T mantém morfologia normal — a pausa entre QRS e T é longa."
         ),
     }
-    try:
+    seed = (n_clicks or 0) % FIGURE_VARIANTS
+
+    def build():
         from simulation.ecg_generator import generate_ecg, generate_pathological_ecg
         if pathology == "normal":
-            result = generate_ecg(hr_bpm=72, duration_s=10)
+            result = generate_ecg(hr_bpm=72, duration_s=10, rng=seed)
         else:
-            result = generate_pathological_ecg(pathology)
+            result = generate_pathological_ecg(pathology, rng=seed)
         leads_data = result.get("leads", {})
         fig = go.Figure()
         for lead_name in ["II", "V2", "V4"]:
@@ -1784,6 +1794,10 @@ def generate_electrolyte_ecg(n_clicks, pathology):
             xaxis=dict(showgrid=True, gridcolor="rgba(255,150,150,0.3)", dtick=0.2),
             yaxis=dict(showgrid=True, gridcolor="rgba(255,150,150,0.3)", dtick=0.5),
         )
+        return fig
+
+    try:
+        fig = FIGURE_CACHE.get_or_build("electrolyte_ecg", {"pathology": pathology}, build, seed=seed)
         return fig, descriptions.get(pathology, "")
     except Exception as exc:
         fig = go.Figure()
@@ -1917,17 +1931,24 @@ def simulate_ecg(n_clicks, hr, duration, pathology):
     hr = hr or 75
     duration = duration or 10
     pathology = pathology or "normal"
-    try:
+    seed = (n_clicks or 0) % FIGURE_VARIANTS
+
+    def build():
         from simulation.ecg_generator import generate_ecg, generate_pathological_ecg, ecg_to_plotly_figure
 
         if pathology == "normal":
-            result = generate_ecg(hr_bpm=hr, duration_s=duration)
+            result = generate_ecg(hr_bpm=hr, duration_s=duration, rng=seed)
         else:
-            result = generate_pathological_ecg(pathology)
+            result = generate_pathological_ecg(pathology, rng=seed)
 
-        # Use proper 12-lead 3x4 grid with rhythm strip
-        fig = ecg_to_plotly_figure(result, layout="3x4", rhythm_strip=True)
-        return fig
+        # Use proper 12-lead 3x4 grid with rhythm strip (WebGL, decimated to pixel width)
+        return ecg_to_plotly_figure(result, layout="3x4", rhythm_strip=True, render="webgl")
+
+    try:
+        inputs = {"hr": hr if pathology == "normal" else None,
+                  "duration": duration if pathology == "normal" else None, "pathology": pathology,
+                  "render": "webgl"}
+        return FIGURE_CACHE.get_or_build("simulate_ecg", inputs, build, seed=seed)
     except Exception as exc:
         fig = go.Figure()
         t = np.linspace(0, duration, duration * 500)
@@ -0,0 +1,175 @@
+"""
+Cache LRU de figuras Plotly serializadas (JSON) para os callbacks do Dash.
+
+Chave = versão do código + nome do callback + entradas normalizadas + seed. A versão
+do código é uma impressão digital (caminho, mtime, tamanho) dos módulos que geram as
+figuras, para que um deploy novo não sirva figuras antigas do disco. Cada processo mantém um
+LRU em memória; um diretório local compartilhado (um arquivo por figura, escrita
+atômica) deixa os workers do Gunicorn reaproveitarem figuras uns dos outros. O
+disco também é limitado a ``max_entries`` (descarta os de mtime mais antigo; leitura
+renova o mtime). Contadores de acerto/erro em ``stats()``.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pathlib
+import tempfile
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Union
+
+FIGURE_CACHE_VERSION = "figcache-0.1"
+_REPO_ROOT = pathlib.Path(__file__).resolve().parents[2]
+# Pacotes cujos módulos constroem as figuras servidas pelo cache (callbacks do Dash,
+# simulação de ECG e os potenciais de ação de education.electrophysiology)
+GENERATOR_PACKAGES = ("web_app/dash_app", "simulation", "education")
+
+
+@lru_cache(maxsize=None)
+def code_fingerprint(root: Union[str, pathlib.Path] = _REPO_ROOT,
+                     packages: tuple = GENERATOR_PACKAGES) -> str:
+    """Hash curto de (caminho, mtime, tamanho) dos .py dos pacotes geradores (1x por processo)."""
+    root = pathlib.Path(root)
+    h = hashlib.sha256()
+    for package in packages:
+        for path in sorted((root / package).rglob("*.py")):
+            st = path.stat()
+            h.update(f"{path.relative_to(root).as_posix()}:{st.st_mtime_ns}:{st.st_size};".encode())
+    return h.hexdigest()[:16]
+
+
+def _normalize(value: Any) -> Any:
+    """Forma canônica das entradas (tipos numpy → Python, floats arredondados, chaves ordenadas)."""
+    if hasattr(value, "item") and callable(value.item) and getattr(value, "ndim", 1) == 0:
+        value = value.item()
+    if isinstance(value, bool) or value is None or isinstance(value, (int, str)):
+        return value
+    if isinstance(value, float):
+        return round(value, 6)
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return str(value)
+
+
+class FigureCache:
+    """LRU de JSON de figuras em memória + armazenamento em disco compartilhado entre processos."""
+
+    def __init__(self, max_entries: int = 256, directory: Optional[Union[str, pathlib.Path]] = None,
+                 code_version: Optional[str] = None):
+        self.max_entries = max(1, int(max_entries))
+        self.code_version = code_version if code_version is not None else code_fingerprint()
+        self.directory = pathlib.Path(directory) if directory else None
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self._mem: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.disk_hits = self.misses = 0
+
+    def make_key(self, name: str, inputs: Any = None, seed: Optional[int] = None) -> str:
+        raw = json.dumps({"v": FIGURE_CACHE_VERSION, "code": self.code_version, "name": name,
+                          "inputs": _normalize(inputs), "seed": _normalize(seed)},
+                         sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> pathlib.Path:
+        return self.directory / f"{key}.json"
+
+    def _remember(self, key: str, payload: str) -> None:
+        self._mem[key] = payload
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+
+    def get(self, key: str) -> Optional[str]:
+        """JSON da figura ou None (memória → disco)."""
+        with self._lock:
+            payload = self._mem.get(key)
+            if payload is not None:
+                self._mem.move_to_end(key)
+                self.hits += 1
+                return payload
+        if self.directory is not None:
+            path = self._path(key)
+            try:
+                payload = path.read_text(encoding="utf-8")
+                os.utime(path)
+            except OSError:  # ausente ou removido por outro worker durante a poda
+                payload = None
+            if payload:
+                with self._lock:
+                    self._remember(key, payload)
+                    self.disk_hits += 1
+                return payload
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, payload: str) -> None:
+        with self._lock:
+            self._remember(key, payload)
+        if self.directory is None:
+            return
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            fh.write(payload)
+        os.replace(tmp, self._path(key))
+        self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        files = []
+        for path in self.directory.glob("*.json"):
+            try:
+                files.append((path.stat().st_mtime_ns, path))
+            except OSError:
+                pass
+        for _, path in sorted(files)[: max(0, len(files) - self.max_entries)]:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def get_or_build(self, name: str, inputs: Any, build: Callable[[], Any],
+                     seed: Optional[int] = None) -> Dict[str, Any]:
+        """Figura (dict pronto para o Dash) do cache ou construída por ``build()`` e guardada.
+
+        Exceções de ``build`` propagam e nada é gravado (o callback mantém seu fallback).
+        """
+        key = self.make_key(name, inputs, seed)
+        payload = self.get(key)
+        if payload is None:
+            fig = build()
+            payload = fig.to_json() if hasattr(fig, "to_json") else json.dumps(fig)
+            self.put(key, payload)
+        return json.loads(payload)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.disk_hits + self.misses
+        disk = len(list(self.directory.glob("*.json"))) if self.directory is not None else None
+        return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses,
+                "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else None,
+                "entries": len(self._mem), "disk_entries": disk, "max_entries": self.max_entries}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._mem.clear()
+            self.hits = self.disk_hits = self.misses = 0
+        if self.directory is not None:
+            for path in self.directory.glob("*.json"):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+
+def default_figure_cache() -> FigureCache:
+    """Cache do app: ECGIGA_FIGURE_CACHE_SIZE entradas (256) em ECGIGA_FIGURE_CACHE_DIR
+    (padrão: <tmp>/ecgiga_figures; "off" desativa o disco)."""
+    directory = (os.environ.get("ECGIGA_FIGURE_CACHE_DIR")
+                 or str(pathlib.Path(tempfile.gettempdir()) / "ecgiga_figures"))
+    return FigureCache(max_entries=int(os.environ.get("ECGIGA_FIGURE_CACHE_SIZE", "256")),
+                       directory=None if directory.lower() == "off" else directory)